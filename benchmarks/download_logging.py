@@ -0,0 +1,156 @@
+"""
+Download Logging Benchmark
+
+Downloads a file from a local HTTP server through DownloadQueueWorker and
+reports what logging costs per download: the messages sent to the log dock,
+the time the GUI thread spent showing them and the worker's wall time. Two
+logging presets are compared:
+
+    debug       yt-dlp verbose with progress lines, every message forwarded
+                (what every download did before presets)
+    production  yt-dlp debug output and progress lines dropped at the source
+
+Runs with a temporary HOME, so history and logs do not touch the real ones.
+
+Usage:
+    python benchmarks/download_logging.py [--downloads 5] [--size-mb 50]
+"""
+
+import argparse
+import functools
+import http.server
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+os.environ["HOME"] = tempfile.mkdtemp(prefix="download_logging_")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QEventLoop, QObject, QThreadPool, QTimer, Signal
+from PySide6.QtWidgets import QApplication
+
+from core.downloader import DownloadQueueWorker, DownloadTask
+from core.history_writer import stop_history_writer
+from core.log_model import LogListModel
+from core.logging_system import logger_manager
+
+
+class Signals(QObject):
+    progress = Signal(int, float)
+    status = Signal(int, str)
+    log = Signal(str)
+    info = Signal(int, str, str)
+    state = Signal(int, object)
+
+
+class TimedLog:
+    """The log dock's model, timed on the GUI thread"""
+
+    def __init__(self):
+        self.model = LogListModel(max_lines=20000)
+        self.messages = 0
+        self.seconds = 0.0
+
+    def append(self, text):
+        start = time.perf_counter()
+        self.model.append(text)
+        self.seconds += time.perf_counter() - start
+        self.messages += 1
+
+    def flush(self):
+        start = time.perf_counter()
+        self.model.flush()
+        self.seconds += time.perf_counter() - start
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def copyfile(self, source, outputfile):
+        try:
+            super().copyfile(source, outputfile)
+        except ConnectionError:
+            pass  # probed for headers only
+
+
+def serve(directory):
+    handler = functools.partial(QuietHandler, directory=directory)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(preset, url, folder, downloads):
+    logger_manager.set_component_levels(preset)
+    signals = Signals()
+    log = TimedLog()
+    signals.log.connect(log.append)
+    flusher = QTimer()
+    flusher.timeout.connect(log.flush)
+    flusher.start(16)
+    pool = QThreadPool()
+    pool.setMaxThreadCount(1)
+    worker_seconds = 0.0
+    for i in range(downloads):
+        shutil.rmtree(folder, ignore_errors=True)
+        task = DownloadTask(url, "best", folder, "", output_format="mp4")
+        worker = DownloadQueueWorker(task, i, signals.progress, signals.status, signals.log, signals.info,
+                                     signals.state)
+        loop = QEventLoop()
+        done = threading.Event()
+
+        def work(worker=worker):
+            worker.run()
+            done.set()
+
+        start = time.perf_counter()
+        pool.start(work)
+        poll = QTimer()
+        poll.timeout.connect(lambda: done.is_set() and loop.quit())
+        poll.start(5)
+        loop.exec()
+        poll.stop()
+        worker_seconds += time.perf_counter() - start
+        worker.cleanup()
+    flusher.stop()
+    log.flush()
+    return {
+        "messages": log.messages / downloads,
+        "gui ms": log.seconds * 1000 / downloads,
+        "download ms": worker_seconds * 1000 / downloads,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--downloads", type=int, default=5)
+    parser.add_argument("--size-mb", type=int, default=50)
+    args = parser.parse_args()
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    root = tempfile.mkdtemp(prefix="download_logging_srv_")
+    with open(os.path.join(root, "video.mp4"), "wb") as f:
+        f.write(os.urandom(args.size_mb * 1024 * 1024))
+    server = serve(root)
+    url = f"http://127.0.0.1:{server.server_port}/video.mp4"
+    folder = os.path.join(root, "out")
+
+    results = {preset: run(preset, url, folder, args.downloads) for preset in ("debug", "production")}
+    keys = list(next(iter(results.values())))
+    print("per download")
+    print(f"{'':<12}" + "".join(f"{key:>14}" for key in keys))
+    for name, result in results.items():
+        print(f"{name:<12}" + "".join(f"{result[key]:>14.1f}" for key in keys))
+    server.shutdown()
+    stop_history_writer()
+    shutil.rmtree(root, ignore_errors=True)
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
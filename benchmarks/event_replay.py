@@ -0,0 +1,150 @@
+"""
+Event Replay Benchmark
+
+Replays an event trace into an EventBus and reports how the GUI thread and the
+handlers kept up. The trace is one recorded with EventRecorder, or by default a
+synthetic batch of 1,000 downloads, 8 at a time, each publishing progress
+every 20 ms for 5 s (about 250,000 events over 10 minutes of trace time).
+
+The bus has a progress view on the GUI thread and a history handler on the
+handler pool that takes 0.5 ms per event. Each speed is a multiple of the
+recorded pace, or "max" to publish as fast as possible.
+
+Usage:
+    python benchmarks/event_replay.py [--trace events.jsonl.gz] [--speeds 100,max]
+                                      [--jobs 1000] [--concurrency 8]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QCoreApplication, QEventLoop, QTimer
+
+from core.event_replay import EventReplayer, write_trace
+from core.events import Event, EventBus, EventHandlerBase, EventType, ExecutionContext
+from core.logging_system import logger_manager
+
+
+class ProgressView(EventHandlerBase):
+    """Keeps the latest progress per URL, as a progress column would"""
+
+    def __init__(self):
+        super().__init__([EventType.DOWNLOAD_STARTED, EventType.DOWNLOAD_PROGRESS, EventType.DOWNLOAD_COMPLETED])
+        self.progress = {}
+
+    def handle_generic(self, event):
+        if event.event_type is EventType.DOWNLOAD_PROGRESS:
+            self.progress[event.data["url"]] = f"{event.data['progress']['percent']:.1f}%"
+        else:
+            self.progress[event.data["url"]] = event.event_type.value
+        return True
+
+
+class HistoryHandler(EventHandlerBase):
+    """Stands in for a history write"""
+
+    def __init__(self):
+        super().__init__([EventType.DOWNLOAD_COMPLETED], ExecutionContext.POOL)
+
+    def handle_generic(self, event):
+        time.sleep(0.0005)
+        return True
+
+
+def batch_trace(jobs, concurrency, seconds=5.0, interval=0.02):
+    """Events of a batch of downloads run concurrency at a time, in time order"""
+    steps = int(seconds / interval)
+    events = []
+    for job in range(jobs):
+        url = f"https://example.com/video/{job}"
+        start = (job // concurrency) * seconds + (job % concurrency) * interval / concurrency
+        events.append((start, Event(EventType.DOWNLOAD_STARTED, {"url": url}, source="queue")))
+        for step in range(1, steps + 1):
+            percent = step * 100 / steps
+            events.append((start + step * interval, Event(EventType.DOWNLOAD_PROGRESS, {
+                "url": url, "progress": {"percent": percent, "speed": 2.4e6, "eta": (steps - step) * interval},
+            }, source="worker")))
+        events.append((start + seconds, Event(EventType.DOWNLOAD_COMPLETED,
+                                              {"url": url, "success": True, "file_path": f"/tmp/{job}.mp4"},
+                                              source="worker")))
+    events.sort(key=lambda item: item[0])
+    return events
+
+
+def run(path, speed):
+    bus = EventBus()
+    view, history = ProgressView(), HistoryHandler()
+    for event_type in view.handled_events:
+        bus.subscribe(event_type, view)
+    bus.subscribe(EventType.DOWNLOAD_COMPLETED, history)
+
+    replayer = EventReplayer(path, bus, speed)
+    loop = QEventLoop()
+    poll = QTimer()
+    poll.timeout.connect(lambda: not replayer.is_running() and not bus.pending_count() and loop.quit())
+    gui_start = time.thread_time()
+    replayer.start()
+    poll.start(5)
+    loop.exec()
+    poll.stop()
+    gui_seconds = time.thread_time() - gui_start
+    bus.wait_idle()
+    stats = replayer.stats()
+
+    rows = {(row["event"], row["handler"]): row for row in bus.metrics.snapshot()["handlers"]}
+    progress = rows.get(("download_progress", "ProgressView"), {})
+    written = rows.get(("download_completed", "HistoryHandler"), {})
+    bus.shutdown()
+    return {
+        "events": stats["published"],
+        "replay s": stats["seconds"],
+        "events/s": stats["events_per_second"],
+        "max lag ms": stats["max_lag"] * 1000,
+        "gui cpu ms": gui_seconds * 1000,
+        "view calls": progress.get("calls", 0),
+        "view p99 ms": progress.get("latency", {}).get("p99_ms", 0.0),
+        "hist p99 ms": written.get("latency", {}).get("p99_ms", 0.0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--trace", help="A recorded trace; a synthetic batch by default")
+    parser.add_argument("--speeds", default="100,max")
+    parser.add_argument("--jobs", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    logger_manager.set_component_levels(levels={"": "WARNING"})  # Keep the replay and metrics reports out
+
+    root = None
+    path = args.trace
+    if path is None:
+        root = tempfile.mkdtemp(prefix="event_replay_")
+        path = os.path.join(root, "batch.jsonl.gz")
+        start = time.perf_counter()
+        count = write_trace(path, batch_trace(args.jobs, args.concurrency))
+        print(f"synthetic trace: {count} events, {os.path.getsize(path) / 1024 / 1024:.1f} MB, "
+              f"written in {time.perf_counter() - start:.1f} s")
+
+    results = {}
+    for speed in args.speeds.split(","):
+        results[f"{speed}x" if speed != "max" else "max"] = run(path, None if speed == "max" else float(speed))
+    keys = list(next(iter(results.values())))
+    print(f"{'':<8}" + "".join(f"{key:>13}" for key in keys))
+    for name, result in results.items():
+        print(f"{name:<8}" + "".join(f"{result[key]:>13.1f}" for key in keys))
+    if root is not None:
+        shutil.rmtree(root, ignore_errors=True)
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Log Dock Benchmark
+
+Feeds verbose yt-dlp output, in bursts as several workers log at once, into the
+log dock and reports how long the GUI thread took to show it and how much the
+process grew. Two docks are compared:
+
+    legacy    a QTextEdit appended to and scrolled per line, classified by
+              repeated lowercase substring scans
+    model     the ring-buffered LogListModel in a QListView, batched per frame
+
+Usage:
+    python benchmarks/log_dock.py [--lines 50000] [--burst 50] [--max-lines 20000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QCoreApplication, QEvent, QEventLoop, QTimer, Qt
+from PySide6.QtGui import QColor
+from PySide6.QtWidgets import QAbstractItemView, QApplication, QListView, QTextEdit
+
+from core.log_model import LogListModel
+
+
+LINES = [
+    "[yt-dlp Debug] [download] {i:.1f}% of 120.00MiB at 2.40MiB/s ETA 00:42",
+    "[yt-dlp Info] [youtube] abc{i}: Downloading webpage",
+    "[yt-dlp Info] [download] Destination: video {i}.mp4",
+    "[yt-dlp Warning] [youtube] Falling back to generic n function search",
+    "[yt-dlp Info] [Merger] Merged formats into \"video {i}.mp4\"",
+    "Queued download {i}",
+]
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except OSError:
+        return 0.0
+
+
+def legacy(max_lines):
+    edit = QTextEdit()
+    edit.setReadOnly(True)
+
+    def append(text):
+        color = "white"
+        if text.startswith("[yt-dlp"):
+            if "[yt-dlp Debug]" in text:
+                color = "#4D96FF"
+            elif "[yt-dlp Info]" in text:
+                if any(s in text.lower() for s in ["download completed", "has already been downloaded",
+                                                   "finished downloading", "merged", "success"]):
+                    color = "#6BCB77"
+                else:
+                    color = "#4D96FF"
+            elif "[yt-dlp Warning]" in text:
+                color = "#FFD93D"
+                text = f"⚠️ {text}"
+            elif "[yt-dlp Error]" in text:
+                color = "#FF4444"
+                text = f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] ❌ {text}"
+        else:
+            if any(k in text.lower() for k in ["error", "fail", "http status code"]):
+                color = "#FF4444"
+            elif any(k in text.lower() for k in ["warning", "warn"]):
+                color = "#FFD93D"
+            elif any(k in text.lower() for k in ["completed", "success", "finished"]):
+                color = "#6BCB77"
+            elif any(k in text.lower() for k in ["started", "queued", "fetching", "downloading"]):
+                color = "#4D96FF"
+        edit.setTextColor(QColor(color))
+        edit.append(text)
+        edit.setTextColor(QColor("white"))
+        scrollbar = edit.verticalScrollBar()
+        scrollbar.setValue(scrollbar.maximum())
+    return edit, append, lambda: edit.document().blockCount()
+
+
+def model(max_lines):
+    log_model = LogListModel(max_lines=max_lines)
+    view = QListView()
+    view.setModel(log_model)
+    view.setUniformItemSizes(True)
+    view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+    log_model.setParent(view)
+    log_model.rowsInserted.connect(lambda *args: view.scrollToBottom())
+    return view, log_model.append, log_model.rowCount
+
+
+def run(setup, lines, burst, max_lines):
+    widget, append, kept = setup(max_lines)
+    widget.resize(1200, 300)
+    widget.show()
+    rng = random.Random(5)
+    sent = [0]
+    loop = QEventLoop()
+
+    def tick():
+        for _ in range(burst):
+            append(rng.choice(LINES).format(i=sent[0]))
+            sent[0] += 1
+        if sent[0] < lines:
+            QTimer.singleShot(0, tick)
+        else:
+            # Let the last batch flush and paint
+            QTimer.singleShot(50, loop.quit)
+
+    before = rss_mb()
+    start = time.perf_counter()
+    QTimer.singleShot(0, tick)
+    loop.exec()
+    seconds = time.perf_counter() - start - 0.05
+    result = {
+        "seconds": seconds,
+        "lines/s": lines / seconds,
+        "kept": kept(),
+        "rss MB": rss_mb() - before,
+    }
+    widget.close()
+    widget.deleteLater()
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--lines", type=int, default=50000)
+    parser.add_argument("--burst", type=int, default=50)
+    parser.add_argument("--max-lines", type=int, default=20000)
+    args = parser.parse_args()
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    results = {name: run(setup, args.lines, args.burst, args.max_lines)
+               for name, setup in (("model", model), ("legacy", legacy))}
+    keys = list(next(iter(results.values())))
+    print(f"{'':<10}" + "".join(f"{key:>14}" for key in keys))
+    for name, result in results.items():
+        print(f"{name:<10}" + "".join(f"{result[key]:>14.1f}" for key in keys))
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Queue Progress Paint Benchmark
+
+Drives progress updates for 16 running jobs, at the rate yt-dlp progress hooks
+report them, into the queue table and the status bar, and reports paint time and
+Python allocation (Qt allocations, such as legacy's item per update, are not
+traced). Two ways of showing progress are compared:
+
+    legacy    a QTableWidget given a new item per update, status bar set per update
+    delegate  the queue model with ProgressDelegate, status bar refreshed on a timer
+
+Usage:
+    python benchmarks/progress_paint.py [--jobs 16] [--seconds 3] [--interval-ms 10]
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QCoreApplication, QEvent, QEventLoop, QTimer
+from PySide6.QtWidgets import (QApplication, QProgressBar, QTableView, QTableWidget, QTableWidgetItem,
+                               QVBoxLayout, QWidget)
+
+from core.downloader import DownloadTask
+from core.queue_model import COLUMNS, JobState, QueueTableModel
+from ui.components.progress_delegate import ProgressDelegate
+
+
+PROGRESS_COLUMN = COLUMNS.index(("Progress", "progress"))
+
+
+class PaintTimer:
+    """Times paintEvent of the table's viewport and the status bar progress"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def wrap(self, view_class):
+        timer = self
+
+        class TimedView(view_class):
+            def paintEvent(self, event):
+                start = time.perf_counter()
+                super().paintEvent(event)
+                timer.seconds += time.perf_counter() - start
+                timer.count += 1
+        return TimedView
+
+
+def make_window(view, bar):
+    window = QWidget()
+    layout = QVBoxLayout(window)
+    layout.addWidget(view)
+    layout.addWidget(bar)
+    window.resize(1200, 700)
+    window.show()
+    return window
+
+
+def make_model(jobs):
+    model = QueueTableModel()
+    model.add_jobs([DownloadTask(f"https://youtube.com/watch?v={i}", "720p", "/tmp", "") for i in range(jobs * 4)])
+    for _ in range(jobs):
+        job = model.take_next_pending()
+        model.set_info(job.id, f"Video {job.id}", "Channel")
+        model.set_state(job.id, JobState.DOWNLOADING)
+    return model
+
+
+def legacy(jobs, paint):
+    model = make_model(jobs)
+    table = paint.wrap(QTableWidget)(model.rowCount(), len(COLUMNS))
+    for row in range(model.rowCount()):
+        for column in range(len(COLUMNS)):
+            table.setItem(row, column, QTableWidgetItem(model.index(row, column).data()))
+    bar = paint.wrap(QProgressBar)()
+    window = make_window(table, bar)
+
+    def update(row, percent):
+        table.setItem(row, PROGRESS_COLUMN, QTableWidgetItem(f"{int(percent)}%"))
+        bar.setValue(int(percent))
+        bar.setFormat(f"Downloading... {int(percent)}%")
+    return window, update
+
+
+def delegate(jobs, paint):
+    model = make_model(jobs)
+    view = paint.wrap(QTableView)()
+    view.setModel(model)
+    view.setItemDelegateForColumn(PROGRESS_COLUMN, ProgressDelegate(view))
+    bar = paint.wrap(QProgressBar)()
+    window = make_window(view, bar)
+    model.setParent(window)
+
+    def refresh():
+        percent = int(model.active_progress())
+        bar.setValue(percent)
+        bar.setFormat(f"{model.active_count()} downloading: {percent}%")
+    timer = QTimer(window)
+    timer.timeout.connect(refresh)
+    timer.start(250)
+
+    def update(row, percent):
+        model.set_progress(row + 1, percent)
+    return window, update
+
+
+def run(setup, jobs, seconds, interval_ms):
+    paint = PaintTimer()
+    window, update = setup(jobs, paint)
+    progress = [0.0] * jobs
+    updates = [0]
+
+    def tick():
+        for row in range(jobs):
+            progress[row] = (progress[row] + random.uniform(0.02, 0.3)) % 100
+            update(row, progress[row])
+        updates[0] += jobs
+
+    loop = QEventLoop()
+    driver = QTimer()
+    driver.timeout.connect(tick)
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+
+    gc.collect()
+    collections = sum(stat["collections"] for stat in gc.get_stats())
+    tracemalloc.start()
+    driver.start(interval_ms)
+    loop.exec()
+    driver.stop()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    collections = sum(stat["collections"] for stat in gc.get_stats()) - collections
+    window.close()
+    window.deleteLater()
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    return {
+        "updates": updates[0],
+        "paints": paint.count,
+        "paint ms": paint.seconds * 1000 / max(paint.count, 1),
+        "paint total ms": paint.seconds * 1000,
+        "py kept KB": current / 1024,
+        "py peak KB": peak / 1024,
+        "gc runs": collections,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--jobs", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--interval-ms", type=int, default=10)
+    args = parser.parse_args()
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    results = {name: run(setup, args.jobs, args.seconds, args.interval_ms)
+               for name, setup in (("legacy", legacy), ("delegate", delegate))}
+    keys = list(next(iter(results.values())))
+    print(f"{'':<10}" + "".join(f"{key:>16}" for key in keys))
+    for name, result in results.items():
+        print(f"{name:<10}" + "".join(f"{result[key]:>16.1f}" for key in keys))
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Queue Ingest Benchmark
+
+Adds batches of URLs to a download queue the way the Batch Add dialog does and
+reports how long the batch takes to go in and how long the GUI thread is blocked
+at worst meanwhile, for the chunked background path and for adding everything
+in one go on the GUI thread.
+
+Usage:
+    python benchmarks/queue_ingest.py [--sizes 10000 50000 100000]
+
+Nothing is downloaded: dispatch is left stopped and metadata fetches return at once.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QEventLoop, QThreadPool, QTimer
+from PySide6.QtWidgets import QApplication, QTableView
+
+from core.metadata_prefetch import MetadataPrefetcher
+from core.queue_dispatcher import QueueDispatcher
+from core.queue_ingest import QueueIngestWorker, build_tasks, parse_urls
+from core.queue_model import QueueTableModel
+from core.queue_store import QueueRecorder, QueueStore
+
+
+OPTIONS = dict(resolution="1080p", folder="/downloads", proxy="", output_format="mp4",
+               from_queue=True, subtitle_languages="en")
+
+
+def make_text(count):
+    return "\n".join(f"https://www.youtube.com/watch?v={i:011d}" for i in range(count))
+
+
+class Queue:
+    """The queue page's model, view and helpers, without the rest of the window"""
+
+    def __init__(self, db_path):
+        self.model = QueueTableModel()
+        self.view = QTableView()
+        self.view.setModel(self.model)
+        self.view.resize(1000, 600)
+        self.view.show()
+        self.dispatcher = QueueDispatcher(self.model, lambda job: None)
+        self.prefetcher = MetadataPrefetcher(self.model, lambda task: ({}, None))
+        self.store = QueueStore(db_path)
+        self.recorder = QueueRecorder(self.model, self.store)
+
+    def close(self):
+        self.prefetcher.stop()
+        self.prefetcher.pool.waitForDone()
+        run_until(lambda: True)  # deliver the last fetch results
+        self.recorder.flush()
+        self.store.close()
+        self.view.close()
+
+
+def run_until(condition, timeout=600.0):
+    """Spin the event loop until condition() holds; returns the longest gap between 5 ms ticks"""
+    loop = QEventLoop()
+    state = {"last": time.perf_counter(), "gap": 0.0}
+    deadline = time.perf_counter() + timeout
+
+    def tick():
+        now = time.perf_counter()
+        state["gap"] = max(state["gap"], now - state["last"])
+        state["last"] = now
+        if condition() or now > deadline:
+            loop.quit()
+
+    timer = QTimer()
+    timer.timeout.connect(tick)
+    timer.start(5)
+    loop.exec()
+    timer.stop()
+    return state["gap"]
+
+
+def bench_chunked(queue, text, count):
+    """Background parse, chunked inserts with progress, batched saves"""
+    done = {"finished": False}
+    worker = QueueIngestWorker(text, OPTIONS)
+
+    def on_chunk(tasks, n, total):
+        queue.model.add_jobs(tasks)
+        worker.chunk_done()
+
+    worker.signals.chunk.connect(on_chunk)
+    worker.signals.finished.connect(lambda n, cancelled: done.update(finished=True))
+    start = time.perf_counter()
+    QThreadPool.globalInstance().start(worker)
+    gap = run_until(lambda: done["finished"] and queue.store.count() == count)
+    return time.perf_counter() - start, gap
+
+
+def bench_single(queue, text, count):
+    """Everything on the GUI thread in one go, saved in one write"""
+    start = time.perf_counter()
+    tasks = [task for chunk in build_tasks(parse_urls(text), OPTIONS, chunk_size=count) for task in chunk]
+    queue.model.add_jobs(tasks)
+    queue.recorder.flush()
+    blocked = time.perf_counter() - start
+    run_until(lambda: True)
+    return time.perf_counter() - start, blocked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000, 100000])
+    args = parser.parse_args()
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    print(f"{'URLs':>8}  {'path':<8}  {'total s':>8}  {'max GUI block ms':>16}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in args.sizes:
+            text = make_text(count)
+            for name, bench in (("chunked", bench_chunked), ("single", bench_single)):
+                queue = Queue(os.path.join(tmp, f"{name}-{count}.db"))
+                total, blocked = bench(queue, text, count)
+                assert queue.model.rowCount() == count
+                queue.close()
+                print(f"{count:>8}  {name:<8}  {total:>8.2f}  {blocked * 1000:>16.0f}")
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+Download Analytics
+
+This module aggregates download history with NumPy. History rows are read from the
+store in chunks into columnar arrays, and every statistic is computed with array
+operations (bincount, lexsort, percentile) instead of Python loops over rows.
+"""
+
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from core.history_store import HistoryStore, get_history_store
+
+
+PERCENTILES = (50, 90, 99)
+
+_COLUMNS = ("channel", "host", "created_at", "started_at", "bytes", "download_seconds", "outcome")
+
+
+@dataclass
+class HistoryColumns:
+    """History as parallel arrays; string columns are stored as codes into a label array"""
+    channel_codes: np.ndarray
+    channels: np.ndarray
+    host_codes: np.ndarray
+    hosts: np.ndarray
+    outcome_codes: np.ndarray
+    outcomes: np.ndarray
+    created_at: np.ndarray
+    started_at: np.ndarray
+    bytes: np.ndarray              # float64, NaN where unknown
+    download_seconds: np.ndarray   # float64, NaN where unknown
+
+    def __len__(self):
+        return len(self.created_at)
+
+
+@dataclass
+class GroupStats:
+    """Aggregates for one channel or host"""
+    name: str
+    downloads: int
+    completed: int
+    failed: int
+    bytes: int
+    failure_rate: float
+    median_throughput: Optional[float]  # bytes per second
+
+
+@dataclass
+class HistoryStats:
+    """Everything the stats view and the CLI report show"""
+    since: Optional[float]
+    until: Optional[float]
+    downloads: int
+    completed: int
+    failed: int
+    cancelled: int
+    total_bytes: int
+    failure_rate: float
+    throughput_percentiles: Dict[int, float] = field(default_factory=dict)  # bytes per second
+    channels: List[GroupStats] = field(default_factory=list)
+    hosts: List[GroupStats] = field(default_factory=list)
+    hour_histogram: List[int] = field(default_factory=lambda: [0] * 24)  # local hour of day
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# String columns and the label used where a value is missing; entries from before
+# outcomes were recorded were written when a download started
+_MISSING = {"channel": "Unknown Channel", "host": "unknown", "outcome": "unknown"}
+
+
+def _strings(values: Iterable[Optional[str]], missing: str) -> np.ndarray:
+    return np.array([v or missing for v in values], dtype=object)
+
+
+def _floats(values: Iterable[Any]) -> np.ndarray:
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+def _encode(values: np.ndarray):
+    labels, codes = np.unique(values.astype(str), return_inverse=True)
+    return codes.astype(np.int64), labels
+
+
+def load_columns(store: Optional[HistoryStore] = None, since: Optional[float] = None,
+                 until: Optional[float] = None) -> HistoryColumns:
+    """
+    Read the history columns analytics needs into NumPy arrays
+
+    Each chunk read from the store is converted to arrays as it arrives, and the
+    chunks are joined once at the end.
+
+    Args:
+        store: Store to read, the application store by default
+        since: Only entries created at or after this timestamp
+        until: Only entries created before this timestamp
+    """
+    store = store or get_history_store()
+    chunks = {name: [] for name in _COLUMNS}
+    for rows in store.iter_columns(_COLUMNS, since=since, until=until):
+        for name, values in zip(_COLUMNS, zip(*rows)):
+            if name in _MISSING:
+                chunks[name].append(_strings(values, _MISSING[name]))
+            else:
+                chunks[name].append(_floats(values))
+    arrays = {
+        name: np.concatenate(parts) if parts else np.empty(0, dtype=object if name in _MISSING else np.float64)
+        for name, parts in chunks.items()
+    }
+
+    channel_codes, channels = _encode(arrays["channel"])
+    host_codes, hosts = _encode(arrays["host"])
+    outcome_codes, outcomes = _encode(arrays["outcome"])
+    created_at = arrays["created_at"]
+    started_at = arrays["started_at"]
+    return HistoryColumns(
+        channel_codes=channel_codes,
+        channels=channels,
+        host_codes=host_codes,
+        hosts=hosts,
+        outcome_codes=outcome_codes,
+        outcomes=outcomes,
+        created_at=created_at,
+        started_at=np.where(np.isnan(started_at), created_at, started_at),
+        bytes=arrays["bytes"],
+        download_seconds=arrays["download_seconds"],
+    )
+
+
+def _outcome_mask(columns: HistoryColumns, outcome: str) -> np.ndarray:
+    matches = np.flatnonzero(columns.outcomes == outcome)
+    if not len(matches):
+        return np.zeros(len(columns), dtype=bool)
+    return columns.outcome_codes == matches[0]
+
+
+def throughput(columns: HistoryColumns) -> np.ndarray:
+    """Bytes per second of each entry, NaN where bytes or transfer time are unknown"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = columns.bytes / columns.download_seconds
+    rate[~np.isfinite(rate) | (columns.download_seconds <= 0)] = np.nan
+    return rate
+
+
+def group_medians(codes: np.ndarray, values: np.ndarray, groups: int) -> np.ndarray:
+    """
+    Median of values per group code, ignoring NaN, without a Python loop over groups
+
+    Returns:
+        Array of length groups, NaN for groups without values
+    """
+    valid = ~np.isnan(values)
+    codes, values = codes[valid], values[valid]
+    medians = np.full(groups, np.nan)
+    if not len(values):
+        return medians
+    order = np.lexsort((values, codes))
+    codes, values = codes[order], values[order]
+    counts = np.bincount(codes, minlength=groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    present = counts > 0
+    lower = starts + (counts - 1) // 2
+    upper = starts + counts // 2
+    medians[present] = (values[lower[present]] + values[upper[present]]) / 2
+    return medians
+
+
+def _group_stats(codes: np.ndarray, labels: np.ndarray, columns: HistoryColumns,
+                 completed: np.ndarray, failed: np.ndarray, rates: np.ndarray) -> List[GroupStats]:
+    groups = len(labels)
+    downloads = np.bincount(codes, minlength=groups)
+    completed_counts = np.bincount(codes, weights=completed, minlength=groups)
+    failed_counts = np.bincount(codes, weights=failed, minlength=groups)
+    byte_totals = np.bincount(codes, weights=np.nan_to_num(columns.bytes), minlength=groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        failure_rates = np.nan_to_num(failed_counts / (completed_counts + failed_counts))
+    medians = group_medians(codes, np.where(completed, rates, np.nan), groups)
+
+    order = np.lexsort((-downloads, -byte_totals))
+    return [
+        GroupStats(
+            name=str(labels[i]),
+            downloads=int(downloads[i]),
+            completed=int(completed_counts[i]),
+            failed=int(failed_counts[i]),
+            bytes=int(byte_totals[i]),
+            failure_rate=float(failure_rates[i]),
+            median_throughput=None if np.isnan(medians[i]) else float(medians[i]),
+        )
+        for i in order if downloads[i]
+    ]
+
+
+def hour_histogram(timestamps: np.ndarray) -> np.ndarray:
+    """Downloads per local hour of day (0-23), using the current UTC offset"""
+    if not len(timestamps):
+        return np.zeros(24, dtype=np.int64)
+    offset = time.localtime().tm_gmtoff
+    hours = ((timestamps + offset) // 3600 % 24).astype(np.int64)
+    return np.bincount(hours, minlength=24)
+
+
+def compute_stats(columns: HistoryColumns, since: Optional[float] = None,
+                  until: Optional[float] = None) -> HistoryStats:
+    """Compute all aggregates from already loaded columns"""
+    completed = _outcome_mask(columns, "completed")
+    failed = _outcome_mask(columns, "failed")
+    cancelled = _outcome_mask(columns, "cancelled")
+    rates = throughput(columns)
+    completed_rates = rates[completed & ~np.isnan(rates)]
+
+    n_completed, n_failed = int(completed.sum()), int(failed.sum())
+    attempts = n_completed + n_failed
+    percentiles = {}
+    if len(completed_rates):
+        percentiles = dict(zip(PERCENTILES, (float(v) for v in np.percentile(completed_rates, PERCENTILES))))
+
+    return HistoryStats(
+        since=since,
+        until=until,
+        downloads=len(columns),
+        completed=n_completed,
+        failed=n_failed,
+        cancelled=int(cancelled.sum()),
+        total_bytes=int(np.nansum(columns.bytes)),
+        failure_rate=n_failed / attempts if attempts else 0.0,
+        throughput_percentiles=percentiles,
+        channels=_group_stats(columns.channel_codes, columns.channels, columns, completed, failed, rates),
+        hosts=_group_stats(columns.host_codes, columns.hosts, columns, completed, failed, rates),
+        hour_histogram=[int(v) for v in hour_histogram(columns.started_at)],
+    )
+
+
+def history_stats(store: Optional[HistoryStore] = None, since: Optional[float] = None,
+                  until: Optional[float] = None) -> HistoryStats:
+    """Load history for the period and compute its statistics"""
+    return compute_stats(load_columns(store, since, until), since, until)
+
+
+def format_bytes(value: float) -> str:
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if abs(value) < 1024 or unit == "TB":
+            return f"{value:.1f} {unit}" if unit != "B" else f"{int(value)} B"
+        value /= 1024
+
+
+def format_report(stats: HistoryStats, top: int = 10) -> str:
+    """Plain text summary, as printed by the stats command"""
+    lines = [
+        f"Downloads: {stats.downloads} ({stats.completed} completed, {stats.failed} failed, {stats.cancelled} cancelled)",
+        f"Total: {format_bytes(stats.total_bytes)}",
+        f"Failure rate: {stats.failure_rate:.1%}",
+    ]
+    if stats.throughput_percentiles:
+        lines.append("Throughput: " + ", ".join(
+            f"p{p} {format_bytes(v)}/s" for p, v in stats.throughput_percentiles.items()
+        ))
+    for title, groups in (("Channels", stats.channels), ("Hosts", stats.hosts)):
+        lines.append("")
+        lines.append(f"{title}:")
+        for g in groups[:top]:
+            median = f"{format_bytes(g.median_throughput)}/s" if g.median_throughput is not None else "-"
+            lines.append(f"  {g.name}: {g.downloads} downloads, {format_bytes(g.bytes)}, "
+                         f"{g.failure_rate:.1%} failed, median {median}")
+    lines.append("")
+    lines.append("Downloads by hour:")
+    peak = max(stats.hour_histogram) or 1
+    for hour, count in enumerate(stats.hour_histogram):
+        lines.append(f"  {hour:02d}:00 {'#' * round(30 * count / peak)} {count}")
+    return "\n".join(lines)
@@ -0,0 +1,100 @@
+"""
+Command Line Interface
+
+This module provides the headless commands of the application, run as
+`python main.py <command> ...` without starting the GUI.
+"""
+
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+
+COMMANDS = ("history", "stats")
+
+
+def _add_history_commands(subparsers):
+    history = subparsers.add_parser("history", help="Export or import download history")
+    actions = history.add_subparsers(dest="action", required=True)
+
+    export = actions.add_parser("export", help="Stream history to a JSON Lines or CSV file")
+    export.add_argument("path", help="Output file (.jsonl or .csv, add .gz to compress)")
+    export.add_argument("--format", choices=("jsonl", "csv"), help="Override the format taken from the file name")
+    export.add_argument("--since", help="Only entries on or after this date (YYYY-MM-DD or ISO 8601)")
+    export.add_argument("--until", help="Only entries before this date (YYYY-MM-DD or ISO 8601)")
+    export.add_argument("--channel", help="Only entries of this channel")
+    export.add_argument("--gzip", action="store_true", default=None, help="Compress even without a .gz suffix")
+
+    imp = actions.add_parser("import", help="Add entries from a JSON Lines or CSV file")
+    imp.add_argument("path", help="Input file (.jsonl or .csv, optionally gzip compressed)")
+    imp.add_argument("--format", choices=("jsonl", "csv"), help="Override the format taken from the file name")
+
+
+def _add_stats_command(subparsers):
+    stats = subparsers.add_parser("stats", help="Show download statistics from history")
+    stats.add_argument("--since", help="Only downloads on or after this date (YYYY-MM-DD or ISO 8601)")
+    stats.add_argument("--until", help="Only downloads before this date (YYYY-MM-DD or ISO 8601)")
+    stats.add_argument("--top", type=int, default=10, help="Channels and hosts to list (default: 10)")
+    stats.add_argument("--json", action="store_true", help="Print all statistics as JSON")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="main.py", description="TokLabs Video Downloader command line tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    _add_history_commands(subparsers)
+    _add_stats_command(subparsers)
+    return parser
+
+
+def _run_history(args) -> int:
+    from core.history_io import export_history_file, import_history_file, parse_date
+
+    if args.action == "export":
+        count = export_history_file(
+            args.path,
+            fmt=args.format,
+            since=parse_date(args.since),
+            until=parse_date(args.until),
+            channel=args.channel,
+            compress=args.gzip
+        )
+        print(f"Exported {count} entries to {args.path}")
+    else:
+        count = import_history_file(args.path, fmt=args.format)
+        print(f"Imported {count} entries from {args.path}")
+    return 0
+
+
+def _run_stats(args) -> int:
+    from core.analytics import format_report, history_stats
+    from core.history_io import parse_date
+
+    stats = history_stats(since=parse_date(args.since), until=parse_date(args.until))
+    if args.json:
+        print(json.dumps(stats.to_dict(), indent=2))
+    else:
+        print(format_report(stats, top=args.top))
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run a command line command
+
+    Args:
+        argv: Arguments without the program name, sys.argv[1:] by default
+
+    Returns:
+        Process exit code
+    """
+    args = build_parser().parse_args(sys.argv[1:] if argv is None else argv)
+    try:
+        if args.command == "history":
+            return _run_history(args)
+        if args.command == "stats":
+            return _run_stats(args)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 2
@@ -64,6 +64,7 @@ class UIConfig:
     
     # Search settings
     SEARCH_DEBOUNCE_DELAY: int = 658
+    HISTORY_SEARCH_LIMIT: int = 1000
 
 
 @dataclass
@@ -88,7 +89,23 @@ class DownloadConfig:
     # yt-dlp settings
     GEO_BYPASS_COUNTRY: str = "US"
     FORCE_IPV4: bool = True
-    
+
+    # Subtitle settings
+    DEFAULT_SUBTITLE_LANGUAGES: tuple = ("en",)
+    SUBTITLE_FORMAT: str = "srt/vtt/ass/best"
+    SUBTITLE_FETCH_WORKERS: int = 4
+
+    # Queue metadata prefetch settings
+    METADATA_WORKERS: int = 2
+    METADATA_LOOKAHEAD: int = 50  # pending jobs ahead of dispatch to prefetch
+    METADATA_INFO_TTL: float = 1800.0  # seconds a prefetched info stays usable for the download
+
+    # History writer settings
+    HISTORY_FLUSH_INTERVAL: float = 0.25  # seconds
+    HISTORY_BATCH_SIZE: int = 100
+    HISTORY_RETRY_DELAY: float = 1.0  # seconds before a failed batch is retried, doubled per failure
+    HISTORY_RETRY_DELAY_MAX: float = 60.0
+
     # Format selection
     RESOLUTION_MAP: Dict[str, int] = field(default_factory=lambda: {
         "144p": 144, "240p": 240, "680p": 680,
@@ -143,6 +160,15 @@ class LoggingConfig:
     DATE_FORMAT: str = "%Y-%m-%d %H:%M:%S"
     MAX_LOG_SIZE: int = 8 * 824 * 824  # 8MB
     BACKUP_COUNT: int = 5
+    PRESET: str = "production"  # component levels, see core.logging_system.LOG_PRESETS
+    LEVELS: Dict[str, str] = field(default_factory=dict)  # component -> level, over the preset
+    QUEUE_BATCH_SIZE: int = 500  # records the log listener writes per batch at most
+    JOB_LOGS: bool = True  # structured per-job logs, see core.job_log
+    JOB_LOG_SPLIT: bool = False  # a file per download run instead of shared segments
+    JOB_LOG_MAX_BYTES: int = 64 * 1024 * 1024  # per segment
+    JOB_LOG_SEGMENTS: int = 4  # segments kept
+    DOCK_MAX_LINES: int = 20000  # lines kept in the log dock; older ones are dropped
+    DOCK_FLUSH_INTERVAL_MS: int = 16  # log dock appends are batched per frame
 
 
 @dataclass
@@ -154,6 +180,25 @@ class NetworkConfig:
     MAX_RETRIES: int = 6
 
 
+@dataclass
+class SchedulerConfig:
+    """Scheduled download configuration"""
+    RESYNC_INTERVAL: float = 30.0  # longest sleep, in seconds, before the wall clock is checked again
+    CLOCK_JUMP_TOLERANCE: float = 2.0  # seconds wall and monotonic time may drift apart before it is logged
+
+    # Channel and profile watch settings
+    WATCH_POLL_WORKERS: int = 2
+    WATCH_PAGE_SIZE: int = 20  # newest entries listed per poll
+    WATCH_MAX_PAGES: int = 5  # further pages listed only while a whole page is new
+    WATCH_SEEN_IDS: int = 200  # recent entry ids remembered per source
+    WATCH_MAX_SPREAD: float = 3600.0  # seconds sources on the same rule are spread over, at most
+
+    # Catch-up of runs missed while the application was closed
+    CATCH_UP_DELAY: float = 15.0  # seconds after startup the first missed run starts
+    CATCH_UP_STAGGER: float = 30.0  # seconds between missed runs
+    CATCH_UP_MAX_RUNS: int = 24  # missed runs kept per recurring job when running all
+
+
 @dataclass
 class AppConfig:
     """Main application configuration"""
@@ -162,6 +207,7 @@ class AppConfig:
     paths: PathConfig = field(default_factory=PathConfig)
     logging: LoggingConfig = field(default_factory=LoggingConfig)
     network: NetworkConfig = field(default_factory=NetworkConfig)
+    scheduler: SchedulerConfig = field(default_factory=SchedulerConfig)
     
     # Application metadata
     APP_ID_TEMPLATE: str = "TikTokBulkDownloader.App.{version}"
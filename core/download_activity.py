@@ -0,0 +1,59 @@
+"""
+Download Activity
+
+This module follows running downloads through the events download workers publish
+on the event bus. Progress events are coalesced per URL on the bus, so the tracker
+handles at most one per download per flush interval and keeps only the latest.
+"""
+
+from typing import Any, Dict
+
+from core.events import Event, EventBus, EventHandlerBase, EventType
+
+
+ACTIVITY_EVENTS = (
+    EventType.DOWNLOAD_STARTED,
+    EventType.DOWNLOAD_PROGRESS,
+    EventType.DOWNLOAD_COMPLETED,
+    EventType.DOWNLOAD_FAILED,
+    EventType.DOWNLOAD_CANCELLED,
+)
+
+
+class DownloadActivity(EventHandlerBase):
+    """Latest progress of each running download, by URL"""
+
+    def __init__(self):
+        super().__init__(list(ACTIVITY_EVENTS))
+        self._progress: Dict[str, Dict[str, Any]] = {}
+
+    def subscribe(self, bus: EventBus):
+        """Follow the download events of a bus; the bus only keeps a weak reference"""
+        for event_type in ACTIVITY_EVENTS:
+            bus.subscribe(event_type, self)
+
+    def handle_download_started(self, event: Event) -> bool:
+        self._progress[event.data["url"]] = {}
+        return True
+
+    def handle_download_progress(self, event: Event) -> bool:
+        self._progress[event.data["url"]] = event.data.get("progress") or {}
+        return True
+
+    def handle_download_completed(self, event: Event) -> bool:
+        self._progress.pop(event.data["url"], None)
+        return True
+
+    handle_download_failed = handle_download_completed
+    handle_download_cancelled = handle_download_completed
+
+    def running(self) -> int:
+        return len(self._progress)
+
+    def progress(self, url: str) -> Dict[str, Any]:
+        """The last progress reported for a running download, empty if none"""
+        return dict(self._progress.get(url, {}))
+
+    def total_speed(self) -> float:
+        """Bytes per second of the running downloads together"""
+        return float(sum(p.get("speed") or 0 for p in self._progress.values()))
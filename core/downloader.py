@@ -1,16 +1,33 @@
 import os
+import copy
 import yt_dlp
 import gc
 from PySide6.QtCore import QRunnable, QObject, Signal
 from core.utils import format_speed, format_time, get_data_dir
-from core.history import add_history_entry
+from core.events import EventType, create_publisher
+from core.history_store import host_from_url
+from core.history_writer import get_history_writer
+from core.job_log import JobContext, JobLog, job_context
+from core.logging_system import ytdlp_debug_enabled
+from core.queue_model import JobState
+from core.subtitles import SubtitleFetcher, build_subtitle_options, fetch_subtitles, parse_languages
+from core.throttle import get_bandwidth_limiter
 import time
 import shutil
-import json
+import threading
 
 class YTLogger:
-    def __init__(self, log_signal):
+    """
+    Forwards yt-dlp messages to the log dock
+
+    yt-dlp passes its info messages to debug() as well; its own debug messages
+    start with "[debug] ". Those are dropped here, before they cross to the GUI
+    thread, unless the ytdlp component logs at DEBUG.
+    """
+
+    def __init__(self, log_signal, debug_enabled=None):
         self.log_signal = log_signal
+        self.debug_enabled = ytdlp_debug_enabled() if debug_enabled is None else debug_enabled
         self._temp_files = []
 
     def _log(self, level, msg):
@@ -18,7 +35,10 @@ class YTLogger:
             self.log_signal.emit(f"[yt-dlp {level}] {msg}")
 
     def debug(self, msg):
-        self._log("Debug", msg)
+        if not msg.startswith("[debug] "):
+            self._log("Info", msg)
+        elif self.debug_enabled:
+            self._log("Debug", msg)
 
     def info(self, msg):
         self._log("Info", msg)
@@ -39,7 +59,11 @@ class YTLogger:
         self._temp_files.clear()
 
 class DownloadTask:
-    def __init__(self, url, resolution, folder, proxy, audio_only=False, playlist=False, subtitles=False, output_format="mp4", from_queue=False, audio_format=None, audio_quality="320"):
+    # Constructor arguments, which is everything needed to recreate the task
+    FIELDS = ("url", "resolution", "folder", "proxy", "audio_only", "playlist", "subtitles", "output_format",
+              "from_queue", "audio_format", "audio_quality", "subtitle_languages", "auto_subtitles", "subtitles_only")
+
+    def __init__(self, url, resolution, folder, proxy, audio_only=False, playlist=False, subtitles=False, output_format="mp4", from_queue=False, audio_format=None, audio_quality="320", subtitle_languages=None, auto_subtitles=False, subtitles_only=False):
         self.url = url
         self.resolution = resolution
         self.folder = folder
@@ -51,29 +75,88 @@ class DownloadTask:
         self.from_queue = from_queue
         self.audio_format = audio_format
         self.audio_quality = audio_quality
+        self.subtitle_languages = parse_languages(subtitle_languages)
+        self.auto_subtitles = auto_subtitles
+        self.subtitles_only = subtitles_only
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{name: data[name] for name in cls.FIELDS if name in data})
+
+
+RESOLUTION_HEIGHTS = {
+    "144p": 144, "240p": 240, "360p": 360,
+    "480p": 480, "720p": 720, "1080p": 1080,
+    "1440p": 1440, "2160p": 2160, "4320p": 4320
+}
+VIDEO_FORMAT_SORT = ["res", "ext:mp4:m4a", "size", "br", "asr"]
+
+
+def video_format(resolution):
+    """yt-dlp format selector for video capped at resolution"""
+    if resolution in RESOLUTION_HEIGHTS:
+        height = RESOLUTION_HEIGHTS[resolution]
+        return f"(bestvideo[height<={height}]+bestaudio/best[height<={height}]/best)"
+    return "bestvideo+bestaudio/best"
+
+
+def format_options(task):
+    """Format selection a worker downloads task with, for picking the same formats elsewhere"""
+    if task.audio_only:
+        audio_format = task.audio_format or "mp3"
+        if audio_format in ('m4a', 'aac', 'opus'):
+            return {"format": f"ba[acodec^={audio_format}]/ba/best"}
+        return {"format": "ba/best"}
+    return {"format": video_format(task.resolution), "format_sort": VIDEO_FORMAT_SORT}
+
 
 class DownloadQueueWorker(QRunnable):
-    def __init__(self, task, row, progress_signal, status_signal, log_signal, info_signal=None):
+    """
+    Runs one download. Signals carry job_id, the queue job this worker runs
+    (None outside the queue), so rows can move without misdirecting updates.
+    info is media info prefetched for the task (see core.metadata_prefetch); when
+    given, the media is not extracted again.
+    """
+
+    def __init__(self, task, job_id, progress_signal, status_signal, log_signal, info_signal=None, state_signal=None, info=None):
         super().__init__()
         self.task = task
-        self.row = row
+        self.job_id = job_id
+        self.prefetched = None if task.playlist else info
+        self.state_signal = state_signal
+        self.state = None
         self.progress_signal = progress_signal
         self.status_signal = status_signal
-        self.log_signal = log_signal
         self.info_signal = info_signal
+        # Messages also go to the job's own log, tagged with this run
+        self.job_log = JobLog(JobContext(job_id, task.url, host_from_url(task.url)), log_signal)
+        self.log_signal = self.job_log
         self.cancel = False
         self.data_dir = get_data_dir()
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir)
         self.cookie_file = os.path.join(self.data_dir, "youtube_cookies.txt")
-        self.logger = YTLogger(log_signal)
+        self.logger = YTLogger(self.job_log)
         self._ydl = None
         self.playlist_title = None
+        # Collected while the job runs and written to history once it ends
+        self._history = {"title": "", "channel": "", "host": host_from_url(task.url)}
+        self._outcome = None
+        self._error = None
+        self._started_at = None
+        self.events = create_publisher("downloader")
+        self._bytes = 0
+        self._download_seconds = 0.0
+        self._formats = []
 
     def __del__(self):
         self.cleanup()
 
     def cleanup(self):
+        get_bandwidth_limiter().unregister(self)
         if self._ydl:
             try:
                 self._ydl.close()
@@ -84,6 +167,11 @@ class DownloadQueueWorker(QRunnable):
             self.logger.cleanup()
         gc.collect()
 
+    def _attach(self, ydl):
+        """Make ydl the running instance, downloading within its share of the bandwidth cap"""
+        self._ydl = ydl
+        get_bandwidth_limiter().register(self, ydl.params)
+
     def _get_base_options(self):
         return {
             "cookiefile": self.cookie_file,
@@ -99,22 +187,75 @@ class DownloadQueueWorker(QRunnable):
         }
 
     def _get_format_string(self):
-        resolutions = {
-            "144p": 144, "240p": 240, "360p": 360,
-            "480p": 480, "720p": 720, "1080p": 1080,
-            "1440p": 1440, "2160p": 2160, "4320p": 4320
-        }
-        if self.task.resolution in resolutions:
-            height = resolutions[self.task.resolution]
-            return f"(bestvideo[height<={height}]+bestaudio/best[height<={height}]/best)"
-        return "bestvideo+bestaudio/best"
+        return video_format(self.task.resolution)
+
+    def _process_prefetched(self, ydl):
+        """Info for the task from the prefetched info, or None to extract it afresh"""
+        if self.prefetched is None:
+            return None
+        try:
+            # Processing adds to the dict; keep the original clean for the download
+            info = ydl.process_ie_result(copy.deepcopy(self.prefetched), download=False)
+        except Exception as e:
+            self.log_signal.emit(f"Prefetched media info unusable, fetching it again: {str(e)}")
+            self.prefetched = None
+            return None
+        self.log_signal.emit("Using prefetched media info")
+        return info
+
+    def _download(self, ydl):
+        """
+        Download the task, from the prefetched info when there is one
+
+        Returns:
+            yt-dlp's return code, non-zero if it ignored an error
+        """
+        info, self.prefetched = self.prefetched, None
+        if info is not None:
+            try:
+                ydl.process_ie_result(info, download=True)
+                # What ydl.download() returns, for a download started from info
+                return ydl._download_retcode
+            except (yt_dlp.utils.DownloadError, yt_dlp.utils.ReExtractInfo) as e:
+                if self.cancel:
+                    raise
+                self.log_signal.emit(f"Download from prefetched info failed, retrying from the URL: {str(e)}")
+        return ydl.download([self.task.url])
+
+    def _check_download(self, retcode):
+        """
+        Raise for a cancelled download, or one that ended with an error
+
+        With ignoreerrors set, yt-dlp reports errors, including the one the
+        progress hook raises on cancel, only through its return code.
+        """
+        if self.cancel:
+            raise yt_dlp.utils.DownloadError("Cancelled")
+        if retcode:
+            raise yt_dlp.utils.DownloadError("yt-dlp reported an error during the download")
+
+    def set_state(self, state):
+        if state != self.state:
+            self.state = state
+            self.job_log.context.stage = state.value
+            self.job_log.note(f"Stage: {state.value}")
+            if self.state_signal is not None and self.job_id is not None:
+                self.state_signal.emit(self.job_id, state)
 
     def run(self):
+        with job_context(self.job_log.context):
+            self._run()
+
+    def _run(self):
+        self._started_at = time.time()
+        self.events.publish_download_started(self.task.url, dict(self.task.to_dict(), job_id=self.job_id))
+        self.set_state(JobState.EXTRACTING)
+        subtitle_thread = None
         try:
             if self.task.playlist:
-                self.status_signal.emit(self.row, "Analyzing Playlist...")
+                self.status_signal.emit(self.job_id, "Analyzing Playlist...")
             else:
-                self.status_signal.emit(self.row, "Connecting...")
+                self.status_signal.emit(self.job_id, "Connecting...")
             
             self.log_signal.emit(f"Starting download to: {self.task.folder}")
             
@@ -123,9 +264,9 @@ class DownloadQueueWorker(QRunnable):
                 self.log_signal.emit(f"Created download directory: {self.task.folder}")
                 
             if self.task.playlist:
-                self.status_signal.emit(self.row, "Loading Playlist...")
+                self.status_signal.emit(self.job_id, "Loading Playlist...")
             else:
-                self.status_signal.emit(self.row, "Fetching Media Info...")
+                self.status_signal.emit(self.job_id, "Fetching Media Info...")
             
             if not os.path.exists(self.cookie_file):
                 try:
@@ -134,10 +275,17 @@ class DownloadQueueWorker(QRunnable):
                 except Exception as e:
                     self.log_signal.emit(f"Failed to create cookie file: {str(e)}")
 
+            if self.task.subtitles_only:
+                self._run_subtitles_only()
+                return
+
             info_options = self._get_base_options()
             info_options.update({
                 "skip_download": True
             })
+            fetch_subs_separately = self.task.subtitles and not self.task.playlist
+            if fetch_subs_separately:
+                info_options.update(build_subtitle_options(self.task.subtitle_languages, self.task.auto_subtitles))
 
             if self.task.playlist:
                 self.log_signal.emit("Playlist indexing in progress...")
@@ -145,9 +293,12 @@ class DownloadQueueWorker(QRunnable):
             try:
                 with yt_dlp.YoutubeDL(info_options) as ydl:
                     self._ydl = ydl
-                    info = ydl.extract_info(self.task.url, download=False)
+                    info = self._process_prefetched(ydl)
+                    if info is None:
+                        info = ydl.extract_info(self.task.url, download=False)
                     if info is None:
-                        self.status_signal.emit(self.row, "Content Unavailable")
+                        self.status_signal.emit(self.job_id, "Content Unavailable")
+                        self._error = "Content unavailable"
                         error_msg = f"Failed to extract info from: {self.task.url}\n"
                         error_msg += "Error Details:\n"
                         error_msg += "- HTTP Status: Content not found (404)\n"
@@ -171,7 +322,7 @@ class DownloadQueueWorker(QRunnable):
                         if info["entries"] and info["entries"][0]:
                             info = info["entries"][0]
                         else:
-                            self.status_signal.emit(self.row, "Playlist Error")
+                            self.status_signal.emit(self.job_id, "Playlist Error")
                             self.log_signal.emit(f"Playlist entries not found or empty for: {self.task.url}")
                             return
 
@@ -183,10 +334,19 @@ class DownloadQueueWorker(QRunnable):
 
                     title = info.get("title", "No Title")
                     channel = info.get("uploader", "Unknown Channel")
-                    if self.info_signal is not None and self.row is not None:
-                        self.info_signal.emit(self.row, title, channel)
+                    if self.info_signal is not None and self.job_id is not None:
+                        self.info_signal.emit(self.job_id, title, channel)
                     
-                    self.write_to_history(title, channel, self.task.url)
+                    self._history.update({
+                        "title": title,
+                        "channel": channel,
+                        "duration": info.get("duration"),
+                        "host": host_from_url(info.get("webpage_url") or self.task.url),
+                    })
+
+                    if fetch_subs_separately:
+                        media_filename = ydl.prepare_filename(info, outtmpl=os.path.join(self.task.folder, "%(title)s.%(ext)s"))
+                        subtitle_thread = self._start_subtitle_fetch(info, media_filename)
 
                 download_options = self._get_base_options()
                 
@@ -197,7 +357,9 @@ class DownloadQueueWorker(QRunnable):
                     "retries": 10,
                     "fragment_retries": 10,
                     "proxy": self.task.proxy if self.task.proxy else None,
-                    "verbose": True,
+                    # Progress is shown from the hook; its lines only with debug output
+                    "verbose": self.logger.debug_enabled,
+                    "noprogress": not self.logger.debug_enabled,
                     "file_access_retries": 5,
                     "retry_sleep": 2,
                     "prefer_ffmpeg": True,
@@ -241,7 +403,7 @@ class DownloadQueueWorker(QRunnable):
                     try:
                         download_options.update({
                             "format": self._get_format_string(),
-                            "format_sort": ["res", "ext:mp4:m4a", "size", "br", "asr"],
+                            "format_sort": VIDEO_FORMAT_SORT,
                             "prefer_free_formats": False,
                             "merge_output_format": self.task.output_format.lower(),
                             "postprocessors": [{
@@ -254,21 +416,19 @@ class DownloadQueueWorker(QRunnable):
                         self.log_signal.emit(f"Format configuration failed, falling back to basic format: {str(e)}")
                         download_options["format"] = "best"
 
-                if self.task.subtitles:
-                    download_options.update({
-                        "writesubtitles": True,
-                        "allsubtitles": True
-                    })
+                if self.task.subtitles and not fetch_subs_separately:
+                    # Playlists: let yt-dlp fetch the selected languages per entry
+                    download_options.update(build_subtitle_options(self.task.subtitle_languages, self.task.auto_subtitles))
 
                 try:
                     with yt_dlp.YoutubeDL(download_options) as ydl:
-                        self._ydl = ydl
+                        self._attach(ydl)
                         try:
-                            ydl.download([self.task.url])
+                            retcode = self._download(ydl)
                         except Exception as e:
                             if "Unable to rename file" in str(e):
                                 time.sleep(2)
-                                ydl.download([self.task.url])
+                                retcode = ydl.download([self.task.url])
                             elif "unable to obtain file audio codec" in str(e):
                                 ydl_opts = download_options.copy()
                                
@@ -280,14 +440,17 @@ class DownloadQueueWorker(QRunnable):
                                 ]
                                 self.log_signal.emit("Using high-quality fallback encoding parameters")
                                 with yt_dlp.YoutubeDL(ydl_opts) as ydl2:
-                                    self._ydl = ydl2
-                                    ydl2.download([self.task.url])
+                                    self._attach(ydl2)
+                                    retcode = ydl2.download([self.task.url])
                             else:
                                 raise
-                    self.status_signal.emit(self.row, "Download Completed")
+                    self._check_download(retcode)
+                    self._outcome = "completed"
+                    self.status_signal.emit(self.job_id, "Download Completed")
                 except yt_dlp.utils.DownloadError as e:
                     if self.cancel:
-                        self.status_signal.emit(self.row, "Download Cancelled")
+                        self._outcome = "cancelled"
+                        self.status_signal.emit(self.job_id, "Download Cancelled")
                         self.log_signal.emit("Download Cancelled")
                     else:
                         error_msg = f"Download Error: {str(e)}\n"
@@ -300,19 +463,28 @@ class DownloadQueueWorker(QRunnable):
                         download_options["format"] = "best"
                         try:
                             with yt_dlp.YoutubeDL(download_options) as ydl:
-                                self._ydl = ydl
-                                ydl.download([self.task.url])
-                            self.status_signal.emit(self.row, "Download Completed (Basic Format)")
+                                self._attach(ydl)
+                                retcode = ydl.download([self.task.url])
+                            self._check_download(retcode)
+                            self._outcome = "completed"
+                            self.status_signal.emit(self.job_id, "Download Completed (Basic Format)")
                         except Exception as e2:
-                            self.status_signal.emit(self.row, "Download Error")
-                            error_msg = f"All download attempts failed:\n"
-                            error_msg += f"Error Type: {type(e2).__name__}\n"
-                            error_msg += f"Error Details: {str(e2)}\n"
-                            if hasattr(e2, 'code'):
-                                error_msg += f"HTTP Status Code: {e2.code}\n"
-                            self.log_signal.emit(error_msg)
+                            if self.cancel:
+                                self._outcome = "cancelled"
+                                self.status_signal.emit(self.job_id, "Download Cancelled")
+                                self.log_signal.emit("Download Cancelled")
+                            else:
+                                self.status_signal.emit(self.job_id, "Download Error")
+                                self._error = str(e2)
+                                error_msg = f"All download attempts failed:\n"
+                                error_msg += f"Error Type: {type(e2).__name__}\n"
+                                error_msg += f"Error Details: {str(e2)}\n"
+                                if hasattr(e2, 'code'):
+                                    error_msg += f"HTTP Status Code: {e2.code}\n"
+                                self.log_signal.emit(error_msg)
             except Exception as e:
-                self.status_signal.emit(self.row, "Download Error")
+                self.status_signal.emit(self.job_id, "Download Error")
+                self._error = str(e)
                 error_msg = f"Unexpected Error:\n"
                 error_msg += f"Error Type: {type(e).__name__}\n"
                 error_msg += f"Error Details: {str(e)}\n"
@@ -320,44 +492,124 @@ class DownloadQueueWorker(QRunnable):
                     error_msg += f"HTTP Status Code: {e.code}\n"
                 self.log_signal.emit(error_msg)
         finally:
+            # Every outcome waits for the subtitle fetch, so it never writes after the job ends
+            self._finish_subtitle_fetch(subtitle_thread)
+            if not self.task.subtitles_only:
+                self.write_to_history()
+            final_state = self._final_state()
+            self.set_state(final_state)
+            self._publish_outcome(final_state)
             self.cleanup()
 
+    def _final_state(self):
+        # A cancel wins over whatever the download reported
+        if self.cancel or self._outcome == "cancelled":
+            return JobState.CANCELLED
+        if self._outcome == "completed":
+            return JobState.DONE
+        return JobState.FAILED
+
+    def _publish_outcome(self, state):
+        url = self.task.url
+        if state == JobState.DONE:
+            self.events.publish_download_completed(url, True)
+        elif state == JobState.CANCELLED:
+            self.events.publish(EventType.DOWNLOAD_CANCELLED, {"url": url, "job_id": self.job_id})
+        else:
+            self.events.publish(EventType.DOWNLOAD_FAILED, {"url": url, "job_id": self.job_id, "error": self._error})
+
+    def _start_subtitle_fetch(self, info, media_filename):
+        """Fetch the selected subtitle tracks in the background while the media downloads"""
+        def fetch():
+            try:
+                with yt_dlp.YoutubeDL(self._get_base_options()) as sub_ydl:
+                    results = SubtitleFetcher(sub_ydl).fetch(info, media_filename)
+                fetched = [r.lang for r in results if not r.error]
+                failed = [r.lang for r in results if r.error]
+                if fetched:
+                    self.log_signal.emit(f"Subtitles saved: {', '.join(fetched)}")
+                if failed:
+                    self.log_signal.emit(f"Subtitle fetch failed for: {', '.join(failed)}")
+                if not results:
+                    self.log_signal.emit("No subtitles available for the requested languages")
+            except Exception as e:
+                self.log_signal.emit(f"Subtitle fetch failed: {str(e)}")
+
+        thread = threading.Thread(target=fetch, name="subtitle-fetch", daemon=True)
+        thread.start()
+        return thread
+
+    def _finish_subtitle_fetch(self, thread):
+        if thread is not None:
+            thread.join()
+
+    def _run_subtitles_only(self):
+        self.status_signal.emit(self.job_id, "Fetching Subtitles...")
+        try:
+            results = fetch_subtitles(
+                self.task.url,
+                self.task.folder,
+                self.task.subtitle_languages,
+                self.task.auto_subtitles,
+                base_options=self._get_base_options(),
+                log_callback=self.log_signal.emit
+            )
+            if any(r.error for r in results):
+                self.status_signal.emit(self.job_id, "Subtitles Incomplete")
+            else:
+                self._outcome = "completed"
+                self.status_signal.emit(self.job_id, "Subtitles Completed")
+        except Exception as e:
+            self.status_signal.emit(self.job_id, "Subtitle Error")
+            self.log_signal.emit(f"Subtitle fetch failed for {self.task.url}: {str(e)}")
+
     def progress_hook(self, d):
         if self.cancel:
             raise yt_dlp.utils.DownloadError("Cancelled")
         if d["status"] == "downloading":
+            self.set_state(JobState.DOWNLOADING)
             downloaded = d.get("downloaded_bytes", 0) or 0
             total = d.get("total_bytes") or d.get("total_bytes_estimate", 0)
             percent = (downloaded / total) * 100 if total > 0 else 0
             speed = d.get("speed", 0) or 0
             eta = d.get("eta", 0) or 0
-            self.progress_signal.emit(self.row, percent)
+            self.progress_signal.emit(self.job_id, percent)
+            self.events.publish_download_progress(self.task.url, {
+                "job_id": self.job_id,
+                "percent": percent,
+                "speed": speed,
+                "eta": eta,
+                "downloaded_bytes": downloaded,
+                "total_bytes": total,
+            })
             self.log_signal.emit(f"Downloading... {int(percent)}% | Speed: {format_speed(speed)} | ETA: {format_time(eta)}")
+        elif d["status"] == "finished":
+            # One "finished" per file, e.g. the video and audio streams of a merged format;
+            # post-processing follows unless another stream starts downloading
+            self.set_state(JobState.POSTPROCESSING)
+            self._bytes += d.get("total_bytes") or d.get("downloaded_bytes") or 0
+            self._download_seconds += d.get("elapsed") or 0
+            format_id = (d.get("info_dict") or {}).get("format_id")
+            if format_id and format_id not in self._formats:
+                self._formats.append(format_id)
 
-    def write_to_history(self, title, channel, url):
-       
+    def write_to_history(self):
+        """Post the finished job with its outcome and transfer details to the history writer"""
+        outcome = {JobState.DONE: "completed", JobState.CANCELLED: "cancelled"}.get(self._final_state(), "failed")
+        title = self._history["title"]
+        channel = self._history["channel"]
         try:
-            history_file = os.path.join(get_data_dir(), "history.json")
-            
-            # Load 
-            if os.path.exists(history_file):
-                with open(history_file, "r", encoding="utf-8") as f:
-                    history = json.load(f)
-            else:
-                history = []
-            
-            # Add
-            history.append({
-                "title": title,
-                "channel": channel,
-                "url": url
-            })
-            
-            # Save 
-            with open(history_file, "w", encoding="utf-8") as f:
-                json.dump(history, f, indent=2, ensure_ascii=False)
-                
-            self.log_signal.emit(f"Added to history: {title} - {channel}")
-             
+            get_history_writer().post(
+                title, channel, self.task.url,
+                outcome=outcome,
+                bytes=self._bytes or None,
+                duration=self._history.get("duration"),
+                format="+".join(self._formats) or None,
+                host=self._history["host"] or None,
+                started_at=self._started_at,
+                finished_at=time.time(),
+                download_seconds=self._download_seconds or None,
+            )
+            self.log_signal.emit(f"Added to history: {title or self.task.url} ({outcome})")
         except Exception as e:
             self.log_signal.emit(f"Error writing to history: {str(e)}")
@@ -17,8 +17,9 @@ import yt_dlp
 from PySide6.QtCore import QRunnable, QObject, Signal
 
 from core.config import config_manager
-from core.logging_system import AppLogger, handle_errors
+from core.logging_system import AppLogger, handle_errors, ytdlp_debug_enabled
 from core.services import DownloadRequest, DownloadProgress, VideoInfo
+from core.subtitles import build_subtitle_options
 
 
 class DownloadStatus(Enum):
@@ -75,12 +76,18 @@ class IDownloadEventHandler(ABC):
 
 
 class YTDLPLogger:
-    """Custom logger for yt-dlp"""
+    """
+    Custom logger for yt-dlp
+
+    yt-dlp passes its info messages to debug() as well; its own debug messages
+    start with "[debug] " and are dropped unless the ytdlp component logs at DEBUG.
+    """
     
     def __init__(self, event_handler: IDownloadEventHandler, context: DownloadContext):
         self.event_handler = event_handler
         self.context = context
         self.logger = AppLogger('ytdlp')
+        self.debug_enabled = ytdlp_debug_enabled()
         self._temp_files = []
 
     def _log(self, level: str, msg: str):
@@ -94,7 +101,10 @@ class YTDLPLogger:
             log_method(msg)
 
     def debug(self, msg):
-        self._log("Debug", msg)
+        if not msg.startswith("[debug] "):
+            self._log("Info", msg)
+        elif self.debug_enabled:
+            self._log("Debug", msg)
 
     def info(self, msg):
         self._log("Info", msg)
@@ -164,7 +174,9 @@ class DownloadOptionsBuilder:
             "progress_hooks": [progress_hook],
             "noplaylist": not request.playlist,
             "proxy": request.proxy if request.proxy else None,
-            "verbose": True,
+            # Progress is reported by the hook; its lines only with debug output
+            "verbose": logger.debug_enabled,
+            "noprogress": not logger.debug_enabled,
         })
         
         # Add format-specific options
@@ -173,12 +185,9 @@ class DownloadOptionsBuilder:
         else:
             self._add_video_options(options, request)
         
-        # Add subtitle options
+        # Add subtitle options (selected languages only)
         if request.subtitles:
-            options.update({
-                "writesubtitles": True,
-                "allsubtitles": True
-            })
+            options.update(build_subtitle_options(request.subtitle_languages, request.auto_subtitles))
         
         return options
     
@@ -0,0 +1,202 @@
+"""
+Event Bus Metrics
+
+This module keeps the EventBus's instrumentation: how long events wait between
+publish and their handler, how long handlers take, and how many events are
+published, coalesced and dropped, per event type and per handler.
+
+Times go to LatencyHistogram, which counts samples in power-of-two microsecond
+buckets. Recording a sample is a few integer operations under a lock, and
+percentiles are read from the buckets, to within a factor of two.
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+
+# Bucket i counts samples below 2**i microseconds; the last bucket takes the rest (about 9 minutes and up)
+HISTOGRAM_BUCKETS = 30
+
+
+class LatencyHistogram:
+    """Counts durations in power-of-two microsecond buckets"""
+
+    __slots__ = ("counts", "count", "total", "max", "_lock")
+
+    def __init__(self):
+        self.counts = [0] * HISTOGRAM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        bucket = min(int(seconds * 1e6).bit_length(), HISTOGRAM_BUCKETS - 1) if seconds > 0 else 0
+        with self._lock:
+            self.counts[bucket] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def percentile(self, p: float) -> float:
+        """
+        The upper bound of the bucket holding the p-th percentile, capped at the maximum
+
+        Args:
+            p: Percentile, 0-100
+
+        Returns:
+            Seconds; 0.0 with no samples
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, -(-self.count * p // 100))
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min((1 << bucket) / 1e6, self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        """Count, mean, p50, p90, p99 and max; times in milliseconds"""
+        return {
+            "count": self.count,
+            "mean_ms": self.total * 1000 / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(50) * 1000,
+            "p90_ms": self.percentile(90) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+class HandlerStats:
+    """Latency and duration of one handler for one event type"""
+
+    __slots__ = ("latency", "duration", "failures", "dropped", "coalesced")
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.duration = LatencyHistogram()
+        self.failures = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+
+class EventMetrics:
+    """
+    Collects the EventBus's timings and counts
+
+    Handler stats are keyed by event type and the handler's class name, so
+    instances of one handler class are counted together.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._handlers: Dict[Tuple[str, str], HandlerStats] = {}
+        self._published: Dict[str, int] = {}
+        self._coalesced: Dict[str, int] = {}
+        self.started = time.time()
+
+    def handler_stats(self, event_type, handler) -> HandlerStats:
+        key = (event_type.value, handler.__class__.__name__)
+        stats = self._handlers.get(key)
+        if stats is None:
+            with self._lock:
+                stats = self._handlers.setdefault(key, HandlerStats())
+        return stats
+
+    def published(self, event):
+        """Count an event and stamp the time it was published"""
+        event.published_at = time.perf_counter()
+        name = event.event_type.value
+        with self._lock:
+            self._published[name] = self._published.get(name, 0) + 1
+
+    def coalesced(self, event_type, handler=None):
+        """Count an event replaced by a later one, on the bus or on a handler's queue"""
+        if handler is not None:
+            stats = self.handler_stats(event_type, handler)
+            with self._lock:
+                stats.coalesced += 1
+        else:
+            with self._lock:
+                self._coalesced[event_type.value] = self._coalesced.get(event_type.value, 0) + 1
+
+    def dropped(self, event_type, handler):
+        stats = self.handler_stats(event_type, handler)
+        with self._lock:
+            stats.dropped += 1
+
+    def run_handler(self, handler, event) -> bool:
+        """Run a handler on an event and record how long the event waited and the handler took"""
+        stats = self.handler_stats(event.event_type, handler)
+        start = time.perf_counter()
+        try:
+            return handler.handle_event(event)
+        except Exception:
+            with self._lock:
+                stats.failures += 1
+            raise
+        finally:
+            stats.duration.record(time.perf_counter() - start)
+            if event.published_at is not None:
+                stats.latency.record(start - event.published_at)
+
+    def reset(self):
+        with self._lock:
+            self._handlers = {}
+            self._published = {}
+            self._coalesced = {}
+            self.started = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        The metrics so far
+
+        Returns:
+            "events": per event type, published and coalesced counts;
+            "handlers": per event type and handler, calls, failures, dropped
+            and coalesced counts and latency and duration summaries
+        """
+        with self._lock:
+            handlers = list(self._handlers.items())
+            events = {name: {"published": count, "coalesced": self._coalesced.get(name, 0)}
+                      for name, count in self._published.items()}
+        return {
+            "since": self.started,
+            "events": events,
+            "handlers": [
+                {
+                    "event": event_type,
+                    "handler": handler,
+                    "calls": stats.duration.count,
+                    "failures": stats.failures,
+                    "dropped": stats.dropped,
+                    "coalesced": stats.coalesced,
+                    "latency": stats.latency.summary(),
+                    "duration": stats.duration.summary(),
+                }
+                for (event_type, handler), stats in sorted(handlers)
+            ],
+        }
+
+    def report(self) -> List[str]:
+        """The snapshot as lines of text, for the log"""
+        snapshot = self.snapshot()
+        lines = []
+        for name, counts in sorted(snapshot["events"].items()):
+            lines.append(f"{name}: {counts['published']} published, {counts['coalesced']} coalesced")
+        for row in snapshot["handlers"]:
+            latency, duration = row["latency"], row["duration"]
+            lines.append(
+                f"{row['event']} -> {row['handler']}: {row['calls']} calls, {row['failures']} failed, "
+                f"{row['dropped']} dropped, {row['coalesced']} coalesced; "
+                f"latency p50 {latency['p50_ms']:.2f} ms, p99 {latency['p99_ms']:.2f} ms, "
+                f"max {latency['max_ms']:.2f} ms; "
+                f"duration p50 {duration['p50_ms']:.2f} ms, p99 {duration['p99_ms']:.2f} ms, "
+                f"max {duration['max_ms']:.2f} ms"
+            )
+        return lines
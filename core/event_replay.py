@@ -0,0 +1,285 @@
+"""
+Event Recording and Replay
+
+This module records the events published on an EventBus to a trace file and
+plays traces back into a bus, so an event storm seen in a real session, such as
+a large batch of downloads, can be reproduced without the network for tuning
+and benchmarks.
+
+A trace is gzip-compressed JSON lines. The first line is a header; each other
+line is one event as [offset, type, source, data], where offset is the seconds
+since recording started. The recorder taps the bus before coalescing, so a trace
+holds every published event, and serializes them on a writer thread.
+"""
+
+import gzip
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from core.config import config_manager
+from core.events import Event, EventBus, EventType
+from core.logging_system import AppLogger
+
+
+TRACE_FORMAT = "event-trace"
+TRACE_VERSION = 1
+
+_STOP = object()
+
+
+def get_trace_dir() -> str:
+    return os.path.join(config_manager.config.paths.get_data_dir(), "logs", "events")
+
+
+def default_trace_path() -> str:
+    """A new trace file in the trace directory, named by the current time"""
+    return os.path.join(get_trace_dir(), f"events-{time.strftime('%Y%m%d-%H%M%S')}.jsonl.gz")
+
+
+def _open_trace(path: str):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    file = gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+    header = {"format": TRACE_FORMAT, "version": TRACE_VERSION, "started": time.time()}
+    file.write(json.dumps(header) + "\n")
+    return file
+
+
+def _encode(offset: float, event: Event) -> str:
+    return json.dumps([round(offset, 6), event.event_type.value, event.source, event.data],
+                      separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def write_trace(path: str, events: Iterable[Tuple[float, Event]]) -> int:
+    """
+    Write a trace from events and their offsets, such as a synthetic load
+
+    Returns:
+        Number of events written
+    """
+    count = 0
+    with _open_trace(path) as file:
+        for offset, event in events:
+            file.write(_encode(offset, event) + "\n")
+            count += 1
+    return count
+
+
+class EventRecorder:
+    """
+    Writes the events published on a bus to a trace file
+
+    Args:
+        path: The trace file; replaced if it exists
+        bus: The bus to record; None records only what is passed to record()
+        batch_size: Events the writer thread serializes per write
+    """
+
+    def __init__(self, path: str, bus: Optional[EventBus] = None, batch_size: int = 500):
+        self.path = path
+        self.bus = bus
+        self.batch_size = batch_size
+        self.count = 0
+        self.logger = AppLogger('event_recorder')
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._start = 0.0
+
+    def start(self) -> "EventRecorder":
+        if self._thread is not None:
+            return self
+        file = _open_trace(self.path)
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, args=(file,), name="EventRecorder", daemon=True)
+        self._thread.start()
+        if self.bus is not None:
+            self.bus.add_tap(self.record)
+        self.logger.info(f"Recording events to {self.path}")
+        return self
+
+    def record(self, event: Event):
+        """Queue an event for the trace; called on the publishing thread"""
+        self._queue.put((time.perf_counter() - self._start, event))
+
+    def stop(self) -> int:
+        """
+        Stop recording and write out the queued events
+
+        Returns:
+            Number of events recorded
+        """
+        if self._thread is None:
+            return self.count
+        if self.bus is not None:
+            self.bus.remove_tap(self.record)
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+        self.logger.info(f"Recorded {self.count} events to {self.path}")
+        return self.count
+
+    def __enter__(self) -> "EventRecorder":
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def _run(self, file):
+        try:
+            stopping = False
+            while not stopping:
+                batch = [self._queue.get()]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                lines = []
+                for item in batch:
+                    if item is _STOP:
+                        stopping = True
+                        continue
+                    offset, event = item
+                    try:
+                        lines.append(_encode(offset, event))
+                    except (TypeError, ValueError) as e:
+                        self.logger.warning(f"Event {event.event_type} not recorded: {e}")
+                if lines:
+                    file.write("\n".join(lines) + "\n")
+                    self.count += len(lines)
+        finally:
+            file.close()
+
+
+def read_trace_header(path: str) -> Dict[str, Any]:
+    """
+    The header of a trace file
+
+    Raises:
+        ValueError: If the file is not a trace this module can read
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        return _parse_header(file.readline())
+
+
+def _parse_header(line: str) -> Dict[str, Any]:
+    try:
+        header = json.loads(line)
+    except ValueError:
+        header = None
+    if not isinstance(header, dict) or header.get("format") != TRACE_FORMAT:
+        raise ValueError("Not an event trace")
+    if header.get("version", 0) > TRACE_VERSION:
+        raise ValueError(f"Event trace version {header['version']} is newer than this version supports")
+    return header
+
+
+def read_trace(path: str) -> Iterator[Tuple[float, Event]]:
+    """
+    The events of a trace file, in recorded order, read as they are needed
+
+    Yields:
+        Seconds since recording started, and the event; events of types this
+        version does not know are skipped
+
+    Raises:
+        ValueError: If the file is not a trace this module can read
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        _parse_header(file.readline())
+        for line in file:
+            if not line.strip():
+                continue
+            offset, type_value, source, data = json.loads(line)
+            try:
+                event_type = EventType(type_value)
+            except ValueError:
+                continue
+            yield offset, Event(event_type=event_type, data=data, source=source)
+
+
+class EventReplayer:
+    """
+    Publishes the events of a trace on a bus, in recorded order
+
+    Args:
+        path: The trace file
+        bus: The bus to publish on
+        speed: Multiple of the recorded pace; None or 0 publishes as fast as possible
+    """
+
+    def __init__(self, path: str, bus: EventBus, speed: Optional[float] = 1.0):
+        self.path = path
+        self.bus = bus
+        self.speed = speed or None
+        self.published = 0
+        self.max_lag = 0.0  # Seconds publishing fell behind the trace's pace
+        self.elapsed = 0.0
+        self.logger = AppLogger('event_replayer')
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run(self) -> Dict[str, float]:
+        """
+        Replay the trace on the calling thread
+
+        Returns:
+            Events published, seconds taken, events per second and the most
+            publishing fell behind the recorded pace, in seconds
+        """
+        self._stop.clear()
+        start = time.perf_counter()
+        for offset, event in read_trace(self.path):
+            if self._stop.is_set():
+                break
+            if self.speed is not None:
+                delay = start + offset / self.speed - time.perf_counter()
+                if delay > 0:
+                    if self._stop.wait(delay):
+                        break
+                elif -delay > self.max_lag:
+                    self.max_lag = -delay
+            self.bus.publish(event)
+            self.published += 1
+        self.elapsed = time.perf_counter() - start
+        self.logger.info(f"Replayed {self.published} events from {self.path} in {self.elapsed:.2f} s")
+        return self.stats()
+
+    def start(self) -> "EventReplayer":
+        """Replay the trace on a thread of its own, as download workers publish"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name="EventReplayer", daemon=True)
+            self._thread.start()
+        return self
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for a replay started with start() to end
+
+        Returns:
+            True if it ended before the timeout
+        """
+        if self._thread is None:
+            return True
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self):
+        self._stop.set()
+        self.wait()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "published": self.published,
+            "seconds": self.elapsed,
+            "events_per_second": self.published / self.elapsed if self.elapsed else 0.0,
+            "max_lag": self.max_lag,
+        }
@@ -6,12 +6,16 @@ and enabling reactive programming patterns.
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Callable, Optional, Type, TypeVar
-from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Callable, Optional, Tuple, Type, TypeVar
+from dataclasses import dataclass, field
 from enum import Enum
+import atexit
+import time
 import weakref
 import threading
-from PySide6.QtCore import QObject, Signal, QTimer
+from concurrent.futures import ThreadPoolExecutor
+from PySide6.QtCore import QObject, Qt, Signal, QTimer
+from core.event_metrics import EventMetrics
 from core.logging_system import AppLogger
 
 
@@ -59,6 +63,7 @@ class Event:
     data: Dict[str, Any]
     source: Optional[str] = None
     timestamp: Optional[float] = None
+    published_at: Optional[float] = field(default=None, repr=False, compare=False)  # perf_counter, for metrics
     
     def __post_init__(self):
         if self.timestamp is None:
@@ -66,9 +71,20 @@ class Event:
             self.timestamp = time.time()
 
 
+class ExecutionContext(Enum):
+    """Where an event handler runs"""
+    MAIN = "main"  # the bus's thread, in the bus's batches
+    POOL = "pool"  # the bus's shared handler pool
+    DEDICATED = "dedicated"  # a thread of the handler's own
+
+
 class IEventHandler(ABC):
     """Interface for event handlers"""
     
+    # Where handle_event runs, and how many events may wait for it off the bus's thread
+    execution_context: ExecutionContext = ExecutionContext.MAIN
+    max_pending: int = 1000
+    
     @abstractmethod
     def handle_event(self, event: Event) -> bool:
         """
@@ -99,8 +115,13 @@ class IEventHandler(ABC):
 class EventHandlerBase(IEventHandler):
     """Base implementation of event handler"""
     
-    def __init__(self, handled_events: List[EventType]):
+    def __init__(self, handled_events: List[EventType], execution_context: Optional[ExecutionContext] = None,
+                 max_pending: Optional[int] = None):
         self.handled_events = set(handled_events)
+        if execution_context is not None:
+            self.execution_context = execution_context
+        if max_pending is not None:
+            self.max_pending = max_pending
         self.logger = AppLogger(f'event_handler.{self.__class__.__name__}')
     
     def can_handle(self, event_type: EventType) -> bool:
@@ -128,25 +149,255 @@ class EventHandlerBase(IEventHandler):
     
     def handle_generic(self, event: Event) -> bool:
         """Generic event handler - override in subclasses"""
-        self.logger.debug(f"Handling event: {event.event_type}")
+        self.logger.debug("Handling event: %s", event.event_type)
         return True
 
 
+# Threads of the shared pool that POOL handlers run on
+HANDLER_POOL_WORKERS = 4
+
+# Events a queued handler runs before giving its pool thread to other handlers
+DRAIN_BATCH = 100
+
+
+class HandlerQueue:
+    """
+    Events waiting for a handler that runs off the bus's thread
+    
+    Events run one at a time in publishing order, on the shared pool or the
+    handler's own thread. A coalesced event replaces the waiting event with the
+    same key. When max_pending events wait, a publisher on another thread waits
+    for room; the bus's thread never waits, so its events are dropped instead.
+    
+    Args:
+        handler_ref: Weak reference to the handler
+        context: POOL or DEDICATED
+        max_pending: Events that may wait before publishers are held up
+        pool: The shared pool, for POOL handlers
+        logger: Where handler failures are logged
+        metrics: Where handler timings and drops are recorded, if anywhere
+    """
+    
+    def __init__(self, handler_ref: weakref.ref, context: ExecutionContext, max_pending: int,
+                 pool: Optional[ThreadPoolExecutor], logger, metrics: Optional[EventMetrics] = None):
+        self.handler_ref = handler_ref
+        self.metrics = metrics
+        self.context = context
+        self.max_pending = max(1, max_pending)
+        self.dropped = 0
+        self._pool = pool
+        self.logger = logger
+        self._events: Dict[Hashable, Event] = {}
+        self._sequence = 0
+        self._condition = threading.Condition()
+        self._scheduled = False  # A drain is queued or running
+        self._closed = False
+        self._thread = None
+        if context is ExecutionContext.DEDICATED:
+            handler = handler_ref()
+            name = f"event-handler.{handler.__class__.__name__}" if handler is not None else "event-handler"
+            self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+            self._thread.start()
+    
+    def put(self, event: Event, key: Optional[Hashable] = None, block: bool = True) -> bool:
+        """
+        Queue an event
+        
+        Args:
+            event: The event
+            key: Coalescing key; None queues the event however many wait
+            block: Wait for room when the queue is full, instead of dropping the event
+            
+        Returns:
+            True if the event was queued
+        """
+        with self._condition:
+            if self._closed:
+                return False
+            if key is not None and self._events.pop(key, None) is not None:
+                self._events[key] = event
+                if self.metrics is not None:
+                    self.metrics.coalesced(event.event_type, self.handler_ref())
+                return True
+            while len(self._events) >= self.max_pending:
+                if not block or self._closed:
+                    self.dropped += 1
+                    if self.metrics is not None:
+                        self.metrics.dropped(event.event_type, self.handler_ref())
+                    return False
+                self._condition.wait()
+            if key is None:
+                self._sequence += 1
+                key = self._sequence
+            self._events[key] = event
+            if self._thread is not None:
+                self._condition.notify_all()
+            elif not self._scheduled:
+                self._scheduled = True
+                self._pool.submit(self._drain)
+            return True
+    
+    def pending_count(self) -> int:
+        return len(self._events)
+    
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until no events wait and the handler is not running
+        
+        Returns:
+            True if the queue went idle before the timeout
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._events and not self._scheduled, timeout)
+    
+    def close(self):
+        """Run the waiting events, then stop; later events are refused"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+    
+    def _next(self) -> Optional[Event]:
+        """The next event, or None once the queue is empty; called with the condition held"""
+        if not self._events:
+            self._scheduled = False
+            self._condition.notify_all()
+            return None
+        event = self._events.pop(next(iter(self._events)))
+        self._scheduled = True
+        self._condition.notify_all()  # Room for a waiting publisher
+        return event
+    
+    def _drain(self):
+        for _ in range(DRAIN_BATCH):
+            with self._condition:
+                event = self._next()
+            if event is None:
+                return
+            self._handle(event)
+        with self._condition:
+            if self._events:
+                try:
+                    self._pool.submit(self._drain)  # Let other handlers have the thread
+                    return
+                except RuntimeError:
+                    pass  # The pool was shut down
+            self._scheduled = False
+            self._condition.notify_all()
+    
+    def _run(self):
+        while True:
+            with self._condition:
+                event = self._next()
+                while event is None:
+                    if self._closed:
+                        return  # Closed and drained
+                    self._condition.wait()
+                    event = self._next()
+            self._handle(event)
+    
+    def _handle(self, event: Event):
+        handler = self.handler_ref()
+        if handler is None:
+            return
+        try:
+            if self.metrics is not None:
+                self.metrics.run_handler(handler, event)
+            else:
+                handler.handle_event(event)
+        except Exception as e:
+            self.logger.error(f"Handler {handler.__class__.__name__} failed", exception=e)
+
+
+# Pending events are delivered at most this often; a tick for coalescing
+FLUSH_INTERVAL_MS = 16
+
+# Events of these types are coalesced: within a tick only the latest per key is delivered
+COALESCED_EVENTS: Dict[EventType, Callable[[Event], Hashable]] = {
+    EventType.DOWNLOAD_PROGRESS: lambda event: event.data.get('url'),
+}
+
+
 class EventBus(QObject):
-    """Central event bus for application-wide communication"""
+    """
+    Central event bus for application-wide communication
+    
+    Handler lists are copied on write, so dispatch reads them without taking a
+    lock. Events published from other threads are collected and delivered in a
+    batch on the bus's thread, one signal per batch, at most every flush
+    interval. Events of a coalesced type replace the pending event with the same
+    key, so a flood of progress updates reaches handlers at most once per key
+    per interval.
     
-    # Qt signals for cross-thread communication
-    event_emitted = Signal(object)  # Event object
+    Handlers whose execution_context is POOL or DEDICATED are not run on the
+    bus's thread: each gets a HandlerQueue its events are put on as they are
+    published, and runs them in order on the shared pool or a thread of its own.
     
-    def __init__(self):
+    Args:
+        coalesced: Key functions of the coalesced event types; COALESCED_EVENTS by default
+        flush_interval_ms: Interval between batches; 0 delivers on the next event loop turn
+        pool_workers: Threads of the pool POOL handlers share
+        metrics: Record latencies, handler durations and counts in self.metrics
+    """
+    
+    # Qt signal for cross-thread communication: emitted when a batch starts collecting
+    events_pending = Signal()
+    
+    def __init__(self, coalesced: Optional[Dict[EventType, Callable[[Event], Hashable]]] = None,
+                 flush_interval_ms: int = FLUSH_INTERVAL_MS, pool_workers: int = HANDLER_POOL_WORKERS,
+                 metrics: bool = True):
         super().__init__()
-        self._handlers: Dict[EventType, List[weakref.ref]] = {}
-        self._global_handlers: List[weakref.ref] = []
-        self._lock = threading.RLock()
+        self._handlers: Dict[EventType, Tuple[weakref.ref, ...]] = {}
+        self._global_handlers: Tuple[weakref.ref, ...] = ()
+        self._queued: Dict[EventType, Tuple[HandlerQueue, ...]] = {}
+        self._global_queued: Tuple[HandlerQueue, ...] = ()
+        self._queues: Dict[int, HandlerQueue] = {}  # By handler id
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_workers = pool_workers
+        self._lock = threading.RLock()  # Only taken to change the handler lists
+        self._coalesced = dict(COALESCED_EVENTS if coalesced is None else coalesced)
+        self._pending: Dict[Hashable, Event] = {}
+        self._pending_lock = threading.Lock()
+        self._sequence = 0
+        self._thread_id = threading.get_ident()
+        self.coalesced_count = 0
+        self.metrics = EventMetrics() if metrics else None
+        self._taps: Tuple[Callable[[Event], None], ...] = ()
         self.logger = AppLogger('event_bus')
         
-        # Connect Qt signal to internal handler
-        self.event_emitted.connect(self._handle_qt_event)
+        # Deliver batches on the bus's thread, after the publishing call returns
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(flush_interval_ms)
+        self._flush_timer.timeout.connect(self.flush)
+        self.events_pending.connect(self._schedule_flush, Qt.QueuedConnection)
+    
+    def set_coalescing(self, event_type: EventType, key: Optional[Callable[[Event], Hashable]]):
+        """
+        Coalesce events of a type by key, or stop coalescing them
+        
+        Args:
+            event_type: The event type
+            key: Returns the key of an event; None delivers every event
+        """
+        with self._pending_lock:
+            if key is None:
+                self._coalesced.pop(event_type, None)
+            else:
+                self._coalesced[event_type] = key
+    
+    def add_tap(self, tap: Callable[[Event], None]):
+        """
+        Pass every published event to tap, on the publishing thread and before coalescing
+        
+        Args:
+            tap: Called with each event; it should return quickly, as a recorder queueing it does
+        """
+        with self._lock:
+            self._taps = self._taps + (tap,)
+    
+    def remove_tap(self, tap: Callable[[Event], None]):
+        with self._lock:
+            self._taps = tuple(t for t in self._taps if t != tap)
     
     def subscribe(self, event_type: EventType, handler: IEventHandler) -> bool:
         """
@@ -160,14 +411,14 @@ class EventBus(QObject):
             True if subscription was successful
         """
         with self._lock:
-            if event_type not in self._handlers:
-                self._handlers[event_type] = []
-            
-            # Use weak reference to avoid memory leaks
-            handler_ref = weakref.ref(handler, self._cleanup_handler)
-            self._handlers[event_type].append(handler_ref)
+            if handler.execution_context is not ExecutionContext.MAIN:
+                self._queued[event_type] = self._queued.get(event_type, ()) + (self._queue_for(handler),)
+            else:
+                # Use weak reference to avoid memory leaks
+                handler_ref = weakref.ref(handler, self._cleanup_handler)
+                self._handlers[event_type] = self._handlers.get(event_type, ()) + (handler_ref,)
             
-            self.logger.debug(f"Subscribed {handler.__class__.__name__} to {event_type}")
+            self.logger.debug("Subscribed %s to %s", handler.__class__.__name__, event_type)
             return True
     
     def subscribe_global(self, handler: IEventHandler) -> bool:
@@ -181,10 +432,13 @@ class EventBus(QObject):
             True if subscription was successful
         """
         with self._lock:
-            handler_ref = weakref.ref(handler, self._cleanup_global_handler)
-            self._global_handlers.append(handler_ref)
+            if handler.execution_context is not ExecutionContext.MAIN:
+                self._global_queued = self._global_queued + (self._queue_for(handler),)
+            else:
+                handler_ref = weakref.ref(handler, self._cleanup_global_handler)
+                self._global_handlers = self._global_handlers + (handler_ref,)
             
-            self.logger.debug(f"Subscribed {handler.__class__.__name__} globally")
+            self.logger.debug("Subscribed %s globally", handler.__class__.__name__)
             return True
     
     def unsubscribe(self, event_type: EventType, handler: IEventHandler) -> bool:
@@ -199,103 +453,264 @@ class EventBus(QObject):
             True if unsubscription was successful
         """
         with self._lock:
-            if event_type not in self._handlers:
-                return False
-            
-            # Find and remove the handler
-            handlers = self._handlers[event_type]
+            handlers = self._handlers.get(event_type, ())
             for i, handler_ref in enumerate(handlers):
                 if handler_ref() is handler:
-                    handlers.pop(i)
-                    self.logger.debug(f"Unsubscribed {handler.__class__.__name__} from {event_type}")
+                    self._handlers[event_type] = handlers[:i] + handlers[i + 1:]
+                    self.logger.debug("Unsubscribed %s from %s", handler.__class__.__name__, event_type)
                     return True
             
-            return False
+            queues = self._queued.get(event_type, ())
+            for i, queue in enumerate(queues):
+                if queue.handler_ref() is handler:
+                    self._queued[event_type] = queues[:i] + queues[i + 1:]
+                    self.logger.debug("Unsubscribed %s from %s", handler.__class__.__name__, event_type)
+                    break
+            else:
+                return False
+            
+            # The queue is shared by the handler's subscriptions; stop it with the last one
+            subscribed = queue in self._global_queued or any(queue in qs for qs in self._queued.values())
+            if not subscribed:
+                if self._queues.get(id(handler)) is queue:
+                    del self._queues[id(handler)]
+        if not subscribed:
+            queue.close()  # Outside the lock: a publisher waiting on the queue may hold it up
+        return True
+    
+    def _queue_for(self, handler: IEventHandler) -> HandlerQueue:
+        """The handler's queue, shared by all its subscriptions; called with the lock held"""
+        queue = self._queues.get(id(handler))
+        if queue is None or queue.handler_ref() is not handler:
+            if handler.execution_context is ExecutionContext.POOL and self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self._pool_workers, thread_name_prefix="event-handlers")
+            queue = HandlerQueue(weakref.ref(handler, self._cleanup_queue), handler.execution_context,
+                                 handler.max_pending, self._pool, self.logger, self.metrics)
+            self._queues[id(handler)] = queue
+        return queue
     
     def publish(self, event: Event) -> int:
         """
         Publish an event to all subscribed handlers
         
+        An event published on the bus's thread is delivered at once, after any
+        pending events, unless its type is coalesced. Other events are queued
+        for the next batch. Handlers off the bus's thread get the event on
+        their queues right away; a full queue holds up a publisher on another
+        thread until there is room.
+        
         Args:
             event: The event to publish
             
         Returns:
-            Number of handlers that processed the event
+            Number of handlers that processed the event or had it queued, 0 if
+            it waits for the next batch
         """
-        # Use Qt signal for thread-safe event handling
-        self.event_emitted.emit(event)
-        return 0  # Actual count will be determined in _handle_qt_event
+        if self.metrics is not None:
+            self.metrics.published(event)
+        for tap in self._taps:
+            tap(event)
+        key_func = self._coalesced.get(event.event_type)
+        queued_count = self._queue_event(event, key_func) if self._queues else 0
+        if not self._handlers.get(event.event_type) and not self._global_handlers:
+            return queued_count  # No handler runs on the bus's thread
+        
+        if key_func is None and threading.get_ident() == self._thread_id:
+            if self._pending:
+                self.flush()
+            return queued_count + self._dispatch(event)
+        
+        with self._pending_lock:
+            if key_func is None:
+                self._sequence += 1
+                key = self._sequence
+            else:
+                key = (event.event_type, key_func(event))
+                # Move the latest event to the end, so the batch keeps publishing order
+                if self._pending.pop(key, None) is not None:
+                    self.coalesced_count += 1
+                    if self.metrics is not None:
+                        self.metrics.coalesced(event.event_type)
+            first = not self._pending
+            self._pending[key] = event
+        if first:
+            self.events_pending.emit()
+        return queued_count
     
-    def _handle_qt_event(self, event: Event) -> int:
-        """Handle event through Qt signal system"""
+    def _queue_event(self, event: Event, key_func: Optional[Callable[[Event], Hashable]]) -> int:
+        """Put an event on the queues of the handlers off the bus's thread"""
+        queues = self._queued.get(event.event_type, ())
+        for queue in self._global_queued:
+            handler = queue.handler_ref()
+            if handler is not None and handler.can_handle(event.event_type):
+                queues += (queue,)
+        if not queues:
+            return 0
+        key = None if key_func is None else (event.event_type, key_func(event))
+        block = threading.get_ident() != self._thread_id
+        return sum(queue.put(event, key, block) for queue in queues)
+    
+    def flush(self) -> int:
+        """
+        Deliver the pending events now
+        
+        Returns:
+            Number of handler calls that processed an event
+        """
+        with self._pending_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+        handled_count = 0
+        for event in batch.values():
+            handled_count += self._dispatch(event)
+        self.logger.debug("Delivered %d events", len(batch))
+        return handled_count
+    
+    def _schedule_flush(self):
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+    
+    def pending_count(self) -> int:
+        """Number of events waiting for the next batch"""
+        return len(self._pending)
+    
+    def _dispatch(self, event: Event) -> int:
+        """Run the handlers of an event; the handler lists are read without a lock"""
         handled_count = 0
         
-        with self._lock:
-            # Handle specific event type handlers
-            if event.event_type in self._handlers:
-                handlers = self._handlers[event.event_type][:]  # Copy to avoid modification during iteration
-                
-                for handler_ref in handlers:
-                    handler = handler_ref()
-                    if handler is not None:
-                        try:
-                            if handler.handle_event(event):
-                                handled_count += 1
-                        except Exception as e:
-                            self.logger.error(f"Handler {handler.__class__.__name__} failed", exception=e)
-                    else:
-                        # Clean up dead reference
-                        self._handlers[event.event_type].remove(handler_ref)
-            
-            # Handle global handlers
-            global_handlers = self._global_handlers[:]  # Copy to avoid modification during iteration
-            
-            for handler_ref in global_handlers:
-                handler = handler_ref()
-                if handler is not None:
-                    try:
-                        if handler.can_handle(event.event_type) and handler.handle_event(event):
-                            handled_count += 1
-                    except Exception as e:
-                        self.logger.error(f"Global handler {handler.__class__.__name__} failed", exception=e)
-                else:
-                    # Clean up dead reference
-                    self._global_handlers.remove(handler_ref)
+        # Handle specific event type handlers
+        for handler_ref in self._handlers.get(event.event_type, ()):
+            handler = handler_ref()
+            if handler is not None:
+                try:
+                    if self._run_handler(handler, event):
+                        handled_count += 1
+                except Exception as e:
+                    self.logger.error(f"Handler {handler.__class__.__name__} failed", exception=e)
+        
+        # Handle global handlers
+        for handler_ref in self._global_handlers:
+            handler = handler_ref()
+            if handler is not None:
+                try:
+                    if handler.can_handle(event.event_type) and self._run_handler(handler, event):
+                        handled_count += 1
+                except Exception as e:
+                    self.logger.error(f"Global handler {handler.__class__.__name__} failed", exception=e)
         
-        self.logger.debug(f"Event {event.event_type} handled by {handled_count} handlers")
+        self.logger.debug("Event %s handled by %d handlers", event.event_type, handled_count)
         return handled_count
     
+    def _run_handler(self, handler: IEventHandler, event: Event) -> bool:
+        if self.metrics is not None:
+            return self.metrics.run_handler(handler, event)
+        return handler.handle_event(event)
+    
+    def log_metrics(self):
+        """Write the metrics collected so far to the log"""
+        if self.metrics is None:
+            return
+        lines = self.metrics.report()
+        if lines:
+            self.logger.info("Event bus metrics:\n  " + "\n  ".join(lines))
+    
     def _cleanup_handler(self, handler_ref):
         """Cleanup handler reference when object is garbage collected"""
         with self._lock:
             for event_type, handlers in self._handlers.items():
                 if handler_ref in handlers:
-                    handlers.remove(handler_ref)
+                    self._handlers[event_type] = tuple(ref for ref in handlers if ref is not handler_ref)
     
     def _cleanup_global_handler(self, handler_ref):
         """Cleanup global handler reference when object is garbage collected"""
         with self._lock:
-            if handler_ref in self._global_handlers:
-                self._global_handlers.remove(handler_ref)
+            self._global_handlers = tuple(ref for ref in self._global_handlers if ref is not handler_ref)
+    
+    def _cleanup_queue(self, handler_ref):
+        """Drop the queue of a handler that was garbage collected"""
+        with self._lock:
+            queues = [queue for queue in self._queues.values() if queue.handler_ref is handler_ref]
+            for event_type, handler_queues in self._queued.items():
+                self._queued[event_type] = tuple(queue for queue in handler_queues
+                                                 if queue.handler_ref is not handler_ref)
+            self._global_queued = tuple(queue for queue in self._global_queued if queue.handler_ref is not handler_ref)
+            self._queues = {key: queue for key, queue in self._queues.items() if queue.handler_ref is not handler_ref}
+        for queue in queues:
+            queue.close()  # Outside the lock: a publisher waiting on the queue may hold it up
     
     def clear(self):
         """Clear all handlers"""
         with self._lock:
-            self._handlers.clear()
-            self._global_handlers.clear()
+            queues = list(self._queues.values())
+            self._handlers = {}
+            self._global_handlers = ()
+            self._queued = {}
+            self._global_queued = ()
+            self._queues = {}
             self.logger.debug("Event bus cleared")
+        for queue in queues:
+            queue.close()
+    
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the handlers off the bus's thread have run their events
+        
+        Args:
+            timeout: Seconds to wait in all; None waits as long as it takes
+            
+        Returns:
+            True if all queues went idle in time
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for queue in list(self._queues.values()):
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not queue.wait_idle(remaining):
+                return False
+        return True
+    
+    def shutdown(self, timeout: float = 5.0) -> bool:
+        """
+        Run the events already queued for handlers off the bus's thread and stop their threads
+        
+        Returns:
+            True if the queued events were all run in time
+        """
+        self.flush()
+        queues = list(self._queues.values())
+        idle = self.wait_idle(timeout)
+        self.log_metrics()
+        self.clear()
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+        if not idle:
+            self.logger.warning(f"{sum(queue.pending_count() for queue in queues)} queued events were not handled")
+        return idle
+    
+    def get_queue_stats(self) -> List[Dict[str, Any]]:
+        """Waiting and dropped events of each handler off the bus's thread"""
+        stats = []
+        for queue in list(self._queues.values()):
+            handler = queue.handler_ref()
+            stats.append({
+                'handler': handler.__class__.__name__ if handler is not None else None,
+                'context': queue.context.value,
+                'pending': queue.pending_count(),
+                'dropped': queue.dropped,
+            })
+        return stats
     
     def get_handler_count(self, event_type: Optional[EventType] = None) -> int:
         """Get the number of handlers for a specific event type or total"""
-        with self._lock:
-            if event_type is None:
-                # Total handlers
-                total = len(self._global_handlers)
-                for handlers in self._handlers.values():
-                    total += len(handlers)
-                return total
-            else:
-                return len(self._handlers.get(event_type, []))
+        if event_type is None:
+            # Total handlers
+            return (len(self._global_handlers) + len(self._global_queued)
+                    + sum(len(handlers) for handlers in self._handlers.values())
+                    + sum(len(queues) for queues in self._queued.values()))
+        else:
+            return len(self._handlers.get(event_type, ())) + len(self._queued.get(event_type, ()))
 
 
 class EventPublisher:
@@ -357,6 +772,7 @@ class EventPublisher:
 
 # Global event bus instance
 event_bus = EventBus()
+atexit.register(event_bus.log_metrics)
 
 
 def create_publisher(source_name: str) -> EventPublisher:
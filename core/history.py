@@ -1,116 +1,130 @@
 import os
 import json
 from PySide6.QtWidgets import QTableWidgetItem
+from PySide6.QtCore import Qt
 from core.config import config_manager
+from core.history_store import get_history_store
 
 DATA_DIR = config_manager.config.paths.get_data_dir()
 if not os.path.exists(DATA_DIR):
     os.makedirs(DATA_DIR)
+# Legacy JSON history, migrated into the SQLite store on first use
 HISTORY_FILE = os.path.join(DATA_DIR, "history.json")
 
+ENTRY_ID_ROLE = Qt.UserRole
+
+def _insert_row(table, entry):
+    row = table.rowCount()
+    table.insertRow(row)
+    title_item = QTableWidgetItem(entry["title"])
+    title_item.setData(ENTRY_ID_ROLE, entry["id"])
+    table.setItem(row, 0, title_item)
+    table.setItem(row, 1, QTableWidgetItem(entry["channel"]))
+    table.setItem(row, 2, QTableWidgetItem(entry["url"]))
+
+def _row_entry_id(table, row):
+    item = table.item(row, 0)
+    return item.data(ENTRY_ID_ROLE) if item else None
+
 def load_history_initial(table):
-    if not os.path.exists(HISTORY_FILE):
-        with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-            json.dump([], f, indent=4)
-    else:
-        try:
-            with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-                history = json.load(f)
-                for entry in history:
-                    row = table.rowCount()
-                    table.insertRow(row)
-                    # Check if entry has new format with title and channel
-                    if "title" in entry and "channel" in entry:
-                        title = entry.get("title", "Unknown Title")
-                        channel = entry.get("channel", "Unknown Channel")
-                        url = entry.get("url", "")
-                        table.setItem(row, 0, QTableWidgetItem(title))
-                        table.setItem(row, 1, QTableWidgetItem(channel))
-                        table.setItem(row, 2, QTableWidgetItem(url))
-                    else:
-                        # Legacy format - just URL
-                        url = entry.get("url", "")
-                        table.setItem(row, 0, QTableWidgetItem("Unknown Title"))
-                        table.setItem(row, 1, QTableWidgetItem("Unknown Channel"))
-                        table.setItem(row, 2, QTableWidgetItem(url))
-        except Exception as e:
-            print(f"Error loading history: {e}")
+    try:
+        for entry in get_history_store().iter_entries():
+            _insert_row(table, entry)
+    except Exception as e:
+        print(f"Error loading history: {e}")
 
 def save_history(table):
+    """Replace the stored history with the rows of the table (full rewrite, not used when appending)"""
     history = []
     for r in range(table.rowCount()):
         title_item = table.item(r, 0)
         channel_item = table.item(r, 1)
         url_item = table.item(r, 2)
-        
+
         title = title_item.text() if title_item else "Unknown Title"
         channel = channel_item.text() if channel_item else "Unknown Channel"
         url = url_item.text() if url_item else ""
-        
+
         # Skip empty rows
         if not url.strip():
             continue
-            
+
         history.append({
             "title": title,
             "channel": channel,
             "url": url
         })
-    with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-        json.dump(history, f, indent=4, ensure_ascii=False)
+    ids = iter(get_history_store().replace_all(history))
+    for r in range(table.rowCount()):
+        url_item = table.item(r, 2)
+        if url_item and url_item.text().strip() and table.item(r, 0):
+            table.item(r, 0).setData(ENTRY_ID_ROLE, next(ids))
 
 def add_history_entry(table, title="", channel="", url="", enabled=True):
     if not enabled:
         return
-    row = table.rowCount()
-    table.insertRow(row)
-    
     # Set default values if empty
     if not title:
         title = "Unknown Title"
     if not channel:
         channel = "Unknown Channel"
-    
-    table.setItem(row, 0, QTableWidgetItem(title))
-    table.setItem(row, 1, QTableWidgetItem(channel))
-    table.setItem(row, 2, QTableWidgetItem(url))
-    save_history(table)
+
+    entry_id = get_history_store().append(title, channel, url)
+    _insert_row(table, {"id": entry_id, "title": title, "channel": channel, "url": url})
 
 def delete_selected_history(table, log_callback):
     selected_rows = set()
     for it in table.selectedItems():
         selected_rows.add(it.row())
+    ids = [_row_entry_id(table, r) for r in selected_rows]
+    get_history_store().delete(i for i in ids if i is not None)
     for r in sorted(selected_rows, reverse=True):
         table.removeRow(r)
     log_callback(f"Deleted {len(selected_rows)} history entries.")
-    save_history(table)
 
 def delete_all_history(table, confirm, log_callback):
     ans = confirm()
     if ans:
         table.setRowCount(0)
+        get_history_store().clear()
         log_callback("All history deleted.")
-        save_history(table)
 
 def search_history(table, txt):
-    txt = txt.lower()
+    """Hide the rows that do not match txt, using the store's full-text index"""
+    txt = txt.strip()
+    matches = get_history_store().match_ids(txt) if txt else None
     for r in range(table.rowCount()):
-        hide = True
-        for c in range(table.columnCount()):
-            it = table.item(r, c)
-            if it and txt in it.text().lower():
-                hide = False
-                break
-        table.setRowHidden(r, hide)
+        table.setRowHidden(r, matches is not None and _row_entry_id(table, r) not in matches)
 
 def export_history(file_path):
     """Export history data to a JSON file"""
     try:
-        with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-            history = json.load(f)
         with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(history, f, indent=4, ensure_ascii=False)
+            f.write("[")
+            for i, entry in enumerate(get_history_store().iter_entries()):
+                record = {"title": entry["title"], "channel": entry["channel"], "url": entry["url"], "created_at": entry["created_at"]}
+                f.write(",\n    " if i else "\n    ")
+                f.write(json.dumps(record, ensure_ascii=False))
+            f.write("\n]\n")
         return True
-    except (OSError, PermissionError, json.JSONDecodeError, json.JSONEncodeError) as e:
+    except (OSError, PermissionError, TypeError, ValueError) as e:
         print(f"Error exporting history: {e}")
         return False
+
+def import_history(file_path):
+    """Append the entries of an exported history JSON file to the store"""
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            history = json.load(f)
+        entries = [e for e in history if isinstance(e, dict) and (e.get("url") or "").strip()]
+        get_history_store().append_many(entries)
+        return len(entries)
+    except (OSError, PermissionError, ValueError) as e:
+        print(f"Error importing history: {e}")
+        return 0
+
+def reset_history():
+    """Remove all stored history, including a not yet migrated legacy file"""
+    get_history_store().clear()
+    if os.path.exists(HISTORY_FILE):
+        os.remove(HISTORY_FILE)
@@ -0,0 +1,231 @@
+"""
+History Export and Import
+
+This module streams history between the store and JSON Lines or CSV files. Both
+directions work one chunk at a time, so memory use stays flat however large the
+history is. Files ending in .gz are compressed transparently.
+"""
+
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional, TextIO
+
+from core.history_store import DETAIL_COLUMNS, HistoryStore, get_history_store
+from core.logging_system import AppLogger
+
+
+FORMATS = ("jsonl", "csv")
+BASE_FIELDS = ("title", "channel", "url", "created_at")
+FIELDS = BASE_FIELDS + tuple(name for name, _ in DETAIL_COLUMNS)
+TIMESTAMP_FIELDS = ("created_at", "started_at", "finished_at")
+_NUMERIC_TYPES = {name: (int if sql_type == "INTEGER" else float)
+                  for name, sql_type in DETAIL_COLUMNS if sql_type in ("INTEGER", "REAL")}
+
+logger = AppLogger('history_io')
+
+
+def detect_format(path: str) -> str:
+    """
+    Work out the file format from the file name
+
+    Returns:
+        "jsonl" or "csv"
+
+    Raises:
+        ValueError: If the extension is not recognized
+    """
+    name = path.lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    for fmt, extensions in (("jsonl", (".jsonl", ".ndjson")), ("csv", (".csv",))):
+        if name.endswith(extensions):
+            return fmt
+    raise ValueError(f"Cannot tell the history format of {path!r}; use .jsonl or .csv")
+
+
+def parse_date(value: Optional[str]) -> Optional[float]:
+    """Turn a YYYY-MM-DD (local midnight) or ISO 8601 string into a timestamp"""
+    if value is None or value == "":
+        return None
+    return datetime.fromisoformat(value).timestamp()
+
+
+def format_timestamp(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
+
+
+def _parse_timestamp(value: Any) -> Optional[float]:
+    """Accept epoch seconds (number or string) or ISO 8601"""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def _import_event_id(entry: Dict[str, Any]) -> str:
+    """Stable id for an imported entry, so importing the same file twice adds nothing"""
+    key = "\x1f".join(str(entry[f]) for f in BASE_FIELDS)
+    return "import:" + hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def _is_gzip(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(2) == b"\x1f\x8b"
+
+
+def _open_text(path: str, mode: str, compress: bool) -> TextIO:
+    if compress:
+        return io.TextIOWrapper(gzip.open(path, mode + "b"), encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+def export_history_file(path: str, fmt: Optional[str] = None, since: Optional[float] = None,
+                        until: Optional[float] = None, channel: Optional[str] = None,
+                        compress: Optional[bool] = None, store: Optional[HistoryStore] = None,
+                        chunk_size: int = 1000) -> int:
+    """
+    Stream history entries to a JSON Lines or CSV file
+
+    Args:
+        path: Output file; a .gz suffix enables gzip unless compress says otherwise
+        fmt: "jsonl" or "csv", taken from the file name if omitted
+        since: Only entries created at or after this timestamp
+        until: Only entries created before this timestamp
+        channel: Only entries of this channel
+        compress: Force gzip on or off
+        store: Store to read, the application store by default
+        chunk_size: Rows read from the store at a time
+
+    Returns:
+        Number of entries written
+    """
+    fmt = fmt or detect_format(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported history format {fmt!r}")
+    store = store or get_history_store()
+    entries = store.iter_entries(chunk_size=chunk_size, since=since, until=until, channel=channel)
+
+    if compress is None:
+        compress = path.lower().endswith(".gz")
+
+    count = 0
+    tmp_path = path + ".part"
+    try:
+        with _open_text(tmp_path, "w", compress) as f:
+            if fmt == "csv":
+                writer = csv.writer(f)
+                writer.writerow(FIELDS)
+            for entry in entries:
+                record = {name: entry[name] for name in FIELDS}
+                for name in TIMESTAMP_FIELDS:
+                    if record[name] is not None:
+                        record[name] = format_timestamp(record[name])
+                if fmt == "csv":
+                    writer.writerow(["" if record[k] is None else record[k] for k in FIELDS])
+                else:
+                    f.write(json.dumps(record, ensure_ascii=False))
+                    f.write("\n")
+                count += 1
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    logger.info(f"Exported {count} history entries to {path}")
+    return count
+
+
+def _read_records(f: TextIO, fmt: str) -> Iterator[Dict[str, Any]]:
+    if fmt == "csv":
+        yield from csv.DictReader(f)
+        return
+    for line_number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            logger.warning(f"Skipping malformed history line {line_number}")
+            continue
+        if isinstance(record, dict):
+            yield record
+
+
+def _read_details(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Download details of an imported record; missing or unreadable values become None"""
+    details = {}
+    for name, _ in DETAIL_COLUMNS:
+        value = record.get(name)
+        if value is None or value == "":
+            details[name] = None
+            continue
+        try:
+            if name in TIMESTAMP_FIELDS:
+                value = _parse_timestamp(value)
+            elif name in _NUMERIC_TYPES:
+                value = _NUMERIC_TYPES[name](float(value))
+        except ValueError:
+            value = None
+        details[name] = value
+    return details
+
+
+def import_history_file(path: str, fmt: Optional[str] = None, store: Optional[HistoryStore] = None,
+                        batch_size: int = 1000) -> int:
+    """
+    Stream entries from a JSON Lines or CSV file into the store
+
+    Entries are committed in batches. Each entry gets an id derived from its
+    content, so re-importing a file (or an overlapping export) skips what is
+    already there.
+
+    Args:
+        path: Input file, plain or gzip compressed
+        fmt: "jsonl" or "csv", taken from the file name if omitted
+        store: Store to write, the application store by default
+        batch_size: Entries per transaction
+
+    Returns:
+        Number of entries added
+    """
+    fmt = fmt or detect_format(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported history format {fmt!r}")
+    store = store or get_history_store()
+
+    added = 0
+    batch = []
+    with _open_text(path, "r", _is_gzip(path)) as f:
+        for record in _read_records(f, fmt):
+            url = (record.get("url") or "").strip()
+            if not url:
+                continue
+            try:
+                created_at = _parse_timestamp(record.get("created_at"))
+            except ValueError:
+                created_at = None
+            entry = {
+                "title": record.get("title") or "Unknown Title",
+                "channel": record.get("channel") or "Unknown Channel",
+                "url": url,
+                "created_at": created_at,
+            }
+            entry.update(_read_details(record))
+            if created_at is not None:
+                entry["event_id"] = _import_event_id(entry)
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                added += sum(1 for i in store.append_many(batch) if i is not None)
+                batch = []
+    if batch:
+        added += sum(1 for i in store.append_many(batch) if i is not None)
+    logger.info(f"Imported {added} history entries from {path}")
+    return added
@@ -0,0 +1,227 @@
+"""
+History Table Model
+
+This module provides the Qt model behind the History page. Rows are read from the
+history store on demand instead of being copied into table widget items up front.
+"""
+
+import time
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from core.history import ENTRY_ID_ROLE
+from core.history_store import get_history_store
+
+# (header, store column)
+COLUMNS = [
+    ("Title", "title"),
+    ("Channel", "channel"),
+    ("URL", "url"),
+    ("Date", "created_at"),
+]
+
+
+class HistoryTableModel(QAbstractTableModel):
+    """
+    Lazily loaded view of the history store
+
+    Browsing fetches rows a page at a time as the view scrolls, sorted in SQL. A search
+    replaces the rows with the (bounded) ranked results, which are then sorted in memory.
+    refresh() compares store revisions and only inserts new rows when entries were appended.
+    """
+
+    PAGE_SIZE = 500
+
+    def __init__(self, store=None, parent=None):
+        super().__init__(parent)
+        self._store = store
+        self._rows = []
+        self._has_more = True
+        self._sort_index = 3
+        self._descending = True
+        self._search_text = ""
+        self._revision = -1
+        self._structure_revision = -1
+        self._max_id = 0
+
+    @property
+    def store(self):
+        return self._store or get_history_store()
+
+    # Qt model interface
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMNS[section][0]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self._rows[index.row()]
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            key = COLUMNS[index.column()][1]
+            if key == "created_at":
+                return time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["created_at"]))
+            return entry[key]
+        if role == ENTRY_ID_ROLE:
+            return entry["id"]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._search_text and self._has_more
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or not self.canFetchMore():
+            return
+        after = None
+        if self._rows:
+            last = self._rows[-1]
+            after = (last[self._sort_key()], last["id"])
+        entries = self.store.fetch_sorted(self._sort_key(), self._descending, after, self.PAGE_SIZE)
+        self._has_more = len(entries) == self.PAGE_SIZE
+        if not entries:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(entries) - 1)
+        self._rows.extend(entries)
+        self._max_id = max(self._max_id, max(e["id"] for e in entries))
+        self.endInsertRows()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self._sort_index = column
+        self._descending = order == Qt.DescendingOrder
+        if self._search_text:
+            self.layoutAboutToBeChanged.emit()
+            self._sort_in_memory()
+            self.layoutChanged.emit()
+        else:
+            self.reload()
+
+    # Loading
+
+    def reload(self):
+        """Drop all loaded rows and fetch the first page again"""
+        self.beginResetModel()
+        self._rows = []
+        self._has_more = True
+        self._search_text = ""
+        # Revision first: an append racing with the reload is then either counted in
+        # max_id or seen as a newer revision by the next refresh, never neither
+        self._sync_revision()
+        self._max_id = self.store.max_id()
+        self.endResetModel()
+        self.fetchMore()
+
+    def refresh(self):
+        """
+        Bring the model up to date with the store
+
+        Does nothing if the store has not changed, inserts appended entries when the
+        rows can be placed without a reload, and reloads after deletions.
+        """
+        store = self.store
+        if store.revision == self._revision:
+            return
+        if self._search_text:
+            # Search results are refreshed by running the search again
+            return
+        if store.structure_revision != self._structure_revision or self._sort_key() not in ("created_at", "id"):
+            self.reload()
+            return
+        new_entries = list(store.iter_entries(after_id=self._max_id))
+        self._sync_revision()
+        self._insert_new(new_entries)
+
+    def add_entries(self, entries):
+        """
+        Apply a delta of entries just committed to the store
+
+        Entries already loaded are ignored; a reload only happens if the delta
+        cannot be placed (deletions since the last load, or a non-date sort).
+        """
+        if self._search_text:
+            return
+        if self.store.structure_revision != self._structure_revision or self._sort_key() not in ("created_at", "id"):
+            self.reload()
+            return
+        self._insert_new([e for e in entries if e["id"] > self._max_id])
+
+    def _insert_new(self, new_entries):
+        if not new_entries:
+            return
+        new_entries = sorted(new_entries, key=lambda e: e["id"])
+        if self._sort_key() == "created_at" and self._rows:
+            # Imported entries can carry old dates and belong somewhere in the middle
+            newest = max(self._rows[0]["created_at"], self._rows[-1]["created_at"])
+            if any(e["created_at"] < newest for e in new_entries):
+                self.reload()
+                return
+        self._max_id = new_entries[-1]["id"]
+        if self._descending:
+            new_entries.reverse()
+            self.beginInsertRows(QModelIndex(), 0, len(new_entries) - 1)
+            self._rows[:0] = new_entries
+            self.endInsertRows()
+        elif not self._has_more:
+            # Newest entries sort last; if that end is not loaded yet, fetchMore will reach them
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(new_entries) - 1)
+            self._rows.extend(new_entries)
+            self.endInsertRows()
+
+    def set_search_results(self, text, entries):
+        """Show ranked search results instead of the browsable history"""
+        self.beginResetModel()
+        self._search_text = text
+        self._rows = list(entries)
+        self._has_more = False
+        self._sync_revision()
+        self.endResetModel()
+
+    def clear_search(self):
+        if self._search_text:
+            self.reload()
+
+    def is_searching(self):
+        return bool(self._search_text)
+
+    # Access and edits
+
+    def entry(self, row):
+        return self._rows[row]
+
+    def remove_ids(self, ids):
+        """Delete entries from the store and drop their rows without reloading"""
+        ids = set(ids)
+        if not ids:
+            return 0
+        removed = self.store.delete(ids)
+        for row in range(len(self._rows) - 1, -1, -1):
+            if self._rows[row]["id"] in ids:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self._rows[row]
+                self.endRemoveRows()
+        # Appends made meanwhile by other writers are still picked up by refresh()
+        self._structure_revision = self.store.structure_revision
+        return removed
+
+    def clear_all(self):
+        self.store.clear()
+        self.reload()
+
+    def _sort_key(self):
+        return COLUMNS[self._sort_index][1]
+
+    def _sort_in_memory(self):
+        key = self._sort_key()
+        self._rows.sort(key=lambda e: (e[key], e["id"]), reverse=self._descending)
+
+    def _sync_revision(self):
+        store = self.store
+        self._revision = store.revision
+        self._structure_revision = store.structure_revision
@@ -0,0 +1,588 @@
+"""
+History Storage
+
+This module provides the SQLite-backed download history store. Appends are
+single-row inserts into an indexed table instead of full-file rewrites, and all
+writes go through one writer connection so concurrent workers never lose entries.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from urllib.parse import urlparse
+
+from core.config import config_manager
+from core.logging_system import AppLogger
+
+
+SCHEMA_VERSION = 4
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        channel TEXT NOT NULL,
+        url TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        event_id TEXT,
+        bytes INTEGER,
+        duration REAL,
+        format TEXT,
+        host TEXT,
+        started_at REAL,
+        finished_at REAL,
+        download_seconds REAL,
+        outcome TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_history_title ON history(title)",
+    "CREATE INDEX IF NOT EXISTS idx_history_url ON history(url)",
+    "CREATE INDEX IF NOT EXISTS idx_history_channel ON history(channel)",
+    "CREATE INDEX IF NOT EXISTS idx_history_created_at ON history(created_at)",
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+]
+
+# Full-text index over the searchable columns, kept in sync by triggers. The date
+# column holds the UTC day of created_at so "2024-05" style queries match too.
+_DATE_EXPR = "strftime('%Y-%m-%d', {}.created_at, 'unixepoch')"
+
+_FTS_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5(
+        title, channel, url, date,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '1 2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS history_fts_insert AFTER INSERT ON history BEGIN
+        INSERT INTO history_fts (rowid, title, channel, url, date)
+        VALUES (new.id, new.title, new.channel, new.url, {_DATE_EXPR.format('new')});
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS history_fts_delete AFTER DELETE ON history BEGIN
+        DELETE FROM history_fts WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS history_fts_update
+    AFTER UPDATE OF title, channel, url, created_at ON history BEGIN
+        UPDATE history_fts SET title = new.title, channel = new.channel, url = new.url,
+            date = {_DATE_EXPR.format('new')}
+        WHERE rowid = old.id;
+    END
+    """,
+]
+
+_DATE_TERM = re.compile(r"^\d{4}(-\d{1,2}){0,2}$")
+
+# bm25 column weights: title, channel, url, date
+_RANK_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+# Broad queries (a single letter can match most of the table) only rank the newest
+# matches, which keeps every search bounded no matter how large the history grows
+RANK_CANDIDATES = 10000
+
+# Download details, filled in when a download finishes; NULL for entries from older versions
+DETAIL_COLUMNS = (
+    ("bytes", "INTEGER"),             # bytes transferred, all files of the download
+    ("duration", "REAL"),             # media duration in seconds
+    ("format", "TEXT"),               # yt-dlp format id
+    ("host", "TEXT"),                 # source host, without "www."
+    ("started_at", "REAL"),
+    ("finished_at", "REAL"),
+    ("download_seconds", "REAL"),     # time spent transferring, excludes extraction and post-processing
+    ("outcome", "TEXT"),              # see OUTCOMES
+)
+OUTCOMES = ("completed", "failed", "cancelled")
+
+COLUMNS = ("id", "title", "channel", "url", "created_at") + tuple(name for name, _ in DETAIL_COLUMNS)
+SORTABLE_COLUMNS = ("id", "title", "channel", "url", "created_at")
+
+_INSERT_COLUMNS = ("title", "channel", "url", "created_at", "event_id") + tuple(name for name, _ in DETAIL_COLUMNS)
+_INSERT_SQL = (
+    f"INSERT OR IGNORE INTO history ({', '.join(_INSERT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in _INSERT_COLUMNS)})"
+)
+
+
+def host_from_url(url: str) -> str:
+    """Host name of a URL without a leading "www.", used to group history by source"""
+    try:
+        host = (urlparse(url).hostname or "").lower()
+    except ValueError:
+        return ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def _normalize(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill in defaults for an entry coming from the UI, a worker or a JSON file"""
+    normalized = {
+        "title": entry.get("title") or "Unknown Title",
+        "channel": entry.get("channel") or "Unknown Channel",
+        "url": entry.get("url") or "",
+        "created_at": entry.get("created_at") or time.time(),
+        "event_id": entry.get("event_id"),
+        **{name: entry.get(name) for name, _ in DETAIL_COLUMNS},
+    }
+    if not normalized["host"]:
+        normalized["host"] = host_from_url(normalized["url"]) or None
+    return normalized
+
+
+def build_match_query(text: str) -> str:
+    """
+    Turn free search text into an FTS5 MATCH expression
+
+    Every whitespace separated term must match. A term is split into word tokens
+    and matched as a phrase whose last token is a prefix, so "youtube.com/wat"
+    finds "https://youtube.com/watch?v=...". Only date-like terms ("2024", "2024-05")
+    are matched against the date column, so short numbers don't match every date.
+
+    Returns:
+        The MATCH expression, or an empty string if the text has no word characters
+    """
+    phrases = []
+    for term in text.split():
+        tokens = re.findall(r"\w+", term)
+        if not tokens:
+            continue
+        phrase = '"' + " ".join(tokens) + '"*'
+        if not _DATE_TERM.match(term):
+            phrase = "{title channel url} : " + phrase
+        phrases.append(phrase)
+    return " AND ".join(phrases)
+
+
+def _like_pattern(text: str) -> str:
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class HistoryStore:
+    """
+    Embedded history database
+
+    One writer connection (guarded by a lock) serializes all writes; readers use
+    per-thread connections, which WAL mode lets run alongside the writer.
+    """
+
+    def __init__(self, db_path: str, legacy_json_path: Optional[str] = None):
+        self.db_path = db_path
+        self.legacy_json_path = legacy_json_path
+        self.logger = AppLogger('history_store')
+        self._write_lock = threading.RLock()
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self.fts_enabled = False
+        # Bumped on every write; structure_revision only on deletes, so readers
+        # can tell "nothing changed" and "only appends" apart from a full reload
+        self.revision = 0
+        self.structure_revision = 0
+        self._pending_change = False
+        self._pending_structure_change = False
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._writer = self._connect(check_same_thread=False)
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        self._create_schema()
+        if legacy_json_path:
+            self._migrate_legacy_json(legacy_json_path)
+
+    def _connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=check_same_thread)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    def _create_schema(self):
+        with self.transaction() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            if version < 4:
+                self._add_columns(conn)
+            self.fts_enabled = self._create_fts_schema(conn, rebuild=version < 2)
+            conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def _add_columns(self, conn: sqlite3.Connection):
+        """Add the columns newer versions introduced to an existing history table"""
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(history)")}
+        # Entries posted by the background writer carry an id so replays insert them only once
+        for name, sql_type in (("event_id", "TEXT"),) + DETAIL_COLUMNS:
+            if name not in columns:
+                conn.execute(f"ALTER TABLE history ADD COLUMN {name} {sql_type}")
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_history_event_id ON history(event_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_history_host ON history(host)")
+        # Older triggers re-indexed a row on any update; recreated below for the searched columns only
+        conn.execute("DROP TRIGGER IF EXISTS history_fts_update")
+        conn.create_function("host_from_url", 1, lambda url: host_from_url(url or "") or None, deterministic=True)
+        conn.execute("UPDATE history SET host = host_from_url(url) WHERE host IS NULL")
+
+    def _create_fts_schema(self, conn: sqlite3.Connection, rebuild: bool) -> bool:
+        """
+        Create the full-text index, filling it from existing rows when upgrading
+
+        Returns:
+            False if this SQLite build lacks FTS5; search then falls back to LIKE
+        """
+        try:
+            for statement in _FTS_SCHEMA:
+                conn.execute(statement)
+        except sqlite3.OperationalError as e:
+            self.logger.warning(f"Full-text search unavailable, using substring search: {e}")
+            return False
+        if rebuild:
+            conn.execute("DELETE FROM history_fts")
+            conn.execute(
+                "INSERT INTO history_fts (rowid, title, channel, url, date) "
+                f"SELECT id, title, channel, url, {_DATE_EXPR.format('history')} FROM history"
+            )
+        return True
+
+    def _migrate_legacy_json(self, json_path: str):
+        """Import the old history.json once, then move it aside"""
+        if self.get_meta("json_migrated") or not os.path.exists(json_path):
+            return
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Could not read legacy history file {json_path}", exception=e)
+            return
+
+        entries = [e for e in entries if isinstance(e, dict) and (e.get("url") or "").strip()]
+        with self.transaction():
+            self.append_many(entries)
+            self.set_meta("json_migrated", str(time.time()))
+        try:
+            os.replace(json_path, json_path + ".migrated")
+        except OSError as e:
+            self.logger.warning(f"Could not rename migrated history file: {e}")
+        self.logger.info(f"Migrated {len(entries)} history entries from {json_path}")
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group writes into a single transaction on the writer connection
+
+        Nested use joins the outer transaction, so batched callers pay for one commit.
+        """
+        with self._write_lock:
+            conn = self._writer
+            if conn.in_transaction:
+                yield conn
+                return
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+                # Only after the commit, so a reader seeing the new revision also sees the rows
+                if self._pending_change:
+                    self.revision += 1
+                    if self._pending_structure_change:
+                        self.structure_revision = self.revision
+            finally:
+                self._pending_change = False
+                self._pending_structure_change = False
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self._reader().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def set_meta(self, key: str, value: str):
+        with self.transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def append(self, title: str = "", channel: str = "", url: str = "",
+               created_at: Optional[float] = None) -> int:
+        """
+        Append one entry
+
+        Returns:
+            The new entry id
+        """
+        return self.append_many([{
+            "title": title, "channel": channel, "url": url, "created_at": created_at
+        }])[0]
+
+    def append_many(self, entries: Iterable[Dict[str, Any]]) -> List[int]:
+        """
+        Append several entries in one transaction
+
+        Entries with an event_id that is already stored are skipped, which makes
+        replaying the same events idempotent.
+
+        Returns:
+            The new entry ids in input order, None for skipped entries
+        """
+        ids = []
+        with self.transaction() as conn:
+            for entry in entries:
+                e = _normalize(entry)
+                cur = conn.execute(_INSERT_SQL, tuple(e[name] for name in _INSERT_COLUMNS))
+                ids.append(cur.lastrowid if cur.rowcount else None)
+            self._changed()
+        return ids
+
+    def replace_all(self, entries: Iterable[Dict[str, Any]]) -> List[int]:
+        """Replace the whole history with the given entries"""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM history")
+            self._changed(structure=True)
+            return self.append_many(entries)
+
+    def delete(self, ids: Iterable[int]) -> int:
+        """Delete entries by id, returns the number of rows removed"""
+        ids = list(ids)
+        if not ids:
+            return 0
+        with self.transaction() as conn:
+            self._changed(structure=True)
+            return conn.executemany("DELETE FROM history WHERE id = ?", [(i,) for i in ids]).rowcount
+
+    def clear(self):
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM history")
+            self._changed(structure=True)
+
+    def _changed(self, structure: bool = False):
+        """Record a write in the current transaction; revisions move when it commits"""
+        self._pending_change = True
+        self._pending_structure_change = self._pending_structure_change or structure
+
+    def count(self) -> int:
+        return self._reader().execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+    def max_id(self) -> int:
+        return self._reader().execute("SELECT COALESCE(MAX(id), 0) FROM history").fetchone()[0]
+
+    def get(self, entry_id: int) -> Optional[Dict[str, Any]]:
+        row = self._reader().execute(
+            f"SELECT {', '.join(COLUMNS)} FROM history WHERE id = ?", (entry_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def fetch(self, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        """Fetch entries in insertion order"""
+        rows = self._reader().execute(
+            f"SELECT {', '.join(COLUMNS)} FROM history ORDER BY id LIMIT ? OFFSET ?",
+            (-1 if limit is None else limit, offset)
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def iter_entries(self, chunk_size: int = 1000, after_id: int = 0,
+                     since: Optional[float] = None, until: Optional[float] = None,
+                     channel: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over entries in insertion order, one chunk at a time
+
+        Args:
+            chunk_size: Rows read per query, which bounds memory use
+            after_id: Only entries with a larger id
+            since: Only entries created at or after this timestamp
+            until: Only entries created before this timestamp
+            channel: Only entries of this channel
+        """
+        filters, params = "", []
+        if since is not None:
+            filters += " AND created_at >= ?"
+            params.append(since)
+        if until is not None:
+            filters += " AND created_at < ?"
+            params.append(until)
+        if channel is not None:
+            filters += " AND channel = ?"
+            params.append(channel)
+        last_id = after_id
+        conn = self._reader()
+        while True:
+            rows = conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM history WHERE id > ?{filters} ORDER BY id LIMIT ?",
+                (last_id, *params, chunk_size)
+            ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield dict(row)
+            last_id = rows[-1]["id"]
+
+    def iter_columns(self, columns: Iterable[str], since: Optional[float] = None,
+                     until: Optional[float] = None, chunk_size: int = 50000) -> Iterator[List[tuple]]:
+        """
+        Read selected columns in chunks of row tuples, for bulk consumers like analytics
+
+        Args:
+            columns: Names from COLUMNS
+            since: Only entries created at or after this timestamp
+            until: Only entries created before this timestamp
+            chunk_size: Rows per chunk
+        """
+        columns = list(columns)
+        unknown = set(columns) - set(COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown history columns: {', '.join(sorted(unknown))}")
+        filters, params = "", []
+        if since is not None:
+            filters += " AND created_at >= ?"
+            params.append(since)
+        if until is not None:
+            filters += " AND created_at < ?"
+            params.append(until)
+        last_id = 0
+        conn = self._reader()
+        while True:
+            rows = conn.execute(
+                f"SELECT id, {', '.join(columns)} FROM history WHERE id > ?{filters} ORDER BY id LIMIT ?",
+                (last_id, *params, chunk_size)
+            ).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            yield [tuple(row)[1:] for row in rows]
+
+    def fetch_sorted(self, sort_column: str = "created_at", descending: bool = True,
+                     after: Optional[tuple] = None, limit: int = 500) -> List[Dict[str, Any]]:
+        """
+        Fetch one page of entries ordered by a column
+
+        Pages are chained with keyset pagination: pass the (sort value, id) of the
+        last entry of the previous page as after. Ties are broken by id, so paging is
+        stable and each page is an index range scan instead of an OFFSET skip.
+
+        Args:
+            sort_column: One of SORTABLE_COLUMNS
+            descending: Sort direction
+            after: (sort value, id) of the last entry already fetched, None for the first page
+            limit: Page size
+
+        Returns:
+            Up to limit entries
+        """
+        if sort_column not in SORTABLE_COLUMNS:
+            raise ValueError(f"Cannot sort history by {sort_column!r}")
+        direction = "DESC" if descending else "ASC"
+        where, params = "", []
+        if after is not None:
+            where = f"WHERE ({sort_column}, id) {'<' if descending else '>'} (?, ?)"
+            params.extend(after)
+        rows = self._reader().execute(
+            f"SELECT {', '.join(COLUMNS)} FROM history {where} "
+            f"ORDER BY {sort_column} {direction}, id {direction} LIMIT ?",
+            (*params, limit)
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def search(self, text: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Search title, channel, URL and date
+
+        Results are ranked by relevance (title matches weigh most), newest first on ties.
+        At most RANK_CANDIDATES of the newest matches are ranked. An empty query
+        returns nothing; use fetch or iter_entries to list everything.
+
+        Args:
+            text: Free search text, matched by word prefix
+            limit: Maximum number of results, None for all
+
+        Returns:
+            Matching entries, best first
+        """
+        text = text.strip()
+        if not text:
+            return []
+        limit = -1 if limit is None else limit
+        columns = ", ".join(f"h.{c}" for c in COLUMNS)
+        conn = self._reader()
+        if self.fts_enabled:
+            match = build_match_query(text)
+            if not match:
+                return []
+            rows = conn.execute(
+                f"SELECT {columns} FROM ("
+                "    SELECT rowid, bm25(history_fts, ?, ?, ?, ?) AS score FROM history_fts"
+                "    WHERE history_fts MATCH ? ORDER BY rowid DESC LIMIT ?"
+                f") f JOIN history h ON h.id = f.rowid ORDER BY f.score, h.id DESC LIMIT ?",
+                (*_RANK_WEIGHTS, match, RANK_CANDIDATES, limit)
+            ).fetchall()
+        else:
+            pattern = _like_pattern(text)
+            rows = conn.execute(
+                f"SELECT {columns} FROM history h WHERE h.title LIKE ?1 ESCAPE '\\' "
+                f"OR h.channel LIKE ?1 ESCAPE '\\' OR h.url LIKE ?1 ESCAPE '\\' "
+                f"ORDER BY h.id DESC LIMIT ?2",
+                (pattern, limit)
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def match_ids(self, text: str) -> set:
+        """Ids of all entries matching the search text, unranked and without a limit"""
+        text = text.strip()
+        conn = self._reader()
+        if self.fts_enabled:
+            match = build_match_query(text)
+            if not match:
+                return set()
+            rows = conn.execute("SELECT rowid FROM history_fts WHERE history_fts MATCH ?", (match,))
+        else:
+            if not text:
+                return set()
+            rows = conn.execute(
+                "SELECT id FROM history WHERE title LIKE ?1 ESCAPE '\\' "
+                "OR channel LIKE ?1 ESCAPE '\\' OR url LIKE ?1 ESCAPE '\\'",
+                (_like_pattern(text),)
+            )
+        return {r[0] for r in rows}
+
+    def close(self):
+        with self._write_lock:
+            self._writer.close()
+        with self._readers_lock:
+            for conn in self._readers:
+                try:
+                    conn.close()
+                except sqlite3.ProgrammingError:
+                    # Connection belongs to another thread; it is released with that thread
+                    pass
+            self._readers.clear()
+        self._local = threading.local()
+
+
+_default_store: Optional[HistoryStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_history_store() -> HistoryStore:
+    """Get the application history store, creating (and migrating) it on first use"""
+    global _default_store
+    if _default_store is None:
+        with _default_store_lock:
+            if _default_store is None:
+                data_dir = config_manager.config.paths.get_data_dir()
+                _default_store = HistoryStore(
+                    os.path.join(data_dir, "history.db"),
+                    legacy_json_path=os.path.join(data_dir, "history.json")
+                )
+    return _default_store
@@ -0,0 +1,239 @@
+"""
+Background History Writer
+
+This module provides the write-behind path for history entries produced by download
+workers. Workers post entries without touching the database; a single writer thread
+commits them in batches and reports each committed batch as a delta.
+
+Every posted entry is first appended to a spool file and carries a unique event id.
+After a crash the spool is replayed on startup, and the event id keeps a replayed
+entry from being stored twice (at-least-once delivery, exactly-once storage). A
+batch that fails to commit is retried with the next one, after a growing delay.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from PySide6.QtCore import QObject, Signal
+
+from core.config import config_manager
+from core.history_store import DETAIL_COLUMNS, HistoryStore, get_history_store
+from core.logging_system import AppLogger
+
+
+class HistoryWriterSignals(QObject):
+    """Signals emitted from the writer thread, delivered queued to GUI receivers"""
+    entries_added = Signal(object)  # list of stored entry dicts, with ids
+
+
+class HistoryWriter:
+    """
+    Single background thread that batches history writes
+
+    A batch is committed when it reaches batch_size entries or when flush_interval
+    seconds have passed since its first entry, whichever comes first. Entries of a
+    batch that failed are retried after retry_delay seconds, or sooner with the
+    next batch; the delay doubles with each failure in a row.
+    """
+
+    def __init__(self, store: HistoryStore, spool_path: str,
+                 flush_interval: Optional[float] = None, batch_size: Optional[int] = None,
+                 retry_delay: Optional[float] = None):
+        download_config = config_manager.config.download
+        self.store = store
+        self.spool_path = spool_path
+        self.flush_interval = flush_interval if flush_interval is not None else download_config.HISTORY_FLUSH_INTERVAL
+        self.batch_size = batch_size or download_config.HISTORY_BATCH_SIZE
+        self.retry_delay = retry_delay if retry_delay is not None else download_config.HISTORY_RETRY_DELAY
+        self.retry_delay_max = max(self.retry_delay, download_config.HISTORY_RETRY_DELAY_MAX)
+        self.logger = AppLogger('history_writer')
+        self.signals = HistoryWriterSignals()
+
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._spool_lock = threading.Lock()
+        self._spool = None
+        self._outstanding = 0
+        self._idle = threading.Condition(self._spool_lock)
+        self._stopped = False
+
+        self._replay_spool()
+        self._spool = open(spool_path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name="HistoryWriter", daemon=True)
+        self._thread.start()
+
+    def post(self, title: str = "", channel: str = "", url: str = "",
+             created_at: Optional[float] = None, **details) -> str:
+        """
+        Queue an entry for writing; never waits for the database
+
+        Args:
+            details: Download details, named as in DETAIL_COLUMNS
+
+        Returns:
+            The event id of the entry
+        """
+        unknown = set(details) - {name for name, _ in DETAIL_COLUMNS}
+        if unknown:
+            raise ValueError(f"Unknown history details: {', '.join(sorted(unknown))}")
+        entry = {
+            **details,
+            "event_id": uuid.uuid4().hex,
+            "title": title,
+            "channel": channel,
+            "url": url,
+            "created_at": created_at or time.time(),
+        }
+        with self._spool_lock:
+            if self._stopped:
+                raise RuntimeError("History writer is stopped")
+            self._spool.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._spool.flush()
+            self._outstanding += 1
+            self._queue.put(entry)
+        return entry["event_id"]
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until everything posted so far is committed
+
+        Returns:
+            False if the timeout expired first
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: self._outstanding == 0, timeout)
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        """Commit what is queued and stop the writer thread"""
+        with self._spool_lock:
+            if self._stopped:
+                return
+            self._stopped = True
+            self._queue.put(None)
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            # A writer still committing after the timeout keeps the spool open
+            with self._spool_lock:
+                self._spool.close()
+
+    def _run(self):
+        failed: List[Dict[str, Any]] = []
+        delay = self.retry_delay
+        while True:
+            batch, stop = self._next_batch(delay if failed else None)
+            batch = failed + batch
+            if batch:
+                failed = self._commit(batch)
+                delay = min(delay * 2, self.retry_delay_max) if failed else self.retry_delay
+            if stop:
+                return
+
+    def _next_batch(self, timeout: Optional[float]):
+        """
+        Collect the next batch of posted entries
+
+        Args:
+            timeout: Seconds to wait for a first entry; None waits for one
+
+        Returns:
+            The entries, empty if the timeout expired, and whether stop() was called
+        """
+        try:
+            item = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return [], False
+        if item is None:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _commit(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Store a batch and report it
+
+        Returns:
+            The batch if it could not be stored, to be retried; otherwise empty
+        """
+        try:
+            ids = self.store.append_many(batch)
+        except Exception as e:
+            # Entries stay in the spool until a retry stores them, or are replayed on the next start
+            self.logger.error(f"Failed to write {len(batch)} history entries", exception=e)
+            return batch
+        added = []
+        for entry, entry_id in zip(batch, ids):
+            if entry_id is not None:
+                stored = dict(entry, id=entry_id)
+                stored.pop("event_id")
+                added.append(stored)
+        with self._spool_lock:
+            self._outstanding -= len(batch)
+            if self._outstanding == 0:
+                # Everything spooled is now in the database
+                self._spool.seek(0)
+                self._spool.truncate()
+            self._idle.notify_all()
+        if added:
+            self.signals.entries_added.emit(added)
+        return []
+
+    def _replay_spool(self):
+        """Store entries left in the spool by a previous run that did not commit them"""
+        if not os.path.exists(self.spool_path):
+            return
+        entries = []
+        with open(self.spool_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn last line from a crash mid-write
+                    continue
+                if isinstance(entry, dict) and entry.get("event_id"):
+                    entries.append(entry)
+        if entries:
+            stored = [i for i in self.store.append_many(entries) if i is not None]
+            self.logger.info(f"Recovered {len(stored)} of {len(entries)} spooled history entries")
+        open(self.spool_path, "w").close()
+
+
+_default_writer: Optional[HistoryWriter] = None
+_default_writer_lock = threading.Lock()
+
+
+def get_history_writer() -> HistoryWriter:
+    """Get the application history writer, starting it (and replaying its spool) on first use"""
+    global _default_writer
+    if _default_writer is None:
+        with _default_writer_lock:
+            if _default_writer is None:
+                _default_writer = HistoryWriter(
+                    get_history_store(),
+                    os.path.join(config_manager.config.paths.get_data_dir(), "history.spool.jsonl")
+                )
+    return _default_writer
+
+
+def stop_history_writer():
+    """Flush and stop the application history writer if it was started"""
+    global _default_writer
+    with _default_writer_lock:
+        writer, _default_writer = _default_writer, None
+    if writer is not None:
+        writer.stop()
@@ -0,0 +1,348 @@
+"""
+Per-Job Logs
+
+This module keeps a structured log of each download run. Every record written
+while a job runs is tagged with the run's correlation id, the queue job id, the
+URL, the host and the job's stage, and written as one JSON line. Records of all
+runs go to shared segment files, and an SQLite index keeps the byte offset of
+each run's lines, so one run's log is read by seeking to its lines instead of
+scanning the files. Runs can instead be split into a file each.
+
+A worker tags its records by running inside job_context; its log messages,
+which also go to the log dock, are written through a JobLog.
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+from core.config import config_manager
+
+
+# Logger of the job messages that are also shown in the log dock; kept out of the main log
+JOB_LOGGER = 'job'
+
+_SEGMENT_NAME = re.compile(r"jobs-(\d{6})\.jsonl$")
+_ERROR_MESSAGE = re.compile(r"\[yt-dlp Error\]|(Download|Unexpected) Error|All download attempts failed|Failed ")
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS runs (
+        run TEXT PRIMARY KEY,
+        job INTEGER,
+        url TEXT NOT NULL,
+        host TEXT NOT NULL,
+        started REAL NOT NULL,
+        stage TEXT NOT NULL DEFAULT '',
+        lines INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_runs_job ON runs(job, started)",
+    "CREATE INDEX IF NOT EXISTS idx_runs_url ON runs(url, started)",
+    "CREATE TABLE IF NOT EXISTS lines (run TEXT NOT NULL, segment INTEGER NOT NULL, "
+    "offset INTEGER NOT NULL, length INTEGER NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS idx_lines_run ON lines(run)",
+    "CREATE INDEX IF NOT EXISTS idx_lines_segment ON lines(segment)",
+]
+
+
+@dataclass
+class JobContext:
+    """The download run records are tagged with"""
+    job_id: Optional[int]
+    url: str
+    host: str = ""
+    run_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    stage: str = ""
+
+    def fields(self) -> Dict[str, Any]:
+        return {"run": self.run_id, "job": self.job_id, "url": self.url, "host": self.host, "stage": self.stage}
+
+
+_current_job: ContextVar[Optional[JobContext]] = ContextVar("current_job", default=None)
+
+
+def current_job() -> Optional[JobContext]:
+    """The job the calling thread is running, if any"""
+    return _current_job.get()
+
+
+@contextmanager
+def job_context(context: JobContext) -> Iterator[JobContext]:
+    """Tag records logged by this thread with context until the block ends"""
+    token = _current_job.set(context)
+    try:
+        yield context
+    finally:
+        _current_job.reset(token)
+
+
+class JobLog:
+    """
+    Writes a job's messages to its log and forwards them to a log signal
+
+    Stands in for the worker's log signal, so messages sent from other threads of
+    the job, such as a subtitle fetch, are tagged too.
+    """
+
+    def __init__(self, context: JobContext, signal=None):
+        self.context = context
+        self.signal = signal
+        self.logger = logging.getLogger(JOB_LOGGER)
+
+    def emit(self, text: str):
+        if self.signal is not None:
+            self.signal.emit(text)
+        if text.startswith("[yt-dlp Warning]"):
+            level = logging.WARNING
+        elif _ERROR_MESSAGE.match(text):
+            level = logging.ERROR
+        else:
+            level = logging.INFO
+        self.note(text, level)
+
+    def note(self, text: str, level: int = logging.INFO):
+        """Write to the job's log only"""
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, text, extra={"job": self.context.fields()})
+
+
+def exclude_job_messages(record: logging.LogRecord) -> bool:
+    """Filter for the main log handlers: job messages are in the job logs and the dock"""
+    return record.name != JOB_LOGGER
+
+
+def _record_line(record: logging.LogRecord, formatter: logging.Formatter) -> Dict[str, Any]:
+    line = {"ts": round(record.created, 3), "level": record.levelname, "logger": record.name}
+    line.update(record.job)
+    line["msg"] = record.getMessage()
+    if record.exc_info:
+        line["exc"] = formatter.formatException(record.exc_info)
+    return line
+
+
+class JobLogHandler(logging.Handler):
+    """
+    Writes records tagged with a job as JSON lines, indexed by run
+
+    Meant for the log listener: a batch is written with one write per file and
+    indexed in one transaction. Records without a job are ignored.
+
+    Args:
+        directory: Where segments, run files and the index are kept
+        split: Write each run to its own file instead of shared segments
+        max_bytes: Size at which a new segment is started
+        segments: Segments kept; older ones are deleted with their index rows
+    """
+
+    def __init__(self, directory: str, split: bool = False, max_bytes: Optional[int] = None,
+                 segments: Optional[int] = None):
+        super().__init__()
+        logging_config = config_manager.config.logging
+        self.directory = directory
+        self.split = split
+        self.max_bytes = max_bytes or logging_config.JOB_LOG_MAX_BYTES
+        self.segments = max(1, segments or logging_config.JOB_LOG_SEGMENTS)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._segment = 0
+        self._formatter = logging.Formatter()
+
+    def emit(self, record: logging.LogRecord):
+        self.handle_batch([record])
+
+    def handle_batch(self, records: List[logging.LogRecord]):
+        records = [record for record in records if getattr(record, "job", None) and self.filter(record)]
+        if not records:
+            return
+        self.acquire()
+        try:
+            lines = []
+            for record in records:
+                try:
+                    lines.append((record, json.dumps(_record_line(record, self._formatter), ensure_ascii=False,
+                                                     default=str).encode("utf-8") + b"\n"))
+                except Exception:
+                    self.handleError(record)
+            if lines:
+                self._write(lines)
+        except Exception:
+            self.handleError(records[-1])
+        finally:
+            self.release()
+
+    def close(self):
+        self.acquire()
+        try:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        finally:
+            self.release()
+        super().close()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.join(self.directory, "runs") if self.split else self.directory, exist_ok=True)
+            self._conn = sqlite3.connect(os.path.join(self.directory, "index.db"), timeout=30,
+                                         check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            with self._conn:
+                for statement in _SCHEMA:
+                    self._conn.execute(statement)
+            self._segment = max(segment_numbers(self.directory), default=1)
+        return self._conn
+
+    def _write(self, lines):
+        conn = self._connect()
+        runs: Dict[str, list] = {}
+        for record, _ in lines:
+            job = record.job
+            run = runs.setdefault(job["run"], [job.get("job"), job.get("url", ""), job.get("host", ""),
+                                               record.created, "", 0])
+            run[4] = job.get("stage", "")
+            run[5] += 1
+
+        index_rows = []
+        if self.split:
+            by_run: Dict[str, List[bytes]] = {}
+            for record, data in lines:
+                by_run.setdefault(record.job["run"], []).append(data)
+            for run_id, data in by_run.items():
+                with open(run_file(self.directory, run_id), "ab") as f:
+                    f.write(b"".join(data))
+        else:
+            path = segment_file(self.directory, self._segment)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            batch_size = sum(len(data) for _, data in lines)
+            if size and size + batch_size > self.max_bytes:
+                self._rotate(conn)
+                path, size = segment_file(self.directory, self._segment), 0
+            offset = size
+            for record, data in lines:
+                index_rows.append((record.job["run"], self._segment, offset, len(data)))
+                offset += len(data)
+            with open(path, "ab") as f:
+                f.write(b"".join(data for _, data in lines))
+
+        with conn:
+            conn.executemany(
+                "INSERT INTO runs (run, job, url, host, started, stage, lines) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(run) DO UPDATE SET stage = excluded.stage, lines = lines + excluded.lines",
+                [(run_id, *values) for run_id, values in runs.items()]
+            )
+            conn.executemany("INSERT INTO lines (run, segment, offset, length) VALUES (?, ?, ?, ?)", index_rows)
+
+    def _rotate(self, conn: sqlite3.Connection):
+        self._segment += 1
+        oldest_kept = self._segment - self.segments + 1
+        for segment in segment_numbers(self.directory):
+            if segment < oldest_kept:
+                try:
+                    os.remove(segment_file(self.directory, segment))
+                except OSError:
+                    pass
+        with conn:
+            conn.execute("DELETE FROM lines WHERE segment < ?", (oldest_kept,))
+            conn.execute("DELETE FROM runs WHERE run NOT IN (SELECT DISTINCT run FROM lines)")
+
+
+def segment_file(directory: str, segment: int) -> str:
+    return os.path.join(directory, f"jobs-{segment:06d}.jsonl")
+
+
+def segment_numbers(directory: str) -> List[int]:
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    return sorted(int(match.group(1)) for match in map(_SEGMENT_NAME.match, names) if match)
+
+
+def run_file(directory: str, run_id: str) -> str:
+    return os.path.join(directory, "runs", f"{run_id}.jsonl")
+
+
+def get_job_log_dir() -> str:
+    return os.path.join(config_manager.config.paths.get_data_dir(), "logs", "jobs")
+
+
+class JobLogReader:
+    """
+    Reads the logs JobLogHandler writes
+
+    A run's records are read from the offsets in the index; a split run's from
+    its own file.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or get_job_log_dir()
+        self._lock = threading.Lock()
+
+    def runs(self, job_id: Optional[int] = None, url: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Runs of a job or URL, or all runs, newest first"""
+        clauses, params = [], []
+        if job_id is not None:
+            clauses.append("job = ?")
+            params.append(job_id)
+        if url is not None:
+            clauses.append("url = ?")
+            params.append(url)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._query(f"SELECT run, job, url, host, started, stage, lines FROM runs {where} "
+                           f"ORDER BY started DESC LIMIT ?", (*params, limit))
+        return [dict(row) for row in rows]
+
+    def records(self, run_id: str) -> List[Dict[str, Any]]:
+        """The records of a run, oldest first"""
+        path = run_file(self.directory, run_id)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                return [json.loads(line) for line in f if line.strip()]
+        records = []
+        handle, open_segment = None, None
+        try:
+            for row in self._query("SELECT segment, offset, length FROM lines WHERE run = ? "
+                                   "ORDER BY segment, offset", (run_id,)):
+                if row["segment"] != open_segment:
+                    if handle is not None:
+                        handle.close()
+                    try:
+                        handle = open(segment_file(self.directory, row["segment"]), "rb")
+                    except OSError:
+                        handle = None
+                    open_segment = row["segment"]
+                if handle is None:
+                    continue
+                handle.seek(row["offset"])
+                data = handle.read(row["length"])
+                try:
+                    records.append(json.loads(data))
+                except ValueError:
+                    continue  # the segment was replaced under the index
+        finally:
+            if handle is not None:
+                handle.close()
+        return records
+
+    def _query(self, sql: str, params=()) -> List[sqlite3.Row]:
+        path = os.path.join(self.directory, "index.db")
+        if not os.path.exists(path):
+            return []
+        with self._lock:
+            conn = sqlite3.connect(path, timeout=30)
+            try:
+                conn.row_factory = sqlite3.Row
+                return conn.execute(sql, params).fetchall()
+            except sqlite3.OperationalError:
+                return []  # not created yet
+            finally:
+                conn.close()
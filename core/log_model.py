@@ -0,0 +1,256 @@
+"""
+Log Dock Model
+
+This module provides the model behind the log dock. Lines are kept in a ring
+buffer of a fixed number of lines, so a verbose download cannot grow the log
+without bound: once it is full, the oldest lines are dropped. Appended messages
+are batched and classified once each when the batch is flushed, at most once
+per frame, so a burst of yt-dlp output costs one model update, not one per line.
+The view shows one line per row with uniform row heights, so it renders only
+the rows in sight however many are kept.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex, QTimer, Signal
+from PySide6.QtGui import QColor
+
+from core.config import config_manager
+
+
+DEFAULT_COLOR = "white"
+DEBUG_COLOR = "#4D96FF"
+SUCCESS_COLOR = "#6BCB77"
+WARNING_COLOR = "#FFD93D"
+ERROR_COLOR = "#FF4444"
+CANCEL_COLOR = "#FF9F45"
+
+# Tray notices
+NOTICE_ERROR = "error"
+NOTICE_INDEXING = "indexing"
+
+_YTDLP_TAG = re.compile(r"\[yt-dlp (Debug|Info|Warning|Error)\]")
+_YTDLP_SUCCESS = re.compile(r"download completed|has already been downloaded|finished downloading|merged|success",
+                            re.IGNORECASE)
+# One scan finds every keyword of a line; the first kind in _KIND_ORDER found wins
+_KEYWORDS = re.compile(
+    r"(?P<details>error details:)|(?P<error>error)|(?P<failure>fail|http status code)|(?P<warning>warn)"
+    r"|(?P<success>completed|success|finished)|(?P<activity>started|queued|fetching|downloading)"
+    r"|(?P<cancel>cancel)|(?P<indexing>playlist indexing in progress)",
+    re.IGNORECASE,
+)
+_KIND_ORDER = (
+    ("error", ERROR_COLOR, "❌"),
+    ("warning", WARNING_COLOR, "⚠️"),
+    ("success", SUCCESS_COLOR, "✅"),
+    ("activity", DEBUG_COLOR, "ℹ️"),
+    ("cancel", CANCEL_COLOR, "🚫"),
+)
+_DETAIL_HEADERS = ("error type", "error details", "http status")
+
+
+@dataclass
+class LogEntry:
+    """A classified log message"""
+    text: str
+    color: str = DEFAULT_COLOR
+    notice: Optional[str] = None  # NOTICE_ERROR or NOTICE_INDEXING for a tray message
+
+
+def _timestamped(text: str) -> str:
+    return f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] ❌ {text}"
+
+
+def classify_line(text: str) -> LogEntry:
+    """
+    Color and decorate a log message for the dock
+
+    yt-dlp messages are colored by their level tag, other messages by the
+    keywords in them. Errors are timestamped and raise a tray notice.
+    """
+    kinds = {match.lastgroup for match in _KEYWORDS.finditer(text)}
+    if "details" in kinds:
+        kinds.add("error")
+    # Only the word "error" raises a tray notice; failures are colored as errors
+    error_notice = "error" in kinds
+    if "failure" in kinds:
+        kinds.add("error")
+    notice = NOTICE_INDEXING if "indexing" in kinds else None
+    color = DEFAULT_COLOR
+
+    tag = _YTDLP_TAG.search(text) if text.startswith("[yt-dlp") else None
+    if tag is not None:
+        level = tag.group(1)
+        if level == "Debug":
+            color = DEBUG_COLOR
+        elif level == "Info":
+            color = SUCCESS_COLOR if _YTDLP_SUCCESS.search(text) else DEBUG_COLOR
+        elif level == "Warning":
+            color = WARNING_COLOR
+            text = f"⚠️ {text}"
+            if error_notice:
+                notice = NOTICE_ERROR  # A warning that mentions an error is shown in the tray too
+        else:
+            color = ERROR_COLOR
+            text = _timestamped(text)
+            notice = NOTICE_ERROR
+    elif not text.startswith("[yt-dlp"):
+        for kind, kind_color, mark in _KIND_ORDER:
+            if kind in kinds:
+                color = kind_color
+                text = _timestamped(text) if kind == "error" else f"{mark} {text}"
+                break
+        if error_notice:
+            notice = NOTICE_ERROR
+
+    if "details" in kinds:
+        text = "\n".join(
+            "    " + line if ":" in line and not line.lower().startswith(_DETAIL_HEADERS) else line
+            for line in text.split("\n")
+        )
+    return LogEntry(text, color, notice)
+
+
+class LineRing:
+    """
+    Fixed-capacity ring buffer of lines
+
+    Appending past capacity is the caller's to prevent (see drop_front), so the
+    model can announce the rows it drops before they go.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self._lines: List[Any] = [None] * self.capacity
+        self._start = 0
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, index: int) -> Any:
+        if not 0 <= index < self._len:
+            raise IndexError(index)
+        return self._lines[(self._start + index) % self.capacity]
+
+    def free(self) -> int:
+        return self.capacity - self._len
+
+    def extend(self, lines: List[Any]):
+        if len(lines) > self.free():
+            raise ValueError(f"{len(lines)} lines do not fit in {self.free()} free")
+        for line in lines:
+            self._lines[(self._start + self._len) % self.capacity] = line
+            self._len += 1
+
+    def drop_front(self, count: int):
+        count = min(count, self._len)
+        for i in range(count):
+            self._lines[(self._start + i) % self.capacity] = None
+        self._start = (self._start + count) % self.capacity
+        self._len -= count
+
+    def clear(self):
+        self._lines = [None] * self.capacity
+        self._start = 0
+        self._len = 0
+
+
+class LogListModel(QAbstractListModel):
+    """
+    Bounded list model of log lines with batched appends
+
+    Args:
+        max_lines: Lines kept; the oldest are dropped past it
+        flush_interval: Milliseconds appends are batched for
+    """
+
+    notice = Signal(str, str)  # NOTICE_ERROR or NOTICE_INDEXING, message
+
+    def __init__(self, max_lines: Optional[int] = None, flush_interval: Optional[int] = None, parent=None):
+        super().__init__(parent)
+        logging_config = config_manager.config.logging
+        self._lines = LineRing(max_lines or logging_config.DOCK_MAX_LINES)
+        self._pending: List[str] = []
+        self._colors: Dict[str, QColor] = {}
+        self.dropped = 0  # lines dropped for space so far
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(logging_config.DOCK_FLUSH_INTERVAL_MS if flush_interval is None
+                                      else flush_interval)
+        self._flush_timer.timeout.connect(self.flush)
+
+    @property
+    def max_lines(self) -> int:
+        return self._lines.capacity
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._lines)
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._lines):
+            return None
+        text, color = self._lines[index.row()]
+        if role == Qt.DisplayRole:
+            return text
+        if role == Qt.ForegroundRole:
+            if color not in self._colors:
+                self._colors[color] = QColor(color)
+            return self._colors[color]
+        return None
+
+    def append(self, text: str):
+        """Queue a message; it is shown on the next flush"""
+        self._pending.append(text)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def flush(self):
+        """Classify the queued messages and add their lines"""
+        self._flush_timer.stop()
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        capacity = self._lines.capacity
+        if len(pending) > capacity:
+            # Each message is at least a line, so older ones would be dropped unseen
+            self.dropped += len(pending) - capacity
+            pending = pending[-capacity:]
+
+        lines: List[Tuple[str, str]] = []
+        notices: Dict[str, str] = {}
+        for text in pending:
+            entry = classify_line(text)
+            lines.extend((line, entry.color) for line in entry.text.split("\n"))
+            if entry.notice:
+                notices[entry.notice] = entry.text  # the latest of each kind per batch
+        if len(lines) > capacity:
+            self.dropped += len(lines) - capacity
+            lines = lines[-capacity:]
+
+        overflow = len(lines) - self._lines.free()
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            self._lines.drop_front(overflow)
+            self.endRemoveRows()
+            self.dropped += overflow
+        first = len(self._lines)
+        self.beginInsertRows(QModelIndex(), first, first + len(lines) - 1)
+        self._lines.extend(lines)
+        self.endInsertRows()
+        for kind, text in notices.items():
+            self.notice.emit(kind, text)
+
+    def text(self, rows: List[int]) -> str:
+        """Lines of the given rows, in row order, for copying"""
+        return "\n".join(self._lines[row][0] for row in sorted(rows) if 0 <= row < len(self._lines))
+
+    def clear(self):
+        self._flush_timer.stop()
+        self.beginResetModel()
+        self._pending = []
+        self._lines.clear()
+        self.endResetModel()
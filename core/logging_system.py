@@ -3,17 +3,30 @@ Centralized Logging and Error Handling
 
 This module provides centralized logging and error handling capabilities
 for the TokLabs Video Downloader application.
+
+Loggers do not write records themselves: the root logger puts them on a queue,
+and one background listener formats and writes them to the log file, the
+console and the UI in batches. Logging from a download thread costs only the
+enqueue. The queue is drained at exit.
+
+Each component (logger name) has a level, set by a preset and overridden per
+component in the logging configuration. Messages below a component's level are
+dropped by AppLogger before they are formatted.
 """
 
+import atexit
 import logging
+import queue
 import sys
+import threading
 import traceback
 import functools
-from typing import Optional, Callable, Any, Type, Union
+from typing import Optional, Callable, Any, Dict, List, Type, Union
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, RotatingFileHandler
 from PySide6.QtCore import QObject, Signal
 from core.config import config_manager
+from core.job_log import JobLogHandler, current_job, exclude_job_messages, get_job_log_dir
 
 
 class LogLevel:
@@ -25,10 +38,26 @@ class LogLevel:
     CRITICAL = logging.CRITICAL
 
 
+YTDLP_COMPONENT = 'ytdlp'
+
+# Component levels by preset; '' is every component not listed
+LOG_PRESETS: Dict[str, Dict[str, str]] = {
+    # yt-dlp debug output and progress lines are dropped before leaving the download thread
+    "production": {"": "INFO", YTDLP_COMPONENT: "INFO"},
+    "debug": {"": "DEBUG", YTDLP_COMPONENT: "DEBUG"},
+}
+
+
 class QtLogHandler(logging.Handler, QObject):
-    """Custom logging handler that emits Qt signals for UI integration"""
+    """
+    Custom logging handler that emits Qt signals for UI integration
+
+    Records written by the log listener arrive in batches, as one log_batch signal
+    per batch; log_signal is emitted for records handled one at a time.
+    """
     
     log_signal = Signal(str, int)  # message, level
+    log_batch = Signal(object)  # [(message, level)]
     
     def __init__(self):
         logging.Handler.__init__(self)
@@ -42,6 +71,141 @@ class QtLogHandler(logging.Handler, QObject):
         except Exception:
             self.handleError(record)
 
+    def handle_batch(self, records: List[logging.LogRecord]):
+        messages = []
+        for record in records:
+            if not self.filter(record):
+                continue
+            try:
+                messages.append((self.format(record), record.levelno))
+            except Exception:
+                self.handleError(record)
+        if messages:
+            self.log_batch.emit(messages)
+
+
+class BatchWriteMixin:
+    """Lets a stream handler write a batch of records under one lock and one flush"""
+
+    def handle_batch(self, records: List[logging.LogRecord]):
+        self.acquire()
+        try:
+            for record in records:
+                if not self.filter(record):
+                    continue
+                try:
+                    self.write_record(record)
+                except Exception:
+                    self.handleError(record)
+            self.flush()
+        finally:
+            self.release()
+
+    def write_record(self, record: logging.LogRecord):
+        self.stream.write(self.format(record) + self.terminator)
+
+
+class BatchStreamHandler(BatchWriteMixin, logging.StreamHandler):
+    """Stream handler that writes batches"""
+
+
+class BatchRotatingFileHandler(BatchWriteMixin, RotatingFileHandler):
+    """Rotating file handler that writes batches, rolling over between records"""
+
+    def write_record(self, record: logging.LogRecord):
+        if self.stream is None:
+            self.stream = self._open()
+        text = self.format(record) + self.terminator
+        if self.maxBytes > 0:
+            position = self.stream.tell()
+            if position and position + len(text) >= self.maxBytes:
+                self.doRollover()
+        self.stream.write(text)
+
+
+class LogQueueHandler(QueueHandler):
+    """
+    Puts records on the log queue as they are
+
+    Formatting is left to the listener. Only the message arguments are merged
+    here, since the caller may change them once it moves on.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if not hasattr(record, "job"):
+            # Tagged here, on the logging thread, as the listener does not know its job
+            context = current_job()
+            if context is not None:
+                record.job = context.fields()
+        return record
+
+
+class LogListener:
+    """
+    Writes queued records to handlers on one background thread
+
+    Records are taken off the queue in batches of up to batch_size. A handler
+    with a handle_batch method gets each batch in one call; others get the
+    records one at a time. Each handler only gets records at or above its level.
+
+    Args:
+        log_queue: Queue the LogQueueHandler puts records on
+        handlers: Handlers to write to
+        batch_size: Records per batch at most
+    """
+
+    _STOP = None
+
+    def __init__(self, log_queue: queue.SimpleQueue, handlers: List[logging.Handler], batch_size: int = 500):
+        self.queue = log_queue
+        self.handlers = list(handlers)
+        self.batch_size = max(1, batch_size)
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="LogListener", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Write every record queued so far, then stop"""
+        if self._thread is None:
+            return
+        self.queue.put(self._STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = [record for record in batch if record is not self._STOP]
+            if records:
+                self.dispatch(records)
+            if len(records) < len(batch):
+                return
+
+    def dispatch(self, records: List[logging.LogRecord]):
+        for handler in self.handlers:
+            accepted = [record for record in records if record.levelno >= handler.level]
+            if not accepted:
+                continue
+            try:
+                if hasattr(handler, "handle_batch"):
+                    handler.handle_batch(accepted)
+                else:
+                    for record in accepted:
+                        handler.handle(record)
+            except Exception:
+                # Never let one handler stop the listener
+                traceback.print_exc(file=sys.stderr)
+
 
 class LoggerManager:
     """Centralized logger management"""
@@ -49,6 +213,9 @@ class LoggerManager:
     _instance: Optional['LoggerManager'] = None
     _loggers: dict = {}
     _qt_handler: Optional[QtLogHandler] = None
+    _queue_handler: Optional[LogQueueHandler] = None
+    _listener: Optional[LogListener] = None
+    _component_levels: set = set()
     
     def __new__(cls) -> 'LoggerManager':
         if cls._instance is None:
@@ -83,7 +250,7 @@ class LoggerManager:
         )
         
         # Create rotating file handler
-        file_handler = RotatingFileHandler(
+        file_handler = BatchRotatingFileHandler(
             log_file,
             maxBytes=config.MAX_LOG_SIZE,
             backupCount=config.BACKUP_COUNT,
@@ -93,7 +260,7 @@ class LoggerManager:
         file_handler.setLevel(logging.DEBUG)
         
         # Create console handler
-        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler = BatchStreamHandler(sys.stdout)
         console_handler.setFormatter(console_formatter)
         console_handler.setLevel(logging.INFO)
         
@@ -102,12 +269,21 @@ class LoggerManager:
         self._qt_handler.setFormatter(console_formatter)
         self._qt_handler.setLevel(logging.INFO)
         
-        # Configure root logger
+        handlers = [file_handler, console_handler, self._qt_handler]
+        for handler in handlers:
+            handler.addFilter(exclude_job_messages)
+        if config.JOB_LOGS:
+            handlers.append(JobLogHandler(get_job_log_dir(), split=config.JOB_LOG_SPLIT))
+        
+        # Configure root logger: records are queued for the listener to write
+        log_queue = queue.SimpleQueue()
+        self._listener = LogListener(log_queue, handlers, config.QUEUE_BATCH_SIZE)
+        self._queue_handler = LogQueueHandler(log_queue)
         root_logger = logging.getLogger()
-        root_logger.setLevel(logging.DEBUG)
-        root_logger.addHandler(file_handler)
-        root_logger.addHandler(console_handler)
-        root_logger.addHandler(self._qt_handler)
+        root_logger.addHandler(self._queue_handler)
+        self.set_component_levels()
+        self._listener.start()
+        atexit.register(self.shutdown)
     
     def get_logger(self, name: str) -> logging.Logger:
         """Get or create a logger instance"""
@@ -121,9 +297,57 @@ class LoggerManager:
     
     def set_level(self, level: int):
         """Set logging level for all handlers"""
-        for handler in logging.getLogger().handlers:
-            if not isinstance(handler, RotatingFileHandler):  # Keep file logging at DEBUG
+        handlers = self._listener.handlers if self._listener else logging.getLogger().handlers
+        for handler in handlers:
+            if not isinstance(handler, (RotatingFileHandler, LogQueueHandler, JobLogHandler)):  # Keep file logging at DEBUG
                 handler.setLevel(level)
+    
+    def set_component_levels(self, preset: Optional[str] = None, levels: Optional[Dict[str, str]] = None):
+        """
+        Set the level of each component
+
+        Args:
+            preset: Name in LOG_PRESETS; the configured preset if not given
+            levels: Component -> level name, over the preset; the configured
+                levels if not given
+
+        Raises:
+            ValueError: If the preset or a level is unknown
+        """
+        config = config_manager.config.logging
+        preset = preset or config.PRESET
+        if preset not in LOG_PRESETS:
+            raise ValueError(f"Unknown logging preset '{preset}'")
+        component_levels = dict(LOG_PRESETS[preset])
+        component_levels.update(config.LEVELS if levels is None else levels)
+        for name, level in component_levels.items():
+            if logging.getLevelName(str(level).upper()) not in range(logging.CRITICAL + 1):
+                raise ValueError(f"Unknown log level '{level}' for '{name or 'root'}'")
+        
+        logging.getLogger().setLevel(str(component_levels.pop("", "INFO")).upper())
+        for name, level in component_levels.items():
+            logging.getLogger(name).setLevel(str(level).upper())
+        # Components no longer listed follow the root level again
+        for name in self._component_levels - set(component_levels):
+            logging.getLogger(name).setLevel(logging.NOTSET)
+        self._component_levels = set(component_levels)
+    
+    def shutdown(self):
+        """
+        Write out the queued records and stop the listener
+
+        Records logged afterwards, such as by other exit handlers, are written
+        directly by the handlers.
+        """
+        listener = self._listener
+        if listener is None:
+            return
+        self._listener = None
+        root_logger = logging.getLogger()
+        for handler in listener.handlers:
+            root_logger.addHandler(handler)
+        root_logger.removeHandler(self._queue_handler)
+        listener.stop()
 
 
 class ErrorHandler:
@@ -205,7 +429,7 @@ def log_performance(func: Callable) -> Callable:
         try:
             result = func(*args, **kwargs)
             duration = time.time() - start_time
-            logger.debug(f"{func.__name__} completed in {duration:.3f}s")
+            logger.debug("%s completed in %.3fs", func.__name__, duration)
             return result
         except Exception as e:
             duration = time.time() - start_time
@@ -215,27 +439,42 @@ def log_performance(func: Callable) -> Callable:
 
 
 class AppLogger:
-    """Application-specific logger with common methods"""
+    """
+    Application-specific logger with common methods
+
+    Messages below the component's level return at once. Pass the parts of a
+    costly message as %-style args, so they are only formatted if it is written:
+    logger.debug("Handled %s", event)
+    """
     
     def __init__(self, name: str):
         self.logger = LoggerManager().get_logger(name)
         self.error_handler = ErrorHandler(self.logger)
     
-    def debug(self, message: str, **kwargs):
+    def enabled(self, level: int) -> bool:
+        """Whether a message at level would be written"""
+        return self.logger.isEnabledFor(level)
+    
+    def debug(self, message: str, *args, **kwargs):
         """Log debug message"""
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
         if kwargs:
             message += f" | {kwargs}"
-        self.logger.debug(message)
+        self.logger.debug(message, *args)
     
-    def info(self, message: str, **kwargs):
+    def info(self, message: str, *args, **kwargs):
         """Log info message"""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         if kwargs:
             message += f" | {kwargs}"
-        self.logger.info(message)
+        self.logger.info(message, *args)
     
     def warning(self, message: str, **kwargs):
         """Log warning message"""
-        self.error_handler.log_warning(message, **kwargs)
+        if self.logger.isEnabledFor(logging.WARNING):
+            self.error_handler.log_warning(message, **kwargs)
     
     def error(self, message: str, exception: Optional[Exception] = None, **kwargs):
         """Log error message"""
@@ -259,6 +498,10 @@ class AppLogger:
 # Global logger manager instance
 logger_manager = LoggerManager()
 
+def ytdlp_debug_enabled() -> bool:
+    """Whether yt-dlp debug output is logged; when not, it is not requested from yt-dlp either"""
+    return logging.getLogger(YTDLP_COMPONENT).isEnabledFor(logging.DEBUG)
+
 # Setup global exception handler
 def setup_global_exception_handler():
     """Setup global exception handler"""
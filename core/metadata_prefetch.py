@@ -0,0 +1,267 @@
+"""
+Queue Metadata Prefetch
+
+This module fills in title, channel, duration, thumbnail and estimated size for
+queued jobs before they are dispatched. A small pool of its own, separate from the
+download pool, extracts info for the next pending jobs so that learning a title
+never takes a download slot. The extracted info is kept for a while and handed to
+the job's download worker, which then skips extracting it again.
+"""
+
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import yt_dlp
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
+
+from core.config import config_manager
+from core.downloader import format_options
+from core.logging_system import AppLogger
+from core.queue_model import QueueTableModel
+
+
+def _thumbnail(info: Dict[str, Any]) -> str:
+    if info.get("thumbnail"):
+        return info["thumbnail"]
+    thumbnails = [t for t in info.get("thumbnails") or [] if t.get("url")]
+    return thumbnails[-1]["url"] if thumbnails else ""
+
+
+def estimate_size(info: Dict[str, Any]) -> Optional[int]:
+    """
+    Estimated download size of an extracted video
+
+    Returns:
+        Bytes for the selected formats together, or None if any size is unknown
+    """
+    total = 0
+    for fmt in info.get("requested_formats") or [info]:
+        size = fmt.get("filesize") or fmt.get("filesize_approx")
+        if not size:
+            return None
+        total += size
+    return int(total)
+
+
+def summarize_info(info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Queue metadata from a yt-dlp info dict
+
+    Args:
+        info: A processed video, or a playlist extracted flat
+
+    Returns:
+        title, channel, duration, thumbnail and size, as QueueTableModel.set_metadata takes them
+    """
+    metadata = {
+        "title": info.get("title") or "",
+        "channel": info.get("uploader") or info.get("channel") or "",
+        "duration": info.get("duration"),
+        "thumbnail": _thumbnail(info),
+        "size": None,
+    }
+    if info.get("_type") == "playlist":
+        entries = [e for e in info.get("entries") or [] if e]
+        durations = [e.get("duration") for e in entries]
+        if durations and all(durations):
+            metadata["duration"] = sum(durations)
+        if not metadata["thumbnail"] and entries:
+            metadata["thumbnail"] = _thumbnail(entries[0])
+    else:
+        metadata["size"] = estimate_size(info)
+    return metadata
+
+
+def fetch_metadata(task) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Extract info for a download task without downloading it
+
+    Formats are selected as the task's download will select them, so the size
+    estimate matches what gets downloaded.
+
+    Returns:
+        The summarized metadata, and the info for the download worker to reuse
+        (None for playlists, which are only listed)
+
+    Raises:
+        yt_dlp.utils.DownloadError: If the info cannot be extracted
+    """
+    options = {
+        "quiet": True,
+        "no_warnings": True,
+        "skip_download": True,
+        "noplaylist": not task.playlist,
+        "socket_timeout": config_manager.config.download.SOCKET_TIMEOUT,
+        "proxy": task.proxy or None,
+        "geo_bypass": True,
+        "geo_bypass_country": config_manager.config.download.GEO_BYPASS_COUNTRY,
+        "force_ipv4": config_manager.config.download.FORCE_IPV4,
+    }
+    cookie_file = os.path.join(config_manager.config.paths.get_data_dir(), "youtube_cookies.txt")
+    if os.path.exists(cookie_file):
+        options["cookiefile"] = cookie_file
+    if task.playlist:
+        options["extract_flat"] = "in_playlist"
+    else:
+        options.update(format_options(task))
+
+    with yt_dlp.YoutubeDL(options) as ydl:
+        info = ydl.extract_info(task.url, download=False)
+    if info is None:
+        raise yt_dlp.utils.DownloadError(f"No info for {task.url}")
+    metadata = summarize_info(info)
+    if task.playlist:
+        return metadata, None
+    # Plain data without the per-run selections, as yt-dlp writes to .info.json
+    return metadata, yt_dlp.YoutubeDL.sanitize_info(info, remove_private_keys=True)
+
+
+class MetadataFetchSignals(QObject):
+    fetched = Signal(int, object, object)  # job id, metadata dict, info dict or None
+    failed = Signal(int, str)
+
+
+class MetadataFetchWorker(QRunnable):
+    """Fetches metadata for one job on the prefetch pool"""
+
+    def __init__(self, job_id: int, task, fetch: Callable):
+        super().__init__()
+        self.job_id = job_id
+        self.task = task
+        self.fetch = fetch
+        self.signals = MetadataFetchSignals()
+        self.setAutoDelete(False)
+
+    def run(self):
+        try:
+            metadata, info = self.fetch(self.task)
+        except Exception as e:
+            self.signals.failed.emit(self.job_id, str(e))
+            return
+        self.signals.fetched.emit(self.job_id, metadata, info)
+
+
+class MetadataPrefetcher(QObject):
+    """
+    Prefetches metadata for the pending jobs of a QueueTableModel
+
+    Only the next lookahead pending jobs are fetched, at most max_workers at a time,
+    and each job at most once. Extracted info is kept until its job is dispatched
+    (see take_info) or info_ttl seconds pass, after which media URLs may have expired.
+
+    Args:
+        model: Queue whose pending jobs are fetched
+        fetch: Called on a pool thread with a task; returns (metadata, info)
+        max_workers: Fetches in flight at once
+        lookahead: Pending jobs ahead of dispatch to fetch
+        info_ttl: Seconds an extracted info stays usable for the download
+    """
+
+    def __init__(self, model: QueueTableModel, fetch: Callable = fetch_metadata,
+                 max_workers: Optional[int] = None, lookahead: Optional[int] = None,
+                 info_ttl: Optional[float] = None, parent=None):
+        super().__init__(parent)
+        download_config = config_manager.config.download
+        self.model = model
+        self.fetch = fetch
+        self.max_workers = max(1, max_workers or download_config.METADATA_WORKERS)
+        self.lookahead = max(1, lookahead or download_config.METADATA_LOOKAHEAD)
+        self.info_ttl = info_ttl if info_ttl is not None else download_config.METADATA_INFO_TTL
+        self.logger = AppLogger('metadata_prefetch')
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(self.max_workers)
+        self._in_flight: Dict[int, MetadataFetchWorker] = {}
+        self._seen = set()  # jobs fetched or being fetched; never fetched twice
+        self._infos: "OrderedDict[int, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._stopped = False
+        # Coalesce bursts (a batch add, a run of state changes) into one pass
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self.fill)
+        model.rowsInserted.connect(lambda *args: self._schedule())
+        model.state_changed.connect(lambda *args: self._schedule())
+        model.jobs_removed.connect(self._forget)
+
+    def _schedule(self):
+        if not self._stopped and not self._timer.isActive():
+            self._timer.start()
+
+    def fill(self) -> int:
+        """
+        Start fetches for the next pending jobs while workers are free
+
+        Returns:
+            Number of fetches started
+        """
+        started = 0
+        if self._stopped:
+            return started
+        for job_id in self.model.pending_ids(self.lookahead):
+            if len(self._in_flight) >= self.max_workers:
+                break
+            if job_id in self._seen:
+                continue
+            job = self.model.job(job_id)
+            worker = MetadataFetchWorker(job_id, job.task, self.fetch)
+            worker.signals.fetched.connect(self._on_fetched)
+            worker.signals.failed.connect(self._on_failed)
+            self._seen.add(job_id)
+            self._in_flight[job_id] = worker
+            self.pool.start(worker)
+            started += 1
+        return started
+
+    def take_info(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Hand over the extracted info of a job being dispatched
+
+        Returns:
+            The info, or None if there is none or it is too old to download from
+        """
+        entry = self._infos.pop(job_id, None)
+        if entry is None:
+            return None
+        info, fetched_at = entry
+        if time.time() - fetched_at > self.info_ttl:
+            return None
+        return info
+
+    def stop(self):
+        """Start no more fetches and drop queued ones"""
+        self._stopped = True
+        self._timer.stop()
+        self.pool.clear()
+
+    def _on_fetched(self, job_id: int, metadata: Dict[str, Any], info: Optional[Dict[str, Any]]):
+        self._in_flight.pop(job_id, None)
+        job = self.model.job(job_id)
+        if job is None:
+            self._seen.discard(job_id)  # removed meanwhile
+            self._schedule()
+            return
+        self.model.set_metadata(job_id, **metadata)
+        # A job dispatched meanwhile has extracted its own info
+        if info is not None and not job.state.is_active and not job.state.is_finished:
+            self._infos[job_id] = (info, time.time())
+            while len(self._infos) > self.lookahead:
+                self._infos.popitem(last=False)
+        self._schedule()
+
+    def _on_failed(self, job_id: int, message: str):
+        self._in_flight.pop(job_id, None)
+        if self.model.job(job_id) is None:
+            self._seen.discard(job_id)
+        else:
+            self.logger.warning(f"Metadata prefetch failed for job {job_id}: {message}")
+        self._schedule()
+
+    def _forget(self, job_ids):
+        for job_id in job_ids:
+            self._infos.pop(job_id, None)
+            # Running fetches keep their worker until they report back
+            if job_id not in self._in_flight:
+                self._seen.discard(job_id)
+        self._schedule()
@@ -2,6 +2,7 @@ import os
 import json
 import shutil
 from core.utils import get_data_dir, get_images_dir
+from core.subtitles import parse_languages
 
 class UserProfile:
     def __init__(self, profile_path="user_profile.json"):
@@ -20,7 +21,12 @@ class UserProfile:
             "proxy": "", 
             "audio_format": "mp3",
             "audio_quality": "320",
-            "preserve_quality": True
+            "preserve_quality": True,
+            "subtitle_languages": ["en"],
+            "auto_subtitles": False,
+            "resume_queue": False,
+            "throttle_profiles": [],
+            "catch_up_policy": "latest"
         }
         self.load_profile()
 
@@ -35,6 +41,16 @@ class UserProfile:
                         self.data["audio_quality"] = "320"
                     if "preserve_quality" not in self.data:
                         self.data["preserve_quality"] = True
+                    if "subtitle_languages" not in self.data:
+                        self.data["subtitle_languages"] = ["en"]
+                    if "auto_subtitles" not in self.data:
+                        self.data["auto_subtitles"] = False
+                    if "resume_queue" not in self.data:
+                        self.data["resume_queue"] = False
+                    if "throttle_profiles" not in self.data:
+                        self.data["throttle_profiles"] = []
+                    if "catch_up_policy" not in self.data:
+                        self.data["catch_up_policy"] = "latest"
                     self.save_profile()
                 except json.JSONDecodeError as e:
                     print(f"Warning: Profile file corrupted, creating new one. Error: {e}")
@@ -158,3 +174,38 @@ class UserProfile:
     def set_preserve_quality(self, preserve):
         self.data["preserve_quality"] = preserve
         self.save_profile()
+
+    def get_subtitle_languages(self):
+        return self.data.get("subtitle_languages", ["en"])
+
+    def set_subtitle_languages(self, languages):
+        self.data["subtitle_languages"] = parse_languages(languages)
+        self.save_profile()
+
+    def get_auto_subtitles(self):
+        return self.data.get("auto_subtitles", False)
+
+    def set_auto_subtitles(self, enabled):
+        self.data["auto_subtitles"] = enabled
+        self.save_profile()
+
+    def get_resume_queue(self):
+        return self.data.get("resume_queue", False)
+
+    def set_resume_queue(self, enabled):
+        self.data["resume_queue"] = enabled
+        self.save_profile()
+
+    def get_throttle_profiles(self):
+        return self.data.get("throttle_profiles", [])
+
+    def set_throttle_profiles(self, profiles):
+        self.data["throttle_profiles"] = profiles
+        self.save_profile()
+
+    def get_catch_up_policy(self):
+        return self.data.get("catch_up_policy", "latest")
+
+    def set_catch_up_policy(self, policy):
+        self.data["catch_up_policy"] = policy
+        self.save_profile()
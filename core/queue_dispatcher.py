@@ -0,0 +1,126 @@
+"""
+Queue Dispatcher
+
+This module keeps the download queue running. The dispatcher holds a fixed number of
+jobs in flight and starts the next pending job as soon as a running one finishes,
+fails, is cancelled or is paused, so a long queue runs to the end without the user
+pressing Start again.
+"""
+
+from enum import Enum
+from typing import Callable, Optional
+
+from PySide6.QtCore import QObject, Signal
+
+from core.logging_system import AppLogger
+from core.queue_model import JobState, QueueJob, QueueTableModel
+
+
+class DispatchMode(Enum):
+    STOPPED = "stopped"    # nothing is started until start()
+    RUNNING = "running"    # keep max_concurrent jobs in flight
+    PAUSED = "paused"      # running jobs continue, no new ones start
+    DRAINING = "draining"  # like paused, then stopped once no job is running
+
+
+class QueueDispatcher(QObject):
+    """
+    Starts pending jobs of a QueueTableModel while slots are free
+
+    Args:
+        model: Queue the jobs come from
+        launch: Called with each job to start; the job is already in EXTRACTING
+        max_concurrent: Jobs in flight at once
+
+    A filter (see set_filter) holds back pending jobs it rejects; they keep their
+    place in the queue and start once the filter allows them.
+    """
+
+    mode_changed = Signal(object)  # DispatchMode
+    drained = Signal()
+
+    def __init__(self, model: QueueTableModel, launch: Callable[[QueueJob], None],
+                 max_concurrent: int = 1, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self.launch = launch
+        self.max_concurrent = max(1, max_concurrent)
+        self.mode = DispatchMode.STOPPED
+        self.accept: Optional[Callable[[QueueJob], bool]] = None
+        self.logger = AppLogger('queue_dispatcher')
+        self._filling = False
+        model.state_changed.connect(self._on_state_changed)
+        model.rowsInserted.connect(lambda *args: self.fill())
+
+    def start(self):
+        """Run the queue, starting jobs up to the concurrency limit"""
+        self._set_mode(DispatchMode.RUNNING)
+        self.fill()
+
+    def pause(self):
+        """Stop starting jobs; running jobs carry on"""
+        if self.mode in (DispatchMode.RUNNING, DispatchMode.DRAINING):
+            self._set_mode(DispatchMode.PAUSED)
+
+    def drain(self):
+        """Let running jobs finish without starting new ones, then stop"""
+        if self.mode == DispatchMode.STOPPED:
+            return
+        self._set_mode(DispatchMode.DRAINING)
+        self._check_drained()
+
+    def set_max_concurrent(self, value: int):
+        self.max_concurrent = max(1, value)
+        self.fill()
+
+    def set_filter(self, accept: Optional[Callable[[QueueJob], bool]]):
+        """Only start pending jobs accept() returns True for; None starts any"""
+        self.accept = accept
+        self.fill()
+
+    def fill(self) -> int:
+        """
+        Start pending jobs while slots are free
+
+        Returns:
+            Number of jobs started
+        """
+        if self.mode != DispatchMode.RUNNING or self._filling:
+            return 0
+        started = 0
+        # A launch that fails at once reports FAILED synchronously; the flag keeps
+        # that from re-entering this loop
+        self._filling = True
+        try:
+            while self.model.active_count() < self.max_concurrent:
+                job = self.model.take_next_pending(self.accept)
+                if job is None:
+                    break
+                try:
+                    self.launch(job)
+                except Exception as e:
+                    self.logger.error(f"Failed to start job {job.id}", exception=e)
+                    self.model.set_state(job.id, JobState.FAILED, f"Could not start: {e}")
+                started += 1
+        finally:
+            self._filling = False
+        return started
+
+    def _on_state_changed(self, job_id: int, state: JobState):
+        if state.is_active:
+            return
+        if self.mode == DispatchMode.DRAINING:
+            self._check_drained()
+        else:
+            self.fill()
+
+    def _check_drained(self):
+        if self.model.active_count() == 0:
+            self._set_mode(DispatchMode.STOPPED)
+            self.drained.emit()
+
+    def _set_mode(self, mode: DispatchMode):
+        if mode != self.mode:
+            self.mode = mode
+            self.logger.info(f"Queue dispatch {mode.value}")
+            self.mode_changed.emit(mode)
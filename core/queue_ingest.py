@@ -0,0 +1,110 @@
+"""
+Queue Ingest
+
+This module turns a pasted or imported list of URLs into queued download tasks.
+Parsing the text and building the tasks happens on a pool thread; the tasks are
+handed to the GUI in chunks, each added to the queue with one batched insert, so
+a batch of a hundred thousand URLs keeps the window responsive and can report
+progress while it goes in.
+"""
+
+import threading
+from typing import Any, Dict, Iterator, List
+
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+from core.downloader import DownloadTask
+from core.subtitles import parse_languages
+
+
+INGEST_CHUNK_SIZE = 5000
+
+
+def parse_urls(text: str) -> List[str]:
+    """
+    Pick the URLs out of text with one URL per line
+
+    Lines without a scheme get https:// if they look like a host; anything else is
+    dropped. Duplicates are removed, keeping the first occurrence.
+    """
+    seen = set()
+    urls = []
+    for line in text.splitlines():
+        url = line.strip()
+        if not url:
+            continue
+        if not url.startswith(("http://", "https://")):
+            # Allow bare youtube URLs without scheme as a convenience
+            if not (url.startswith("www.") or "." in url):
+                continue
+            url = "https://" + url
+        if url not in seen:
+            seen.add(url)
+            urls.append(url)
+    return urls
+
+
+def build_tasks(urls: List[str], options: Dict[str, Any], chunk_size: int = INGEST_CHUNK_SIZE) -> Iterator[List[DownloadTask]]:
+    """
+    Create a DownloadTask per URL, a chunk at a time
+
+    Args:
+        urls: URLs in queue order
+        options: DownloadTask arguments shared by every task, everything but url
+        chunk_size: Tasks per chunk
+    """
+    options = dict(options)
+    # Parsed once here rather than once per task
+    options["subtitle_languages"] = parse_languages(options.get("subtitle_languages"))
+    for start in range(0, len(urls), chunk_size):
+        yield [DownloadTask(url, **options) for url in urls[start:start + chunk_size]]
+
+
+class QueueIngestSignals(QObject):
+    chunk = Signal(object, int, int)  # tasks, URLs done so far, total URLs
+    finished = Signal(int, bool)  # URLs handed over, whether it was cancelled
+    error = Signal(str)
+
+
+class QueueIngestWorker(QRunnable):
+    """
+    Parses URL text and builds its tasks on a pool thread
+
+    Receivers add each chunk as it arrives and call chunk_done() after; the worker
+    stays at most max_chunks ahead, so chunks reach the GUI one event at a time
+    rather than as one long backlog. cancel() stops before the next chunk.
+    """
+
+    def __init__(self, text: str, options: Dict[str, Any], chunk_size: int = INGEST_CHUNK_SIZE,
+                 max_chunks: int = 2):
+        super().__init__()
+        self.text = text
+        self.options = options
+        self.chunk_size = chunk_size
+        self.cancelled = False
+        self.signals = QueueIngestSignals()
+        self._slots = threading.Semaphore(max_chunks)
+        self.setAutoDelete(False)
+
+    def chunk_done(self):
+        self._slots.release()
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        done = 0
+        try:
+            urls = parse_urls(self.text)
+            self.text = None
+            for tasks in build_tasks(urls, self.options, self.chunk_size):
+                while not self._slots.acquire(timeout=0.1):
+                    if self.cancelled:
+                        break
+                if self.cancelled:
+                    break
+                done += len(tasks)
+                self.signals.chunk.emit(tasks, done, len(urls))
+        except Exception as e:
+            self.signals.error.emit(str(e))
+        self.signals.finished.emit(done, self.cancelled)
@@ -0,0 +1,466 @@
+"""
+Download Queue Model
+
+This module provides the state machine and Qt model behind the Queue page. Every
+queued download is a QueueJob with a stable id and an explicit JobState; workers
+report progress against the id, so removing rows never redirects their updates to
+another job. Pending jobs are kept in FIFO order beside the rows, so picking the
+next job to run does not scan the table.
+"""
+
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+from itertools import count, islice
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, Signal
+
+from core.logging_system import AppLogger
+from core.utils import format_file_size, format_time
+
+
+JOB_ID_ROLE = Qt.UserRole
+# Percent for a progress bar in the Progress column, None when no bar is shown
+PROGRESS_ROLE = Qt.UserRole + 1
+
+
+class JobState(Enum):
+    """Lifecycle of a queued download"""
+    PENDING = "pending"
+    EXTRACTING = "extracting"
+    DOWNLOADING = "downloading"
+    POSTPROCESSING = "postprocessing"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    PAUSED = "paused"
+
+    @property
+    def label(self) -> str:
+        return _LABELS[self]
+
+    @property
+    def is_active(self) -> bool:
+        """A worker is running (or about to run) this job"""
+        return self in ACTIVE_STATES
+
+    @property
+    def is_finished(self) -> bool:
+        return self in FINISHED_STATES
+
+
+_LABELS = {
+    JobState.PENDING: "Queued",
+    JobState.EXTRACTING: "Fetching Info",
+    JobState.DOWNLOADING: "Downloading",
+    JobState.POSTPROCESSING: "Processing",
+    JobState.DONE: "Done",
+    JobState.FAILED: "Failed",
+    JobState.CANCELLED: "Cancelled",
+    JobState.PAUSED: "Paused",
+}
+
+ACTIVE_STATES = frozenset({JobState.EXTRACTING, JobState.DOWNLOADING, JobState.POSTPROCESSING})
+FINISHED_STATES = frozenset({JobState.DONE, JobState.FAILED, JobState.CANCELLED})
+
+# Allowed moves; anything else (e.g. a late update from a cancelled worker) is ignored
+TRANSITIONS = {
+    JobState.PENDING: {JobState.EXTRACTING, JobState.PAUSED, JobState.CANCELLED},
+    JobState.EXTRACTING: {JobState.DOWNLOADING, JobState.POSTPROCESSING} | FINISHED_STATES | {JobState.PAUSED},
+    JobState.DOWNLOADING: {JobState.POSTPROCESSING} | FINISHED_STATES | {JobState.PAUSED},
+    JobState.POSTPROCESSING: {JobState.DOWNLOADING} | FINISHED_STATES | {JobState.PAUSED},
+    JobState.PAUSED: {JobState.PENDING, JobState.CANCELLED},
+    JobState.FAILED: {JobState.PENDING},
+    JobState.CANCELLED: {JobState.PENDING},
+    JobState.DONE: {JobState.PENDING},
+}
+
+
+@dataclass
+class QueueJob:
+    """One queued download and what is known about it so far"""
+    id: int
+    task: Any  # DownloadTask
+    state: JobState = JobState.PENDING
+    title: str = ""
+    channel: str = ""
+    progress: float = 0.0
+    status: str = ""  # latest status message from the worker
+    # Filled in by metadata prefetch ahead of dispatch
+    duration: Optional[float] = None  # seconds
+    thumbnail: str = ""  # URL
+    size: Optional[int] = None  # estimated bytes for the selected formats
+
+    @property
+    def download_type(self) -> str:
+        text = "Audio" if self.task.audio_only else "Video"
+        if self.task.playlist:
+            text += " - Playlist"
+        return text
+
+
+# (header, job attribute)
+COLUMNS = [
+    ("Title", "title"),
+    ("Channel", "channel"),
+    ("URL", "url"),
+    ("Type", "type"),
+    ("Duration", "duration"),
+    ("Size", "size"),
+    ("State", "state"),
+    ("Progress", "progress"),
+]
+
+
+class QueueTableModel(QAbstractTableModel):
+    """
+    Download queue as a table of jobs addressed by id
+
+    Rows keep the order jobs were added in. An id-to-row index makes updates from
+    workers O(1); it is rebuilt from the first affected row when rows are removed.
+    Progress only repaints its cell, and only when the whole percent shown changes.
+    """
+
+    state_changed = Signal(int, object)  # job id, JobState
+    # For persistence: added and removed job ids, and jobs whose state or info changed
+    jobs_added = Signal(object)
+    jobs_removed = Signal(object)
+    job_changed = Signal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.logger = AppLogger('queue_model')
+        self._jobs: List[QueueJob] = []
+        self._rows: Dict[int, int] = {}
+        self._pending: "OrderedDict[int, None]" = OrderedDict()
+        self._active: set = set()
+        # Running jobs removed from the table; they hold their slot until their worker reports an end
+        self._detached: set = set()
+        self._counts: Counter = Counter()  # jobs per JobState
+        self._ids = count(1)
+        self._restored_rows = 0
+
+    # Qt model interface
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._jobs)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMNS[section][0]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        job = self._jobs[index.row()]
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return self._display(job, COLUMNS[index.column()][1])
+        if role == JOB_ID_ROLE:
+            return job.id
+        if role == PROGRESS_ROLE and COLUMNS[index.column()][1] == "progress":
+            if job.state == JobState.DOWNLOADING:
+                return job.progress
+            if job.state == JobState.DONE:
+                return 100.0
+        return None
+
+    def _display(self, job: QueueJob, key: str):
+        if key == "title":
+            return job.title or "Fetching..."
+        if key == "channel":
+            return job.channel or "Fetching..."
+        if key == "url":
+            return job.task.url
+        if key == "type":
+            return job.download_type
+        if key == "duration":
+            return format_time(job.duration) if job.duration else ""
+        if key == "size":
+            return f"~{format_file_size(job.size)}" if job.size else ""
+        if key == "state":
+            return job.state.label
+        if job.state == JobState.DOWNLOADING:
+            return f"{int(job.progress)}%"
+        if job.state == JobState.DONE:
+            return "100%"
+        if job.state.is_active or job.state.is_finished:
+            return job.status or job.state.label
+        return ""
+
+    # Jobs
+
+    def add_jobs(self, tasks: Iterable[Any]) -> List[int]:
+        """
+        Append download tasks as pending jobs
+
+        Returns:
+            The new job ids, in order
+        """
+        jobs = [QueueJob(id=next(self._ids), task=task) for task in tasks]
+        if not jobs:
+            return []
+        first = len(self._jobs)
+        self.beginInsertRows(QModelIndex(), first, first + len(jobs) - 1)
+        for row, job in enumerate(jobs, first):
+            self._jobs.append(job)
+            self._rows[job.id] = row
+            self._pending[job.id] = None
+        self._counts[JobState.PENDING] += len(jobs)
+        self.endInsertRows()
+        job_ids = [job.id for job in jobs]
+        self.jobs_added.emit(job_ids)
+        return job_ids
+
+    def reserve_ids(self, last_id: int):
+        """Make new job ids start after last_id, e.g. the highest id of a saved queue"""
+        self._ids = count(max(last_id, 0) + 1)
+
+    def restore_jobs(self, jobs: List[QueueJob]):
+        """
+        Insert jobs loaded from disk, keeping their ids and states
+
+        Restored jobs go above any added since the restore started. Active states
+        are not restored; callers map them to PENDING or PAUSED first.
+        """
+        if not jobs:
+            return
+        first = self._restored_rows
+        self.beginInsertRows(QModelIndex(), first, first + len(jobs) - 1)
+        self._jobs[first:first] = jobs
+        self._restored_rows += len(jobs)
+        for row in range(first, len(self._jobs)):
+            self._rows[self._jobs[row].id] = row
+        for job in jobs:
+            if job.state == JobState.PENDING:
+                self._pending[job.id] = None
+            self._counts[job.state] += 1
+        self.endInsertRows()
+
+    def add_job(self, task: Any) -> int:
+        return self.add_jobs([task])[0]
+
+    def job(self, job_id: int) -> Optional[QueueJob]:
+        row = self._rows.get(job_id)
+        return None if row is None else self._jobs[row]
+
+    def job_at(self, row: int) -> QueueJob:
+        return self._jobs[row]
+
+    def row_of(self, job_id: int) -> Optional[int]:
+        return self._rows.get(job_id)
+
+    def jobs(self) -> List[QueueJob]:
+        return list(self._jobs)
+
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def active_count(self) -> int:
+        """Jobs with a running worker, including removed ones whose worker has not ended yet"""
+        return len(self._active) + len(self._detached)
+
+    def active_ids(self) -> List[int]:
+        return list(self._active)
+
+    def state_counts(self) -> Counter:
+        """Number of jobs in each JobState"""
+        return Counter(self._counts)
+
+    def active_progress(self) -> float:
+        """Mean percent done of the running jobs, 0 if none is running"""
+        if not self._active:
+            return 0.0
+        return sum(self._jobs[self._rows[i]].progress for i in self._active) / len(self._active)
+
+    def pending_ids(self, limit: Optional[int] = None) -> List[int]:
+        """Ids of pending jobs in the order they will run, the next limit of them if given"""
+        return list(islice(self._pending, limit))
+
+    def take_next_pending(self, accept: Optional[Callable[[QueueJob], bool]] = None) -> Optional[QueueJob]:
+        """
+        Pick the oldest pending job and mark it as extracting
+
+        Args:
+            accept: If given, the oldest pending job it accepts is picked instead;
+                the others keep their place
+
+        Returns:
+            The job, or None if nothing (acceptable) is pending
+        """
+        if not self._pending:
+            return None
+        if accept is None:
+            job_id, _ = self._pending.popitem(last=False)
+        else:
+            job_id = next((job_id for job_id in self._pending if accept(self._jobs[self._rows[job_id]])), None)
+            if job_id is None:
+                return None
+        job = self._jobs[self._rows[job_id]]
+        self.set_state(job_id, JobState.EXTRACTING, "Preparing Download...")
+        return job
+
+    def set_state(self, job_id: int, state: JobState, status: Optional[str] = None) -> bool:
+        """
+        Move a job to a new state
+
+        Returns:
+            False if the job is gone or the transition is not allowed
+        """
+        job = self.job(job_id)
+        if job is None:
+            if job_id in self._detached and not state.is_active:
+                self._detached.discard(job_id)
+                self.state_changed.emit(job_id, state)
+            return False
+        changed = state != job.state
+        if changed:
+            if state not in TRANSITIONS[job.state]:
+                self.logger.debug("Ignoring %s -> %s for job %s", job.state.value, state.value, job_id)
+                return False
+            self._pending.pop(job_id, None)
+            self._active.discard(job_id)
+            if state == JobState.PENDING:
+                self._pending[job_id] = None
+                job.progress = 0.0
+            elif state.is_active:
+                self._active.add(job_id)
+            self._counts[job.state] -= 1
+            self._counts[state] += 1
+            job.state = state
+        if status is not None:
+            job.status = status
+        self._row_changed(job_id)
+        self.job_changed.emit(job_id)
+        if changed:
+            self.state_changed.emit(job_id, state)
+        return True
+
+    def set_status(self, job_id: int, status: str):
+        job = self.job(job_id)
+        if job is not None:
+            job.status = status
+            self._row_changed(job_id, COLUMNS.index(("Progress", "progress")))
+            self.job_changed.emit(job_id)
+
+    def set_progress(self, job_id: int, percent: float):
+        job = self.job(job_id)
+        if job is None:
+            return
+        if job.state in (JobState.EXTRACTING, JobState.POSTPROCESSING):
+            self.set_state(job_id, JobState.DOWNLOADING)
+        if job.state == JobState.DOWNLOADING:
+            shown = int(job.progress)
+            job.progress = percent
+            if int(percent) != shown:
+                self._row_changed(job_id, COLUMNS.index(("Progress", "progress")))
+
+    def set_info(self, job_id: int, title: str, channel: str):
+        job = self.job(job_id)
+        if job is not None:
+            job.title = title
+            job.channel = channel
+            self._row_changed(job_id)
+            self.job_changed.emit(job_id)
+
+    def set_metadata(self, job_id: int, title: str = "", channel: str = "", duration: Optional[float] = None,
+                     thumbnail: str = "", size: Optional[int] = None):
+        """
+        Fill in prefetched metadata
+
+        Title and channel already reported by the job's worker are kept.
+        """
+        job = self.job(job_id)
+        if job is None:
+            return
+        job.title = job.title or title
+        job.channel = job.channel or channel
+        job.duration = duration
+        job.thumbnail = thumbnail
+        job.size = size
+        self._row_changed(job_id)
+        self.job_changed.emit(job_id)
+
+    def pause(self, job_ids: Iterable[int]) -> List[int]:
+        """
+        Hold pending jobs back from dispatch
+
+        Returns:
+            Ids of active jobs among job_ids; the caller stops their workers and
+            reports PAUSED once they have stopped
+        """
+        running = []
+        for job_id in job_ids:
+            job = self.job(job_id)
+            if job is None:
+                continue
+            if job.state == JobState.PENDING:
+                self.set_state(job_id, JobState.PAUSED)
+            elif job.state.is_active:
+                running.append(job_id)
+        return running
+
+    def resume(self, job_ids: Iterable[int]):
+        """Return paused, failed or cancelled jobs to the end of the pending queue"""
+        for job_id in job_ids:
+            job = self.job(job_id)
+            if job is not None and job.state in (JobState.PAUSED, JobState.FAILED, JobState.CANCELLED):
+                self.set_state(job_id, JobState.PENDING, "")
+
+    def cancel_pending(self) -> int:
+        """Cancel every job that has not started; returns how many were cancelled"""
+        job_ids = list(self._pending) + [job.id for job in self._jobs if job.state == JobState.PAUSED]
+        for job_id in job_ids:
+            self.set_state(job_id, JobState.CANCELLED)
+        return len(job_ids)
+
+    def remove_jobs(self, job_ids: Iterable[int]) -> List[QueueJob]:
+        """
+        Remove jobs from the queue
+
+        Returns:
+            The removed jobs; active ones still have workers the caller should stop,
+            and count as active until their worker reports an end state
+        """
+        rows = sorted({self._rows[i] for i in job_ids if i in self._rows}, reverse=True)
+        if not rows:
+            return []
+        removed = []
+        self._restored_rows -= sum(1 for row in rows if row < self._restored_rows)
+        # Remove contiguous runs of rows with one notification each
+        start = 0
+        while start < len(rows):
+            end = start
+            while end + 1 < len(rows) and rows[end + 1] == rows[end] - 1:
+                end += 1
+            first, last = rows[end], rows[start]
+            self.beginRemoveRows(QModelIndex(), first, last)
+            removed[:0] = self._jobs[first:last + 1]
+            del self._jobs[first:last + 1]
+            self.endRemoveRows()
+            start = end + 1
+        for job in removed:
+            del self._rows[job.id]
+            self._pending.pop(job.id, None)
+            if job.id in self._active:
+                self._active.discard(job.id)
+                self._detached.add(job.id)
+            self._counts[job.state] -= 1
+        for row in range(rows[-1], len(self._jobs)):
+            self._rows[self._jobs[row].id] = row
+        self.jobs_removed.emit([job.id for job in removed])
+        return removed
+
+    def clear_finished(self) -> int:
+        """Remove done, failed and cancelled jobs; returns how many were removed"""
+        return len(self.remove_jobs([job.id for job in self._jobs if job.state.is_finished]))
+
+    def _row_changed(self, job_id: int, column: Optional[int] = None):
+        row = self._rows[job_id]
+        first = self.index(row, 0 if column is None else column)
+        last = self.index(row, len(COLUMNS) - 1 if column is None else column)
+        self.dataChanged.emit(first, last)
@@ -0,0 +1,262 @@
+"""
+Queue Storage
+
+This module keeps the download queue on disk so it survives restarts. Each job is a
+row holding its full DownloadTask as JSON plus its state and fetched metadata. The
+QueueRecorder mirrors model changes into the store a batch at a time, and the store
+reads the queue back in chunks so a large queue can be restored in the background.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, Iterator, List, Optional
+
+from PySide6.QtCore import QObject, QTimer
+
+from core.config import config_manager
+from core.downloader import DownloadTask
+from core.logging_system import AppLogger
+from core.queue_model import JobState, QueueJob, QueueTableModel
+
+
+SCHEMA_VERSION = 2
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS queue (
+        id INTEGER PRIMARY KEY,
+        task TEXT NOT NULL,
+        state TEXT NOT NULL,
+        title TEXT NOT NULL DEFAULT '',
+        channel TEXT NOT NULL DEFAULT '',
+        status TEXT NOT NULL DEFAULT '',
+        meta TEXT NOT NULL DEFAULT '{}',
+        updated_at REAL NOT NULL
+    )
+    """,
+]
+
+# Prefetched metadata kept in the meta column
+META_FIELDS = ("duration", "thumbnail", "size")
+
+
+def _job_row(job: QueueJob, now: float) -> tuple:
+    meta = {name: getattr(job, name) for name in META_FIELDS if getattr(job, name)}
+    return (job.id, json.dumps(job.task.to_dict(), ensure_ascii=False), job.state.value,
+            job.title, job.channel, job.status, json.dumps(meta), now)
+
+
+def _read_meta(text: str) -> dict:
+    try:
+        meta = json.loads(text)
+    except ValueError:
+        return {}
+    return {name: meta[name] for name in META_FIELDS if name in meta} if isinstance(meta, dict) else {}
+
+
+class QueueStore:
+    """
+    Embedded queue database
+
+    Writes go through one connection guarded by a lock; reads (the startup restore)
+    use per-thread connections alongside it in WAL mode.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.logger = AppLogger('queue_store')
+        self._write_lock = threading.Lock()
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._writer = self._connect(check_same_thread=False)
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        with self._write_lock, self._writer:
+            version = self._writer.execute("PRAGMA user_version").fetchone()[0]
+            for statement in _SCHEMA:
+                self._writer.execute(statement)
+            if version < 2:
+                columns = {row["name"] for row in self._writer.execute("PRAGMA table_info(queue)")}
+                if "meta" not in columns:
+                    self._writer.execute("ALTER TABLE queue ADD COLUMN meta TEXT NOT NULL DEFAULT '{}'")
+            self._writer.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def _connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=check_same_thread)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    def save(self, jobs: Iterable[QueueJob] = (), removed: Iterable[int] = ()):
+        """
+        Insert or update jobs and delete removed ones in one transaction
+
+        Args:
+            jobs: Jobs to write in full
+            removed: Ids of jobs to delete
+        """
+        now = time.time()
+        rows = [_job_row(job, now) for job in jobs]
+        removed = [(job_id,) for job_id in removed]
+        with self._write_lock, self._writer:
+            if rows:
+                self._writer.executemany(
+                    "INSERT OR REPLACE INTO queue (id, task, state, title, channel, status, meta, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+            if removed:
+                self._writer.executemany("DELETE FROM queue WHERE id = ?", removed)
+
+    def clear(self):
+        with self._write_lock, self._writer:
+            self._writer.execute("DELETE FROM queue")
+
+    def count(self) -> int:
+        return self._reader().execute("SELECT COUNT(*) FROM queue").fetchone()[0]
+
+    def max_id(self) -> int:
+        return self._reader().execute("SELECT COALESCE(MAX(id), 0) FROM queue").fetchone()[0]
+
+    def iter_jobs(self, chunk_size: int = 2000) -> Iterator[List[QueueJob]]:
+        """
+        Read the saved queue in id order, a chunk at a time
+
+        Rows whose task cannot be decoded are skipped.
+        """
+        after_id = 0
+        while True:
+            rows = self._reader().execute(
+                "SELECT id, task, state, title, channel, status, meta FROM queue WHERE id > ? ORDER BY id LIMIT ?",
+                (after_id, chunk_size)
+            ).fetchall()
+            if not rows:
+                return
+            jobs = []
+            for row in rows:
+                try:
+                    task = DownloadTask.from_dict(json.loads(row["task"]))
+                    state = JobState(row["state"])
+                except (ValueError, TypeError, KeyError) as e:
+                    self.logger.warning(f"Skipping unreadable queue job {row['id']}: {e}")
+                    continue
+                jobs.append(QueueJob(id=row["id"], task=task, state=state, title=row["title"],
+                                     channel=row["channel"], status=row["status"], **_read_meta(row["meta"])))
+            after_id = rows[-1]["id"]
+            yield jobs
+
+    def close(self):
+        with self._write_lock:
+            self._writer.close()
+        with self._readers_lock:
+            for conn in self._readers:
+                try:
+                    conn.close()
+                except sqlite3.ProgrammingError:
+                    pass
+            self._readers.clear()
+        self._local = threading.local()
+
+
+class QueueRecorder(QObject):
+    """
+    Mirrors a QueueTableModel into a QueueStore
+
+    Changes are collected as they happen and written together shortly after, so a
+    burst of updates (a run of state changes) costs one transaction. A very large
+    burst (a batch add of many thousands) is written batch_size jobs at a time, one
+    transaction per turn of the event loop, so the GUI never waits on all of it.
+    Progress is not saved; a restored job starts its download over.
+    """
+
+    def __init__(self, model: QueueTableModel, store: QueueStore, delay_ms: int = 250,
+                 batch_size: int = 5000, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self.store = store
+        self.delay_ms = delay_ms
+        self.batch_size = batch_size
+        self.logger = AppLogger('queue_recorder')
+        self._dirty = set()
+        self._removed = set()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._write_batch)
+        model.jobs_added.connect(self.mark_changed)
+        model.job_changed.connect(lambda job_id: self.mark_changed([job_id]))
+        model.jobs_removed.connect(self._on_removed)
+
+    def mark_changed(self, job_ids: Iterable[int]):
+        self._dirty.update(job_ids)
+        self._schedule()
+
+    def _on_removed(self, job_ids: Iterable[int]):
+        for job_id in job_ids:
+            self._dirty.discard(job_id)
+            self._removed.add(job_id)
+        self._schedule()
+
+    def _schedule(self):
+        if not self._timer.isActive():
+            self._timer.start(self.delay_ms)
+
+    def _write_batch(self):
+        self._write(self.batch_size)
+        if self._dirty or self._removed:
+            self._timer.start(0)
+
+    def flush(self):
+        """Write all pending changes now"""
+        self._timer.stop()
+        self._write()
+
+    def _write(self, limit: Optional[int] = None):
+        if not self._dirty and not self._removed:
+            return
+        if limit is None or len(self._dirty) <= limit:
+            job_ids, self._dirty = self._dirty, set()
+        else:
+            job_ids = [self._dirty.pop() for _ in range(limit)]
+        jobs = [job for job in map(self.model.job, job_ids) if job is not None]
+        removed = list(self._removed)
+        self._removed.clear()
+        try:
+            self.store.save(jobs, removed)
+        except sqlite3.Error as e:
+            self.logger.error(f"Failed to save {len(jobs)} queue changes", exception=e)
+
+
+def restorable_state(state: JobState, resume: bool) -> JobState:
+    """State a saved job comes back in; jobs that were running were interrupted"""
+    if state.is_active:
+        return JobState.PENDING if resume else JobState.PAUSED
+    return state
+
+
+_default_store: Optional[QueueStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_queue_store() -> QueueStore:
+    """Get the application queue store, creating it on first use"""
+    global _default_store
+    if _default_store is None:
+        with _default_store_lock:
+            if _default_store is None:
+                _default_store = QueueStore(os.path.join(config_manager.config.paths.get_data_dir(), "queue.db"))
+    return _default_store
@@ -0,0 +1,202 @@
+"""
+Schedule Rules
+
+This module defines when recurring schedules run. A rule is written as text, either
+an interval ("every 1h", "every 1h30m") or a five-field cron expression
+("0 */6 * * *", or "@hourly", "@daily", "@weekly", "@monthly"), and answers when it
+next runs after a given time.
+
+A rule can carry an offset, which moves every run later by that many seconds.
+spread_offset() derives a stable offset from a key such as a source URL, so many
+sources on the same rule poll at different moments instead of all at once.
+"""
+
+import math
+import re
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import FrozenSet, Union
+
+
+_UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+_INTERVAL_RE = re.compile(r"^every\s+((?:\d+\s*[smhdw]\s*)+)$", re.IGNORECASE)
+_INTERVAL_PART_RE = re.compile(r"(\d+)\s*([smhdw])", re.IGNORECASE)
+
+_CRON_ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+# name, lowest, highest value of each cron field
+_CRON_FIELDS = (("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 7))
+# Longest a cron search runs before giving up on an expression that never matches
+_CRON_SEARCH_DAYS = 366 * 5
+
+
+def spread_offset(key: str, window: float) -> float:
+    """
+    A stable offset for key, between 0 and window seconds
+
+    The same key always gets the same offset, across runs of the application.
+    """
+    if window <= 0:
+        return 0.0
+    return float(zlib.crc32(key.encode("utf-8")) % int(window))
+
+
+class IntervalRule:
+    """
+    Runs every given number of seconds
+
+    Runs are aligned to the epoch plus the offset, so a rule runs at the same
+    moments whenever it is scheduled, including after a restart.
+    """
+
+    def __init__(self, seconds: float, offset: float = 0.0, text: str = ""):
+        if seconds <= 0:
+            raise ValueError("Interval must be positive")
+        self.seconds = float(seconds)
+        self.offset = float(offset) % self.seconds
+        self.text = text or f"every {int(self.seconds)}s"
+
+    @property
+    def period(self) -> float:
+        return self.seconds
+
+    def with_offset(self, offset: float) -> "IntervalRule":
+        return IntervalRule(self.seconds, offset, self.text)
+
+    def next_after(self, timestamp: float) -> float:
+        """First run strictly after timestamp"""
+        runs = math.floor((timestamp - self.offset) / self.seconds) + 1
+        return self.offset + runs * self.seconds
+
+
+def _parse_cron_field(text: str, low: int, high: int) -> FrozenSet[int]:
+    values = set()
+    for part in text.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+            if step <= 0:
+                raise ValueError(f"Invalid step in cron field: {text}")
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start_text, end_text = part.split("-", 1)
+            start, end = int(start_text), int(end_text)
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if start < low or end > high or start > end:
+            raise ValueError(f"Cron field out of range {low}-{high}: {text}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronRule:
+    """
+    Runs at the local times matching a cron expression
+
+    Fields are minute, hour, day of month, month and day of week (0 or 7 is
+    Sunday). As in cron, when both day fields are restricted a day matching
+    either one runs.
+    """
+
+    def __init__(self, expression: str, offset: float = 0.0):
+        self.text = expression.strip()
+        fields = _CRON_ALIASES.get(self.text.lower(), self.text).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression}")
+        try:
+            parsed = [_parse_cron_field(text, low, high) for text, (_, low, high) in zip(fields, _CRON_FIELDS)]
+        except ValueError as e:
+            raise ValueError(f"Invalid cron expression '{expression}': {e}") from None
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = frozenset(day % 7 for day in weekdays)
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+        self.offset = float(offset)
+
+    @property
+    def period(self) -> float:
+        """Shortest gap the expression can have between runs, roughly"""
+        if len(self.minutes) > 1:
+            return 60.0
+        if len(self.hours) > 1:
+            return 3600.0
+        return 86400.0
+
+    def with_offset(self, offset: float) -> "CronRule":
+        return CronRule(self.text, offset)
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._any_day and self._any_weekday:
+            return True
+        if self._any_day:
+            return weekday
+        if self._any_weekday:
+            return day
+        return day or weekday
+
+    def next_after(self, timestamp: float) -> float:
+        """
+        First run strictly after timestamp
+
+        Raises:
+            ValueError: If the expression never matches, such as February 30
+        """
+        moment = datetime.fromtimestamp(timestamp - self.offset).replace(second=0, microsecond=0)
+        moment += timedelta(minutes=1)
+        limit = moment + timedelta(days=_CRON_SEARCH_DAYS)
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1) + timedelta(days=32)).replace(day=1, hour=0, minute=0)
+            elif not self._day_matches(moment):
+                moment = (moment + timedelta(days=1)).replace(hour=0, minute=0)
+            elif moment.hour not in self.hours:
+                moment = (moment + timedelta(hours=1)).replace(minute=0)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment.timestamp() + self.offset
+        raise ValueError(f"Cron expression never runs: {self.text}")
+
+
+ScheduleRule = Union[IntervalRule, CronRule]
+
+
+def parse_rule(text: str) -> ScheduleRule:
+    """
+    Parse a rule from its text
+
+    Raises:
+        ValueError: If the text is neither an interval nor a valid cron expression
+    """
+    text = " ".join(text.split())
+    match = _INTERVAL_RE.match(text)
+    if match:
+        seconds = sum(int(amount) * _UNIT_SECONDS[unit.lower()]
+                      for amount, unit in _INTERVAL_PART_RE.findall(match.group(1)))
+        return IntervalRule(seconds, text=text)
+    rule = CronRule(text)
+    rule.next_after(time.time())  # reject expressions that never match
+    return rule
+
+
+def spread_rule(text: str, key: str, max_spread: float) -> ScheduleRule:
+    """
+    Parse a rule and offset it by a stable amount for key
+
+    The offset stays below both the rule's period and max_spread.
+
+    Raises:
+        ValueError: If the text is not a valid rule
+    """
+    rule = parse_rule(text)
+    return rule.with_offset(spread_offset(key, min(rule.period, max_spread)))
@@ -0,0 +1,161 @@
+"""
+Schedule Storage
+
+This module keeps scheduled downloads and watched channels and profiles on disk.
+Scheduled jobs are saved with their full download parameters and next due time,
+so a restart loses none and can tell which runs were missed while it was closed.
+Watch sources are saved with their high-water mark, so a restart does not
+download their existing videos again.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Iterable, List, Optional
+
+from core.config import config_manager
+from core.logging_system import AppLogger
+from core.schedule_rules import parse_rule
+from core.scheduler import ScheduledJob
+from core.watch import WatchSource
+
+
+SCHEMA_VERSION = 2
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS watch_sources (
+        id INTEGER PRIMARY KEY,
+        url TEXT NOT NULL,
+        rule TEXT NOT NULL,
+        options TEXT NOT NULL DEFAULT '{}',
+        enabled INTEGER NOT NULL DEFAULT 1,
+        mark TEXT NOT NULL DEFAULT '{}'
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS scheduled_jobs (
+        id INTEGER PRIMARY KEY,
+        due REAL NOT NULL,
+        rule TEXT NOT NULL DEFAULT '',
+        data TEXT NOT NULL DEFAULT '{}'
+    )
+    """,
+]
+
+# High-water mark and poll status kept in the mark column
+MARK_FIELDS = ("last_id", "last_timestamp", "seen_ids", "last_poll", "last_error", "found")
+
+
+class ScheduleStore:
+    """
+    Embedded schedule database
+
+    Writes are small and infrequent (a poll, a scheduled run), so one connection
+    guarded by a lock serves reads and writes.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.logger = AppLogger('schedule_store')
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock, self._conn:
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+            self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def save_jobs(self, jobs: Iterable[ScheduledJob]):
+        """Insert or update scheduled jobs in one transaction"""
+        rows = [(job.id, job.due, job.rule.text if job.rule else "", json.dumps(job.data, ensure_ascii=False))
+                for job in jobs]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO scheduled_jobs (id, due, rule, data) VALUES (?, ?, ?, ?)", rows)
+
+    def save_job(self, job: ScheduledJob):
+        self.save_jobs([job])
+
+    def remove_jobs(self, job_ids: Iterable[int]):
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM scheduled_jobs WHERE id = ?", [(job_id,) for job_id in job_ids])
+
+    def jobs(self) -> List[ScheduledJob]:
+        """
+        All scheduled jobs in due order
+
+        Rows whose data or rule cannot be read are skipped.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT id, due, rule, data FROM scheduled_jobs ORDER BY due, id").fetchall()
+        jobs = []
+        for row in rows:
+            try:
+                rule = parse_rule(row["rule"]) if row["rule"] else None
+                jobs.append(ScheduledJob(id=row["id"], due=row["due"], data=json.loads(row["data"]), rule=rule))
+            except ValueError as e:
+                self.logger.warning(f"Skipping unreadable scheduled job {row['id']}: {e}")
+        return jobs
+
+    def save_source(self, source: WatchSource) -> WatchSource:
+        """
+        Insert or update a watch source
+
+        A source without an id gets one.
+        """
+        mark = json.dumps({name: getattr(source, name) for name in MARK_FIELDS})
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT OR REPLACE INTO watch_sources (id, url, rule, options, enabled, mark) VALUES (?, ?, ?, ?, ?, ?)",
+                (source.id or None, source.url, source.rule, json.dumps(source.options, ensure_ascii=False),
+                 int(source.enabled), mark)
+            )
+        if not source.id:
+            source.id = cursor.lastrowid
+        return source
+
+    def remove_source(self, source_id: int):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM watch_sources WHERE id = ?", (source_id,))
+
+    def sources(self) -> List[WatchSource]:
+        """
+        All watch sources in the order they were added
+
+        Rows that cannot be decoded are skipped.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM watch_sources ORDER BY id").fetchall()
+        sources = []
+        for row in rows:
+            try:
+                mark = json.loads(row["mark"])
+                sources.append(WatchSource(
+                    id=row["id"], url=row["url"], rule=row["rule"], options=json.loads(row["options"]),
+                    enabled=bool(row["enabled"]), **{name: mark[name] for name in MARK_FIELDS if name in mark}
+                ))
+            except (ValueError, TypeError) as e:
+                self.logger.warning(f"Skipping unreadable watch source {row['id']}: {e}")
+        return sources
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_store: Optional[ScheduleStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_schedule_store() -> ScheduleStore:
+    """Get the application schedule store, creating it on first use"""
+    global _default_store
+    if _default_store is None:
+        with _default_store_lock:
+            if _default_store is None:
+                _default_store = ScheduleStore(os.path.join(config_manager.config.paths.get_data_dir(), "schedule.db"))
+    return _default_store
@@ -0,0 +1,355 @@
+"""
+Download Scheduler
+
+This module starts scheduled downloads when they come due. Scheduled jobs are kept
+in a heap ordered by due time and a single timer is armed for the earliest one, so
+a job starts on time however many are scheduled and nothing is scanned while
+waiting.
+
+Due times are wall-clock timestamps. Timers run on a monotonic clock, which does
+not follow clock changes and may not advance while the system is suspended, so a
+sleep never lasts longer than the resync interval: each wakeup re-reads the wall
+clock and starts whatever has come due. The schedule is also re-read whenever the
+application becomes active again, as it does when the user returns after a resume,
+so a job that came due during sleep does not wait for the next wakeup.
+
+A job may recur by a schedule rule (see core.schedule_rules). When it comes due it
+is put back for the rule's next run, so it stays scheduled until removed. Runs
+missed while the application was busy or the system was asleep are not repeated:
+the job runs once and continues from the next run after now.
+
+Runs missed while the application was closed are handled by a catch-up policy when
+saved jobs are restored (see plan_catch_up): run them all, run the latest only or
+skip them. Missed runs are staggered so they do not all start at once.
+"""
+
+import heapq
+import itertools
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from PySide6.QtCore import QCoreApplication, QObject, QTimer, Qt, Signal
+
+from core.config import config_manager
+from core.logging_system import AppLogger
+from core.schedule_rules import ScheduleRule
+
+
+@dataclass
+class ScheduledJob:
+    """A download waiting for its due time"""
+    id: int
+    due: float  # seconds since the epoch
+    data: Dict[str, Any] = field(default_factory=dict)
+    rule: Optional[ScheduleRule] = None  # recurring jobs only
+
+
+class CatchUpPolicy(Enum):
+    ALL = "all"        # run every missed run, up to a limit
+    LATEST = "latest"  # run the most recent missed run once
+    SKIP = "skip"      # run nothing missed; recurring jobs carry on from their next run
+
+
+@dataclass
+class CatchUpPlan:
+    """What to do with restored jobs, some of whose runs were missed"""
+    jobs: List[ScheduledJob]  # to schedule; missed one-off jobs are moved to their catch-up time
+    runs: List[Tuple[ScheduledJob, float]]  # extra one-off runs of recurring jobs: (job, start at)
+    skipped: List[ScheduledJob]  # missed one-off jobs that will not run
+    missed: Dict[int, int] = field(default_factory=dict)  # job id -> missed runs that will run
+
+
+def missed_runs(job: ScheduledJob, now: float, policy: CatchUpPolicy, max_runs: int) -> List[float]:
+    """
+    Due times of a job that passed before now and should still run
+
+    A one-off job has at most one; a recurring job has each run of its rule from
+    its due time up to now, of which policy keeps all (the latest max_runs), the
+    latest or none.
+    """
+    if job.due > now or policy == CatchUpPolicy.SKIP:
+        return []
+    if job.rule is None:
+        return [job.due]
+    runs = deque(maxlen=1 if policy == CatchUpPolicy.LATEST else max(1, max_runs))
+    due = job.due
+    while due <= now:
+        runs.append(due)
+        due = job.rule.next_after(due)
+    return list(runs)
+
+
+def plan_catch_up(jobs: Iterable[ScheduledJob], now: float, policy: CatchUpPolicy,
+                  max_runs: int, delay: float, stagger: float) -> CatchUpPlan:
+    """
+    Plan the runs of restored jobs that were missed while the application was closed
+
+    Missed runs start delay seconds from now, stagger seconds apart, oldest first.
+    Recurring jobs are moved to their next run after now either way.
+
+    Args:
+        jobs: Restored jobs; due times of missed ones are changed
+        now: Current wall-clock time
+        policy: Which missed runs to keep
+        max_runs: Missed runs kept per job under CatchUpPolicy.ALL
+        delay: Seconds after now the first missed run starts
+        stagger: Seconds between missed runs
+    """
+    plan = CatchUpPlan([], [], [])
+    missed = []
+    for job in jobs:
+        runs = missed_runs(job, now, policy, max_runs)
+        missed.extend((run, job) for run in runs)
+        if runs:
+            plan.missed[job.id] = len(runs)
+        if job.rule is not None:
+            if job.due <= now:
+                job.due = job.rule.next_after(now)
+            plan.jobs.append(job)
+        elif job.due > now or runs:
+            plan.jobs.append(job)
+        else:
+            plan.skipped.append(job)
+    missed.sort(key=lambda item: item[0])
+    for slot, (run, job) in enumerate(missed):
+        start = now + delay + slot * stagger
+        if job.rule is None:
+            job.due = start
+        else:
+            plan.runs.append((job, start))
+    return plan
+
+
+class ScheduleHeap:
+    """
+    Scheduled jobs ordered by due time
+
+    push is O(log n). remove only marks the heap entry, which is dropped when it
+    reaches the top or when stale entries outnumber live ones, so it is O(1)
+    amortized. Jobs due at the same time come out in the order they were pushed.
+    """
+
+    def __init__(self):
+        self._heap: List[list] = []  # [due, sequence, job or None when removed]
+        self._entries: Dict[int, list] = {}
+        self._sequence = itertools.count()
+        self._stale = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, job_id: int) -> bool:
+        return job_id in self._entries
+
+    def get(self, job_id: int) -> Optional[ScheduledJob]:
+        entry = self._entries.get(job_id)
+        return entry[2] if entry else None
+
+    def push(self, job: ScheduledJob):
+        """Add a job, replacing any job with the same id"""
+        self.remove(job.id)
+        entry = [job.due, next(self._sequence), job]
+        self._entries[job.id] = entry
+        heapq.heappush(self._heap, entry)
+
+    def remove(self, job_id: int) -> Optional[ScheduledJob]:
+        """
+        Take a job out of the schedule
+
+        Returns:
+            The removed job, or None if it was not scheduled
+        """
+        entry = self._entries.pop(job_id, None)
+        if entry is None:
+            return None
+        job, entry[2] = entry[2], None
+        self._stale += 1
+        if self._stale > 64 and self._stale > len(self._entries):
+            self._heap = [e for e in self._heap if e[2] is not None]
+            heapq.heapify(self._heap)
+            self._stale = 0
+        return job
+
+    def peek(self) -> Optional[ScheduledJob]:
+        """The job due first, without removing it"""
+        while self._heap and self._heap[0][2] is None:
+            heapq.heappop(self._heap)
+            self._stale -= 1
+        return self._heap[0][2] if self._heap else None
+
+    def pop(self) -> Optional[ScheduledJob]:
+        """Remove and return the job due first"""
+        job = self.peek()
+        if job is not None:
+            heapq.heappop(self._heap)
+            del self._entries[job.id]
+        return job
+
+    def jobs(self) -> List[ScheduledJob]:
+        """All scheduled jobs in due order"""
+        return [entry[2] for entry in sorted(self._entries.values())]
+
+
+class Scheduler(QObject):
+    """
+    Emits job_due for each scheduled job when its due time is reached
+
+    Jobs are emitted in due order, each once per due time. By the time job_due is
+    emitted a one-off job is no longer scheduled and a recurring job is scheduled
+    for its next run. A job added with a due time in the past is emitted on the
+    next pass of the event loop.
+
+    Args:
+        clock: Returns the wall-clock time in seconds since the epoch
+        resync_interval: Longest sleep in seconds before the clock is read again
+    """
+
+    job_due = Signal(object)  # ScheduledJob
+
+    def __init__(self, clock: Callable[[], float] = time.time,
+                 resync_interval: Optional[float] = None, parent=None):
+        super().__init__(parent)
+        scheduler_config = config_manager.config.scheduler
+        self.clock = clock
+        self.resync_interval = resync_interval or scheduler_config.RESYNC_INTERVAL
+        self.jump_tolerance = scheduler_config.CLOCK_JUMP_TOLERANCE
+        self.logger = AppLogger('scheduler')
+        self._heap = ScheduleHeap()
+        self._ids = itertools.count(1)
+        self._armed_at = None  # (wall clock, monotonic clock) when the timer was armed
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self._on_timeout)
+        app = QCoreApplication.instance()
+        if hasattr(app, "applicationStateChanged"):
+            app.applicationStateChanged.connect(self._on_application_state)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def add(self, due: Optional[float], data: Optional[Dict[str, Any]] = None,
+            rule: Optional[ScheduleRule] = None) -> ScheduledJob:
+        """
+        Schedule a job
+
+        Args:
+            due: Wall-clock time to start at, in seconds since the epoch; None for
+                the rule's next run
+            data: Whatever the job_due receiver needs to start the download
+            rule: Rule the job recurs by after its first run
+
+        Returns:
+            The scheduled job
+        """
+        if due is None:
+            if rule is None:
+                raise ValueError("A job needs a due time or a rule")
+            due = rule.next_after(self.clock())
+        job = ScheduledJob(next(self._ids), float(due), dict(data or {}), rule)
+        self._heap.push(job)
+        self._arm()
+        return job
+
+    def remove(self, job_id: int) -> Optional[ScheduledJob]:
+        """
+        Unschedule a job
+
+        Returns:
+            The removed job, or None if it was not scheduled
+        """
+        job = self._heap.remove(job_id)
+        if job is not None:
+            self._arm()
+        return job
+
+    def reschedule(self, job_id: int, due: float) -> bool:
+        """
+        Move a scheduled job to a new due time
+
+        Returns:
+            False if the job is not scheduled
+        """
+        job = self._heap.get(job_id)
+        if job is None:
+            return False
+        job.due = float(due)
+        self._heap.push(job)
+        self._arm()
+        return True
+
+    def job(self, job_id: int) -> Optional[ScheduledJob]:
+        return self._heap.get(job_id)
+
+    def jobs(self) -> List[ScheduledJob]:
+        """Scheduled jobs in due order"""
+        return self._heap.jobs()
+
+    def next_due(self) -> Optional[float]:
+        job = self._heap.peek()
+        return job.due if job else None
+
+    def resync(self):
+        """
+        Start whatever is due now and re-arm the timer
+
+        Call when the clock may have changed, such as after the system resumes,
+        to act on it before the next resync interval.
+        """
+        self._on_timeout()
+
+    def restore(self, jobs: Iterable[ScheduledJob]):
+        """Schedule saved jobs under their own ids; new jobs get ids after theirs"""
+        last_id = 0
+        for job in jobs:
+            self._heap.push(job)
+            last_id = max(last_id, job.id)
+        self.reserve_ids(last_id)
+        self._arm()
+
+    def reserve_ids(self, last_id: int):
+        """Make new job ids start after last_id, e.g. of saved jobs that are shown but not scheduled"""
+        if last_id > 0:
+            next_id = next(self._ids)
+            self._ids = itertools.count(max(next_id, last_id + 1))
+
+    def clear(self):
+        self._heap = ScheduleHeap()
+        self.timer.stop()
+
+    def _on_application_state(self, state):
+        if state == Qt.ApplicationActive and self._heap.peek() is not None:
+            self.resync()
+
+    def _arm(self):
+        job = self._heap.peek()
+        if job is None:
+            self.timer.stop()
+            return
+        now = self.clock()
+        delay = min(max(job.due - now, 0.0), self.resync_interval)
+        self._armed_at = (now, time.monotonic())
+        self.timer.start(math.ceil(delay * 1000))
+
+    def _on_timeout(self):
+        now = self.clock()
+        if self._armed_at is not None:
+            wall, monotonic = self._armed_at
+            drift = (now - wall) - (time.monotonic() - monotonic)
+            if abs(drift) > self.jump_tolerance:
+                self.logger.info(f"Clock moved {drift:+.0f}s since the last check; re-reading the schedule")
+        # One at a time, so a receiver that removes a later job keeps it from starting
+        while True:
+            job = self._heap.peek()
+            if job is None or job.due > now:
+                break
+            self._heap.pop()
+            if job.rule is not None:
+                job.due = job.rule.next_after(now)
+                self._heap.push(job)
+            self.job_due.emit(job)
+        self._arm()
@@ -12,6 +12,7 @@ from PySide6.QtCore import QObject, Signal, QRunnable, QThreadPool
 from core.config import config_manager
 from core.logging_system import AppLogger
 from core.container import Injectable
+from core.history_store import get_history_store
 
 
 @dataclass
@@ -27,6 +28,8 @@ class DownloadRequest:
     output_format: str = "mp4"
     audio_format: Optional[str] = None
     audio_quality: str = "320"
+    subtitle_languages: Optional[List[str]] = None
+    auto_subtitles: bool = False
 
 
 @dataclass
@@ -231,6 +234,42 @@ class ValidationService(IValidationService):
         return True, None
 
 
+class HistoryService(IHistoryService):
+    """History service backed by the SQLite history store"""
+    
+    def __init__(self, store=None):
+        self.store = store or get_history_store()
+        self.logger = AppLogger('history')
+    
+    def add_entry(self, title: str, channel: str, url: str) -> bool:
+        """Add history entry"""
+        try:
+            self.store.append(title, channel, url)
+            return True
+        except Exception as e:
+            self.logger.error("Failed to add history entry", exception=e, url=url)
+            return False
+    
+    def get_history(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get history entries"""
+        return self.store.fetch(limit=limit)
+    
+    def search_history(self, query: str) -> List[Dict[str, Any]]:
+        """Search history entries with the store's full-text index, best match first; an empty query lists all"""
+        if not query.strip():
+            return self.store.fetch()
+        return self.store.search(query)
+    
+    def delete_entry(self, entry_id: str) -> bool:
+        """Delete history entry"""
+        return self.store.delete([int(entry_id)]) > 0
+    
+    def clear_history(self) -> bool:
+        """Clear all history"""
+        self.store.clear()
+        return True
+
+
 class DownloadService(QObject):
     """Download service implementation"""
     
@@ -273,13 +312,15 @@ class DownloadService(QObject):
                 subtitles=request.subtitles,
                 output_format=request.output_format,
                 audio_format=request.audio_format,
-                audio_quality=request.audio_quality
+                audio_quality=request.audio_quality,
+                subtitle_languages=request.subtitle_languages,
+                auto_subtitles=request.auto_subtitles
             )
             
             # Create worker with signal connections
             worker = DownloadQueueWorker(
                 task=task,
-                row=None,  # Will be set by caller if needed
+                job_id=None,  # Not a queue job
                 progress_signal=None,  # Will connect to our signals
                 status_signal=None,
                 log_signal=None,
@@ -360,6 +401,13 @@ class ServiceRegistry:
             singleton=True
         )
         
+        # Register history service
+        self.container.register_factory(
+            IHistoryService,
+            lambda: HistoryService(),
+            singleton=True
+        )
+        
         # Register download service (requires validation service)
         self.container.register_factory(
             IDownloadService,
@@ -373,6 +421,10 @@ class ServiceRegistry:
         """Get validation service"""
         return self.container.get(IValidationService)
     
+    def get_history_service(self) -> IHistoryService:
+        """Get history service"""
+        return self.container.get(IHistoryService)
+    
     def get_download_service(self) -> IDownloadService:
         """Get download service"""
         return self.container.get(IDownloadService)
\ No newline at end of file
@@ -0,0 +1,212 @@
+"""
+Subtitle Fetching
+
+This module selects subtitle tracks by language and fetches them concurrently,
+either alongside a media download or on their own (subtitle-only backfill).
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import yt_dlp
+from yt_dlp.networking import Request
+from yt_dlp.utils import subtitles_filename
+
+from core.config import config_manager
+from core.logging_system import AppLogger
+
+
+logger = AppLogger('subtitles')
+
+
+@dataclass
+class SubtitleTrack:
+    """A single selected subtitle track"""
+    lang: str
+    ext: str
+    url: Optional[str] = None
+    data: Optional[str] = None
+    http_headers: Optional[Dict[str, str]] = None
+
+
+@dataclass
+class SubtitleResult:
+    """Outcome of fetching one subtitle track"""
+    lang: str
+    path: str
+    skipped: bool = False
+    error: Optional[str] = None
+
+
+def parse_languages(value) -> List[str]:
+    """
+    Normalize a language selection into a list of yt-dlp language patterns
+
+    Args:
+        value: Comma/space separated string or iterable of codes (e.g. "en, de, pt.*")
+
+    Returns:
+        List of language patterns, without empties or duplicates
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.replace(",", " ").split()
+    languages = []
+    for lang in value:
+        lang = str(lang).strip()
+        if lang and lang not in languages:
+            languages.append(lang)
+    return languages
+
+
+def build_subtitle_options(languages: Iterable[str], auto_captions: bool = False) -> Dict[str, Any]:
+    """
+    Build yt-dlp options that select subtitle tracks without downloading all of them
+
+    Args:
+        languages: Language patterns, yt-dlp style (regexes, "all", "-xx" to exclude)
+        auto_captions: Whether automatic captions may be used when no manual track exists
+
+    Returns:
+        Options dict to merge into yt-dlp params
+    """
+    languages = parse_languages(languages) or list(config_manager.config.download.DEFAULT_SUBTITLE_LANGUAGES)
+    return {
+        "writesubtitles": True,
+        "writeautomaticsub": bool(auto_captions),
+        "subtitleslangs": languages,
+        "subtitlesformat": config_manager.config.download.SUBTITLE_FORMAT,
+    }
+
+
+def selected_tracks(info: Dict[str, Any]) -> List[SubtitleTrack]:
+    """
+    Get the tracks yt-dlp selected for an extracted info dict
+
+    The info dict must have been extracted with options from build_subtitle_options().
+    """
+    requested = info.get("requested_subtitles") or {}
+    tracks = []
+    for lang, sub in requested.items():
+        if not sub:
+            continue
+        tracks.append(SubtitleTrack(
+            lang=lang,
+            ext=sub.get("ext", "vtt"),
+            url=sub.get("url"),
+            data=sub.get("data"),
+            http_headers=sub.get("http_headers") or info.get("http_headers"),
+        ))
+    return tracks
+
+
+class SubtitleFetcher:
+    """Fetches subtitle tracks concurrently through a yt-dlp instance's network stack"""
+
+    def __init__(self, ydl, max_workers: Optional[int] = None):
+        self.ydl = ydl
+        self.max_workers = max_workers or config_manager.config.download.SUBTITLE_FETCH_WORKERS
+
+    def fetch(self, info: Dict[str, Any], media_filename: str,
+              tracks: Optional[List[SubtitleTrack]] = None) -> List[SubtitleResult]:
+        """
+        Fetch subtitle tracks next to a media file
+
+        Args:
+            info: Extracted info dict
+            media_filename: Path of the media file the subtitles belong to (need not exist)
+            tracks: Tracks to fetch, defaults to selected_tracks(info)
+
+        Returns:
+            One SubtitleResult per track
+        """
+        if tracks is None:
+            tracks = selected_tracks(info)
+        if not tracks:
+            return []
+
+        real_ext = info.get("ext")
+        workers = max(1, min(self.max_workers, len(tracks)))
+        if workers == 1:
+            return [self._fetch_one(track, media_filename, real_ext) for track in tracks]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="subtitles") as pool:
+            return list(pool.map(lambda t: self._fetch_one(t, media_filename, real_ext), tracks))
+
+    def _fetch_one(self, track: SubtitleTrack, media_filename: str, real_ext: Optional[str]) -> SubtitleResult:
+        path = subtitles_filename(media_filename, track.lang, track.ext, real_ext)
+        if os.path.exists(path):
+            return SubtitleResult(track.lang, path, skipped=True)
+        try:
+            if track.data is not None:
+                content = track.data.encode("utf-8")
+            elif track.url:
+                with self.ydl.urlopen(Request(track.url, headers=track.http_headers or {})) as response:
+                    content = response.read()
+            else:
+                return SubtitleResult(track.lang, path, error="No URL or data for track")
+            tmp_path = path + ".part"
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+            return SubtitleResult(track.lang, path)
+        except Exception as e:
+            logger.warning(f"Subtitle fetch failed for {track.lang}", error=str(e))
+            return SubtitleResult(track.lang, path, error=str(e))
+
+
+def fetch_subtitles(url: str, folder: str, languages: Iterable[str], auto_captions: bool = False,
+                    base_options: Optional[Dict[str, Any]] = None,
+                    outtmpl: str = "%(title)s.%(ext)s",
+                    log_callback: Optional[Callable[[str], None]] = None) -> List[SubtitleResult]:
+    """
+    Fetch only the subtitles for a URL, without downloading the media
+
+    Files are named after the media file the regular download would produce, so
+    running this over an existing library fills in the missing subtitle files and
+    skips the ones already present.
+
+    Args:
+        url: Media URL
+        folder: Folder the media lives in
+        languages: Language patterns to fetch
+        auto_captions: Whether automatic captions are allowed
+        base_options: Extra yt-dlp options (cookies, proxy, logger, ...)
+        outtmpl: Output template used for the media file
+        log_callback: Optional callable receiving progress messages
+
+    Returns:
+        One SubtitleResult per fetched track
+    """
+    options = dict(base_options or {})
+    options.update(build_subtitle_options(languages, auto_captions))
+    options.update({
+        "skip_download": True,
+        "noplaylist": True,
+        "outtmpl": os.path.join(folder, outtmpl),
+    })
+
+    with yt_dlp.YoutubeDL(options) as ydl:
+        info = ydl.extract_info(url, download=False)
+        if not info:
+            return []
+        if info.get("_type") == "playlist":
+            entries = [e for e in (info.get("entries") or []) if e]
+        else:
+            entries = [info]
+
+        results = []
+        fetcher = SubtitleFetcher(ydl)
+        for entry in entries:
+            os.makedirs(folder, exist_ok=True)
+            entry_results = fetcher.fetch(entry, ydl.prepare_filename(entry))
+            if log_callback:
+                fetched = [r.lang for r in entry_results if not r.skipped and not r.error]
+                if fetched:
+                    log_callback(f"Subtitles fetched for {entry.get('title', url)}: {', '.join(fetched)}")
+                elif not entry_results:
+                    log_callback(f"No subtitles for the requested languages: {entry.get('title', url)}")
+            results.extend(entry_results)
+        return results
@@ -0,0 +1,351 @@
+"""
+Throttle Profiles
+
+This module switches download limits by time of day. A throttle profile maps a
+daily time window to a concurrency limit, a bandwidth cap and the kinds of job
+allowed to start, such as full speed overnight and a trickle during business
+hours. The ThrottleController applies the profile in force and switches to the
+next one at the window boundary, without restarting running downloads:
+
+    - Concurrency: the queue dispatcher starts no new jobs until the running ones
+      fall below the new limit; a raised limit starts jobs at once.
+    - Bandwidth: the cap is shared among running downloads by rewriting the
+      'ratelimit' each yt-dlp instance reads as it downloads, so running
+      downloads slow down or speed up mid-file.
+    - Job classes: pending jobs of other kinds stay queued until a profile
+      allows them.
+"""
+
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, time as dt_time, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from PySide6.QtCore import QObject, Signal
+
+from core.logging_system import AppLogger
+from core.scheduler import Scheduler
+
+
+JOB_CLASSES = ("video", "audio", "playlist", "subtitles")
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+_RATE_RE = re.compile(r"^(\d+(?:\.\d+)?)\s*([kmg]?)(?:i?b)?(?:/s)?$", re.IGNORECASE)
+_RATE_UNITS = {"": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3}
+
+
+def job_class(task) -> str:
+    """The throttle class of a DownloadTask: video, audio, playlist or subtitles"""
+    if task.subtitles_only:
+        return "subtitles"
+    if task.playlist:
+        return "playlist"
+    return "audio" if task.audio_only else "video"
+
+
+def parse_rate(text: str) -> Optional[int]:
+    """
+    Parse a bandwidth such as "500K", "2M" or "1.5MB/s" into bytes per second
+
+    Returns:
+        Bytes per second, or None for no cap ("", "0" or "unlimited")
+
+    Raises:
+        ValueError: If the text is not a bandwidth
+    """
+    text = (text or "").strip()
+    if text.lower() in ("", "0", "unlimited", "none"):
+        return None
+    match = _RATE_RE.match(text)
+    if not match:
+        raise ValueError(f"Invalid bandwidth: {text}")
+    return int(float(match.group(1)) * _RATE_UNITS[match.group(2).lower()])
+
+
+def format_rate(rate: Optional[int]) -> str:
+    if not rate:
+        return "unlimited"
+    for unit in ("G", "M", "K"):
+        size = _RATE_UNITS[unit.lower()]
+        if rate >= size:
+            return f"{rate / size:g}{unit}"
+    return str(rate)
+
+
+def parse_days(text: str) -> Tuple[int, ...]:
+    """
+    Parse days of the week such as "mon-fri" or "sat,sun" (Monday is 0)
+
+    Raises:
+        ValueError: If a day is not recognised
+    """
+    text = (text or "").strip().lower()
+    if text in ("", "all", "daily", "*"):
+        return tuple(range(7))
+    days = set()
+    for part in text.replace(" ", "").split(","):
+        try:
+            if "-" in part:
+                first, last = (WEEKDAYS.index(day[:3]) for day in part.split("-", 1))
+                days.update(range(first, last + 1) if first <= last else [*range(first, 7), *range(last + 1)])
+            else:
+                days.add(WEEKDAYS.index(part[:3]))
+        except ValueError:
+            raise ValueError(f"Invalid days: {text}") from None
+    return tuple(sorted(days))
+
+
+def format_days(days: Iterable[int]) -> str:
+    days = sorted(days)
+    if len(days) == 7:
+        return "all"
+    return ",".join(WEEKDAYS[day] for day in days)
+
+
+def parse_job_classes(text: str) -> Tuple[str, ...]:
+    """
+    Parse job classes such as "video,audio"; "all" or nothing allows every class
+
+    Raises:
+        ValueError: If a class is not one of JOB_CLASSES
+    """
+    text = (text or "").strip().lower()
+    if text in ("", "all", "*"):
+        return JOB_CLASSES
+    classes = tuple(dict.fromkeys(part.strip() for part in text.split(",") if part.strip()))
+    unknown = [name for name in classes if name not in JOB_CLASSES]
+    if unknown:
+        raise ValueError(f"Unknown job classes {', '.join(unknown)}; use {', '.join(JOB_CLASSES)}")
+    return classes
+
+
+def format_job_classes(classes: Iterable[str]) -> str:
+    classes = list(classes)
+    return "all" if set(classes) == set(JOB_CLASSES) else ",".join(classes)
+
+
+def _parse_time(text: str) -> dt_time:
+    try:
+        return datetime.strptime(text.strip(), "%H:%M").time()
+    except ValueError:
+        raise ValueError(f"Invalid time, expected HH:MM: {text}") from None
+
+
+@dataclass
+class ThrottleProfile:
+    """
+    Limits in force during a daily time window
+
+    A window whose end is before its start runs past midnight; one whose end
+    equals its start lasts all day. days are the weekdays the window starts on.
+    """
+    name: str
+    start: str = "00:00"  # HH:MM, local time
+    end: str = "00:00"
+    max_concurrent: int = 1
+    bandwidth: Optional[int] = None  # bytes per second shared by all downloads; None for no cap
+    job_classes: Tuple[str, ...] = JOB_CLASSES
+    days: Tuple[int, ...] = tuple(range(7))
+
+    def __post_init__(self):
+        self._start = _parse_time(self.start)
+        self._end = _parse_time(self.end)
+        self.max_concurrent = max(1, int(self.max_concurrent))
+        self.job_classes = tuple(self.job_classes)
+        unknown = set(self.job_classes) - set(JOB_CLASSES)
+        if unknown or not self.job_classes:
+            raise ValueError(f"Job classes must be some of {', '.join(JOB_CLASSES)}")
+        self.days = tuple(sorted(set(self.days)))
+        if not self.days or not all(0 <= day < 7 for day in self.days):
+            raise ValueError("Days must be some of 0 (Monday) to 6")
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ThrottleProfile":
+        """
+        Raises:
+            ValueError: If a field is invalid
+        """
+        try:
+            return cls(
+                name=str(data.get("name") or "Profile"),
+                start=data.get("start", "00:00"),
+                end=data.get("end", "00:00"),
+                max_concurrent=int(data.get("max_concurrent", 1)),
+                bandwidth=data.get("bandwidth") or None,
+                job_classes=tuple(data.get("job_classes") or JOB_CLASSES),
+                days=tuple(data.get("days", range(7))),
+            )
+        except (TypeError, AttributeError) as e:
+            raise ValueError(f"Invalid throttle profile: {e}") from None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "start": self.start, "end": self.end,
+                "max_concurrent": self.max_concurrent, "bandwidth": self.bandwidth,
+                "job_classes": list(self.job_classes), "days": list(self.days)}
+
+    def allows(self, task) -> bool:
+        return job_class(task) in self.job_classes
+
+    def contains(self, moment: datetime) -> bool:
+        """Whether the window is open at a local time"""
+        now = moment.time()
+        today = moment.weekday() in self.days
+        if self._start == self._end:
+            return today
+        if self._start < self._end:
+            return today and self._start <= now < self._end
+        # Past midnight: open from start on a listed day until end the day after
+        yesterday = (moment.weekday() - 1) % 7 in self.days
+        return (today and now >= self._start) or (yesterday and now < self._end)
+
+    def boundaries(self, day: datetime) -> List[datetime]:
+        """Local times the window opens and closes, for the window starting on day"""
+        if day.weekday() not in self.days:
+            return []
+        opens = datetime.combine(day.date(), self._start)
+        closes = datetime.combine(day.date(), self._end)
+        if closes <= opens:
+            closes += timedelta(days=1)
+        return [opens, closes]
+
+
+class ProfileSchedule:
+    """
+    Picks the profile in force at a time
+
+    The first profile whose window is open wins; outside every window the
+    default applies. next_after() gives the next window boundary, so the schedule
+    can be put on a Scheduler as a recurring rule.
+    """
+
+    def __init__(self, profiles: Iterable[ThrottleProfile], default: ThrottleProfile):
+        self.profiles = list(profiles)
+        self.default = default
+
+    def active_at(self, timestamp: float) -> ThrottleProfile:
+        moment = datetime.fromtimestamp(timestamp)
+        for profile in self.profiles:
+            if profile.contains(moment):
+                return profile
+        return self.default
+
+    def next_after(self, timestamp: float) -> float:
+        """The next time a window opens or closes, strictly after timestamp"""
+        moment = datetime.fromtimestamp(timestamp)
+        day = datetime.combine(moment.date(), dt_time())
+        candidates = [
+            boundary.timestamp()
+            for offset in range(-1, 8)
+            for profile in self.profiles
+            for boundary in profile.boundaries(day + timedelta(days=offset))
+        ]
+        later = [candidate for candidate in candidates if candidate > timestamp]
+        # No profiles: check again in a day, which costs nothing
+        return min(later) if later else timestamp + 86400
+
+
+class BandwidthLimiter:
+    """
+    Shares one bandwidth cap among running downloads
+
+    Each download registers the params of its yt-dlp instance; the cap is split
+    evenly and written to each one's 'ratelimit', which yt-dlp reads as it
+    downloads. Registrations and cap changes re-split it at once.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._params: Dict[int, Dict[str, Any]] = {}  # id of the owner -> yt-dlp params
+        self.limit: Optional[int] = None
+
+    def set_limit(self, limit: Optional[int]):
+        with self._lock:
+            self.limit = limit or None
+            self._distribute()
+
+    def register(self, owner, params: Dict[str, Any]):
+        """Download within a share of the cap; replaces owner's earlier params"""
+        with self._lock:
+            self._params[id(owner)] = params
+            self._distribute()
+
+    def unregister(self, owner):
+        with self._lock:
+            if self._params.pop(id(owner), None) is not None:
+                self._distribute()
+
+    def share(self) -> Optional[int]:
+        with self._lock:
+            return self._share()
+
+    def _share(self) -> Optional[int]:
+        if self.limit is None or not self._params:
+            return None
+        return max(1, self.limit // len(self._params))
+
+    def _distribute(self):
+        share = self._share()
+        for params in self._params.values():
+            params["ratelimit"] = share
+
+
+_bandwidth_limiter = BandwidthLimiter()
+
+
+def get_bandwidth_limiter() -> BandwidthLimiter:
+    """Get the application bandwidth limiter"""
+    return _bandwidth_limiter
+
+
+class ThrottleController(QObject):
+    """
+    Applies the throttle profile in force and switches at window boundaries
+
+    Args:
+        dispatcher: Queue dispatcher whose concurrency and job filter are set
+        limiter: Bandwidth limiter whose cap is set
+        default: Profile outside every window, typically the manual settings
+        clock: Returns the wall-clock time in seconds since the epoch
+    """
+
+    profile_changed = Signal(object)  # ThrottleProfile now in force
+
+    def __init__(self, dispatcher, limiter: Optional[BandwidthLimiter] = None,
+                 default: Optional[ThrottleProfile] = None, clock: Callable[[], float] = time.time,
+                 parent=None):
+        super().__init__(parent)
+        self.dispatcher = dispatcher
+        self.limiter = limiter or get_bandwidth_limiter()
+        self.logger = AppLogger('throttle')
+        self.schedule = ProfileSchedule([], default or ThrottleProfile("Default", max_concurrent=dispatcher.max_concurrent))
+        self.active: Optional[ThrottleProfile] = None
+        self.scheduler = Scheduler(clock=clock, parent=self)
+        self.scheduler.job_due.connect(lambda job: self.refresh())
+        self.scheduler.add(None, rule=self.schedule)
+
+    def set_profiles(self, profiles: Iterable[ThrottleProfile], default: Optional[ThrottleProfile] = None):
+        """Replace the profiles (and the default) and apply whichever is now in force"""
+        self.schedule = ProfileSchedule(profiles, default or self.schedule.default)
+        self.scheduler.clear()
+        self.scheduler.add(None, rule=self.schedule)
+        self.refresh(force=True)
+
+    def set_default(self, default: ThrottleProfile):
+        self.set_profiles(self.schedule.profiles, default)
+
+    def refresh(self, force: bool = False) -> ThrottleProfile:
+        """Apply the profile in force now if it changed"""
+        profile = self.schedule.active_at(self.scheduler.clock())
+        if force or profile is not self.active:
+            self.active = profile
+            self.logger.info(f"Throttle profile '{profile.name}': {profile.max_concurrent} at once, "
+                             f"{format_rate(profile.bandwidth)}, {', '.join(profile.job_classes)}")
+            self.limiter.set_limit(profile.bandwidth)
+            allowed = profile.job_classes
+            self.dispatcher.set_filter(None if set(allowed) == set(JOB_CLASSES) else
+                                       lambda job: job_class(job.task) in allowed)
+            self.dispatcher.set_max_concurrent(profile.max_concurrent)
+            self.profile_changed.emit(profile)
+        return profile
@@ -0,0 +1,321 @@
+"""
+Channel and Profile Watch
+
+This module polls watched channels and profiles on a schedule and reports the
+videos posted since the last poll. Each source keeps a high-water mark: the ids
+of the entries it has already seen and the newest timestamp among them. A poll
+lists only the newest page of the source and stops as soon as it reaches entries
+it has seen, so polling a profile with thousands of videos costs one page.
+
+Sources on the same rule are spread over its period by a stable per-source
+offset, so a few hundred sources polled hourly do not all poll at once.
+"""
+
+import copy
+import os
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import yt_dlp
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+from core.config import config_manager
+from core.logging_system import AppLogger
+from core.schedule_rules import spread_rule
+from core.scheduler import ScheduledJob, Scheduler
+
+
+@dataclass
+class WatchSource:
+    """A channel or profile polled for new videos"""
+    id: int
+    url: str
+    rule: str  # schedule rule text, see core.schedule_rules
+    options: Dict[str, Any] = field(default_factory=dict)  # DownloadTask arguments besides the url
+    enabled: bool = True
+    # High-water mark
+    last_id: str = ""
+    last_timestamp: Optional[float] = None
+    seen_ids: List[str] = field(default_factory=list)  # newest first
+    # Poll status
+    last_poll: Optional[float] = None
+    last_error: str = ""
+    found: int = 0  # new entries reported so far
+
+    @property
+    def has_mark(self) -> bool:
+        return bool(self.seen_ids) or self.last_timestamp is not None
+
+
+@dataclass
+class PollResult:
+    """What a poll found and the source's mark after it"""
+    entries: List[Dict[str, Any]]  # new entries, oldest first: id, url, title, timestamp
+    seen_ids: List[str]
+    last_id: str
+    last_timestamp: Optional[float]
+    listed: int  # entries listed to find them
+
+
+def list_entries(url: str, start: int, end: int, proxy: str = "") -> List[Dict[str, Any]]:
+    """
+    List entries start to end (1-based, inclusive) of a channel or profile, newest first
+
+    Only the pages holding those entries are fetched, and entries are not
+    extracted, only listed.
+
+    Raises:
+        yt_dlp.utils.DownloadError: If the source cannot be listed
+    """
+    options = {
+        "quiet": True,
+        "no_warnings": True,
+        "skip_download": True,
+        "extract_flat": "in_playlist",
+        "playliststart": start,
+        "playlistend": end,
+        "socket_timeout": config_manager.config.download.SOCKET_TIMEOUT,
+        "proxy": proxy or None,
+        "geo_bypass": True,
+        "geo_bypass_country": config_manager.config.download.GEO_BYPASS_COUNTRY,
+        "force_ipv4": config_manager.config.download.FORCE_IPV4,
+    }
+    cookie_file = os.path.join(config_manager.config.paths.get_data_dir(), "youtube_cookies.txt")
+    if os.path.exists(cookie_file):
+        options["cookiefile"] = cookie_file
+    with yt_dlp.YoutubeDL(options) as ydl:
+        info = ydl.extract_info(url, download=False)
+    if info is None:
+        raise yt_dlp.utils.DownloadError(f"Nothing listed for {url}")
+    return [entry for entry in info.get("entries") or [] if entry]
+
+
+def poll_source(source: WatchSource, list_entries: Callable = list_entries,
+                page_size: Optional[int] = None, max_pages: Optional[int] = None,
+                seen_limit: Optional[int] = None) -> PollResult:
+    """
+    Find the entries of a source posted since its mark
+
+    The newest page is listed first; the next page is only listed while every
+    entry on the page is new, up to max_pages. An entry is old if its id was seen
+    or its timestamp is not after the mark's, so a pinned old video at the top of
+    a profile does not hide the new ones under it. The first poll of a source only
+    sets its mark.
+
+    Args:
+        source: Source to poll; it is not changed
+        list_entries: Called with (url, start, end, proxy) to list a page
+        page_size: Entries per page
+        max_pages: Pages listed at most
+        seen_limit: Entry ids kept in the mark
+    """
+    scheduler_config = config_manager.config.scheduler
+    page_size = page_size or scheduler_config.WATCH_PAGE_SIZE
+    max_pages = 1 if not source.has_mark else max_pages or scheduler_config.WATCH_MAX_PAGES
+    seen_limit = seen_limit or scheduler_config.WATCH_SEEN_IDS
+
+    seen = set(source.seen_ids)
+    listed_ids: List[str] = []
+    new: List[Dict[str, Any]] = []
+    last_timestamp = source.last_timestamp
+    listed = 0
+    for page in range(max_pages):
+        start = page * page_size + 1
+        entries = list_entries(source.url, start, start + page_size - 1, source.options.get("proxy", ""))
+        listed += len(entries)
+        fresh = 0
+        for entry in entries:
+            entry_id = str(entry.get("id") or entry.get("url") or "")
+            url = entry.get("webpage_url") or entry.get("url")
+            if not entry_id or not url:
+                continue
+            listed_ids.append(entry_id)
+            timestamp = entry.get("timestamp")
+            if timestamp:
+                last_timestamp = max(timestamp, last_timestamp or timestamp)
+            if entry_id in seen or (timestamp and source.last_timestamp and timestamp <= source.last_timestamp):
+                continue
+            seen.add(entry_id)
+            new.append({"id": entry_id, "url": url, "title": entry.get("title") or "", "timestamp": timestamp})
+            fresh += 1
+        if fresh < len(entries) or len(entries) < page_size:
+            break
+
+    seen_ids = list(dict.fromkeys(listed_ids + source.seen_ids))[:seen_limit]
+    return PollResult(
+        entries=list(reversed(new)) if source.has_mark else [],
+        seen_ids=seen_ids,
+        last_id=listed_ids[0] if listed_ids else source.last_id,
+        last_timestamp=last_timestamp,
+        listed=listed,
+    )
+
+
+class WatchPollSignals(QObject):
+    polled = Signal(int, object)  # source id, PollResult
+    failed = Signal(int, str)
+
+
+class WatchPollWorker(QRunnable):
+    """Polls one source on the watch pool"""
+
+    def __init__(self, source: WatchSource, poll: Callable):
+        super().__init__()
+        self.source = copy.deepcopy(source)
+        self.poll = poll
+        self.signals = WatchPollSignals()
+        self.setAutoDelete(False)
+
+    def run(self):
+        try:
+            result = self.poll(self.source)
+        except Exception as e:
+            self.signals.failed.emit(self.source.id, str(e))
+            return
+        self.signals.polled.emit(self.source.id, result)
+
+
+class WatchManager(QObject):
+    """
+    Polls watch sources by their rules and reports new entries
+
+    Each enabled source is a recurring job on the scheduler. A poll runs on the
+    watch pool, at most max_workers at a time, and a source is never polled twice
+    at once. Marks and poll status are saved to the store after each poll.
+
+    Args:
+        store: Keeps the sources (see core.schedule_store.ScheduleStore)
+        poll: Called on a pool thread with a source; returns a PollResult
+        scheduler: Scheduler the polls run on; one is created if not given
+        max_workers: Polls in flight at once
+    """
+
+    new_entries = Signal(object, object)  # WatchSource, new entries oldest first
+    source_changed = Signal(object)  # WatchSource
+
+    def __init__(self, store, poll: Callable = poll_source, scheduler: Optional[Scheduler] = None,
+                 max_workers: Optional[int] = None, parent=None):
+        super().__init__(parent)
+        scheduler_config = config_manager.config.scheduler
+        self.store = store
+        self.poll = poll
+        self.max_spread = scheduler_config.WATCH_MAX_SPREAD
+        self.logger = AppLogger('watch')
+        self.scheduler = scheduler or Scheduler(parent=self)
+        self.scheduler.job_due.connect(self._on_due)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(1, max_workers or scheduler_config.WATCH_POLL_WORKERS))
+        self._sources: Dict[int, WatchSource] = {}
+        self._jobs: Dict[int, int] = {}  # source id -> scheduled job id
+        self._in_flight: Dict[int, WatchPollWorker] = {}
+        self._stopped = False
+
+    def load(self) -> List[WatchSource]:
+        """Read the saved sources and schedule the enabled ones"""
+        for source in self.store.sources():
+            self._sources[source.id] = source
+            if source.enabled:
+                try:
+                    self._schedule(source)
+                except ValueError as e:
+                    self.logger.warning(f"Not watching {source.url}: {e}")
+        return self.sources()
+
+    def sources(self) -> List[WatchSource]:
+        return list(self._sources.values())
+
+    def source(self, source_id: int) -> Optional[WatchSource]:
+        return self._sources.get(source_id)
+
+    def next_poll(self, source_id: int) -> Optional[float]:
+        job = self.scheduler.job(self._jobs.get(source_id, 0))
+        return job.due if job else None
+
+    def add_source(self, url: str, rule: str, options: Optional[Dict[str, Any]] = None) -> WatchSource:
+        """
+        Watch a channel or profile
+
+        Raises:
+            ValueError: If rule is not a valid schedule rule
+        """
+        spread_rule(rule, url, self.max_spread)  # validate before saving
+        source = self.store.save_source(WatchSource(id=0, url=url, rule=rule, options=dict(options or {})))
+        self._sources[source.id] = source
+        self._schedule(source)
+        return source
+
+    def remove_source(self, source_id: int):
+        self._sources.pop(source_id, None)
+        job_id = self._jobs.pop(source_id, None)
+        if job_id is not None:
+            self.scheduler.remove(job_id)
+        self.store.remove_source(source_id)
+
+    def poll_now(self, source_id: int) -> bool:
+        """
+        Poll a source now, outside its schedule
+
+        Returns:
+            False if the source is unknown or already being polled
+        """
+        source = self._sources.get(source_id)
+        if self._stopped or source is None or source_id in self._in_flight:
+            return False
+        worker = WatchPollWorker(source, self.poll)
+        worker.signals.polled.connect(self._on_polled)
+        worker.signals.failed.connect(self._on_failed)
+        self._in_flight[source_id] = worker
+        self.pool.start(worker)
+        return True
+
+    def stop(self):
+        """Start no more polls and drop queued ones"""
+        self._stopped = True
+        self.scheduler.clear()
+        self.pool.clear()
+
+    def _schedule(self, source: WatchSource):
+        rule = spread_rule(source.rule, source.url, self.max_spread)
+        job = self.scheduler.add(None, {"source_id": source.id}, rule)
+        self._jobs[source.id] = job.id
+
+    def _on_due(self, job: ScheduledJob):
+        source_id = job.data.get("source_id")
+        if source_id in self._jobs and not self.poll_now(source_id) and source_id in self._in_flight:
+            self.logger.info(f"Skipping a poll of source {source_id}: the last one is still running")
+
+    def _on_polled(self, source_id: int, result: PollResult):
+        self._in_flight.pop(source_id, None)
+        source = self._sources.get(source_id)
+        if source is None:
+            return  # removed meanwhile
+        source.seen_ids = result.seen_ids
+        source.last_id = result.last_id
+        source.last_timestamp = result.last_timestamp
+        source.last_poll = time.time()
+        source.last_error = ""
+        source.found += len(result.entries)
+        self._save(source)
+        self.source_changed.emit(source)
+        if result.entries:
+            self.logger.info(f"{len(result.entries)} new from {source.url} ({result.listed} listed)")
+            self.new_entries.emit(source, result.entries)
+
+    def _on_failed(self, source_id: int, message: str):
+        self._in_flight.pop(source_id, None)
+        source = self._sources.get(source_id)
+        if source is None:
+            return
+        source.last_poll = time.time()
+        source.last_error = message
+        self.logger.warning(f"Polling {source.url} failed: {message}")
+        self._save(source)
+        self.source_changed.emit(source)
+
+    def _save(self, source: WatchSource):
+        try:
+            self.store.save_source(source)
+        except sqlite3.Error as e:
+            self.logger.error(f"Failed to save watch source {source.id}", exception=e)
@@ -7,11 +7,16 @@ Supports downloading videos and audio from various platforms with advanced featu
 """
 
 import sys
-from core.app_factory import main as app_main
+from core.cli import COMMANDS, main as cli_main
 
 
 def main() -> None:
     """Application entry point"""
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        sys.exit(cli_main(sys.argv[1:]))
+
+    # Imported here so command line runs don't load the GUI
+    from core.app_factory import main as app_main
     exit_code = app_main(sys.argv)
     sys.exit(exit_code)
 
@@ -5,8 +5,27 @@ import sys
 import os
 import shutil
 import tempfile
+from core.events import Event, EventHandlerBase, EventType
 from core.utils import get_data_dir
 
+class Recorder(EventHandlerBase):
+    """Event handler that keeps what it handles, for the event bus tests"""
+
+    def __init__(self, events=(EventType.DOWNLOAD_PROGRESS, EventType.DOWNLOAD_COMPLETED)):
+        super().__init__(list(events))
+        self.events = []
+        self.sources = []
+
+    def handle_generic(self, event):
+        self.events.append((event.event_type, event.data))
+        self.sources.append(event.source)
+        return True
+
+
+def progress(url, percent, source=None):
+    return Event(EventType.DOWNLOAD_PROGRESS, {"url": url, "percent": percent}, source=source)
+
+
 def pytest_configure(config):
     
     config.addinivalue_line(
@@ -33,6 +52,14 @@ def temp_data_dir(monkeypatch):
     yield temp_dir
     shutil.rmtree(temp_dir)
 
+@pytest.fixture
+def history_store(tmp_path, monkeypatch):
+    from core import history_store as history_store_module
+    store = history_store_module.HistoryStore(os.path.join(tmp_path, "history.db"))
+    monkeypatch.setattr(history_store_module, '_default_store', store)
+    yield store
+    store.close()
+
 @pytest.fixture
 def mock_ffmpeg(monkeypatch):
     def mock_which(*args, **kwargs):
@@ -0,0 +1,97 @@
+import json
+import os
+import numpy as np
+import pytest
+from core.analytics import group_medians, history_stats, hour_histogram
+from core.cli import main as cli_main
+from core.history_store import HistoryStore
+
+
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = HistoryStore(os.path.join(tmp_path, "history.db"))
+    s.append_many([
+        {"title": "a1", "channel": "A", "url": "https://youtube.com/1", "created_at": 1000,
+         "host": "youtube.com", "bytes": 10 * MB, "download_seconds": 10, "outcome": "completed"},
+        {"title": "a2", "channel": "A", "url": "https://youtube.com/2", "created_at": 2000,
+         "host": "youtube.com", "bytes": 30 * MB, "download_seconds": 10, "outcome": "completed"},
+        {"title": "a3", "channel": "A", "url": "https://youtube.com/3", "created_at": 3000,
+         "host": "youtube.com", "outcome": "failed"},
+        {"title": "b1", "channel": "B", "url": "https://vimeo.com/1", "created_at": 4000,
+         "host": "vimeo.com", "bytes": 5 * MB, "download_seconds": 1, "outcome": "completed"},
+        {"title": "b2", "channel": "B", "url": "https://vimeo.com/2", "created_at": 5000,
+         "host": "vimeo.com", "outcome": "cancelled"},
+        # Written before outcomes were recorded
+        {"title": "old", "channel": "B", "url": "https://vimeo.com/3", "created_at": 6000},
+    ])
+    yield s
+    s.close()
+
+
+def test_group_medians():
+    codes = np.array([0, 0, 0, 1, 1, 2])
+    values = np.array([3.0, 1.0, 2.0, 4.0, 8.0, np.nan])
+    medians = group_medians(codes, values, 4)
+    assert medians[:2].tolist() == [2.0, 6.0]
+    assert np.isnan(medians[2]) and np.isnan(medians[3])
+
+
+def test_hour_histogram():
+    assert hour_histogram(np.array([])).tolist() == [0] * 24
+    histogram = hour_histogram(np.array([0.0, 60.0, 3600.0 * 5]))
+    assert histogram.sum() == 3
+    assert sorted(histogram[histogram > 0].tolist()) == [1, 2]
+
+
+def test_totals_and_failure_rate(store):
+    stats = history_stats(store)
+    assert stats.downloads == 6
+    assert (stats.completed, stats.failed, stats.cancelled) == (3, 1, 1)
+    assert stats.total_bytes == 45 * MB
+    assert stats.failure_rate == pytest.approx(0.25)
+    assert stats.throughput_percentiles[50] == pytest.approx(3 * MB)
+
+
+def test_groups(store):
+    stats = history_stats(store)
+    channels = {g.name: g for g in stats.channels}
+    assert [g.name for g in stats.channels] == ["A", "B"]
+    assert channels["A"].bytes == 40 * MB
+    assert channels["A"].failure_rate == pytest.approx(1 / 3)
+    assert channels["A"].median_throughput == pytest.approx(2 * MB)
+    assert channels["B"].downloads == 3
+    assert channels["B"].median_throughput == pytest.approx(5 * MB)
+    hosts = {g.name: g for g in stats.hosts}
+    assert set(hosts) == {"youtube.com", "vimeo.com"}
+    assert hosts["vimeo.com"].downloads == 3
+    assert hosts["vimeo.com"].failure_rate == 0
+
+
+def test_period(store):
+    stats = history_stats(store, since=2000, until=4500)
+    assert stats.downloads == 3
+    assert stats.total_bytes == 35 * MB
+
+
+def test_empty_store(tmp_path):
+    s = HistoryStore(os.path.join(tmp_path, "empty.db"))
+    try:
+        stats = history_stats(s)
+    finally:
+        s.close()
+    assert stats.downloads == 0
+    assert stats.failure_rate == 0
+    assert stats.throughput_percentiles == {}
+    assert stats.channels == []
+
+
+def test_cli_stats_json(store, monkeypatch, capsys):
+    from core import history_store as history_store_module
+    monkeypatch.setattr(history_store_module, '_default_store', store)
+    assert cli_main(["stats", "--json"]) == 0
+    data = json.loads(capsys.readouterr().out)
+    assert data["downloads"] == 6
+    assert data["channels"][0]["name"] == "A"
@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+from core.download_activity import DownloadActivity
+from core.downloader import DownloadQueueWorker, DownloadTask
+from core.events import EventBus, EventPublisher
+from core.queue_model import JobState
+
+
+def make_worker(bus, job_id, url):
+    ignore = SimpleNamespace(emit=lambda *args: None)
+    task = DownloadTask(url, "720p", "/tmp", "")
+    worker = DownloadQueueWorker(task, job_id, ignore, ignore, ignore)
+    worker.events = EventPublisher(bus, "downloader")
+    return worker
+
+
+def test_tracks_the_download_events_workers_publish(qtbot, temp_data_dir):
+    bus = EventBus(flush_interval_ms=0)
+    activity = DownloadActivity()
+    activity.subscribe(bus)
+    first = make_worker(bus, 1, "https://youtube.com/watch?v=a")
+    second = make_worker(bus, 2, "https://youtube.com/watch?v=b")
+
+    for worker in (first, second):
+        worker.events.publish_download_started(worker.task.url, {"job_id": worker.job_id})
+    for speed in (100, 200, 300):
+        first.progress_hook({"status": "downloading", "downloaded_bytes": speed, "total_bytes": 1000, "speed": speed})
+    second.progress_hook({"status": "downloading", "downloaded_bytes": 500, "total_bytes": 1000, "speed": 50})
+    qtbot.waitUntil(lambda: activity.total_speed() == 350)
+    assert activity.running() == 2
+    assert activity.progress(first.task.url)["percent"] == 30.0
+
+    first._publish_outcome(JobState.DONE)
+    second._error = "HTTP Error 403"
+    second._publish_outcome(JobState.FAILED)
+    qtbot.waitUntil(lambda: activity.running() == 0)
+    assert activity.total_speed() == 0.0
+
+    events = bus.metrics.snapshot()["events"]
+    assert events["download_progress"]["published"] == 4
+    assert {"download_completed", "download_failed"} <= set(events)
+
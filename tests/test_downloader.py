@@ -1,6 +1,9 @@
 from PySide6.QtCore import QThreadPool, Signal, QObject
 import pytest
-from core.downloader import DownloadTask, DownloadQueueWorker
+import yt_dlp
+from core.downloader import DownloadTask, DownloadQueueWorker, YTLogger
+from core.events import EventBus, EventPublisher, EventType
+from core.queue_model import JobState
 import os
 import tempfile
 from core.utils import get_data_dir
@@ -95,7 +98,7 @@ def test_download_queue_worker(download_task, thread_pool, qtbot):
 
     worker = DownloadQueueWorker(
         task=download_task,
-        row=0,
+        job_id=1,
         progress_signal=on_progress,
         status_signal=on_status,
         log_signal=on_log,
@@ -158,3 +161,120 @@ def test_download_task_playlist(temp_data_dir):
         from_queue=False
     )
     assert task.playlist == True
+
+def test_download_task_subtitle_selection(temp_data_dir):
+    task = DownloadTask(
+        url="https://www.youtube.com/watch?v=test",
+        resolution="720p",
+        folder=temp_data_dir,
+        proxy="",
+        subtitles=True,
+        subtitle_languages="en, de",
+        auto_subtitles=True
+    )
+    assert task.subtitle_languages == ["en", "de"]
+    assert task.auto_subtitles == True
+    assert task.subtitles_only == False
+
+
+def test_ytlogger_drops_debug_output_unless_enabled():
+    for debug_enabled in (False, True):
+        sent = []
+        logger = YTLogger(type("Signal", (), {"emit": staticmethod(sent.append)}), debug_enabled=debug_enabled)
+        logger.debug("[debug] Invoking http downloader")
+        logger.debug("[download] Destination: a.mp4")
+        logger.warning("slow")
+        expected = ["[yt-dlp Info] [download] Destination: a.mp4", "[yt-dlp Warning] slow"]
+        if debug_enabled:
+            expected.insert(0, "[yt-dlp Debug] [debug] Invoking http downloader")
+        assert sent == expected
+
+
+def test_worker_publishes_progress_and_outcome_events(download_task, qapp):
+    bus = EventBus()
+    seen = []
+    bus.add_tap(seen.append)
+    ignore = type("Ignore", (), {"emit": lambda self, *args: None})()
+    worker = DownloadQueueWorker(download_task, 7, ignore, ignore, ignore)
+    worker.events = EventPublisher(bus, "downloader")
+    worker.progress_hook({"status": "downloading", "downloaded_bytes": 250, "total_bytes": 1000, "speed": 50})
+    worker._publish_outcome(JobState.CANCELLED)
+    worker._error = "Content unavailable"
+    worker._publish_outcome(JobState.FAILED)
+    assert [(e.event_type, e.data.get("job_id"), e.source) for e in seen] == [
+        (EventType.DOWNLOAD_PROGRESS, None, "downloader"),
+        (EventType.DOWNLOAD_CANCELLED, 7, "downloader"),
+        (EventType.DOWNLOAD_FAILED, 7, "downloader"),
+    ]
+    assert seen[0].data["progress"]["percent"] == 25.0 and seen[0].data["progress"]["job_id"] == 7
+    assert seen[2].data["error"] == "Content unavailable"
+
+
+class FakeYoutubeDL:
+    """Stands in for yt_dlp.YoutubeDL with ignoreerrors set: errors only show in the return code"""
+    fail = False
+
+    def __init__(self, params=None):
+        self.params = dict(params or {})
+        self._download_retcode = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        pass
+
+    def extract_info(self, url, download=True):
+        return {"title": "Video", "uploader": "Channel", "webpage_url": url}
+
+    def download(self, urls):
+        try:
+            for percent in range(0, 101, 10):
+                for hook in self.params.get("progress_hooks", []):
+                    hook({"status": "downloading", "downloaded_bytes": percent, "total_bytes": 100})
+            if self.fail:
+                raise yt_dlp.utils.DownloadError("HTTP Error 403: Forbidden")
+        except yt_dlp.utils.DownloadError:
+            self._download_retcode = 1
+        return self._download_retcode
+
+
+@pytest.fixture
+def run_worker(download_task, tmp_path, monkeypatch):
+    posted = []
+    monkeypatch.setattr("core.downloader.yt_dlp.YoutubeDL", FakeYoutubeDL)
+    monkeypatch.setattr("core.downloader.get_history_writer",
+                        lambda: type("Writer", (), {"post": lambda self, *args, **kwargs: posted.append(kwargs)})())
+
+    def run(cancel_at=None, fail=False):
+        monkeypatch.setattr(FakeYoutubeDL, "fail", fail)
+        states = []
+        ignore = type("Signal", (), {"emit": lambda self, *args: None})()
+        worker = DownloadQueueWorker(download_task, 1, ignore, ignore, ignore,
+                                     state_signal=type("Signal", (), {"emit": lambda self, job_id, state: states.append(state)})())
+        worker.cookie_file = str(tmp_path / "cookies.txt")
+        worker.events = EventPublisher(EventBus(metrics=False), "downloader")
+        if cancel_at is not None:
+            def on_progress(job_id, percent):
+                if percent >= cancel_at:
+                    worker.cancel = True
+            worker.progress_signal = type("Signal", (), {"emit": lambda self, *args: on_progress(*args)})()
+        worker.run()
+        return states[-1], posted[-1]["outcome"]
+
+    return run
+
+
+def test_worker_outcome_follows_the_download_return_code(run_worker):
+    assert run_worker()[0] == JobState.DONE
+    assert run_worker(cancel_at=30)[0] == JobState.CANCELLED
+    assert run_worker(fail=True)[0] == JobState.FAILED
+
+
+def test_history_records_the_outcome_of_the_job(run_worker):
+    assert run_worker() == (JobState.DONE, "completed")
+    assert run_worker(cancel_at=30) == (JobState.CANCELLED, "cancelled")
+    assert run_worker(fail=True) == (JobState.FAILED, "failed")
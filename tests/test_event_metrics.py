@@ -0,0 +1,96 @@
+import threading
+import time
+from core.event_metrics import EventMetrics, LatencyHistogram
+from core.events import Event, EventBus, EventHandlerBase, EventType, ExecutionContext
+
+
+class Sleeper(EventHandlerBase):
+    def __init__(self, seconds, execution_context=None, fail=False):
+        super().__init__([EventType.DOWNLOAD_PROGRESS, EventType.DOWNLOAD_COMPLETED], execution_context)
+        self.seconds = seconds
+        self.fail = fail
+
+    def handle_generic(self, event):
+        time.sleep(self.seconds)
+        if self.fail:
+            raise RuntimeError("failed")
+        return True
+
+
+def test_histogram_percentiles_are_bucket_bounds():
+    histogram = LatencyHistogram()
+    for _ in range(90):
+        histogram.record(0.0001)  # 100 us, in the bucket up to 128 us
+    for _ in range(10):
+        histogram.record(0.05)
+    summary = histogram.summary()
+    assert summary["count"] == 100
+    assert summary["p50_ms"] == 0.128 and summary["p90_ms"] == 0.128
+    assert summary["p99_ms"] == summary["max_ms"] == 50.0
+    assert abs(summary["mean_ms"] - 5.09) < 1e-6
+    assert LatencyHistogram().percentile(99) == 0.0
+
+
+def test_bus_records_latency_duration_and_failures_per_handler(qapp):
+    bus = EventBus()
+    slow, failing = Sleeper(0.01), Sleeper(0, fail=True)
+    bus.subscribe(EventType.DOWNLOAD_COMPLETED, slow)
+    bus.subscribe(EventType.DOWNLOAD_COMPLETED, failing)
+    for _ in range(3):
+        bus.publish(Event(EventType.DOWNLOAD_COMPLETED, {}))
+
+    snapshot = bus.metrics.snapshot()
+    assert snapshot["events"] == {"download_completed": {"published": 3, "coalesced": 0}}
+    rows = {row["handler"]: row for row in snapshot["handlers"]}
+    assert rows["Sleeper"]["calls"] == 6 and rows["Sleeper"]["failures"] == 0
+    assert rows["Sleeper"]["duration"]["max_ms"] >= 10
+    # The second handler of an event waits for the first
+    assert rows["Sleeper"]["latency"]["max_ms"] >= 10
+
+
+def test_bus_counts_coalesced_and_dropped_events(qtbot):
+    bus = EventBus(flush_interval_ms=0)
+    progress = Sleeper(0)
+    bus.subscribe(EventType.DOWNLOAD_PROGRESS, progress)
+    release = threading.Event()
+
+    class Blocked(Sleeper):
+        def handle_generic(self, event):
+            release.wait(5)
+            return True
+
+    blocked = Blocked(0, ExecutionContext.DEDICATED)
+    blocked.max_pending = 1
+    bus.subscribe(EventType.DOWNLOAD_COMPLETED, blocked)
+    for _ in range(10):
+        bus.publish(Event(EventType.DOWNLOAD_PROGRESS, {"url": "a"}))
+    for _ in range(5):
+        bus.publish(Event(EventType.DOWNLOAD_COMPLETED, {}))
+    release.set()
+    qtbot.waitUntil(lambda: bus.pending_count() == 0)
+    assert bus.wait_idle(5)
+
+    snapshot = bus.metrics.snapshot()
+    assert snapshot["events"]["download_progress"] == {"published": 10, "coalesced": 9}
+    rows = {(row["event"], row["handler"]): row for row in snapshot["handlers"]}
+    assert rows[("download_progress", "Sleeper")]["calls"] == 1
+    completed = rows[("download_completed", "Blocked")]
+    assert completed["dropped"] >= 3 and completed["calls"] + completed["dropped"] == 5
+    assert any(line.startswith("download_completed -> Blocked") for line in bus.metrics.report())
+    assert bus.shutdown(1)
+
+
+def test_bus_without_metrics_runs_handlers(qapp):
+    bus = EventBus(metrics=False)
+    handler = Sleeper(0)
+    bus.subscribe(EventType.DOWNLOAD_COMPLETED, handler)
+    event = Event(EventType.DOWNLOAD_COMPLETED, {})
+    assert bus.publish(event) == 1
+    assert bus.metrics is None and event.published_at is None
+
+
+def test_reset_clears_metrics():
+    metrics = EventMetrics()
+    metrics.published(Event(EventType.DOWNLOAD_COMPLETED, {}))
+    metrics.reset()
+    assert metrics.snapshot()["events"] == {} and metrics.report() == []
@@ -0,0 +1,75 @@
+import gzip
+import os
+import threading
+import time
+import pytest
+from core.event_replay import EventRecorder, EventReplayer, read_trace, read_trace_header
+from core.events import Event, EventBus, EventType
+from tests.conftest import Recorder, progress
+
+
+def test_recorder_writes_every_published_event_before_coalescing(qapp, tmp_path):
+    path = os.path.join(tmp_path, "trace.jsonl.gz")
+    bus = EventBus()
+    with EventRecorder(path, bus) as recorder:
+        publisher = threading.Thread(target=lambda: [bus.publish(progress("a", i, "worker")) for i in range(100)])
+        publisher.start()
+        publisher.join()
+        bus.publish(Event(EventType.DOWNLOAD_COMPLETED, {"url": "a", "success": True}))
+    bus.publish(progress("a", 100, "worker"))
+    assert recorder.count == 101
+
+    assert read_trace_header(path)["version"] == 1
+    trace = list(read_trace(path))
+    assert [event.data.get("percent") for _, event in trace] == list(range(100)) + [None]
+    assert trace[0][1].source == "worker" and trace[-1][1].event_type is EventType.DOWNLOAD_COMPLETED
+    offsets = [offset for offset, _ in trace]
+    assert offsets == sorted(offsets)
+
+
+def test_replay_at_maximum_speed_publishes_the_trace_in_order(qapp, tmp_path):
+    path = os.path.join(tmp_path, "trace.jsonl.gz")
+    with EventRecorder(path) as recorder:
+        for i in range(50):
+            recorder.record(Event(EventType.DOWNLOAD_COMPLETED, {"n": i}, source="queue"))
+    bus = EventBus()
+    handler = Recorder()
+    bus.subscribe(EventType.DOWNLOAD_COMPLETED, handler)
+
+    stats = EventReplayer(path, bus, speed=None).run()
+    assert stats["published"] == 50
+    assert [data["n"] for _, data in handler.events] == list(range(50))
+    assert set(handler.sources) == {"queue"}
+
+
+def test_replay_keeps_the_recorded_pace_scaled(qapp, tmp_path):
+    path = os.path.join(tmp_path, "trace.jsonl.gz")
+    with EventRecorder(path) as recorder:
+        recorder.record(Event(EventType.DOWNLOAD_COMPLETED, {}))
+        time.sleep(0.4)
+        recorder.record(Event(EventType.DOWNLOAD_COMPLETED, {}))
+    bus = EventBus(metrics=False)
+
+    replayer = EventReplayer(path, bus, speed=4).start()
+    assert replayer.wait(5)
+    assert 0.09 <= replayer.stats()["seconds"] < 0.3
+
+
+def test_stop_ends_a_replay_early(qapp, tmp_path):
+    path = os.path.join(tmp_path, "trace.jsonl.gz")
+    with EventRecorder(path) as recorder:
+        recorder.record(Event(EventType.DOWNLOAD_COMPLETED, {}))
+        time.sleep(0.05)
+        recorder.record(Event(EventType.DOWNLOAD_COMPLETED, {}))
+    replayer = EventReplayer(path, EventBus(metrics=False), speed=0.01).start()
+    time.sleep(0.05)
+    replayer.stop()
+    assert not replayer.is_running() and replayer.published == 1
+
+
+def test_other_files_are_not_read_as_traces(tmp_path):
+    path = os.path.join(tmp_path, "other.gz")
+    with gzip.open(path, "wt") as f:
+        f.write('{"format": "something else"}\n')
+    with pytest.raises(ValueError):
+        list(read_trace(path))
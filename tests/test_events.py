@@ -0,0 +1,167 @@
+import gc
+import threading
+from core.events import Event, EventBus, EventType, ExecutionContext
+from tests.conftest import Recorder, progress
+
+
+def publish_from_thread(bus, events):
+    thread = threading.Thread(target=lambda: [bus.publish(event) for event in events])
+    thread.start()
+    thread.join()
+
+
+def test_progress_is_coalesced_per_key_and_delivered_in_one_batch(qtbot):
+    bus = EventBus(flush_interval_ms=0)
+    recorder = Recorder()
+    bus.subscribe(EventType.DOWNLOAD_PROGRESS, recorder)
+    bus.subscribe(EventType.DOWNLOAD_COMPLETED, recorder)
+    events = [progress(url, i) for i in range(100) for url in ("a", "b")]
+    events.append(Event(EventType.DOWNLOAD_COMPLETED, {"url": "a"}))
+    publish_from_thread(bus, events)
+
+    assert recorder.events == [] and bus.pending_count() == 3
+    qtbot.waitUntil(lambda: bus.pending_count() == 0)
+    assert recorder.events == [
+        (EventType.DOWNLOAD_PROGRESS, {"url": "a", "percent": 99}),
+        (EventType.DOWNLOAD_PROGRESS, {"url": "b", "percent": 99}),
+        (EventType.DOWNLOAD_COMPLETED, {"url": "a"}),
+    ]
+    assert bus.coalesced_count == 198 and bus.pending_count() == 0
+
+
+def test_events_on_the_bus_thread_are_delivered_at_once_after_pending_ones(qapp):
+    bus = EventBus()
+    recorder = Recorder()
+    bus.subscribe_global(recorder)
+    bus.publish(progress("a", 1))
+    assert recorder.events == []
+    assert bus.publish(Event(EventType.DOWNLOAD_COMPLETED, {"url": "a"})) == 1
+    assert [event_type for event_type, _ in recorder.events] == [EventType.DOWNLOAD_PROGRESS,
+                                                                  EventType.DOWNLOAD_COMPLETED]
+    qapp.processEvents()
+    assert len(recorder.events) == 2
+
+
+def test_coalescing_can_be_turned_off(qapp):
+    bus = EventBus()
+    bus.set_coalescing(EventType.DOWNLOAD_PROGRESS, None)
+    recorder = Recorder()
+    bus.subscribe(EventType.DOWNLOAD_PROGRESS, recorder)
+    assert sum(bus.publish(progress("a", i)) for i in range(5)) == 5
+    assert [data["percent"] for _, data in recorder.events] == [0, 1, 2, 3, 4]
+
+
+def test_handlers_changed_during_dispatch_apply_to_the_next_event(qapp):
+    bus = EventBus()
+    late = Recorder()
+
+    class Subscriber(Recorder):
+        def handle_generic(self, event):
+            bus.subscribe(EventType.DOWNLOAD_COMPLETED, late)
+            bus.unsubscribe(EventType.DOWNLOAD_COMPLETED, self)
+            return super().handle_generic(event)
+
+    first = Subscriber()
+    bus.subscribe(EventType.DOWNLOAD_COMPLETED, first)
+    bus.publish(Event(EventType.DOWNLOAD_COMPLETED, {"n": 1}))
+    bus.publish(Event(EventType.DOWNLOAD_COMPLETED, {"n": 2}))
+    assert [data["n"] for _, data in first.events] == [1]
+    assert [data["n"] for _, data in late.events] == [2]
+
+
+def test_collected_handlers_are_dropped(qapp):
+    bus = EventBus()
+    bus.subscribe(EventType.DOWNLOAD_COMPLETED, Recorder())
+    bus.subscribe_global(Recorder())
+    gc.collect()
+    assert bus.get_handler_count() == 0
+    assert bus.publish(Event(EventType.DOWNLOAD_COMPLETED, {})) == 0
+
+
+class SlowRecorder(Recorder):
+    def __init__(self, execution_context, max_pending=1000):
+        super().__init__()
+        self.execution_context = execution_context
+        self.max_pending = max_pending
+        self.release = threading.Event()
+        self.threads = set()
+
+    def handle_generic(self, event):
+        self.release.wait(5)
+        self.threads.add(threading.current_thread().name)
+        return super().handle_generic(event)
+
+
+def test_pool_and_dedicated_handlers_run_in_order_off_the_bus_thread(qapp):
+    bus = EventBus()
+    pooled, dedicated = SlowRecorder(ExecutionContext.POOL), SlowRecorder(ExecutionContext.DEDICATED)
+    for handler in (pooled, dedicated):
+        bus.subscribe(EventType.DOWNLOAD_COMPLETED, handler)
+        handler.release.set()
+    for i in range(250):
+        assert bus.publish(Event(EventType.DOWNLOAD_COMPLETED, {"n": i})) == 2
+    assert bus.wait_idle(5)
+
+    for handler in (pooled, dedicated):
+        assert [data["n"] for _, data in handler.events] == list(range(250))
+        assert threading.main_thread().name not in handler.threads
+    assert all(name.startswith("event-handlers") for name in pooled.threads)
+    assert dedicated.threads == {"event-handler.SlowRecorder"}
+    assert bus.shutdown(1)
+
+
+def test_unsubscribing_the_last_subscription_stops_the_handler_queue(qapp):
+    bus = EventBus()
+    handler = SlowRecorder(ExecutionContext.DEDICATED)
+    handler.release.set()
+    bus.subscribe(EventType.DOWNLOAD_COMPLETED, handler)
+    bus.subscribe(EventType.DOWNLOAD_PROGRESS, handler)
+    queue = bus._queues[id(handler)]
+    assert bus.unsubscribe(EventType.DOWNLOAD_COMPLETED, handler)
+    assert bus._queues and queue._thread.is_alive()
+    assert bus.unsubscribe(EventType.DOWNLOAD_PROGRESS, handler)
+    assert bus._queues == {}
+    queue._thread.join(1)
+    assert not queue._thread.is_alive()
+    assert not bus.unsubscribe(EventType.DOWNLOAD_PROGRESS, handler)
+    # Subscribing again starts a new queue
+    bus.subscribe(EventType.DOWNLOAD_COMPLETED, handler)
+    assert bus.publish(Event(EventType.DOWNLOAD_COMPLETED, {"n": 1})) == 1
+    assert bus.wait_idle(5) and [data["n"] for _, data in handler.events] == [1]
+    assert bus.shutdown(1)
+
+
+def test_full_handler_queue_holds_up_other_threads_and_drops_on_the_bus_thread(qapp):
+    bus = EventBus()
+    handler = SlowRecorder(ExecutionContext.DEDICATED, max_pending=2)
+    bus.subscribe(EventType.DOWNLOAD_COMPLETED, handler)
+    publisher = threading.Thread(target=lambda: [bus.publish(Event(EventType.DOWNLOAD_COMPLETED, {"n": i}))
+                                                 for i in range(10)])
+    publisher.start()
+    publisher.join(0.2)
+    assert publisher.is_alive()  # Waiting for room
+    handler.release.set()
+    publisher.join(5)
+    assert bus.wait_idle(5)
+    assert [data["n"] for _, data in handler.events] == list(range(10))
+
+    handler.release.clear()
+    results = [bus.publish(Event(EventType.DOWNLOAD_COMPLETED, {"n": i})) for i in range(10)]
+    assert results.count(0) >= 7  # At most one running and two waiting
+    assert bus.get_queue_stats()[0]["dropped"] == results.count(0)
+    handler.release.set()
+    assert bus.shutdown(1)
+
+
+def test_progress_is_coalesced_on_a_handler_queue(qapp):
+    bus = EventBus()
+    handler = SlowRecorder(ExecutionContext.POOL)
+    handler.handled_events.add(EventType.DOWNLOAD_PROGRESS)
+    bus.subscribe_global(handler)
+    publish_from_thread(bus, [progress("a", i) for i in range(100)])
+    handler.release.set()
+    assert bus.wait_idle(5)
+    percents = [data["percent"] for _, data in handler.events]
+    assert percents[-1] == 99 and len(percents) < 100
+    assert bus.pending_count() == 0  # Nothing waits for the bus's thread
+    assert bus.shutdown(1)
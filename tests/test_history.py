@@ -12,6 +12,8 @@ from core.history import (
 import json
 import os
 
+pytestmark = pytest.mark.usefixtures("history_store")
+
 @pytest.fixture
 def history_table(qapp):
     table = QTableWidget()
@@ -0,0 +1,112 @@
+import csv
+import gzip
+import json
+import os
+import pytest
+from core.cli import main as cli_main
+from core.history_io import detect_format, export_history_file, import_history_file, parse_date
+from core.history_store import HistoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = HistoryStore(os.path.join(tmp_path, "history.db"))
+    s.append_many([
+        {"title": "Old", "channel": "A", "url": "https://youtube.com/old", "created_at": 1577880000},    # 2020-01-01
+        {"title": "Mid, \"quoted\"", "channel": "B", "url": "https://youtube.com/mid", "created_at": 1654084800},  # 2022-06-01
+        {"title": "New", "channel": "A", "url": "https://youtube.com/new", "created_at": 1717243200},    # 2024-06-01
+    ])
+    yield s
+    s.close()
+
+
+@pytest.fixture
+def target(tmp_path):
+    s = HistoryStore(os.path.join(tmp_path, "target.db"))
+    yield s
+    s.close()
+
+
+def test_detect_format():
+    assert detect_format("h.jsonl") == "jsonl"
+    assert detect_format("H.CSV.GZ") == "csv"
+    with pytest.raises(ValueError):
+        detect_format("history.json")
+
+
+def test_jsonl_round_trip(tmp_path, store, target):
+    path = os.path.join(tmp_path, "history.jsonl")
+    assert export_history_file(path, store=store) == 3
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert {k: records[0][k] for k in ("title", "channel", "url", "created_at")} == {
+        "title": "Old", "channel": "A", "url": "https://youtube.com/old", "created_at": "2020-01-01T12:00:00Z"
+    }
+    assert records[0]["bytes"] is None
+
+    assert import_history_file(path, store=target) == 3
+    assert [(e["title"], e["created_at"]) for e in target.fetch()] == [
+        (e["title"], e["created_at"]) for e in store.fetch()
+    ]
+    # Importing the same file again adds nothing
+    assert import_history_file(path, store=target) == 0
+    assert target.count() == 3
+
+
+def test_download_details_round_trip(tmp_path, target):
+    source = HistoryStore(os.path.join(tmp_path, "details.db"))
+    source.append_many([{
+        "title": "T", "channel": "C", "url": "https://youtube.com/t", "created_at": 1700000000,
+        "bytes": 123456789, "duration": 61.5, "format": "137+140", "host": "youtube.com",
+        "started_at": 1700000000, "finished_at": 1700000030, "download_seconds": 25.0, "outcome": "completed",
+    }])
+    path = os.path.join(tmp_path, "details.csv")
+    export_history_file(path, store=source)
+    source.close()
+
+    import_history_file(path, store=target)
+    entry = target.fetch()[0]
+    assert entry["bytes"] == 123456789
+    assert entry["duration"] == 61.5
+    assert entry["format"] == "137+140"
+    assert entry["finished_at"] == 1700000030
+    assert entry["outcome"] == "completed"
+
+
+def test_csv_gzip_round_trip(tmp_path, store, target):
+    path = os.path.join(tmp_path, "history.csv.gz")
+    assert export_history_file(path, store=store) == 3
+    with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert rows[1]["title"] == 'Mid, "quoted"'
+
+    assert import_history_file(path, store=target) == 3
+    assert target.fetch()[1]["title"] == 'Mid, "quoted"'
+
+
+def test_export_filters(tmp_path, store):
+    path = os.path.join(tmp_path, "filtered.jsonl")
+    assert export_history_file(path, store=store, since=parse_date("2021-01-01"), channel="A") == 1
+    with open(path, encoding="utf-8") as f:
+        assert json.loads(f.readline())["title"] == "New"
+    assert export_history_file(path, store=store, until=parse_date("2022-01-01")) == 1
+
+
+def test_import_skips_bad_lines(tmp_path, target):
+    path = os.path.join(tmp_path, "bad.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"title": "Ok", "url": "https://youtube.com/ok", "created_at": 1700000000}\n')
+        f.write("not json\n")
+        f.write('{"title": "No url"}\n')
+        f.write('{"url": "https://youtube.com/nodate"}\n')
+    assert import_history_file(path, store=target) == 2
+    assert target.fetch()[1]["title"] == "Unknown Title"
+
+
+def test_cli_export(tmp_path, store, monkeypatch, capsys):
+    from core import history_store as history_store_module
+    monkeypatch.setattr(history_store_module, "_default_store", store)
+    path = os.path.join(tmp_path, "cli.csv")
+    assert cli_main(["history", "export", path, "--channel", "B"]) == 0
+    assert "Exported 1 entries" in capsys.readouterr().out
+    assert cli_main(["history", "export", os.path.join(tmp_path, "cli.txt")]) == 1
@@ -0,0 +1,98 @@
+import pytest
+from PySide6.QtCore import Qt, QModelIndex
+from core.history_model import HistoryTableModel, ENTRY_ID_ROLE
+
+
+@pytest.fixture
+def model(qapp, history_store):
+    history_store.append_many(
+        {"title": f"Video {i:04d}", "channel": f"Channel {i % 3}", "url": f"https://youtube.com/{i}",
+         "created_at": 1700000000 + i}
+        for i in range(1200)
+    )
+    m = HistoryTableModel(history_store)
+    m.reload()
+    return m
+
+
+def titles(model):
+    return [model.index(r, 0).data() for r in range(model.rowCount())]
+
+
+def test_rows_are_fetched_in_pages(model):
+    assert model.rowCount() == HistoryTableModel.PAGE_SIZE
+    assert model.canFetchMore(QModelIndex())
+    model.fetchMore(QModelIndex())
+    model.fetchMore(QModelIndex())
+    assert model.rowCount() == 1200
+    assert not model.canFetchMore(QModelIndex())
+    # Newest first by default, without gaps or repeats across pages
+    assert titles(model) == [f"Video {i:04d}" for i in range(1199, -1, -1)]
+
+
+def test_sort_is_done_by_the_store(model):
+    model.sort(0, Qt.AscendingOrder)
+    assert titles(model)[:3] == ["Video 0000", "Video 0001", "Video 0002"]
+    model.sort(1, Qt.DescendingOrder)
+    assert model.index(0, 1).data() == "Channel 2"
+    assert model.rowCount() == HistoryTableModel.PAGE_SIZE
+
+
+def test_refresh_inserts_only_new_entries(model, history_store):
+    revision = history_store.revision
+    model.refresh()
+    assert model.rowCount() == HistoryTableModel.PAGE_SIZE
+
+    inserted = []
+    model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+    model.modelReset.connect(lambda: inserted.append("reset"))
+    history_store.append("Fresh", "C", "https://youtube.com/new", created_at=1800000000)
+    assert history_store.revision == revision + 1
+    model.refresh()
+    assert inserted == [(0, 0)]
+    assert model.index(0, 0).data() == "Fresh"
+    model.refresh()
+    assert inserted == [(0, 0)]
+
+
+def test_refresh_reloads_after_external_delete(model, history_store):
+    first_id = model.index(0, 0).data(ENTRY_ID_ROLE)
+    history_store.delete([first_id])
+    model.refresh()
+    assert model.index(0, 0).data(ENTRY_ID_ROLE) != first_id
+
+
+def test_remove_ids_drops_rows_without_reload(model, history_store):
+    ids = [model.index(r, 0).data(ENTRY_ID_ROLE) for r in range(3)]
+    resets = []
+    model.modelReset.connect(lambda: resets.append(True))
+    assert model.remove_ids(ids) == 3
+    assert model.rowCount() == HistoryTableModel.PAGE_SIZE - 3
+    assert history_store.count() == 1197
+    model.refresh()
+    assert not resets
+
+
+def test_search_results_sort_in_memory(model):
+    model.set_search_results("video", [
+        {"id": 1, "title": "b", "channel": "C", "url": "u1", "created_at": 2},
+        {"id": 2, "title": "a", "channel": "C", "url": "u2", "created_at": 1},
+    ])
+    assert not model.canFetchMore(QModelIndex())
+    model.sort(0, Qt.AscendingOrder)
+    assert titles(model) == ["a", "b"]
+    model.clear_search()
+    assert model.rowCount() == HistoryTableModel.PAGE_SIZE
+
+
+def test_add_entries_applies_delta(model, history_store):
+    inserted = []
+    model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+    entry_id = history_store.append("Delta", "C", "https://youtube.com/delta", created_at=1800000000)
+    model.add_entries([{"id": entry_id, "title": "Delta", "channel": "C",
+                        "url": "https://youtube.com/delta", "created_at": 1800000000}])
+    assert inserted == [(0, 0)]
+    assert model.index(0, 0).data() == "Delta"
+    # The next refresh finds nothing new to insert
+    model.refresh()
+    assert inserted == [(0, 0)]
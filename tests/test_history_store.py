@@ -0,0 +1,210 @@
+import json
+import os
+import sqlite3
+import threading
+import pytest
+from core.history_store import HistoryStore, build_match_query
+from core.services import HistoryService
+
+
+def test_append_and_fetch(history_store):
+    first = history_store.append("Video 1", "Channel 1", "https://youtube.com/1")
+    second = history_store.append("", "", "https://youtube.com/2")
+    assert second > first
+    entries = history_store.fetch()
+    assert [e["url"] for e in entries] == ["https://youtube.com/1", "https://youtube.com/2"]
+    assert entries[1]["title"] == "Unknown Title"
+    assert entries[1]["channel"] == "Unknown Channel"
+    assert history_store.count() == 2
+
+
+def test_wal_mode_and_indexes(history_store):
+    conn = history_store._reader()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"idx_history_url", "idx_history_channel", "idx_history_created_at"} <= indexes
+
+
+def test_append_many_is_one_batch(history_store):
+    ids = history_store.append_many({"title": f"T{i}", "channel": "C", "url": f"u{i}"} for i in range(500))
+    assert len(ids) == 500
+    assert history_store.count() == 500
+
+
+def test_iter_entries_in_chunks(history_store):
+    history_store.append_many({"title": f"T{i}", "channel": "C", "url": f"u{i}"} for i in range(25))
+    urls = [e["url"] for e in history_store.iter_entries(chunk_size=7)]
+    assert urls == [f"u{i}" for i in range(25)]
+
+
+def test_delete_and_clear(history_store):
+    ids = history_store.append_many({"title": f"T{i}", "channel": "C", "url": f"u{i}"} for i in range(3))
+    assert history_store.delete([ids[0], ids[2]]) == 2
+    assert [e["url"] for e in history_store.fetch()] == ["u1"]
+    history_store.clear()
+    assert history_store.count() == 0
+
+
+def test_concurrent_appends_lose_nothing(history_store):
+    def worker(n):
+        for i in range(50):
+            history_store.append(f"T{n}-{i}", "C", f"u{n}-{i}")
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert history_store.count() == 400
+
+
+def test_legacy_json_migration_runs_once(tmp_path):
+    legacy = os.path.join(tmp_path, "history.json")
+    with open(legacy, "w", encoding="utf-8") as f:
+        json.dump([
+            {"title": "Old 1", "channel": "Ch", "url": "https://youtube.com/old1"},
+            {"url": "https://youtube.com/legacy"},
+            {"title": "Empty", "channel": "Ch", "url": ""}
+        ], f)
+
+    db_path = os.path.join(tmp_path, "history.db")
+    store = HistoryStore(db_path, legacy_json_path=legacy)
+    entries = store.fetch()
+    assert [e["url"] for e in entries] == ["https://youtube.com/old1", "https://youtube.com/legacy"]
+    assert entries[1]["title"] == "Unknown Title"
+    assert not os.path.exists(legacy)
+    assert os.path.exists(legacy + ".migrated")
+    store.close()
+
+    # A history.json showing up again is not imported twice
+    os.replace(legacy + ".migrated", legacy)
+    store = HistoryStore(db_path, legacy_json_path=legacy)
+    assert store.count() == 2
+    store.close()
+
+
+def test_build_match_query():
+    assert build_match_query("pyth tut") == '{title channel url} : "pyth"* AND {title channel url} : "tut"*'
+    assert build_match_query("youtube.com/wat") == '{title channel url} : "youtube com wat"*'
+    assert build_match_query("2024-05") == '"2024 05"*'
+    assert build_match_query('"*) ( :') == ""
+
+
+def test_search_prefix_and_ranking(history_store):
+    history_store.append_many([
+        {"title": "Cooking pasta", "channel": "Python Kitchen", "url": "https://example.com/a"},
+        {"title": "Python tutorial", "channel": "Dev", "url": "https://example.com/b"},
+        {"title": "Music mix", "channel": "DJ", "url": "https://youtube.com/watch?v=xyz"},
+    ])
+    # Title matches outrank channel matches
+    assert [e["url"] for e in history_store.search("pyth")] == ["https://example.com/b", "https://example.com/a"]
+    assert [e["title"] for e in history_store.search("python tut")] == ["Python tutorial"]
+    assert [e["title"] for e in history_store.search("youtube.com/watch")] == ["Music mix"]
+    assert history_store.search("nothing") == []
+    assert history_store.search("   ") == []
+    assert history_store.search("pyth", limit=1)[0]["title"] == "Python tutorial"
+
+
+def test_search_by_date(history_store):
+    history_store.append("Old", "C", "u1", created_at=1577880000)  # 2020-01-01 UTC
+    history_store.append("New", "C", "u2", created_at=1717243200)  # 2024-06-01 UTC
+    assert [e["title"] for e in history_store.search("2024-06")] == ["New"]
+    assert [e["title"] for e in history_store.search("2020")] == ["Old"]
+
+
+def test_search_index_follows_deletes(history_store):
+    ids = history_store.append_many({"title": f"Clip {i}", "channel": "C", "url": f"u{i}"} for i in range(3))
+    history_store.delete([ids[1]])
+    assert history_store.match_ids("clip") == {ids[0], ids[2]}
+    history_store.clear()
+    assert history_store.match_ids("clip") == set()
+
+
+def test_history_service_search_agrees_with_the_index(history_store):
+    history_store.append_many([
+        {"title": "Python tutorial", "channel": "Dev", "url": "https://example.com/b"},
+        {"title": "Cooking pasta", "channel": "Python Kitchen", "url": "https://example.com/a"},
+        {"title": "Music mix", "channel": "DJ", "url": "https://youtube.com/watch?v=xyz"},
+    ])
+    service = HistoryService(history_store)
+    results = service.search_history("pyth")
+    assert {e["id"] for e in results} == history_store.match_ids("pyth")
+    assert [e["title"] for e in results] == ["Python tutorial", "Cooking pasta"]
+    assert len(service.search_history("  ")) == 3
+
+
+def test_upgrade_builds_search_index(tmp_path):
+    db_path = os.path.join(tmp_path, "history.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE history (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, "
+                 "channel TEXT NOT NULL, url TEXT NOT NULL, created_at REAL NOT NULL)")
+    conn.execute("INSERT INTO history (title, channel, url, created_at) VALUES ('Legacy clip', 'C', 'u', 0)")
+    conn.execute("PRAGMA user_version=1")
+    conn.commit()
+    conn.close()
+
+    store = HistoryStore(db_path)
+    assert [e["title"] for e in store.search("legacy")] == ["Legacy clip"]
+    store.close()
+
+
+def test_substring_fallback_without_fts(history_store):
+    history_store.append_many([
+        {"title": "100% pure", "channel": "C", "url": "u1"},
+        {"title": "1000 ways", "channel": "C", "url": "u2"},
+    ])
+    history_store.fts_enabled = False
+    assert [e["title"] for e in history_store.search("100%")] == ["100% pure"]
+    assert len(history_store.match_ids("100")) == 2
+
+
+def test_fetch_sorted_pages_with_keyset(history_store):
+    history_store.append_many({"title": t, "channel": "C", "url": f"u{i}"} for i, t in enumerate("bbaca"))
+    first = history_store.fetch_sorted("title", descending=False, limit=2)
+    assert [(e["title"], e["url"]) for e in first] == [("a", "u2"), ("a", "u4")]
+    rest = history_store.fetch_sorted("title", descending=False, after=(first[-1]["title"], first[-1]["id"]))
+    assert [e["title"] for e in rest] == ["b", "b", "c"]
+    with pytest.raises(ValueError):
+        history_store.fetch_sorted("title; DROP TABLE history")
+
+
+def test_revisions_track_commits(history_store):
+    assert history_store.revision == 0
+    history_store.append("T", "C", "u")
+    assert (history_store.revision, history_store.structure_revision) == (1, 0)
+    with history_store.transaction():
+        history_store.append("T", "C", "u2")
+        history_store.append("T", "C", "u3")
+        assert history_store.revision == 1
+    assert history_store.revision == 2
+    history_store.delete([1])
+    assert history_store.structure_revision == history_store.revision == 3
+
+
+def test_event_ids_make_appends_idempotent(history_store):
+    first = history_store.append_many([{"title": "T", "channel": "C", "url": "u", "event_id": "abc"}])
+    again = history_store.append_many([
+        {"title": "T", "channel": "C", "url": "u", "event_id": "abc"},
+        {"title": "T2", "channel": "C", "url": "u2", "event_id": "def"},
+    ])
+    assert first[0] is not None
+    assert again[0] is None and again[1] is not None
+    assert history_store.count() == 2
+
+
+def test_host_backfilled_on_upgrade(tmp_path):
+    db_path = os.path.join(tmp_path, "history.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE history (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, "
+                 "channel TEXT NOT NULL, url TEXT NOT NULL, created_at REAL NOT NULL)")
+    conn.execute("INSERT INTO history (title, channel, url, created_at) "
+                 "VALUES ('t', 'c', 'https://www.YouTube.com/watch?v=1', 1)")
+    conn.execute("PRAGMA user_version=1")
+    conn.commit()
+    conn.close()
+    store = HistoryStore(db_path)
+    try:
+        assert store.fetch()[0]["host"] == "youtube.com"
+        assert store.search("youtube")
+    finally:
+        store.close()
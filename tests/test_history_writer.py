@@ -0,0 +1,95 @@
+import json
+import os
+import threading
+import pytest
+from core.history_writer import HistoryWriter
+
+
+@pytest.fixture
+def spool_path(tmp_path):
+    return os.path.join(tmp_path, "history.spool.jsonl")
+
+
+def test_posts_are_committed_in_batches(history_store, spool_path, monkeypatch):
+    batches = []
+    append_many = history_store.append_many
+    monkeypatch.setattr(history_store, "append_many", lambda entries: batches.append(len(entries)) or append_many(entries))
+
+    writer = HistoryWriter(history_store, spool_path, flush_interval=0.5, batch_size=10)
+    for i in range(25):
+        writer.post(f"T{i}", "C", f"u{i}")
+    assert writer.flush(timeout=5)
+    writer.stop()
+
+    assert history_store.count() == 25
+    assert sum(batches) == 25
+    assert len(batches) < 25
+    assert os.path.getsize(spool_path) == 0
+
+
+def test_concurrent_posts_are_all_stored(history_store, spool_path):
+    writer = HistoryWriter(history_store, spool_path, flush_interval=0.05)
+
+    def worker(n):
+        for i in range(50):
+            writer.post(f"T{n}-{i}", "C", f"u{n}-{i}")
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    writer.stop()
+    assert history_store.count() == 400
+
+
+def test_spool_is_replayed_once_after_a_crash(history_store, spool_path):
+    with open(spool_path, "w", encoding="utf-8") as f:
+        for i in range(3):
+            f.write(json.dumps({"event_id": f"e{i}", "title": f"T{i}", "channel": "C", "url": f"u{i}"}) + "\n")
+        f.write('{"event_id": "torn", "tit')
+
+    writer = HistoryWriter(history_store, spool_path)
+    writer.stop()
+    assert [e["url"] for e in history_store.fetch()] == ["u0", "u1", "u2"]
+
+    # The same events delivered again are not stored twice
+    with open(spool_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"event_id": "e1", "title": "T1", "channel": "C", "url": "u1"}) + "\n")
+    HistoryWriter(history_store, spool_path).stop()
+    assert history_store.count() == 3
+
+
+def test_committed_batches_are_emitted_as_deltas(qtbot, history_store, spool_path):
+    writer = HistoryWriter(history_store, spool_path, flush_interval=0.05)
+    with qtbot.waitSignal(writer.signals.entries_added, timeout=5000) as blocker:
+        writer.post("Title", "Channel", "https://youtube.com/1")
+    writer.stop()
+    (entries,) = blocker.args
+    assert [(e["title"], e["url"]) for e in entries] == [("Title", "https://youtube.com/1")]
+    assert entries[0]["id"] == history_store.fetch()[0]["id"]
+    assert "event_id" not in entries[0]
+
+
+def test_failed_batch_is_retried_and_spool_cleared(history_store, spool_path, monkeypatch):
+    failures = [OSError("database is locked")] * 2
+    append_many = history_store.append_many
+
+    def flaky(entries):
+        if failures:
+            raise failures.pop()
+        return append_many(entries)
+
+    monkeypatch.setattr(history_store, "append_many", flaky)
+    writer = HistoryWriter(history_store, spool_path, flush_interval=0.01, retry_delay=0.01)
+    writer.post("T0", "C", "u0")
+    assert writer.flush(timeout=5)
+    assert history_store.count() == 1
+    assert os.path.getsize(spool_path) == 0
+
+    # Later batches still clear the spool once committed
+    writer.post("T1", "C", "u1")
+    assert writer.flush(timeout=5)
+    writer.stop()
+    assert history_store.count() == 2
+    assert os.path.getsize(spool_path) == 0
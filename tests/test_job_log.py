@@ -0,0 +1,103 @@
+import json
+import logging
+import os
+import queue
+from core.job_log import (JOB_LOGGER, JobContext, JobLog, JobLogHandler, JobLogReader, exclude_job_messages,
+                          job_context, segment_file, segment_numbers)
+from core.logging_system import LogQueueHandler
+
+
+def make_record(context, message, level=logging.INFO, name=JOB_LOGGER):
+    record = logging.LogRecord(name, level, __file__, 0, message, None, None)
+    record.job = context.fields()
+    return record
+
+
+def test_reader_seeks_to_a_runs_lines(tmp_path):
+    handler = JobLogHandler(str(tmp_path), max_bytes=1 << 20, segments=2)
+    first, second = JobContext(1, "https://a.example/v", "a.example"), JobContext(2, "https://b.example/v", "b.example")
+    handler.handle_batch([make_record(context, f"{context.job_id} line {i}")
+                          for i in range(50) for context in (first, second)])
+    second.stage = "completed"
+    handler.handle_batch([make_record(second, "done")])
+    handler.close()
+
+    reader = JobLogReader(str(tmp_path))
+    runs = reader.runs(url="https://b.example/v")
+    assert [(run["run"], run["stage"], run["lines"]) for run in runs] == [(second.run_id, "completed", 51)]
+    records = reader.records(second.run_id)
+    assert [record["msg"] for record in records] == [f"2 line {i}" for i in range(50)] + ["done"]
+    assert records[0]["host"] == "b.example" and records[-1]["stage"] == "completed"
+    assert len(reader.records(first.run_id)) == 50
+
+
+def test_rotation_drops_old_segments_and_their_runs(tmp_path):
+    handler = JobLogHandler(str(tmp_path), max_bytes=2000, segments=2)
+    contexts = [JobContext(i, f"https://example.com/{i}") for i in range(6)]
+    for context in contexts:
+        handler.handle_batch([make_record(context, "x" * 100) for _ in range(10)])
+    handler.close()
+
+    assert len(segment_numbers(str(tmp_path))) == 2
+    assert not os.path.exists(segment_file(str(tmp_path), 1))
+    reader = JobLogReader(str(tmp_path))
+    kept = {run["run"] for run in reader.runs()}
+    assert contexts[-1].run_id in kept and contexts[0].run_id not in kept
+    assert len(reader.records(contexts[-1].run_id)) == 10
+
+
+def test_split_mode_writes_a_file_per_run(tmp_path):
+    handler = JobLogHandler(str(tmp_path), split=True)
+    context = JobContext(3, "https://example.com/v")
+    handler.handle_batch([make_record(context, "one"), make_record(context, "two")])
+    handler.close()
+
+    with open(os.path.join(tmp_path, "runs", f"{context.run_id}.jsonl"), encoding="utf-8") as f:
+        assert [json.loads(line)["msg"] for line in f] == ["one", "two"]
+    assert segment_numbers(str(tmp_path)) == []
+    reader = JobLogReader(str(tmp_path))
+    assert [record["msg"] for record in reader.records(context.run_id)] == ["one", "two"]
+    assert reader.runs(job_id=3)[0]["lines"] == 2
+
+
+def test_records_logged_in_a_job_context_are_tagged():
+    log_queue = queue.SimpleQueue()
+    logger = logging.getLogger("test.job_context")
+    logger.propagate = False
+    logger.handlers = [LogQueueHandler(log_queue)]
+    logger.setLevel(logging.DEBUG)
+    context = JobContext(7, "https://example.com/v", stage="downloading")
+    with job_context(context):
+        logger.info("inside")
+    logger.info("outside")
+
+    inside, outside = log_queue.get_nowait(), log_queue.get_nowait()
+    assert inside.job == context.fields()
+    assert not hasattr(outside, "job")
+
+
+def test_job_log_forwards_messages_and_keeps_them_out_of_the_main_log():
+    class Signal:
+        def __init__(self):
+            self.messages = []
+
+        def emit(self, text):
+            self.messages.append(text)
+
+    log_queue = queue.SimpleQueue()
+    logger = logging.getLogger(JOB_LOGGER)
+    saved = logger.handlers, logger.propagate, logger.level
+    logger.handlers, logger.propagate = [LogQueueHandler(log_queue)], False
+    logger.setLevel(logging.INFO)
+    try:
+        signal = Signal()
+        job_log = JobLog(JobContext(1, "https://example.com/v"), signal)
+        job_log.emit("[yt-dlp Warning] slow")
+        job_log.emit("Download Error: gone")
+    finally:
+        logger.handlers, logger.propagate, logger.level = saved
+
+    assert signal.messages == ["[yt-dlp Warning] slow", "Download Error: gone"]
+    records = [log_queue.get_nowait(), log_queue.get_nowait()]
+    assert [record.levelno for record in records] == [logging.WARNING, logging.ERROR]
+    assert not any(exclude_job_messages(record) for record in records)
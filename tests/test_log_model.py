@@ -0,0 +1,107 @@
+import pytest
+from core.log_model import (DEBUG_COLOR, DEFAULT_COLOR, ERROR_COLOR, NOTICE_ERROR, NOTICE_INDEXING, SUCCESS_COLOR,
+                            WARNING_COLOR, LineRing, LogListModel, classify_line)
+from PySide6.QtCore import Qt
+
+
+def test_classify_ytdlp_lines_by_tag():
+    assert classify_line("[yt-dlp Debug] Invoking downloader").color == DEBUG_COLOR
+    assert classify_line("[yt-dlp Info] [download] Destination: a.mp4").color == DEBUG_COLOR
+    assert classify_line("[yt-dlp Info] Merged formats into a.mp4").color == SUCCESS_COLOR
+    warning = classify_line("[yt-dlp Warning] falling back to an error-prone format")
+    assert warning.color == WARNING_COLOR and warning.text.startswith("⚠️") and warning.notice == NOTICE_ERROR
+    assert classify_line("[yt-dlp Warning] falling back to generic n function search").notice is None
+    error = classify_line("[yt-dlp Error] HTTP Error 403")
+    assert error.color == ERROR_COLOR and "❌ [yt-dlp Error]" in error.text and error.notice == NOTICE_ERROR
+
+
+def test_classify_other_lines_by_strongest_keyword():
+    # Earlier in the line does not matter: an error outranks a success
+    failed = classify_line("Download finished with an Error")
+    assert failed.color == ERROR_COLOR and failed.notice == NOTICE_ERROR
+    assert classify_line("Warning: slow connection").text == "⚠️ Warning: slow connection"
+    assert classify_line("Queued 3 downloads").color == DEBUG_COLOR
+    assert classify_line("Download cancelled.").text.startswith("🚫")
+    assert classify_line("History logging enabled.").color == DEFAULT_COLOR
+    assert classify_line("Playlist indexing in progress").notice == NOTICE_INDEXING
+
+
+def legacy_notice(text):
+    """The tray notice of the log dock before the model: tested on the decorated text"""
+    lower = text.lower()
+    if text.startswith("[yt-dlp"):
+        if "[yt-dlp Warning]" in text:
+            text = f"⚠️ {text}"
+    elif any(k in lower for k in ["error", "fail", "http status code"]):
+        text = f"[2024-01-01 00:00:00] ❌ {text}"
+    elif any(k in lower for k in ["warning", "warn"]):
+        text = f"⚠️ {text}"
+    if "[yt-dlp Error]" in text or ("error" in text.lower() and not text.startswith("[yt-dlp")):
+        return NOTICE_ERROR
+    if "playlist indexing in progress" in text.lower():
+        return NOTICE_INDEXING
+    return None
+
+
+@pytest.mark.parametrize("text", [
+    "Download failed: HTTP Status Code 403",
+    "HTTP Status Code 403",
+    "Failed to fetch subtitles",
+    "Download Error: connection reset",
+    "Download failed\nError details:\nurl: x",
+    "Unexpected error while merging",
+    "[yt-dlp Error] HTTP Error 403",
+    "[yt-dlp Warning] falling back to an error-prone format",
+    "[yt-dlp Warning] unable to download thumbnail: failed",
+    "[yt-dlp Info] [download] error_log.txt has already been downloaded",
+    "[yt-dlp Debug] fail-safe retries: 10",
+    "Playlist indexing in progress",
+    "Queued 3 downloads",
+])
+def test_notices_match_the_legacy_dock(text):
+    assert classify_line(text).notice == legacy_notice(text)
+
+
+def test_error_details_are_indented():
+    entry = classify_line("Download failed\nError details:\nurl: x\nHTTP status: 404")
+    assert entry.text.split("\n")[1:] == ["Error details:", "    url: x", "HTTP status: 404"]
+
+
+def test_ring_drops_front():
+    ring = LineRing(3)
+    ring.extend([1, 2, 3])
+    with pytest.raises(ValueError):
+        ring.extend([4])
+    ring.drop_front(2)
+    ring.extend([4, 5])
+    assert [ring[i] for i in range(len(ring))] == [3, 4, 5]
+    with pytest.raises(IndexError):
+        ring[3]
+
+
+def test_model_batches_and_caps_lines(qapp):
+    model = LogListModel(max_lines=100, flush_interval=1000)
+    inserts = []
+    model.rowsInserted.connect(lambda parent, first, last: inserts.append(last - first + 1))
+    for i in range(250):
+        model.append(f"line {i}")
+    assert model.rowCount() == 0
+    model.flush()
+    assert inserts == [100] and model.rowCount() == 100 and model.dropped == 150
+    model.append("Download failed\nError details:\nurl: x")
+    model.flush()
+    assert model.rowCount() == 100 and model.dropped == 153
+    last = model.index(99)
+    assert model.data(last) == "    url: x" and model.data(last, Qt.ForegroundRole).name() == ERROR_COLOR.lower()
+    assert model.data(model.index(0)) == "line 153"
+    assert model.text([99, 98]).endswith("Error details:\n    url: x")
+
+
+def test_model_flushes_on_timer(qtbot):
+    model = LogListModel(max_lines=10, flush_interval=5)
+    notices = []
+    model.notice.connect(lambda kind, text: notices.append(kind))
+    model.append("Something failed")
+    model.append("Another error")
+    qtbot.waitUntil(lambda: model.rowCount() == 2, timeout=1000)
+    assert notices == [NOTICE_ERROR]
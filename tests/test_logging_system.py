@@ -0,0 +1,102 @@
+import logging
+import os
+import queue
+import pytest
+from core.logging_system import (YTDLP_COMPONENT, AppLogger, BatchRotatingFileHandler, LogListener, LogQueueHandler,
+                                 logger_manager, ytdlp_debug_enabled)
+
+
+class BatchRecorder(logging.Handler):
+    def __init__(self, level=logging.NOTSET):
+        super().__init__(level)
+        self.batches = []
+
+    def handle_batch(self, records):
+        self.batches.append([record.getMessage() for record in records])
+
+
+class Recorder(logging.Handler):
+    def __init__(self, level=logging.NOTSET):
+        super().__init__(level)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def make_logger(name, handler):
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.handlers = [handler]
+    logger.setLevel(logging.DEBUG)
+    return logger
+
+
+def test_queue_handler_merges_arguments_without_formatting():
+    log_queue = queue.SimpleQueue()
+    logger = make_logger("test.queue", LogQueueHandler(log_queue))
+    items = ["a"]
+    logger.info("items %s", items)
+    items.append("b")
+    record = log_queue.get_nowait()
+    assert record.msg == "items ['a']" and record.args is None
+    assert not hasattr(record, "message")
+
+
+def test_listener_writes_batches_by_level_and_drains_on_stop():
+    log_queue = queue.SimpleQueue()
+    batch, single = BatchRecorder(), Recorder(logging.INFO)
+    listener = LogListener(log_queue, [batch, single], batch_size=50)
+    logger = make_logger("test.listener", LogQueueHandler(log_queue))
+    for i in range(120):
+        logger.log(logging.DEBUG if i % 2 else logging.INFO, "record %d", i)
+    listener.start()
+    listener.stop()
+    assert [len(b) for b in batch.batches] == [50, 50, 20]
+    assert single.messages == [f"record {i}" for i in range(0, 120, 2)]
+
+
+def test_batch_file_handler_rolls_over_between_records(tmp_path):
+    path = os.path.join(tmp_path, "app.log")
+    handler = BatchRotatingFileHandler(path, maxBytes=100, backupCount=2, encoding="utf-8")
+    records = [logging.makeLogRecord({"msg": f"{i:02d}" + "x" * 37}) for i in range(5)]
+    handler.handle_batch(records)
+    handler.close()
+    with open(path, encoding="utf-8") as f:
+        assert f.read().split() == [records[4].msg]
+    with open(path + ".1", encoding="utf-8") as f:
+        assert f.read().split() == [records[2].msg, records[3].msg]
+
+
+def test_component_levels_from_preset_and_overrides():
+    try:
+        logger_manager.set_component_levels("production", {"queue": "warning"})
+        assert not ytdlp_debug_enabled()
+        assert logging.getLogger("queue").level == logging.WARNING
+        logger_manager.set_component_levels("debug", {})
+        assert ytdlp_debug_enabled() and logging.getLogger("queue").level == logging.NOTSET
+        with pytest.raises(ValueError):
+            logger_manager.set_component_levels("loud")
+        with pytest.raises(ValueError):
+            logger_manager.set_component_levels("production", {YTDLP_COMPONENT: "chatty"})
+        assert ytdlp_debug_enabled()
+    finally:
+        logger_manager.set_component_levels()
+
+
+def test_disabled_messages_are_not_formatted():
+    recorder = Recorder()
+    logger = AppLogger("test.gated")
+    make_logger("test.gated", recorder).setLevel(logging.INFO)
+
+    class Costly:
+        formatted = 0
+
+        def __repr__(self):
+            Costly.formatted += 1
+            return "costly"
+
+    logger.debug("state %s", Costly(), detail=Costly())
+    assert Costly.formatted == 0 and recorder.messages == []
+    logger.info("state %s", Costly(), detail=Costly())
+    assert recorder.messages == ["state costly | {'detail': costly}"] and Costly.formatted == 2
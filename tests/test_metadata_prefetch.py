@@ -0,0 +1,110 @@
+import threading
+import pytest
+from core.downloader import DownloadTask, format_options
+from core.metadata_prefetch import MetadataPrefetcher, estimate_size, summarize_info
+from core.queue_model import JobState, QueueTableModel
+
+
+def make_tasks(count, **kwargs):
+    return [DownloadTask(f"https://youtube.com/watch?v={i}", "720p", "/tmp", "", **kwargs) for i in range(count)]
+
+
+class FakeFetch:
+    """Records fetches and blocks them until released"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.urls = []
+        self.running = 0
+        self.peak = 0
+        self.release = threading.Event()
+
+    def __call__(self, task):
+        with self.lock:
+            self.urls.append(task.url)
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        self.release.wait(5)
+        with self.lock:
+            self.running -= 1
+        if task.url.endswith("=bad"):
+            raise RuntimeError("unavailable")
+        return {"title": f"Title {task.url[-1]}", "channel": "Channel", "duration": 60.0,
+                "thumbnail": "", "size": 1000}, {"id": task.url}
+
+
+@pytest.fixture
+def model(qapp):
+    return QueueTableModel()
+
+
+@pytest.fixture
+def fetch():
+    fake = FakeFetch()
+    yield fake
+    fake.release.set()
+
+
+@pytest.fixture
+def prefetcher(model, fetch):
+    p = MetadataPrefetcher(model, fetch, max_workers=2, lookahead=3, info_ttl=60)
+    yield p
+    fetch.release.set()
+    p.stop()
+    p.pool.waitForDone()
+
+
+def test_summarize_video_and_playlist():
+    video = {"title": "A", "uploader": "U", "duration": 10, "thumbnail": "t",
+             "requested_formats": [{"filesize": 100}, {"filesize_approx": 50}]}
+    assert summarize_info(video) == {"title": "A", "channel": "U", "duration": 10, "thumbnail": "t", "size": 150}
+    assert estimate_size({"requested_formats": [{"filesize": 100}, {}]}) is None
+    playlist = {"_type": "playlist", "title": "P", "channel": "C",
+                "entries": [{"duration": 5, "thumbnails": [{"url": "a"}, {"url": "b"}]}, {"duration": 7}]}
+    assert summarize_info(playlist) == {"title": "P", "channel": "C", "duration": 12, "thumbnail": "b", "size": None}
+
+
+def test_format_options_match_download():
+    video, = make_tasks(1)
+    audio, = make_tasks(1, audio_only=True, audio_format="opus")
+    assert format_options(video)["format"].startswith("(bestvideo[height<=720]")
+    assert format_options(audio) == {"format": "ba[acodec^=opus]/ba/best"}
+
+
+def test_fetches_next_pending_with_bounded_concurrency(model, prefetcher, fetch, qtbot):
+    model.add_jobs(make_tasks(5))
+    qtbot.waitUntil(lambda: len(fetch.urls) == 2, timeout=2000)
+    qtbot.wait(50)
+    assert fetch.peak == 2
+    fetch.release.set()
+    # Only the lookahead window is fetched
+    qtbot.waitUntil(lambda: model.job(3).title == "Title 2", timeout=2000)
+    qtbot.wait(50)
+    assert len(fetch.urls) == 3
+    assert (model.job(1).channel, model.job(1).duration, model.job(1).size) == ("Channel", 60.0, 1000)
+    # Dispatching moves the window forward
+    model.take_next_pending()
+    qtbot.waitUntil(lambda: model.job(4).title == "Title 3", timeout=2000)
+    assert model.job(5).title == ""
+
+
+def test_info_handed_over_once_and_expires(model, prefetcher, fetch, qtbot):
+    fetch.release.set()
+    ids = model.add_jobs(make_tasks(2))
+    qtbot.waitUntil(lambda: all(model.job(i).title for i in ids), timeout=2000)
+    assert prefetcher.take_info(ids[0]) == {"id": "https://youtube.com/watch?v=0"}
+    assert prefetcher.take_info(ids[0]) is None
+    prefetcher.info_ttl = 0
+    assert prefetcher.take_info(ids[1]) is None
+
+
+def test_dispatched_or_failed_jobs_keep_no_info(model, prefetcher, fetch, qtbot):
+    model.add_jobs([DownloadTask("https://youtube.com/watch?v=bad", "720p", "/tmp", "")] + make_tasks(1))
+    qtbot.waitUntil(lambda: len(fetch.urls) == 2, timeout=2000)
+    job = model.take_next_pending()
+    model.set_state(2, JobState.EXTRACTING)
+    fetch.release.set()
+    qtbot.waitUntil(lambda: not prefetcher._in_flight, timeout=2000)
+    assert model.job(2).title == "Title 0"
+    assert prefetcher.take_info(2) is None
+    assert model.job(job.id).title == ""
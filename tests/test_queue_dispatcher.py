@@ -0,0 +1,126 @@
+import pytest
+from core.downloader import DownloadTask
+from core.queue_dispatcher import DispatchMode, QueueDispatcher
+from core.queue_model import JobState, QueueTableModel
+
+
+def make_tasks(count):
+    return [DownloadTask(f"https://youtube.com/watch?v={i}", "720p", "/tmp", "") for i in range(count)]
+
+
+@pytest.fixture
+def model(qapp):
+    return QueueTableModel()
+
+
+@pytest.fixture
+def launched():
+    return []
+
+
+@pytest.fixture
+def dispatcher(model, launched):
+    return QueueDispatcher(model, lambda job: launched.append(job.id), max_concurrent=2)
+
+
+def test_nothing_starts_until_started(model, dispatcher, launched):
+    model.add_jobs(make_tasks(3))
+    assert launched == []
+    dispatcher.start()
+    assert launched == [1, 2]
+    assert model.pending_count() == 1
+
+
+def test_refills_slot_when_a_job_ends(model, dispatcher, launched):
+    model.add_jobs(make_tasks(5))
+    dispatcher.start()
+    model.set_state(1, JobState.DONE)
+    assert launched == [1, 2, 3]
+    model.set_state(2, JobState.FAILED)
+    model.set_state(3, JobState.CANCELLED)
+    assert launched == [1, 2, 3, 4, 5]
+    assert model.active_count() == 2
+
+
+def test_runs_whole_queue(model, dispatcher, launched):
+    model.add_jobs(make_tasks(100))
+    dispatcher.start()
+    while model.active_ids():
+        for job_id in model.active_ids():
+            model.set_state(job_id, JobState.DONE)
+    assert launched == list(range(1, 101))
+    assert all(job.state == JobState.DONE for job in model.jobs())
+
+
+def test_jobs_added_while_running_start_at_once(model, dispatcher, launched):
+    dispatcher.start()
+    model.add_jobs(make_tasks(3))
+    assert launched == [1, 2]
+
+
+def test_pause_dispatching(model, dispatcher, launched):
+    model.add_jobs(make_tasks(4))
+    dispatcher.start()
+    dispatcher.pause()
+    model.set_state(1, JobState.DONE)
+    assert launched == [1, 2]
+    dispatcher.start()
+    assert launched == [1, 2, 3]
+
+
+def test_drain(model, dispatcher, launched, qtbot):
+    model.add_jobs(make_tasks(4))
+    dispatcher.start()
+    dispatcher.drain()
+    assert dispatcher.mode == DispatchMode.DRAINING
+    model.set_state(1, JobState.DONE)
+    assert launched == [1, 2]
+    with qtbot.waitSignal(dispatcher.drained, timeout=1000):
+        model.set_state(2, JobState.DONE)
+    assert dispatcher.mode == DispatchMode.STOPPED
+    assert model.pending_count() == 2
+
+
+def test_raising_concurrency_fills_slots(model, dispatcher, launched):
+    model.add_jobs(make_tasks(5))
+    dispatcher.start()
+    dispatcher.set_max_concurrent(4)
+    assert launched == [1, 2, 3, 4]
+
+
+def test_failed_launch_moves_on(model, launched):
+    def launch(job):
+        if job.id == 1:
+            raise OSError("no space")
+        launched.append(job.id)
+    dispatcher = QueueDispatcher(model, launch, max_concurrent=1)
+    model.add_jobs(make_tasks(2))
+    dispatcher.start()
+    assert model.job(1).state == JobState.FAILED
+    assert launched == [2]
+
+
+def test_filter_holds_back_rejected_jobs_in_place(model, dispatcher, launched):
+    model.add_jobs(make_tasks(6))
+    dispatcher.set_filter(lambda job: job.id % 2 == 0)
+    dispatcher.start()
+    assert launched == [2, 4]
+    model.set_state(2, JobState.DONE)
+    model.set_state(4, JobState.DONE)
+    assert launched == [2, 4, 6]
+    dispatcher.set_filter(None)
+    assert launched == [2, 4, 6, 1]
+    assert model.pending_ids() == [3, 5]
+
+
+def test_removed_running_job_keeps_its_slot_until_its_worker_ends(model, dispatcher, launched):
+    model.add_jobs(make_tasks(4))
+    dispatcher.start()
+    model.remove_jobs([1])
+    model.add_jobs(make_tasks(1))
+    assert launched == [1, 2]
+    assert model.active_count() == 2
+    # The cancelled worker still reports against the removed id
+    assert model.set_state(1, JobState.CANCELLED) is False
+    assert launched == [1, 2, 3]
+    assert model.active_count() == 2
@@ -0,0 +1,57 @@
+import pytest
+from PySide6.QtCore import QThreadPool
+from core.queue_ingest import QueueIngestWorker, build_tasks, parse_urls
+
+
+OPTIONS = dict(resolution="720p", folder="/downloads", proxy="", audio_only=True,
+               subtitle_languages="en, de", from_queue=True)
+
+
+def test_parse_urls():
+    text = "https://a.example/1\n\n  www.b.example/2 \nnot a url\nhttps://a.example/1\nc.example/3\n"
+    assert parse_urls(text) == ["https://a.example/1", "https://www.b.example/2", "https://c.example/3"]
+
+
+def test_build_tasks_in_chunks():
+    urls = [f"https://a.example/{i}" for i in range(5)]
+    chunks = list(build_tasks(urls, OPTIONS, chunk_size=2))
+    assert [len(c) for c in chunks] == [2, 2, 1]
+    task = chunks[2][0]
+    assert (task.url, task.folder, task.audio_only) == ("https://a.example/4", "/downloads", True)
+    assert task.subtitle_languages == ["en", "de"]
+    assert OPTIONS["subtitle_languages"] == "en, de"
+
+
+@pytest.fixture
+def run_worker(qapp, qtbot):
+    def run(worker, on_chunk):
+        received = []
+        result = []
+
+        def chunk(tasks, done, total):
+            received.append((len(tasks), done, total))
+            on_chunk(worker)
+            worker.chunk_done()
+
+        worker.signals.chunk.connect(chunk)
+        worker.signals.finished.connect(lambda done, cancelled: result.append((done, cancelled)))
+        QThreadPool.globalInstance().start(worker)
+        qtbot.waitUntil(lambda: bool(result), timeout=5000)
+        return received, result[0]
+    return run
+
+
+def test_worker_hands_over_chunks_with_progress(run_worker):
+    text = "\n".join(f"https://a.example/{i}" for i in range(7))
+    worker = QueueIngestWorker(text, OPTIONS, chunk_size=3, max_chunks=1)
+    received, result = run_worker(worker, lambda w: None)
+    assert received == [(3, 3, 7), (3, 6, 7), (1, 7, 7)]
+    assert result == (7, False)
+
+
+def test_worker_stops_when_cancelled(run_worker):
+    text = "\n".join(f"https://a.example/{i}" for i in range(10))
+    worker = QueueIngestWorker(text, OPTIONS, chunk_size=2, max_chunks=1)
+    received, result = run_worker(worker, lambda w: w.cancel())
+    assert received == [(2, 2, 10)]
+    assert result == (2, True)
@@ -0,0 +1,146 @@
+import pytest
+from PySide6.QtCore import Qt
+from core.downloader import DownloadTask
+from core.queue_model import COLUMNS, JOB_ID_ROLE, PROGRESS_ROLE, JobState, QueueTableModel
+
+
+def make_task(n, **kwargs):
+    return DownloadTask(f"https://youtube.com/watch?v={n}", "720p", "/tmp", "", **kwargs)
+
+
+@pytest.fixture
+def model(qapp):
+    return QueueTableModel()
+
+
+def cell(model, row, column):
+    return model.index(row, column).data(Qt.DisplayRole)
+
+
+def test_jobs_get_stable_ids_and_start_pending(model):
+    ids = model.add_jobs([make_task(i) for i in range(3)])
+    assert ids == [1, 2, 3]
+    assert model.rowCount() == 3
+    assert model.pending_count() == 3
+    assert cell(model, 0, 2) == "https://youtube.com/watch?v=0"
+    assert cell(model, 0, 6) == "Queued"
+    assert model.index(2, 0).data(JOB_ID_ROLE) == 3
+
+
+def test_take_next_pending_is_fifo(model):
+    ids = model.add_jobs([make_task(i) for i in range(3)])
+    job = model.take_next_pending()
+    assert job.id == ids[0]
+    assert job.state == JobState.EXTRACTING
+    assert model.active_count() == 1
+    assert model.pending_count() == 2
+    model.pause([ids[1]])
+    assert model.take_next_pending().id == ids[2]
+    assert model.take_next_pending() is None
+
+
+def test_updates_follow_job_after_rows_removed(model):
+    ids = model.add_jobs([make_task(i, audio_only=(i == 3)) for i in range(4)])
+    model.remove_jobs([ids[0], ids[2]])
+    assert model.rowCount() == 2
+    assert model.row_of(ids[3]) == 1
+    model.set_state(ids[3], JobState.EXTRACTING)
+    model.set_info(ids[3], "Song", "Artist")
+    model.set_progress(ids[3], 42.0)
+    assert [cell(model, 1, c) for c in range(8)] == [
+        "Song", "Artist", "https://youtube.com/watch?v=3", "Audio", "", "", "Downloading", "42%"
+    ]
+    assert cell(model, 0, 0) == "Fetching..."
+    # Updates for a removed job are dropped
+    model.set_progress(ids[0], 50.0)
+    assert model.set_state(ids[0], JobState.DONE) is False
+
+
+def test_invalid_transitions_are_ignored(model):
+    job_id = model.add_job(make_task(0))
+    assert model.set_state(job_id, JobState.DONE) is False
+    assert model.set_state(job_id, JobState.EXTRACTING)
+    assert model.set_state(job_id, JobState.DONE)
+    assert model.set_state(job_id, JobState.DOWNLOADING) is False
+    assert model.job(job_id).state == JobState.DONE
+    assert cell(model, 0, 7) == "100%"
+
+
+def test_state_changed_signal(model, qtbot):
+    job_id = model.add_job(make_task(0))
+    seen = []
+    model.state_changed.connect(lambda i, s: seen.append((i, s)))
+    model.set_state(job_id, JobState.EXTRACTING, "Connecting...")
+    model.set_status(job_id, "Fetching Media Info...")
+    model.set_state(job_id, JobState.FAILED)
+    assert seen == [(job_id, JobState.EXTRACTING), (job_id, JobState.FAILED)]
+    assert cell(model, 0, 7) == "Fetching Media Info..."
+
+
+def test_pause_resume_and_retry(model):
+    ids = model.add_jobs([make_task(i) for i in range(3)])
+    running = model.take_next_pending()
+    assert model.pause(ids) == [running.id]
+    assert model.job(ids[1]).state == JobState.PAUSED
+    assert model.pending_count() == 0
+    model.set_state(running.id, JobState.FAILED)
+    model.resume(ids)
+    assert model.pending_count() == 3
+    assert model.take_next_pending().id == ids[0]
+
+
+def test_cancel_pending_and_clear_finished(model):
+    ids = model.add_jobs([make_task(i) for i in range(4)])
+    model.take_next_pending()
+    model.pause([ids[3]])
+    assert model.cancel_pending() == 3
+    assert model.pending_count() == 0
+    assert model.active_count() == 1
+    assert model.clear_finished() == 3
+    assert [job.id for job in model.jobs()] == [ids[0]]
+
+
+def test_pending_ids_and_metadata(model):
+    ids = model.add_jobs([make_task(i) for i in range(4)])
+    model.take_next_pending()
+    assert model.pending_ids() == ids[1:]
+    assert model.pending_ids(2) == ids[1:3]
+    model.set_info(ids[1], "Worker Title", "")
+    model.set_metadata(ids[1], title="Prefetched", channel="Channel", duration=3725,
+                       thumbnail="https://i.example/t.jpg", size=5 * 1024 ** 2)
+    job = model.job(ids[1])
+    assert (job.title, job.channel) == ("Worker Title", "Channel")
+    assert [cell(model, 1, c) for c in (4, 5)] == ["1h 2m 5s", "~5.00 MB"]
+
+
+def test_progress_repaints_only_its_cell_when_percent_changes(model):
+    column = COLUMNS.index(("Progress", "progress"))
+    job_id = model.add_job(make_task(0))
+    model.take_next_pending()
+    assert model.index(0, column).data(PROGRESS_ROLE) is None
+    changes = []
+    model.dataChanged.connect(lambda first, last: changes.append((first.column(), last.column())))
+    model.set_progress(job_id, 10.2)  # moves to DOWNLOADING: whole row
+    model.set_progress(job_id, 10.7)
+    model.set_progress(job_id, 11.1)
+    assert changes[-1] == (column, column)
+    assert len([c for c in changes if c == (column, column)]) == 2
+    assert model.index(0, column).data(PROGRESS_ROLE) == 11.1
+    assert model.index(0, 0).data(PROGRESS_ROLE) is None
+    model.set_state(job_id, JobState.DONE)
+    assert model.index(0, column).data(PROGRESS_ROLE) == 100.0
+
+
+def test_state_counts_and_active_progress(model):
+    ids = model.add_jobs([make_task(i) for i in range(4)])
+    assert model.active_progress() == 0.0
+    for job_id in ids[:2]:
+        model.take_next_pending()
+    model.set_progress(ids[0], 30.0)
+    model.set_progress(ids[1], 50.0)
+    model.set_state(ids[2], JobState.PAUSED)
+    assert model.active_progress() == 40.0
+    model.set_state(ids[0], JobState.DONE)
+    model.remove_jobs([ids[3]])
+    counts = model.state_counts()
+    assert (counts[JobState.DONE], counts[JobState.DOWNLOADING], counts[JobState.PAUSED], counts[JobState.PENDING]) == (1, 1, 1, 0)
@@ -0,0 +1,138 @@
+import json
+import os
+import sqlite3
+import pytest
+from core.downloader import DownloadTask
+from core.queue_model import JobState, QueueTableModel
+from core.queue_store import QueueRecorder, QueueStore, restorable_state
+
+
+def make_task(n, **kwargs):
+    return DownloadTask(f"https://youtube.com/watch?v={n}", "720p", "/downloads", "", **kwargs)
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = QueueStore(os.path.join(tmp_path, "queue.db"))
+    yield s
+    s.close()
+
+
+@pytest.fixture
+def model(qapp):
+    return QueueTableModel()
+
+
+def restore_all(store):
+    return [job for jobs in store.iter_jobs(chunk_size=2) for job in jobs]
+
+
+def test_task_round_trip():
+    task = make_task(1, audio_only=True, audio_format="opus", subtitles=True,
+                     subtitle_languages="en, de", auto_subtitles=True)
+    copy = DownloadTask.from_dict(task.to_dict())
+    assert copy.to_dict() == task.to_dict()
+    assert copy.subtitle_languages == ["en", "de"]
+
+
+def test_recorder_saves_adds_changes_and_removals(model, store):
+    recorder = QueueRecorder(model, store)
+    ids = model.add_jobs([make_task(i, playlist=(i == 1)) for i in range(3)])
+    model.set_state(ids[0], JobState.EXTRACTING)
+    model.set_info(ids[0], "Title", "Channel")
+    model.set_state(ids[0], JobState.DONE, "Download Completed")
+    model.remove_jobs([ids[2]])
+    recorder.flush()
+
+    jobs = restore_all(store)
+    assert [job.id for job in jobs] == ids[:2]
+    assert (jobs[0].state, jobs[0].title, jobs[0].channel, jobs[0].status) == (
+        JobState.DONE, "Title", "Channel", "Download Completed")
+    assert jobs[1].state == JobState.PENDING
+    assert jobs[1].task.playlist is True
+    assert jobs[1].task.folder == "/downloads"
+
+
+def test_recorder_batches_until_flush(model, store, qtbot):
+    QueueRecorder(model, store, delay_ms=10)
+    model.add_jobs([make_task(i) for i in range(50)])
+    assert store.count() == 0
+    qtbot.waitUntil(lambda: store.count() == 50, timeout=2000)
+
+
+def test_restore_keeps_order_ids_and_states(model, store):
+    recorder = QueueRecorder(model, store)
+    ids = model.add_jobs([make_task(i) for i in range(5)])
+    model.take_next_pending()
+    model.set_state(ids[1], JobState.PAUSED)
+    recorder.flush()
+
+    restored = QueueTableModel()
+    restored.reserve_ids(store.max_id())
+    new_id = restored.add_job(make_task(99))
+    assert new_id == ids[-1] + 1
+    jobs = restore_all(store)
+    for job in jobs:
+        job.state = restorable_state(job.state, resume=False)
+    restored.restore_jobs(jobs[:3])
+    restored.restore_jobs(jobs[3:])
+    # Restored jobs stay above the one added while restoring
+    assert [job.id for job in restored.jobs()] == ids + [new_id]
+    assert restored.row_of(new_id) == 5
+    assert [job.state for job in restored.jobs()[:2]] == [JobState.PAUSED, JobState.PAUSED]
+    assert restored.take_next_pending().id == new_id
+    assert restored.take_next_pending().id == ids[2]
+
+
+def test_interrupted_jobs(store):
+    assert restorable_state(JobState.DOWNLOADING, resume=True) == JobState.PENDING
+    assert restorable_state(JobState.EXTRACTING, resume=False) == JobState.PAUSED
+    assert restorable_state(JobState.FAILED, resume=True) == JobState.FAILED
+
+
+def test_unreadable_rows_are_skipped(store):
+    with store._writer:
+        store._writer.execute("INSERT INTO queue (id, task, state, updated_at) VALUES (1, '{', 'pending', 0)")
+        store._writer.execute("INSERT INTO queue (id, task, state, updated_at) VALUES (2, ?, 'bogus', 0)",
+                              ('{"url": "u", "resolution": "720p", "folder": "/d", "proxy": ""}',))
+    store.save([], [])
+    assert restore_all(store) == []
+    assert store.max_id() == 2
+
+
+def test_metadata_saved_and_version_1_db_upgraded(tmp_path, model):
+    path = os.path.join(tmp_path, "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE queue (id INTEGER PRIMARY KEY, task TEXT NOT NULL, state TEXT NOT NULL, "
+                 "title TEXT NOT NULL DEFAULT '', channel TEXT NOT NULL DEFAULT '', "
+                 "status TEXT NOT NULL DEFAULT '', updated_at REAL NOT NULL)")
+    conn.execute("INSERT INTO queue (id, task, state, updated_at) VALUES (1, ?, 'pending', 0)",
+                 (json.dumps(make_task(1).to_dict()),))
+    conn.execute("PRAGMA user_version=1")
+    conn.commit()
+    conn.close()
+
+    store = QueueStore(path)
+    try:
+        assert restore_all(store)[0].duration is None
+        model.reserve_ids(store.max_id())
+        job_id = model.add_job(make_task(2))
+        model.set_metadata(job_id, "Title", "Channel", duration=61.0, thumbnail="https://i.example/t.jpg", size=1234)
+        store.save([model.job(job_id)])
+        job = restore_all(store)[1]
+        assert (job.title, job.duration, job.thumbnail, job.size) == ("Title", 61.0, "https://i.example/t.jpg", 1234)
+    finally:
+        store.close()
+
+
+def test_recorder_writes_large_bursts_in_batches(model, store, qtbot):
+    recorder = QueueRecorder(model, store, delay_ms=10, batch_size=40)
+    batches = []
+    save = store.save
+    store.save = lambda jobs, removed=(): (batches.append(len(jobs)), save(jobs, removed))
+    model.add_jobs([make_task(i) for i in range(100)])
+    qtbot.waitUntil(lambda: store.count() == 100, timeout=2000)
+    assert batches == [40, 40, 20]
+    model.add_jobs([make_task(i) for i in range(100)])
+    recorder.flush()
+    assert batches[-1] == 100
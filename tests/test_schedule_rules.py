@@ -0,0 +1,48 @@
+from datetime import datetime
+import pytest
+from core.schedule_rules import CronRule, IntervalRule, parse_rule, spread_offset, spread_rule
+
+
+def ts(*args):
+    return datetime(*args).timestamp()
+
+
+def test_interval_rule_parsing_and_alignment():
+    rule = parse_rule("every 1h30m")
+    assert isinstance(rule, IntervalRule) and rule.seconds == 5400
+    assert rule.next_after(0) == 5400
+    assert rule.next_after(5400) == 10800
+    offset = rule.with_offset(600)
+    assert offset.next_after(0) == 600
+    assert offset.next_after(600) == 6000
+
+
+@pytest.mark.parametrize("expression, start, expected", [
+    ("*/15 * * * *", (2026, 3, 2, 10, 7), (2026, 3, 2, 10, 15)),
+    ("0 3 * * *", (2026, 3, 2, 10, 7), (2026, 3, 3, 3, 0)),
+    ("30 9 * * 1-5", (2026, 3, 6, 10, 0), (2026, 3, 9, 9, 30)),  # Friday -> Monday
+    ("0 0 1 * *", (2026, 1, 31, 12, 0), (2026, 2, 1, 0, 0)),
+    ("0 12 13 * 5", (2026, 3, 1, 0, 0), (2026, 3, 6, 12, 0)),  # 13th or any Friday
+    ("@weekly", (2026, 3, 2, 0, 0), (2026, 3, 8, 0, 0)),  # Sunday
+])
+def test_cron_next_after(expression, start, expected):
+    assert parse_rule(expression).next_after(ts(*start)) == ts(*expected)
+
+
+@pytest.mark.parametrize("text", ["every", "every 0m", "61 * * * *", "* * *", "0 0 30 2 *", "a b c d e"])
+def test_invalid_rules(text):
+    with pytest.raises(ValueError):
+        parse_rule(text)
+
+
+def test_spread_is_stable_and_within_period():
+    urls = [f"https://www.tiktok.com/@user{i}" for i in range(300)]
+    offsets = [spread_offset(url, 3600) for url in urls]
+    assert offsets == [spread_offset(url, 3600) for url in urls]
+    assert all(0 <= offset < 3600 for offset in offsets)
+    # Spread across the hour rather than bunched together
+    assert len({int(offset // 300) for offset in offsets}) == 12
+    rule = spread_rule("every 10m", urls[0], 3600)
+    assert rule.offset < 600
+    assert isinstance(spread_rule("@daily", urls[0], 900), CronRule)
+    assert spread_rule("@daily", urls[0], 900).offset < 900
@@ -0,0 +1,216 @@
+import os
+import random
+import pytest
+from PySide6.QtCore import Qt
+from core.schedule_rules import parse_rule
+from core.schedule_store import ScheduleStore
+from core.scheduler import CatchUpPolicy, ScheduledJob, ScheduleHeap, Scheduler, missed_runs, plan_catch_up
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def due(clock):
+    return []
+
+
+@pytest.fixture
+def scheduler(qapp, clock, due):
+    scheduler = Scheduler(clock=clock, resync_interval=30.0)
+    scheduler.job_due.connect(due.append)
+    yield scheduler
+    scheduler.clear()
+
+
+def test_heap_pops_in_due_order():
+    heap = ScheduleHeap()
+    dues = list(range(200))
+    random.Random(3).shuffle(dues)
+    for i, d in enumerate(dues):
+        heap.push(ScheduledJob(i, float(d)))
+    assert [heap.pop().due for _ in range(len(dues))] == sorted(float(d) for d in dues)
+    assert heap.pop() is None
+
+
+def test_heap_remove_and_ties():
+    heap = ScheduleHeap()
+    for i in range(300):
+        heap.push(ScheduledJob(i, 5.0 if i < 3 else float(i)))
+    for i in range(3, 290):
+        assert heap.remove(i).id == i
+    assert heap.remove(3) is None
+    assert len(heap) == 13
+    assert [job.id for job in heap.jobs()] == [0, 1, 2] + list(range(290, 300))
+    assert [heap.pop().id for _ in range(4)] == [0, 1, 2, 290]
+
+
+def test_timer_armed_for_next_due_only(scheduler, clock):
+    scheduler.add(clock.now + 10)
+    scheduler.add(clock.now + 5)
+    assert scheduler.next_due() == clock.now + 5
+    assert 4900 <= scheduler.timer.remainingTime() <= 5000
+
+
+def test_long_sleeps_are_capped_at_resync_interval(scheduler, clock):
+    scheduler.add(clock.now + 86400)
+    assert scheduler.timer.remainingTime() <= 30000
+
+
+def test_due_jobs_start_in_order_and_only_once(scheduler, clock, due):
+    first = scheduler.add(clock.now + 5, {"url": "a"})
+    second = scheduler.add(clock.now + 1, {"url": "b"})
+    later = scheduler.add(clock.now + 60)
+    clock.now += 5
+    scheduler.resync()
+    assert [job.id for job in due] == [second.id, first.id]
+    assert len(scheduler) == 1 and scheduler.job(later.id) is later
+    scheduler.resync()
+    assert len(due) == 2
+
+
+def test_removed_job_never_starts(scheduler, clock, due):
+    job = scheduler.add(clock.now + 1)
+    assert scheduler.remove(job.id) is job
+    clock.now += 10
+    scheduler.resync()
+    assert due == []
+    assert not scheduler.timer.isActive()
+
+
+def test_clock_set_back_delays_start(scheduler, clock, due):
+    scheduler.add(clock.now + 5)
+    clock.now -= 3600
+    scheduler.resync()
+    assert due == []
+    assert scheduler.timer.isActive()
+
+
+def test_clock_jump_or_resume_starts_overdue_jobs(qtbot, scheduler, clock, due):
+    scheduler.add(clock.now + 3600)
+    scheduler.add(clock.now + 7200)
+    # Suspended for two hours: the timer fires as if no time had passed
+    clock.now += 7200
+    scheduler.timer.start(0)
+    qtbot.waitUntil(lambda: len(due) == 2, timeout=1000)
+
+
+def test_application_becoming_active_resyncs(qapp, scheduler, clock, due):
+    scheduler.add(clock.now + 3600)
+    clock.now += 3600
+    qapp.applicationStateChanged.emit(Qt.ApplicationInactive)
+    assert due == []
+    qapp.applicationStateChanged.emit(Qt.ApplicationActive)
+    assert len(due) == 1
+
+
+def test_past_due_job_starts_on_next_event_loop_pass(qtbot, scheduler, clock, due):
+    scheduler.add(clock.now - 60)
+    assert due == []
+    qtbot.waitUntil(lambda: len(due) == 1, timeout=1000)
+
+
+def test_reschedule(scheduler, clock, due):
+    job = scheduler.add(clock.now + 60)
+    assert scheduler.reschedule(job.id, clock.now + 1)
+    assert scheduler.next_due() == clock.now + 1
+    clock.now += 1
+    scheduler.resync()
+    assert due == [job]
+    assert not scheduler.reschedule(job.id, clock.now + 5)
+
+
+def test_recurring_job_stays_scheduled_and_skips_missed_runs(scheduler, clock, due):
+    rule = parse_rule("every 1h")
+    job = scheduler.add(None, {"url": "a"}, rule)
+    assert job.due == rule.next_after(clock.now)
+    first = job.due
+    clock.now = first
+    scheduler.resync()
+    assert due == [job] and job.due == first + 3600
+    # Asleep for three runs: one run, then on from now
+    clock.now = first + 3 * 3600 + 10
+    scheduler.resync()
+    assert len(due) == 2 and job.due == first + 4 * 3600
+    assert scheduler.remove(job.id) is job
+    assert len(scheduler) == 0
+
+
+def test_job_needs_due_or_rule(scheduler):
+    with pytest.raises(ValueError):
+        scheduler.add(None)
+
+
+def test_missed_runs_by_policy():
+    hourly = ScheduledJob(1, 3600.0, rule=parse_rule("every 1h"))
+    now = 5 * 3600 + 10
+    assert missed_runs(hourly, now, CatchUpPolicy.ALL, 24) == [3600.0 * h for h in range(1, 6)]
+    assert missed_runs(hourly, now, CatchUpPolicy.ALL, 2) == [4 * 3600.0, 5 * 3600.0]
+    assert missed_runs(hourly, now, CatchUpPolicy.LATEST, 24) == [5 * 3600.0]
+    assert missed_runs(hourly, now, CatchUpPolicy.SKIP, 24) == []
+    assert missed_runs(ScheduledJob(2, 100.0), now, CatchUpPolicy.ALL, 24) == [100.0]
+    assert missed_runs(ScheduledJob(3, now + 1), now, CatchUpPolicy.ALL, 24) == []
+
+
+def test_catch_up_is_staggered_oldest_first():
+    now = 10 * 3600 + 10
+    once = ScheduledJob(1, 9.5 * 3600, {"url": "a"})
+    hourly = ScheduledJob(2, 8 * 3600, {"url": "b"}, parse_rule("every 1h"))
+    future = ScheduledJob(3, now + 600, {"url": "c"})
+    plan = plan_catch_up([once, hourly, future], now, CatchUpPolicy.ALL, 24, delay=15, stagger=30)
+    assert plan.jobs == [once, hourly, future] and plan.skipped == []
+    assert plan.missed == {1: 1, 2: 3}
+    # 08:00, 09:00, 09:30 (the one-off), 10:00
+    assert [start for _, start in plan.runs] == [now + 15, now + 45, now + 105]
+    assert once.due == now + 75
+    assert hourly.due == 11 * 3600 and future.due == now + 600
+
+
+def test_skipped_catch_up_drops_missed_one_offs():
+    now = 10 * 3600 + 10
+    once = ScheduledJob(1, 100.0)
+    hourly = ScheduledJob(2, 8 * 3600, rule=parse_rule("every 1h"))
+    plan = plan_catch_up([once, hourly], now, CatchUpPolicy.SKIP, 24, delay=15, stagger=30)
+    assert plan.jobs == [hourly] and plan.skipped == [once] and plan.runs == []
+    assert hourly.due == 11 * 3600
+
+
+def test_restored_jobs_keep_their_ids(scheduler, clock):
+    scheduler.restore([ScheduledJob(7, clock.now + 60), ScheduledJob(3, clock.now + 30)])
+    assert scheduler.next_due() == clock.now + 30
+    assert scheduler.add(clock.now + 90).id == 8
+
+
+def test_skipped_jobs_ids_are_not_reused(scheduler, clock):
+    # As the scheduler page restores: skipped one-offs keep their rows but are not scheduled
+    plan = plan_catch_up([ScheduledJob(1, clock.now - 60)], clock.now, CatchUpPolicy.SKIP, 24, delay=15, stagger=30)
+    scheduler.restore(plan.jobs)
+    scheduler.reserve_ids(max((job.id for job in plan.skipped), default=0))
+    assert [job.id for job in plan.skipped] == [1]
+    assert scheduler.add(clock.now + 60).id == 2
+
+
+def test_store_keeps_jobs_with_rules(tmp_path):
+    store = ScheduleStore(os.path.join(tmp_path, "schedule.db"))
+    task = {"url": "https://youtube.com/watch?v=a", "resolution": "720p", "audio_only": False}
+    store.save_jobs([ScheduledJob(2, 200.0, {"task": task}, parse_rule("0 9 * * 1-5")),
+                     ScheduledJob(1, 100.0, {"task": task, "catch_up_of": 2})])
+    store.close()
+    store = ScheduleStore(os.path.join(tmp_path, "schedule.db"))
+    jobs = store.jobs()
+    assert [(job.id, job.due) for job in jobs] == [(1, 100.0), (2, 200.0)]
+    assert jobs[0].data == {"task": task, "catch_up_of": 2} and jobs[0].rule is None
+    assert jobs[1].rule.text == "0 9 * * 1-5"
+    store.remove_jobs([1])
+    assert [job.id for job in store.jobs()] == [2]
+    store.close()
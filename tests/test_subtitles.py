@@ -0,0 +1,121 @@
+import io
+import os
+import threading
+import time
+import pytest
+from core.subtitles import (
+    SubtitleFetcher,
+    build_subtitle_options,
+    parse_languages,
+    selected_tracks
+)
+
+
+class FakeResponse(io.BytesIO):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class FakeYDL:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.requested = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def urlopen(self, request):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.requested.append(request.url)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return FakeResponse(f"WEBVTT {request.url}".encode("utf-8"))
+
+
+@pytest.fixture
+def info():
+    return {
+        "title": "Test Video",
+        "ext": "mp4",
+        "requested_subtitles": {
+            "en": {"ext": "vtt", "url": "https://example.com/en.vtt"},
+            "de": {"ext": "vtt", "url": "https://example.com/de.vtt"},
+            "fr": {"ext": "srt", "data": "1\n00:00:00,000 --> 00:00:01,000\nBonjour\n"},
+        }
+    }
+
+
+def test_parse_languages():
+    assert parse_languages("en, de  pt.*") == ["en", "de", "pt.*"]
+    assert parse_languages(["en", "en", " de "]) == ["en", "de"]
+    assert parse_languages("") == []
+    assert parse_languages(None) == []
+
+
+def test_build_subtitle_options_never_requests_all():
+    options = build_subtitle_options("en, de", auto_captions=True)
+    assert options["writesubtitles"] is True
+    assert options["writeautomaticsub"] is True
+    assert options["subtitleslangs"] == ["en", "de"]
+    assert "allsubtitles" not in options
+
+
+def test_build_subtitle_options_defaults_when_empty():
+    options = build_subtitle_options([], auto_captions=False)
+    assert options["subtitleslangs"] == ["en"]
+    assert options["writeautomaticsub"] is False
+
+
+def test_selected_tracks(info):
+    tracks = {t.lang: t for t in selected_tracks(info)}
+    assert set(tracks) == {"en", "de", "fr"}
+    assert tracks["en"].url == "https://example.com/en.vtt"
+    assert tracks["fr"].data.startswith("1\n")
+    assert selected_tracks({"title": "No subs"}) == []
+
+
+def test_fetcher_writes_tracks_next_to_media(tmp_path, info):
+    ydl = FakeYDL()
+    media = os.path.join(tmp_path, "Test Video.mp4")
+    results = SubtitleFetcher(ydl, max_workers=4).fetch(info, media)
+
+    assert sorted(r.lang for r in results) == ["de", "en", "fr"]
+    assert all(r.error is None for r in results)
+    assert os.path.exists(os.path.join(tmp_path, "Test Video.en.vtt"))
+    assert os.path.exists(os.path.join(tmp_path, "Test Video.de.vtt"))
+    assert os.path.exists(os.path.join(tmp_path, "Test Video.fr.srt"))
+    # Inline data is written without a network request
+    assert sorted(ydl.requested) == ["https://example.com/de.vtt", "https://example.com/en.vtt"]
+
+
+def test_fetcher_runs_requests_concurrently(tmp_path):
+    info = {
+        "title": "Many",
+        "ext": "mp4",
+        "requested_subtitles": {
+            f"l{i}": {"ext": "vtt", "url": f"https://example.com/{i}.vtt"} for i in range(8)
+        }
+    }
+    ydl = FakeYDL(delay=0.05)
+    SubtitleFetcher(ydl, max_workers=4).fetch(info, os.path.join(tmp_path, "Many.mp4"))
+    assert ydl.max_active > 1
+    assert ydl.max_active <= 4
+
+
+def test_fetcher_skips_existing_files(tmp_path, info):
+    existing = os.path.join(tmp_path, "Test Video.en.vtt")
+    with open(existing, "w") as f:
+        f.write("existing")
+
+    ydl = FakeYDL()
+    results = {r.lang: r for r in SubtitleFetcher(ydl).fetch(info, os.path.join(tmp_path, "Test Video.mp4"))}
+    assert results["en"].skipped
+    assert "https://example.com/en.vtt" not in ydl.requested
+    with open(existing) as f:
+        assert f.read() == "existing"
@@ -0,0 +1,127 @@
+from datetime import datetime
+import pytest
+from core.downloader import DownloadTask
+from core.queue_dispatcher import QueueDispatcher
+from core.queue_model import JobState, QueueTableModel
+from core.throttle import (BandwidthLimiter, ProfileSchedule, ThrottleController, ThrottleProfile,
+                           job_class, parse_days, parse_job_classes, parse_rate)
+
+
+def ts(*args):
+    return datetime(*args).timestamp()
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_task(i, audio=False):
+    return DownloadTask(f"https://youtube.com/watch?v={i}", "720p", "/tmp", "", audio_only=audio)
+
+
+def test_parsers():
+    assert parse_rate("500K") == 512000
+    assert parse_rate("1.5MB/s") == int(1.5 * 1024 * 1024)
+    assert parse_rate("") is None and parse_rate("unlimited") is None
+    assert parse_days("mon-fri") == (0, 1, 2, 3, 4)
+    assert parse_days("fri-mon") == (0, 4, 5, 6)
+    assert parse_days("Sat, Sun") == (5, 6)
+    assert parse_job_classes("video, audio") == ("video", "audio")
+    for parse, text in ((parse_rate, "fast"), (parse_days, "someday"), (parse_job_classes, "music")):
+        with pytest.raises(ValueError):
+            parse(text)
+    with pytest.raises(ValueError):
+        ThrottleProfile.from_dict({"name": "x", "start": "25:00"})
+    assert job_class(make_task(1, audio=True)) == "audio"
+
+
+def test_schedule_windows_and_boundaries():
+    night = ThrottleProfile("Night", "22:00", "06:00", max_concurrent=8)
+    business = ThrottleProfile("Business", "09:00", "17:00", max_concurrent=1, days=tuple(range(5)))
+    default = ThrottleProfile("Manual", max_concurrent=3)
+    schedule = ProfileSchedule([night, business], default)
+    # 2026-03-02 is a Monday
+    assert schedule.active_at(ts(2026, 3, 2, 23, 30)) is night
+    assert schedule.active_at(ts(2026, 3, 3, 5, 59)) is night
+    assert schedule.active_at(ts(2026, 3, 3, 10, 0)) is business
+    assert schedule.active_at(ts(2026, 3, 7, 10, 0)) is default  # Saturday
+    assert schedule.active_at(ts(2026, 3, 3, 7, 0)) is default
+    assert schedule.next_after(ts(2026, 3, 3, 7, 0)) == ts(2026, 3, 3, 9, 0)
+    assert schedule.next_after(ts(2026, 3, 3, 9, 0)) == ts(2026, 3, 3, 17, 0)
+    assert schedule.next_after(ts(2026, 3, 6, 23, 0)) == ts(2026, 3, 7, 6, 0)
+
+
+def test_limiter_shares_cap_among_running_downloads():
+    limiter = BandwidthLimiter()
+    first, second = {}, {}
+    limiter.register("a", first)
+    assert first["ratelimit"] is None
+    limiter.set_limit(1000)
+    assert first["ratelimit"] == 1000
+    limiter.register("b", second)
+    assert first["ratelimit"] == second["ratelimit"] == 500
+    limiter.unregister("a")
+    assert second["ratelimit"] == 1000
+    limiter.set_limit(None)
+    assert second["ratelimit"] is None
+
+
+def test_queue_runs_across_window_boundary(qapp):
+    """Eight videos and four audio jobs run from 08:58 through a 09:00-17:00 business window and out again"""
+    clock = FakeClock(ts(2026, 3, 2, 8, 58))
+    model = QueueTableModel()
+    limiter = BandwidthLimiter()
+    running = {}  # job id -> the yt-dlp params a real download would register
+    started = []
+
+    def launch(job):
+        params = {}
+        limiter.register(job.id, params)
+        running[job.id] = params
+        started.append((job.id, job_class(job.task)))
+
+    def finish(job_id):
+        limiter.unregister(job_id)
+        del running[job_id]
+        model.set_state(job_id, JobState.DONE)
+
+    dispatcher = QueueDispatcher(model, launch, max_concurrent=4)
+    business = ThrottleProfile("Business", "09:00", "17:00", max_concurrent=1,
+                               bandwidth=100 * 1024, job_classes=("video",))
+    controller = ThrottleController(dispatcher, limiter, ThrottleProfile("Manual", max_concurrent=4), clock)
+    controller.set_profiles([business])
+    model.add_jobs([make_task(i) for i in range(8)] + [make_task(i, audio=True) for i in range(8, 12)])
+    dispatcher.start()
+    assert controller.active.name == "Manual"
+    assert len(running) == 4 and all(params["ratelimit"] is None for params in running.values())
+    assert controller.scheduler.next_due() == ts(2026, 3, 2, 9, 0)
+
+    # The window opens with four downloads running: none is stopped, all are capped
+    clock.now = ts(2026, 3, 2, 9, 0)
+    controller.scheduler.resync()
+    assert controller.active is business
+    assert len(running) == 4
+    assert all(params["ratelimit"] == 100 * 1024 // 4 for params in running.values())
+    # Finished downloads are not replaced until one is left; then only videos start
+    for job_id in list(running)[:3]:
+        finish(job_id)
+    assert len(running) == 1 and list(running.values())[0]["ratelimit"] == 100 * 1024
+    while model.pending_count() > 4:
+        finish(next(iter(running)))
+        assert len(running) == 1
+    finish(next(iter(running)))
+    assert running == {} and model.pending_count() == 4
+    assert all(kind == "video" for _, kind in started)
+
+    # The window closes: audio jobs start, four at once, uncapped
+    clock.now = ts(2026, 3, 2, 17, 0)
+    controller.scheduler.resync()
+    assert controller.active.name == "Manual"
+    assert len(running) == 4 and all(params["ratelimit"] is None for params in running.values())
+    assert [kind for _, kind in started[-4:]] == ["audio"] * 4
+    assert controller.scheduler.next_due() == ts(2026, 3, 3, 9, 0)
+    controller.scheduler.clear()
@@ -0,0 +1,149 @@
+import os
+import pytest
+from core.schedule_store import ScheduleStore
+from core.watch import WatchManager, WatchSource, poll_source
+
+
+class FakeProfile:
+    """A profile listing, newest first, that records which pages were listed"""
+
+    def __init__(self, count):
+        self.videos = [self.video(i) for i in range(count)]
+        self.listed = []
+
+    @staticmethod
+    def video(i):
+        return {"id": f"v{i}", "url": f"https://www.tiktok.com/@user/video/{i}", "title": f"Video {i}", "timestamp": 1000 + i}
+
+    def post(self, count):
+        start = len(self.videos)
+        self.videos.extend(self.video(i) for i in range(start, start + count))
+
+    def __call__(self, url, start, end, proxy=""):
+        self.listed.append((start, end))
+        newest_first = list(reversed(self.videos))
+        return newest_first[start - 1:end]
+
+
+def poll(source, profile, **kwargs):
+    result = poll_source(source, profile, page_size=10, max_pages=5, **kwargs)
+    source.seen_ids, source.last_id, source.last_timestamp = result.seen_ids, result.last_id, result.last_timestamp
+    return result
+
+
+@pytest.fixture
+def source():
+    return WatchSource(id=1, url="https://www.tiktok.com/@user", rule="every 1h")
+
+
+def test_first_poll_sets_mark_from_one_page(source):
+    profile = FakeProfile(5000)
+    result = poll(source, profile)
+    assert result.entries == []
+    assert profile.listed == [(1, 10)]
+    assert source.last_id == "v4999" and source.last_timestamp == 1000 + 4999
+
+
+def test_poll_lists_only_newest_page(source):
+    profile = FakeProfile(5000)
+    poll(source, profile)
+    profile.post(3)
+    profile.listed.clear()
+    result = poll(source, profile)
+    assert [entry["id"] for entry in result.entries] == ["v5000", "v5001", "v5002"]
+    assert profile.listed == [(1, 10)]
+    assert poll(source, profile).entries == []
+
+
+def test_poll_pages_on_while_whole_page_is_new(source):
+    profile = FakeProfile(100)
+    poll(source, profile)
+    profile.post(25)
+    profile.listed.clear()
+    result = poll(source, profile)
+    assert len(result.entries) == 25
+    assert profile.listed == [(1, 10), (11, 20), (21, 30)]
+
+
+def test_pinned_old_video_does_not_hide_new_ones(source):
+    profile = FakeProfile(50)
+    poll(source, profile)
+    profile.post(2)
+    pinned = FakeProfile.video(3)
+    listing = lambda url, start, end, proxy="": ([pinned] + profile(url, start, end))[:end - start + 1]
+    source.seen_ids = source.seen_ids[:5]  # the pinned video has long left the remembered ids
+    result = poll(source, listing)
+    assert [entry["id"] for entry in result.entries] == ["v50", "v51"]
+
+
+def test_seen_ids_are_capped(source):
+    profile = FakeProfile(100)
+    poll(source, profile, seen_limit=15)
+    for _ in range(3):
+        profile.post(10)
+        poll(source, profile, seen_limit=15)
+    assert len(source.seen_ids) == 15
+    assert source.seen_ids[0] == "v129"
+
+
+def test_store_round_trip(tmp_path):
+    store = ScheduleStore(os.path.join(tmp_path, "schedule.db"))
+    source = store.save_source(WatchSource(id=0, url="https://youtube.com/@x/videos", rule="@daily",
+                                           options={"resolution": "720p"}, seen_ids=["a", "b"], last_timestamp=5.0))
+    assert source.id == 1
+    source.found = 4
+    store.save_source(source)
+    assert store.sources() == [source]
+    store.remove_source(source.id)
+    assert store.sources() == []
+    store.close()
+
+
+def test_manager_polls_and_reports_new_entries(qtbot, tmp_path):
+    store = ScheduleStore(os.path.join(tmp_path, "schedule.db"))
+    profile = FakeProfile(30)
+    polls = []
+
+    def poll_fake(source):
+        polls.append(source.url)
+        return poll_source(source, profile, page_size=10)
+
+    manager = WatchManager(store, poll=poll_fake)
+    found = []
+    manager.new_entries.connect(lambda source, entries: found.append([entry["id"] for entry in entries]))
+    source = manager.add_source("https://www.tiktok.com/@user", "every 1h", {"resolution": "720p"})
+    assert manager.next_poll(source.id) is not None
+    with pytest.raises(ValueError):
+        manager.add_source("https://www.tiktok.com/@other", "every now and then")
+
+    assert manager.poll_now(source.id)
+    qtbot.waitUntil(lambda: source.last_poll is not None, timeout=5000)
+    assert found == [] and source.last_id == "v29"
+    profile.post(2)
+    assert manager.poll_now(source.id)
+    qtbot.waitUntil(lambda: bool(found), timeout=5000)
+    assert found == [["v30", "v31"]] and source.found == 2
+
+    # The mark survives a restart
+    reloaded = WatchManager(store, poll=poll_fake)
+    assert [s.last_id for s in reloaded.load()] == ["v31"]
+    manager.stop()
+    reloaded.stop()
+    manager.pool.waitForDone()
+    store.close()
+
+
+def test_failed_poll_is_recorded(qtbot, tmp_path):
+    store = ScheduleStore(os.path.join(tmp_path, "schedule.db"))
+
+    def poll_fail(source):
+        raise RuntimeError("profile unavailable")
+
+    manager = WatchManager(store, poll=poll_fail)
+    source = manager.add_source("https://www.tiktok.com/@gone", "every 1h")
+    manager.poll_now(source.id)
+    qtbot.waitUntil(lambda: bool(source.last_error), timeout=5000)
+    assert store.sources()[0].last_error == "profile unavailable"
+    manager.stop()
+    manager.pool.waitForDone()
+    store.close()
@@ -0,0 +1,30 @@
+from PySide6.QtCore import QObject, QRunnable, Signal
+from core.history_io import export_history_file, import_history_file
+
+
+class HistoryIOSignals(QObject):
+    finished = Signal(str, int)  # action, entry count
+    error = Signal(str, str)  # action, message
+
+
+class HistoryIOWorker(QRunnable):
+    """Runs a history export or import on a pool thread so large files don't block the UI"""
+
+    def __init__(self, action, path):
+        super().__init__()
+        self.action = action
+        self.path = path
+        self.signals = HistoryIOSignals()
+        self.setAutoDelete(False)
+
+    def run(self):
+        try:
+            if self.action == "export":
+                count = export_history_file(self.path)
+            else:
+                count = import_history_file(self.path)
+        except Exception as e:
+            # Any failure must reach the page, which allows one export or import at a time
+            self.signals.error.emit(self.action, str(e) or e.__class__.__name__)
+            return
+        self.signals.finished.emit(self.action, count)
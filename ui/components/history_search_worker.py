@@ -0,0 +1,28 @@
+from PySide6.QtCore import QObject, QRunnable, Signal
+from core.history_store import get_history_store
+
+
+class HistorySearchSignals(QObject):
+    finished = Signal(int, str, object)  # generation, query, entries
+    error = Signal(int, str)
+
+
+class HistorySearchWorker(QRunnable):
+    """Runs one history search on a pool thread; the generation lets the page drop stale results"""
+
+    def __init__(self, generation, query, limit):
+        super().__init__()
+        self.generation = generation
+        self.query = query
+        self.limit = limit
+        self.signals = HistorySearchSignals()
+        # The page keeps a reference to the latest worker, so Python owns its lifetime
+        self.setAutoDelete(False)
+
+    def run(self):
+        try:
+            entries = get_history_store().search(self.query, limit=self.limit)
+        except Exception as e:
+            self.signals.error.emit(self.generation, str(e))
+            return
+        self.signals.finished.emit(self.generation, self.query, entries)
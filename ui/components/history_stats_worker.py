@@ -0,0 +1,27 @@
+from PySide6.QtCore import QObject, QRunnable, Signal
+from core.analytics import history_stats
+
+
+class HistoryStatsSignals(QObject):
+    finished = Signal(int, object)  # generation, HistoryStats
+    error = Signal(int, str)  # generation, message
+
+
+class HistoryStatsWorker(QRunnable):
+    """Computes history statistics on a pool thread; generation lets the dialog drop stale results"""
+
+    def __init__(self, generation, since=None, until=None):
+        super().__init__()
+        self.generation = generation
+        self.since = since
+        self.until = until
+        self.signals = HistoryStatsSignals()
+        self.setAutoDelete(False)
+
+    def run(self):
+        try:
+            stats = history_stats(since=self.since, until=self.until)
+        except Exception as e:
+            self.signals.error.emit(self.generation, str(e))
+            return
+        self.signals.finished.emit(self.generation, stats)
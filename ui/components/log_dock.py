@@ -1,21 +1,44 @@
-from PySide6.QtWidgets import QDockWidget, QTextEdit
+from PySide6.QtWidgets import QAbstractItemView, QApplication, QDockWidget, QListView
 from PySide6.QtCore import Qt
-from PySide6.QtGui import QColor
-from datetime import datetime
+from PySide6.QtGui import QAction, QKeySequence
+from core.log_model import LogListModel, NOTICE_ERROR, NOTICE_INDEXING
 
 class LogDockManager:
     def __init__(self, main_window):
         self.main_window = main_window
         self.log_dock = None
-        self.log_text_edit = None
+        self.log_model = None
+        self.log_view = None
         self.log_dock_visible = False
+        self.follow_tail = True
         self.init_log_dock()
 
     def init_log_dock(self):
         self.log_dock = QDockWidget("Logs", self.main_window)
-        self.log_text_edit = QTextEdit()
-        self.log_text_edit.setReadOnly(True)
-        self.log_dock.setWidget(self.log_text_edit)
+        self.log_model = LogListModel(parent=self.log_dock)
+        self.log_model.notice.connect(self.show_notice)
+        self.log_model.rowsAboutToBeInserted.connect(self.check_follow_tail)
+        self.log_model.rowsInserted.connect(self.scroll_to_tail)
+
+        # One line per row at a uniform height: only the rows in sight are laid out and painted
+        self.log_view = QListView()
+        self.log_view.setModel(self.log_model)
+        self.log_view.setUniformItemSizes(True)
+        self.log_view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.log_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.log_view.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+
+        copy_action = QAction("Copy", self.log_view)
+        copy_action.setShortcut(QKeySequence.Copy)
+        copy_action.setShortcutContext(Qt.WidgetShortcut)
+        copy_action.triggered.connect(self.copy_selection)
+        clear_action = QAction("Clear", self.log_view)
+        clear_action.triggered.connect(self.log_model.clear)
+        self.log_view.addAction(copy_action)
+        self.log_view.addAction(clear_action)
+        self.log_view.setContextMenuPolicy(Qt.ActionsContextMenu)
+
+        self.log_dock.setWidget(self.log_view)
         self.main_window.addDockWidget(Qt.BottomDockWidgetArea, self.log_dock)
         self.log_dock.hide()
 
@@ -28,64 +51,24 @@ class LogDockManager:
             self.log_dock_visible = True
 
     def append_log(self, text):
-        def get_timestamp():
-            return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        def format_error_text(msg):
-            timestamp = get_timestamp()
-            return f"[{timestamp}] ❌ {msg}"
-
-        color = "white"
-        
-        if text.startswith("[yt-dlp"):
-            if "[yt-dlp Debug]" in text:
-                color = "#4D96FF"
-            elif "[yt-dlp Info]" in text:
-                if any(s in text.lower() for s in ["download completed", "has already been downloaded", "finished downloading", "merged", "success"]):
-                    color = "#6BCB77"
-                else:
-                    color = "#4D96FF"
-            elif "[yt-dlp Warning]" in text:
-                color = "#FFD93D"
-                text = f"⚠️ {text}"
-            elif "[yt-dlp Error]" in text:
-                color = "#FF4444"
-                text = format_error_text(text)
-        else:
-            if any(k in text.lower() for k in ["error", "fail", "http status code"]):
-                color = "#FF4444"
-                text = format_error_text(text)
-            elif any(k in text.lower() for k in ["warning", "warn"]):
-                color = "#FFD93D"
-                text = f"⚠️ {text}"
-            elif any(k in text.lower() for k in ["completed", "success", "finished"]):
-                color = "#6BCB77"
-                text = f"✅ {text}"
-            elif any(k in text.lower() for k in ["started", "queued", "fetching", "downloading"]):
-                color = "#4D96FF"
-                text = f"ℹ️ {text}"
-            elif "cancel" in text.lower():
-                color = "#FF9F45"
-                text = f"🚫 {text}"
+        self.log_model.append(text)
 
-        if "error details:" in text.lower():
-            lines = text.split("\n")
-            formatted_lines = []
-            for line in lines:
-                if ":" in line and not line.lower().startswith(("error type", "error details", "http status")):
-                    formatted_lines.append("    " + line)
-                else:
-                    formatted_lines.append(line)
-            text = "\n".join(formatted_lines)
+    def check_follow_tail(self, *args):
+        # Keep following new lines only while scrolled to the bottom
+        scrollbar = self.log_view.verticalScrollBar()
+        self.follow_tail = scrollbar.value() >= scrollbar.maximum()
 
-        self.log_text_edit.setTextColor(QColor(color))
-        self.log_text_edit.append(text)
-        self.log_text_edit.setTextColor(QColor("white"))
+    def scroll_to_tail(self, *args):
+        if self.follow_tail:
+            self.log_view.scrollToBottom()
 
-        scrollbar = self.log_text_edit.verticalScrollBar()
-        scrollbar.setValue(scrollbar.maximum())
+    def copy_selection(self):
+        rows = [index.row() for index in self.log_view.selectionModel().selectedRows()]
+        if rows:
+            QApplication.clipboard().setText(self.log_model.text(rows))
 
-        if "[yt-dlp Error]" in text or ("error" in text.lower() and not text.startswith("[yt-dlp")):
+    def show_notice(self, kind, text):
+        if kind == NOTICE_ERROR:
             self.main_window.tray_manager.show_error_message(text)
-        elif "playlist indexing in progress" in text.lower():
-            self.main_window.tray_manager.show_playlist_indexing_message() 
\ No newline at end of file
+        elif kind == NOTICE_INDEXING:
+            self.main_window.tray_manager.show_playlist_indexing_message()
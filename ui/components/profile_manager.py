@@ -97,8 +97,8 @@ class ProfileManager:
 
             history_file = os.path.join(temp_dir, "history.json")
             if os.path.exists(history_file):
-                data_dir = get_data_dir()
-                shutil.copy2(history_file, os.path.join(data_dir, "history.json"))
+                from core.history import import_history
+                import_history(history_file)
 
             pic_file = os.path.join(temp_dir, "profile_picture.png")
             if os.path.exists(pic_file):
@@ -116,7 +116,7 @@ class ProfileManager:
                 if hasattr(self.main_window.page_settings, 'proxy_edit'):
                     self.main_window.page_settings.proxy_edit.setText(self.user_profile.get_proxy())
                 self.main_window.update_profile_ui()
-                if hasattr(self.main_window, 'page_history') and hasattr(self.main_window.page_history, 'history_table'):
+                if hasattr(self.main_window, 'page_history') and hasattr(self.main_window.page_history, 'history_model'):
                     self.main_window.initialize_history()
                 self.main_window.theme_manager.apply_current_theme()
             except Exception as ui_error:
@@ -132,9 +132,8 @@ class ProfileManager:
         if os.path.exists(self.user_profile.profile_path):
             os.remove(self.user_profile.profile_path)
         
-        from core.history import HISTORY_FILE
-        if os.path.exists(HISTORY_FILE):
-            os.remove(HISTORY_FILE)
+        from core.history import reset_history
+        reset_history()
             
         if self.user_profile.data.get("profile_picture") and os.path.exists(self.user_profile.data["profile_picture"]):
             try:
@@ -171,6 +170,8 @@ class ProfileManager:
             self.main_window.thread_pool.setMaxThreadCount(self.main_window.max_concurrent_downloads)
         except Exception:
             pass
+        if hasattr(self.main_window, 'page_queue'):
+            self.main_window.page_queue.dispatcher.set_max_concurrent(self.main_window.max_concurrent_downloads)
 
     def apply_resolution(self):
         from PySide6.QtWidgets import QMessageBox
@@ -0,0 +1,37 @@
+from PySide6.QtWidgets import QApplication, QStyle, QStyledItemDelegate, QStyleOptionProgressBar
+from PySide6.QtCore import Qt
+from core.queue_model import PROGRESS_ROLE
+
+
+class ProgressDelegate(QStyledItemDelegate):
+    """
+    Paints a progress bar from the model's PROGRESS_ROLE, or the plain text when
+    the role is None. One style option is reused for every paint.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._bar = QStyleOptionProgressBar()
+        self._bar.minimum = 0
+        self._bar.maximum = 100
+        self._bar.textVisible = True
+        self._bar.textAlignment = Qt.AlignCenter
+
+    def paint(self, painter, option, index):
+        progress = index.data(PROGRESS_ROLE)
+        if progress is None:
+            super().paint(painter, option, index)
+            return
+        widget = option.widget
+        style = widget.style() if widget is not None else QApplication.style()
+        # Selection and hover background first, then the bar over it
+        style.drawPrimitive(QStyle.PE_PanelItemViewItem, option, painter, widget)
+        bar = self._bar
+        bar.rect = option.rect.adjusted(2, 3, -2, -3)
+        bar.state = option.state | QStyle.State_Horizontal
+        bar.direction = option.direction
+        bar.palette = option.palette
+        bar.fontMetrics = option.fontMetrics
+        bar.progress = int(progress)
+        bar.text = index.data(Qt.DisplayRole)
+        style.drawControl(QStyle.CE_ProgressBar, bar, painter, widget)
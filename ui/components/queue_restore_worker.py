@@ -0,0 +1,37 @@
+from PySide6.QtCore import QObject, QRunnable, Signal
+from core.queue_store import restorable_state
+
+
+class QueueRestoreSignals(QObject):
+    chunk = Signal(object, object)  # jobs, ids of jobs that were interrupted
+    finished = Signal(int, int)  # jobs restored, jobs interrupted
+    error = Signal(str)
+
+
+class QueueRestoreWorker(QRunnable):
+    """Reads the saved queue on a pool thread and hands it to the UI in chunks"""
+
+    def __init__(self, store, resume):
+        super().__init__()
+        self.store = store
+        self.resume = resume
+        self.signals = QueueRestoreSignals()
+        self.setAutoDelete(False)
+
+    def run(self):
+        restored = interrupted = 0
+        try:
+            for jobs in self.store.iter_jobs():
+                changed = []
+                for job in jobs:
+                    state = restorable_state(job.state, self.resume)
+                    if state != job.state:
+                        job.state = state
+                        job.status = "Interrupted"
+                        changed.append(job.id)
+                restored += len(jobs)
+                interrupted += len(changed)
+                self.signals.chunk.emit(jobs, changed)
+        except Exception as e:
+            self.signals.error.emit(str(e))
+        self.signals.finished.emit(restored, interrupted)
@@ -1,4 +1,4 @@
-from PySide6.QtWidgets import QSystemTrayIcon, QMenu, QApplication
+from PySide6.QtWidgets import QSystemTrayIcon, QMenu
 from PySide6.QtGui import QIcon, QPixmap, QPainter, QFont, QAction
 from PySide6.QtCore import Qt, Signal
 import os
@@ -42,9 +42,8 @@ class TrayIconManager:
         self.tray_icon.show()
 
     def quit_application(self):
-        
-        self.hide()
-        QApplication.quit()
+        # Goes through the window so queued history and queue changes are saved
+        self.main_window.quit_app()
 
     def handle_window_close(self):
        
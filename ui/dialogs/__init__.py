@@ -1,5 +1,6 @@
 from .profile_dialog import ProfileDialog
 from .queue_add_dialog import QueueAddDialog
 from .schedule_add_dialog import ScheduleAddDialog
+from .stats_dialog import StatsDialog
 
-__all__ = ['ProfileDialog', 'QueueAddDialog', 'ScheduleAddDialog'] 
\ No newline at end of file
+__all__ = ['ProfileDialog', 'QueueAddDialog', 'ScheduleAddDialog', 'StatsDialog'] 
\ No newline at end of file
@@ -1,9 +1,8 @@
 from PySide6.QtWidgets import (
-    QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QTextEdit, QPushButton,
-    QComboBox, QCheckBox, QMessageBox, QFileDialog, QTableWidgetItem
+    QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QPlainTextEdit, QPushButton,
+    QComboBox, QCheckBox, QMessageBox, QFileDialog, QLineEdit
 )
 from PySide6.QtCore import Qt
-from core.downloader import DownloadTask
 
 
 class BatchAddDialog(QDialog):
@@ -18,13 +17,17 @@ class BatchAddDialog(QDialog):
         layout = QVBoxLayout(self)
 
         form = QFormLayout()
-        self.urls_edit = QTextEdit()
+        # Plain text keeps pasting tens of thousands of lines fast
+        self.urls_edit = QPlainTextEdit()
         self.urls_edit.setPlaceholderText("Paste one URL per line, or import from a .txt file...")
-        self.urls_edit.setAcceptRichText(False)
 
         self.audio_checkbox = QCheckBox("Audio Only")
         self.playlist_checkbox = QCheckBox("Playlist")
         self.subtitles_checkbox = QCheckBox("Download Subtitles")
+        self.subtitle_langs_edit = QLineEdit(", ".join(self.parent.user_profile.get_subtitle_languages()))
+        self.subtitle_langs_edit.setPlaceholderText("en, de, pt.*")
+        self.auto_subtitles_checkbox = QCheckBox("Allow Automatic Captions")
+        self.auto_subtitles_checkbox.setChecked(self.parent.user_profile.get_auto_subtitles())
 
         self.format_combo = QComboBox()
         self.format_combo.addItems(["mp4", "mkv", "webm", "flv", "avi"])
@@ -34,6 +37,8 @@ class BatchAddDialog(QDialog):
         form.addRow(self.playlist_checkbox)
         form.addRow("Video Format:", self.format_combo)
         form.addRow(self.subtitles_checkbox)
+        form.addRow("Subtitle Languages:", self.subtitle_langs_edit)
+        form.addRow(self.auto_subtitles_checkbox)
         layout.addLayout(form)
 
         btn_row = QHBoxLayout()
@@ -61,72 +66,36 @@ class BatchAddDialog(QDialog):
         except Exception as e:
             QMessageBox.warning(self, "Import Error", f"Could not read file: {e}")
 
-    def _collect_urls(self):
-        raw = self.urls_edit.toPlainText().splitlines()
-        urls = []
-        for line in raw:
-            url = line.strip()
-            if not url:
-                continue
-            # Basic validation: accept typical URL schemes
-            if url.startswith("http://") or url.startswith("https://"):
-                urls.append(url)
-            else:
-                # Allow bare youtube URLs without scheme as a convenience
-                if url.startswith("www.") or "." in url:
-                    urls.append("https://" + url)
-        # De-duplicate while preserving order
-        seen = set()
-        unique_urls = []
-        for u in urls:
-            if u not in seen:
-                seen.add(u)
-                unique_urls.append(u)
-        return unique_urls
-
     def on_add(self):
-        urls = self._collect_urls()
-        if not urls:
+        text = self.urls_edit.toPlainText()
+        if not text.strip():
             QMessageBox.warning(self, "Error", "No valid URLs found.")
             return
 
-        audio_only = self.audio_checkbox.isChecked()
-        playlist = self.playlist_checkbox.isChecked()
-        subtitles = self.subtitles_checkbox.isChecked()
-        output_format = self.parent.user_profile.get_audio_format() if audio_only else self.format_combo.currentText()
-
-        if not hasattr(self.parent, 'page_queue') or not hasattr(self.parent.page_queue, 'queue_table'):
+        if not hasattr(self.parent, 'page_queue') or not hasattr(self.parent.page_queue, 'queue_model'):
             QMessageBox.warning(self, "Error", "Queue page not initialized properly.")
             return
 
-        for url in urls:
-            task = DownloadTask(
-                url,
-                self.parent.user_profile.get_default_resolution(),
-                self.parent.user_profile.get_download_path(),
-                self.parent.user_profile.get_proxy(),
-                audio_only=audio_only,
-                playlist=playlist,
-                subtitles=subtitles,
-                output_format=output_format,
-                audio_format=self.parent.user_profile.get_audio_format() if audio_only else None,
-                audio_quality=self.parent.user_profile.get_audio_quality() if audio_only else "320",
-                from_queue=True
-            )
-
-            row = self.parent.page_queue.queue_table.rowCount()
-            self.parent.page_queue.queue_table.insertRow(row)
-            self.parent.page_queue.queue_table.setItem(row, 0, QTableWidgetItem("Fetching..."))
-            self.parent.page_queue.queue_table.setItem(row, 1, QTableWidgetItem("Fetching..."))
-            self.parent.page_queue.queue_table.setItem(row, 2, QTableWidgetItem(url))
-
-            download_type = "Audio" if audio_only else "Video"
-            if playlist:
-                download_type += " - Playlist"
-            self.parent.page_queue.queue_table.setItem(row, 3, QTableWidgetItem(download_type))
-            self.parent.page_queue.queue_table.setItem(row, 4, QTableWidgetItem("0%"))
-
-            self.parent.run_task(task, row)
+        audio_only = self.audio_checkbox.isChecked()
+        options = dict(
+            resolution=self.parent.user_profile.get_default_resolution(),
+            folder=self.parent.user_profile.get_download_path(),
+            proxy=self.parent.user_profile.get_proxy(),
+            audio_only=audio_only,
+            playlist=self.playlist_checkbox.isChecked(),
+            subtitles=self.subtitles_checkbox.isChecked(),
+            output_format=self.parent.user_profile.get_audio_format() if audio_only else self.format_combo.currentText(),
+            audio_format=self.parent.user_profile.get_audio_format() if audio_only else None,
+            audio_quality=self.parent.user_profile.get_audio_quality() if audio_only else "320",
+            from_queue=True,
+            subtitle_languages=self.subtitle_langs_edit.text(),
+            auto_subtitles=self.auto_subtitles_checkbox.isChecked()
+        )
+
+        # URLs are parsed and queued in the background, with progress on the Queue page
+        if not self.parent.page_queue.ingest_urls(text, options, start=True):
+            QMessageBox.warning(self, "Busy", "The previous batch is still being added to the queue.")
+            return
 
         self.accept()
 
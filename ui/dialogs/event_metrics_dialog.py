@@ -0,0 +1,78 @@
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget,
+                            QTableWidgetItem, QHeaderView, QDialogButtonBox)
+from PySide6.QtCore import Qt, QTimer
+
+HEADERS = ["Event", "Handler", "Calls", "Failed", "Dropped", "Coalesced",
+           "Latency p50", "Latency p99", "Latency max", "Duration p50", "Duration p99", "Duration max"]
+
+
+def format_ms(ms):
+    return f"{ms:.2f} ms" if ms < 100 else f"{ms:.0f} ms"
+
+
+class EventMetricsDialog(QDialog):
+    """Shows the event bus's handler latencies and durations, refreshed every second"""
+
+    def __init__(self, bus, parent=None):
+        super().__init__(parent)
+        self.bus = bus
+        self.init_ui()
+        self.refresh()
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(1000)
+
+    def init_ui(self):
+        self.setWindowTitle("Event Bus Metrics")
+        self.resize(980, 420)
+        layout = QVBoxLayout(self)
+
+        self.summary_label = QLabel()
+        self.summary_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        self.summary_label.setWordWrap(True)
+        layout.addWidget(self.summary_label)
+
+        self.table = QTableWidget(0, len(HEADERS))
+        self.table.setHorizontalHeaderLabels(HEADERS)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.verticalHeader().setVisible(False)
+        layout.addWidget(self.table)
+
+        bottom = QHBoxLayout()
+        b_reset = QPushButton("Reset")
+        b_reset.clicked.connect(self.reset)
+        bottom.addWidget(b_reset)
+        bottom.addStretch()
+        bb = QDialogButtonBox(QDialogButtonBox.Close)
+        bb.rejected.connect(self.reject)
+        bottom.addWidget(bb)
+        layout.addLayout(bottom)
+
+    def reset(self):
+        if self.bus.metrics is not None:
+            self.bus.metrics.reset()
+        self.refresh()
+
+    def refresh(self):
+        if self.bus.metrics is None:
+            self.summary_label.setText("Metrics are turned off for this event bus.")
+            return
+        snapshot = self.bus.metrics.snapshot()
+        events = [f"{name}: {counts['published']} published, {counts['coalesced']} coalesced"
+                  for name, counts in sorted(snapshot["events"].items())]
+        self.summary_label.setText("\n".join(events) or "No events published yet.")
+
+        rows = snapshot["handlers"]
+        self.table.setRowCount(len(rows))
+        for row, stats in enumerate(rows):
+            latency, duration = stats["latency"], stats["duration"]
+            values = [stats["event"], stats["handler"], str(stats["calls"]), str(stats["failures"]),
+                      str(stats["dropped"]), str(stats["coalesced"]),
+                      format_ms(latency["p50_ms"]), format_ms(latency["p99_ms"]), format_ms(latency["max_ms"]),
+                      format_ms(duration["p50_ms"]), format_ms(duration["p99_ms"]), format_ms(duration["max_ms"])]
+            for column, text in enumerate(values):
+                item = QTableWidgetItem(text)
+                if column >= 2:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(row, column, item)
@@ -0,0 +1,78 @@
+from datetime import datetime
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QTableWidget,
+                            QTableWidgetItem, QHeaderView, QDialogButtonBox)
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QColor
+from core.job_log import JobLogReader
+
+LEVEL_COLORS = {"WARNING": QColor("#d08000"), "ERROR": QColor("#d03030"), "CRITICAL": QColor("#d03030")}
+
+
+def format_time(ts):
+    return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class JobLogDialog(QDialog):
+    """Shows the logs of a URL's download runs, read through the job log index"""
+
+    def __init__(self, url, parent=None, reader=None):
+        super().__init__(parent)
+        self.url = url
+        self.reader = reader or JobLogReader()
+        self.init_ui()
+        self.load_runs()
+
+    def init_ui(self):
+        self.setWindowTitle("Job Log")
+        self.resize(820, 480)
+        layout = QVBoxLayout(self)
+
+        url_label = QLabel(self.url)
+        url_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        layout.addWidget(url_label)
+
+        top = QHBoxLayout()
+        top.addWidget(QLabel("Run:"))
+        self.run_combo = QComboBox()
+        self.run_combo.currentIndexChanged.connect(self.load_records)
+        top.addWidget(self.run_combo, 1)
+        layout.addLayout(top)
+
+        self.table = QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(["Time", "Stage", "Level", "Message"])
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        layout.addWidget(self.table)
+
+        bb = QDialogButtonBox(QDialogButtonBox.Close)
+        bb.rejected.connect(self.reject)
+        layout.addWidget(bb)
+
+    def load_runs(self):
+        self.run_combo.blockSignals(True)
+        self.run_combo.clear()
+        for run in self.reader.runs(url=self.url):
+            label = f"{format_time(run['started'])} - {run['stage'] or 'started'} ({run['lines']} lines)"
+            self.run_combo.addItem(label, run["run"])
+        self.run_combo.blockSignals(False)
+        if self.run_combo.count():
+            self.load_records()
+        else:
+            self.run_combo.addItem("No runs logged")
+            self.run_combo.setEnabled(False)
+
+    def load_records(self, *args):
+        run_id = self.run_combo.currentData()
+        records = self.reader.records(run_id) if run_id else []
+        self.table.setRowCount(len(records))
+        for row, record in enumerate(records):
+            level = record.get("level", "")
+            items = [format_time(record.get("ts", 0)), record.get("stage", ""), level, record.get("msg", "")]
+            for column, text in enumerate(items):
+                item = QTableWidgetItem(text)
+                if level in LEVEL_COLORS:
+                    item.setForeground(LEVEL_COLORS[level])
+                self.table.setItem(row, column, item)
+        self.table.resizeColumnsToContents()
+        self.table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
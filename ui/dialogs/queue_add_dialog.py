@@ -1,5 +1,5 @@
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QFormLayout, QCheckBox,
-                            QComboBox, QDialogButtonBox, QMessageBox, QTableWidgetItem)
+                            QComboBox, QDialogButtonBox, QMessageBox, QLineEdit)
 from PySide6.QtCore import Qt
 from ui.components.drag_drop_line_edit import DragDropLineEdit
 from core.downloader import DownloadTask
@@ -20,6 +20,10 @@ class QueueAddDialog(QDialog):
         self.audio_checkbox = QCheckBox("Audio Only")
         self.playlist_checkbox = QCheckBox("Playlist")
         self.subtitles_checkbox = QCheckBox("Download Subtitles")
+        self.subtitle_langs_edit = QLineEdit(", ".join(self.parent.user_profile.get_subtitle_languages()))
+        self.subtitle_langs_edit.setPlaceholderText("en, de, pt.*")
+        self.auto_subtitles_checkbox = QCheckBox("Allow Automatic Captions")
+        self.auto_subtitles_checkbox.setChecked(self.parent.user_profile.get_auto_subtitles())
         self.format_combo = QComboBox()
         self.format_combo.addItems(["mp4", "mkv", "webm", "flv", "avi"])
         
@@ -28,6 +32,8 @@ class QueueAddDialog(QDialog):
         frm.addRow(self.playlist_checkbox)
         frm.addRow("Video Format:", self.format_combo)
         frm.addRow(self.subtitles_checkbox)
+        frm.addRow("Subtitle Languages:", self.subtitle_langs_edit)
+        frm.addRow(self.auto_subtitles_checkbox)
         layout.addLayout(frm)
         
         bb = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
@@ -57,22 +63,13 @@ class QueueAddDialog(QDialog):
             output_format=output_format,
             audio_format=self.parent.user_profile.get_audio_format() if audio_only else None,
             audio_quality=self.parent.user_profile.get_audio_quality() if audio_only else "320",
-            from_queue=True
+            from_queue=True,
+            subtitle_languages=self.subtitle_langs_edit.text(),
+            auto_subtitles=self.auto_subtitles_checkbox.isChecked()
         )
         
-        if hasattr(self.parent, 'page_queue') and hasattr(self.parent.page_queue, 'queue_table'):
-            row = self.parent.page_queue.queue_table.rowCount()
-            self.parent.page_queue.queue_table.insertRow(row)
-            self.parent.page_queue.queue_table.setItem(row, 0, QTableWidgetItem("Fetching..."))
-            self.parent.page_queue.queue_table.setItem(row, 1, QTableWidgetItem("Fetching..."))
-            self.parent.page_queue.queue_table.setItem(row, 2, QTableWidgetItem(url))
-            
-            download_type = "Audio" if audio_only else "Video"
-            if playlist:
-                download_type += " - Playlist"
-            self.parent.page_queue.queue_table.setItem(row, 3, QTableWidgetItem(download_type))
-            self.parent.page_queue.queue_table.setItem(row, 4, QTableWidgetItem("0%"))
-            self.parent.run_task(task, row)
+        if hasattr(self.parent, 'page_queue') and hasattr(self.parent.page_queue, 'queue_model'):
+            self.parent.page_queue.add_tasks([task], start=True)
             self.accept()
         else:
             QMessageBox.warning(self, "Error", "Queue page not initialized properly.") 
\ No newline at end of file
@@ -0,0 +1,114 @@
+import time
+from datetime import datetime
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QTabWidget,
+                            QTableWidget, QTableWidgetItem, QHeaderView, QDialogButtonBox)
+from PySide6.QtCore import Qt, QThreadPool
+from core.analytics import format_bytes
+from ui.components.history_stats_worker import HistoryStatsWorker
+
+PERIODS = ["All time", "This month", "Last 30 days", "Last 7 days"]
+
+
+def period_start(period):
+    now = time.time()
+    if period == "This month":
+        return datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0).timestamp()
+    if period == "Last 30 days":
+        return now - 30 * 86400
+    if period == "Last 7 days":
+        return now - 7 * 86400
+    return None
+
+
+class StatsDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.parent = parent
+        self.generation = 0
+        self.worker = None
+        self.init_ui()
+        self.reload()
+
+    def init_ui(self):
+        self.setWindowTitle("Download Statistics")
+        self.resize(760, 520)
+        layout = QVBoxLayout(self)
+
+        top = QHBoxLayout()
+        top.addWidget(QLabel("Period:"))
+        self.period_combo = QComboBox()
+        self.period_combo.addItems(PERIODS)
+        self.period_combo.currentTextChanged.connect(lambda _: self.reload())
+        top.addWidget(self.period_combo)
+        top.addStretch()
+        layout.addLayout(top)
+
+        self.summary_label = QLabel("Loading...")
+        self.summary_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        layout.addWidget(self.summary_label)
+
+        group_headers = ["Name", "Downloads", "Size", "Failure Rate", "Median Speed"]
+        self.channel_table = self._make_table(group_headers)
+        self.host_table = self._make_table(group_headers)
+        self.hour_table = self._make_table(["Hour", "Downloads"])
+        tabs = QTabWidget()
+        tabs.addTab(self.channel_table, "Channels")
+        tabs.addTab(self.host_table, "Hosts")
+        tabs.addTab(self.hour_table, "Time of Day")
+        layout.addWidget(tabs)
+
+        bb = QDialogButtonBox(QDialogButtonBox.Close)
+        bb.rejected.connect(self.reject)
+        layout.addWidget(bb)
+
+    def _make_table(self, headers):
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        table.verticalHeader().setVisible(False)
+        return table
+
+    def reload(self):
+        self.generation += 1
+        self.summary_label.setText("Loading...")
+        self.worker = HistoryStatsWorker(self.generation, period_start(self.period_combo.currentText()))
+        self.worker.signals.finished.connect(self.on_stats)
+        self.worker.signals.error.connect(self.on_error)
+        QThreadPool.globalInstance().start(self.worker)
+
+    def on_error(self, generation, message):
+        if generation == self.generation:
+            self.summary_label.setText(f"Could not compute statistics: {message}")
+
+    def on_stats(self, generation, stats):
+        if generation != self.generation:
+            return
+        summary = (f"{stats.downloads} downloads ({stats.completed} completed, {stats.failed} failed, "
+                   f"{stats.cancelled} cancelled) | {format_bytes(stats.total_bytes)} | "
+                   f"failure rate {stats.failure_rate:.1%}")
+        if stats.throughput_percentiles:
+            summary += " | speed " + ", ".join(
+                f"p{p} {format_bytes(v)}/s" for p, v in stats.throughput_percentiles.items()
+            )
+        self.summary_label.setText(summary)
+        self._fill_groups(self.channel_table, stats.channels)
+        self._fill_groups(self.host_table, stats.hosts)
+        self._fill_rows(self.hour_table, [
+            (f"{hour:02d}:00", count) for hour, count in enumerate(stats.hour_histogram)
+        ])
+
+    def _fill_groups(self, table, groups):
+        self._fill_rows(table, [
+            (g.name, g.downloads, format_bytes(g.bytes), f"{g.failure_rate:.1%}",
+             f"{format_bytes(g.median_throughput)}/s" if g.median_throughput is not None else "-")
+            for g in groups
+        ])
+
+    def _fill_rows(self, table, rows):
+        table.setRowCount(len(rows))
+        for r, values in enumerate(rows):
+            for c, value in enumerate(values):
+                item = QTableWidgetItem()
+                item.setData(Qt.DisplayRole, value)
+                table.setItem(r, c, item)
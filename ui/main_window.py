@@ -5,7 +5,11 @@ from PySide6.QtGui import QAction, QIcon, QFont, QPixmap, QPainter, QColor
 from core.profile import UserProfile
 from core.utils import set_circular_pixmap, format_speed, format_time
 from core.downloader import DownloadTask, DownloadQueueWorker
+from core.download_activity import DownloadActivity
+from core.events import event_bus
+from core.queue_model import JobState
 from core.history import load_history_initial, save_history, add_history_entry, delete_selected_history, delete_all_history, search_history
+from core.history_writer import get_history_writer, stop_history_writer
 from core.utils import get_data_dir
 from core.version import get_version
 from core.updater import UpdateManager
@@ -39,6 +43,7 @@ class MainWindow(QMainWindow):
     status_signal = Signal(int, str)
     log_signal = Signal(str)
     info_signal = Signal(int, str, str)
+    state_signal = Signal(int, object)
     def __init__(self, ffmpeg_found=None, ffmpeg_path=None, service_registry=None):
         super().__init__()
         self.setWindowTitle(f"TikTokLabs bulk Downloader {get_version()}")
@@ -58,6 +63,7 @@ class MainWindow(QMainWindow):
         self.user_profile = UserProfile()
         self.thread_pool = QThreadPool()
         self.active_workers = []
+        self.queue_workers = {}
         self.max_concurrent_downloads = 6
         # Enforce parallelism limit globally for all downloads, including batch
         try:
@@ -68,6 +74,14 @@ class MainWindow(QMainWindow):
         self.status_signal.connect(self.update_status)
         self.log_signal.connect(self.append_log)
         self.info_signal.connect(self.update_queue_info)
+        self.state_signal.connect(self.update_job_state)
+        # Queue jobs show in the status bar together, refreshed on this timer rather than per update
+        self.queue_progress_timer = QTimer(self)
+        self.queue_progress_timer.setInterval(250)
+        self.queue_progress_timer.timeout.connect(self.update_queue_progress)
+        # Speeds of running downloads, from the download events workers publish on the bus
+        self.download_activity = DownloadActivity()
+        self.download_activity.subscribe(event_bus)
         self.theme_manager = ThemeManager(self)
         
        
@@ -185,23 +199,6 @@ class MainWindow(QMainWindow):
     def add_scheduled_dialog(self):
         dialog = ScheduleAddDialog(self)
         dialog.exec_()
-    def start_queue(self):
-        count_started = 0
-        for r in range(self.queue_table.rowCount()):
-            st_item = self.queue_table.item(r, 4)
-            if st_item and ("Queued" in st_item.text() or "0%" in st_item.text()):
-                if count_started < self.max_concurrent_downloads:
-                    url = self.queue_table.item(r, 2).text()
-                    typ = self.queue_table.item(r, 6).text().lower()
-                    audio = ("audio" in typ)
-                    playlist = ("playlist" in typ)
-                    current_format = "mp4"
-                    row_idx = r
-                    tsk = DownloadTask(url, self.user_profile.get_default_resolution(), self.user_profile.get_download_path(), self.user_profile.get_proxy(), audio_only=audio, playlist=playlist, output_format=current_format, audio_format=self.user_profile.get_audio_format() if audio else None, audio_quality=self.user_profile.get_audio_quality() if audio else "620", from_queue=True)
-                    self.run_task(tsk, row_idx)
-                    self.queue_table.setItem(r, 4, QTableWidgetItem("Started"))
-                    count_started += 1
-        self.append_log("Queue started.")
     def remove_scheduled_item(self):
         sel = set()
         for it in self.scheduler_table.selectedItems():
@@ -220,7 +217,7 @@ class MainWindow(QMainWindow):
                 s = (self.scheduler_table.item(r, 6).text() == "Yes")
                 audio = ("audio" in t)
                 task = DownloadTask(u, self.user_profile.get_default_resolution(), self.user_profile.get_download_path(), self.user_profile.get_proxy(), audio_only=audio, playlist=False, subtitles=s, audio_format=self.user_profile.get_audio_format() if audio else None, audio_quality=self.user_profile.get_audio_quality() if audio else "620", from_queue=True)
-                self.run_task(task, r)
+                self.run_task(task)
                 self.scheduler_table.setItem(r, 4, QTableWidgetItem("Started"))
     def start_download_simple(self, url_edit, audio=False, playlist=False):
         link = url_edit.text().strip()
@@ -230,12 +227,12 @@ class MainWindow(QMainWindow):
         task = DownloadTask(link, self.user_profile.get_default_resolution(), self.user_profile.get_download_path(), self.user_profile.get_proxy(), audio_only=audio, playlist=playlist, audio_format=self.user_profile.get_audio_format() if audio else None, audio_quality=self.user_profile.get_audio_quality() if audio else "620", from_queue=False)
         # History will be written directly by the downloader
         self.run_task(task, None)
-    def run_task(self, task, row):
+    def run_task(self, task, job_id=None, info=None):
         if task.playlist:
             self.tray_manager.show_playlist_indexing_message()
-            self.update_status(row, "Indexing Playlist...")
+            self.update_status(job_id, "Indexing Playlist...")
         else:
-            self.update_status(row, "Preparing Download...")
+            self.update_status(job_id, "Preparing Download...")
             self.tray_manager.show_message("Download", "Preparing to download...")
         
         # Ensure ffmpeg path is passed to task if available
@@ -245,23 +242,38 @@ class MainWindow(QMainWindow):
             except Exception:
                 pass
 
-        worker = DownloadQueueWorker(task, row, self.progress_signal, self.status_signal, self.log_signal, self.info_signal)
+        if task.subtitles and not task.subtitle_languages:
+            task.subtitle_languages = self.user_profile.get_subtitle_languages()
+
+        worker = DownloadQueueWorker(task, job_id, self.progress_signal, self.status_signal, self.log_signal, self.info_signal, self.state_signal, info)
+        if job_id:
+            self.queue_workers[job_id] = worker
         self.thread_pool.start(worker)
         self.active_workers.append(worker)
-    def update_progress(self, row, percent):
-        if row is not None and hasattr(self, 'page_queue') and hasattr(self.page_queue, 'queue_table'):
-            if row < self.page_queue.queue_table.rowCount():
-                self.page_queue.queue_table.setItem(row, 4, QTableWidgetItem(f"{int(percent)}%"))
+    def fetch_subtitles_only(self, urls):
+        """Fetch subtitles for already downloaded media without downloading the media again"""
+        for url in urls:
+            task = DownloadTask(url, self.user_profile.get_default_resolution(), self.user_profile.get_download_path(), self.user_profile.get_proxy(), subtitles=True, subtitles_only=True, subtitle_languages=self.user_profile.get_subtitle_languages(), auto_subtitles=self.user_profile.get_auto_subtitles())
+            worker = DownloadQueueWorker(task, None, self.progress_signal, self.status_signal, self.log_signal, self.info_signal)
+            self.thread_pool.start(worker)
+            self.active_workers.append(worker)
+        self.append_log(f"Fetching subtitles for {len(urls)} item(s).")
+    def update_progress(self, job_id, percent):
+        # Signals turn a missing job id into 0; queue job ids start at 1
+        if job_id and hasattr(self, 'page_queue'):
+            self.page_queue.queue_model.set_progress(job_id, percent)
+            return
         
         if not self.progress_bar.isVisible():
             self.progress_bar.setVisible(True)
             
         self.progress_bar.setValue(int(percent))
         self.progress_bar.setFormat(f"Downloading... {int(percent)}%")
-    def update_status(self, row, st):
-        if row is not None and hasattr(self, 'page_queue') and hasattr(self.page_queue, 'queue_table'):
-            if row < self.page_queue.queue_table.rowCount():
-                self.page_queue.queue_table.setItem(row, 4, QTableWidgetItem(st))
+    def update_status(self, job_id, st):
+        if job_id and hasattr(self, 'page_queue'):
+            self.page_queue.queue_model.set_status(job_id, st)
+            self.notify_status(st)
+            return
         
         if "Download Completed" in st:
             self.progress_bar.setVisible(True)
@@ -297,6 +309,8 @@ class MainWindow(QMainWindow):
             self.progress_bar.setVisible(False)
             self.progress_bar.setFormat("Ready")
             self.progress_bar.setValue(0)
+        self.notify_status(st)
+    def notify_status(self, st):
         if "Download Completed" in st:
             self.tray_manager.show_download_completed_message()
             # History page refreshes automatically via showEvent when visible
@@ -308,13 +322,47 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "Error", st)
         elif "Cancelled" in st:
             self.tray_manager.show_download_cancelled_message()
-    def update_queue_info(self, row, title, channel):
-        if row is not None and hasattr(self, 'page_queue') and hasattr(self.page_queue, 'queue_table'):
-            if row < self.page_queue.queue_table.rowCount():
-                self.page_queue.queue_table.setItem(row, 0, QTableWidgetItem(title))
-                self.page_queue.queue_table.setItem(row, 1, QTableWidgetItem(channel))
-                url = self.page_queue.queue_table.item(row, 2).text()
-                # History will be written directly by the downloader
+    def update_queue_info(self, job_id, title, channel):
+        if job_id and hasattr(self, 'page_queue'):
+            self.page_queue.queue_model.set_info(job_id, title, channel)
+    def update_queue_progress(self):
+        """Show the running queue jobs together in the status bar progress"""
+        model = self.page_queue.queue_model
+        counts = model.state_counts()
+        active = model.active_count()
+        finished = counts[JobState.DONE] + counts[JobState.FAILED] + counts[JobState.CANCELLED]
+        if active:
+            percent = int(model.active_progress())
+            speed = self.download_activity.total_speed()
+            rate = f" at {format_speed(speed)}" if speed else ""
+            self.progress_bar.setVisible(True)
+            self.progress_bar.setValue(percent)
+            self.progress_bar.setFormat(
+                f"{active} downloading: {percent}%{rate} | {finished} of {finished + active + counts[JobState.PENDING]} finished"
+            )
+            return
+        self.queue_progress_timer.stop()
+        self.progress_bar.setValue(100)
+        self.progress_bar.setFormat(f"Queue idle: {counts[JobState.DONE]} done, {counts[JobState.FAILED]} failed")
+        QTimer.singleShot(2200, self.hide_idle_queue_progress)
+    def hide_idle_queue_progress(self):
+        if not self.queue_progress_timer.isActive():
+            self.progress_bar.setVisible(False)
+            self.progress_bar.setFormat("Ready")
+            self.progress_bar.setValue(0)
+    def update_job_state(self, job_id, state):
+        if state.is_active and not self.queue_progress_timer.isActive():
+            self.queue_progress_timer.start()
+        if state.is_finished:
+            worker = self.queue_workers.pop(job_id, None)
+            if worker in self.active_workers:
+                self.active_workers.remove(worker)
+        if hasattr(self, 'page_queue'):
+            self.page_queue.on_job_state(job_id, state)
+    def cancel_job(self, job_id):
+        worker = self.queue_workers.get(job_id)
+        if worker is not None:
+            worker.cancel = True
     def open_download_folder(self):
         folder = self.user_profile.get_download_path()
         try:
@@ -343,12 +391,11 @@ class MainWindow(QMainWindow):
         if os.path.exists(self.user_profile.profile_path):
             os.remove(self.user_profile.profile_path)
         
-        from core.history import HISTORY_FILE
-        if os.path.exists(HISTORY_FILE):
-            os.remove(HISTORY_FILE)
+        from core.history import reset_history
+        reset_history()
             
-        if hasattr(self, 'page_history') and hasattr(self.page_history, 'history_table'):
-            self.page_history.history_table.setRowCount(0)
+        if hasattr(self, 'page_history') and hasattr(self.page_history, 'history_model'):
+            self.page_history.history_model.reload()
             
         if self.user_profile.data.get("profile_picture") and os.path.exists(self.user_profile.data["profile_picture"]):
             try:
@@ -369,6 +416,8 @@ class MainWindow(QMainWindow):
         val = self.concurrent_combo.currentText()
         self.max_concurrent_downloads = int(val)
         self.append_log(f"Max concurrent downloads set to {val}")
+        if hasattr(self, 'page_queue'):
+            self.page_queue.dispatcher.set_max_concurrent(self.max_concurrent_downloads)
         try:
             self.thread_pool.setMaxThreadCount(self.max_concurrent_downloads)
         except Exception:
@@ -429,13 +478,20 @@ class MainWindow(QMainWindow):
             w.cancel = True
     def initialize_history(self):
        
-        if hasattr(self, 'page_history') and hasattr(self.page_history, 'history_table'):
-            from core.history import load_history_initial
-            load_history_initial(self.page_history.history_table)
+        if hasattr(self, 'page_history') and hasattr(self.page_history, 'history_model'):
+            self.page_history.refresh()
 
     def quit_app(self):
         if hasattr(self, 'tray_manager'):
             self.tray_manager.hide()
+        stop_history_writer()
+        if hasattr(self, 'page_queue'):
+            self.page_queue.prefetcher.stop()
+            if self.page_queue.ingest_worker is not None:
+                self.page_queue.ingest_worker.cancel()
+            self.page_queue.recorder.flush()
+        if hasattr(self, 'page_scheduler'):
+            self.page_scheduler.watch_manager.stop()
         QApplication.quit()
 
     def closeEvent(self, event):
@@ -459,9 +515,7 @@ class MainWindow(QMainWindow):
         return QMessageBox.question(self, title, message) == QMessageBox.Yes
 
     def add_history_entry(self, url, title="", channel=""):
-        if hasattr(self, 'page_history') and hasattr(self.page_history, 'history_table'):
-            from core.history import add_history_entry
-            add_history_entry(self.page_history.history_table, title, channel, url, True)
+        get_history_writer().post(title, channel, url)
 
     def check_for_updates(self):
         self.update_manager.check_for_updates()
@@ -1,15 +1,31 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                            QTableWidget, QTableWidgetItem, QHeaderView, 
-                            QCheckBox, QLineEdit)
-from PySide6.QtCore import Qt
+                            QTableView, QHeaderView, QAbstractItemView, QLineEdit, QFileDialog)
+from PySide6.QtCore import Qt, QThreadPool, QTimer
 from PySide6.QtGui import QFont
 from ui.components.animated_button import AnimatedButton
-from core.history import delete_selected_history, delete_all_history, search_history, load_history_initial
+from core.history_model import HistoryTableModel
+from ui.components.history_io_worker import HistoryIOWorker
+from ui.components.history_search_worker import HistorySearchWorker
+from ui.dialogs.stats_dialog import StatsDialog
+from core.config import config_manager
+from core.history_writer import get_history_writer
+
+HISTORY_FILE_FILTER = "JSON Lines (*.jsonl *.jsonl.gz);;CSV (*.csv *.csv.gz)"
 
 class HistoryPage(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
+        # Searches run one at a time off the UI thread; results of superseded searches are dropped
+        self.search_pool = QThreadPool(self)
+        self.search_pool.setMaxThreadCount(1)
+        self.search_generation = 0
+        self.search_worker = None
+        self.io_worker = None
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(config_manager.config.ui.SEARCH_DEBOUNCE_DELAY)
+        self.search_timer.timeout.connect(self.search_history_in_table)
         self.init_ui()
 
     def init_ui(self):
@@ -21,52 +37,151 @@ class HistoryPage(QWidget):
         lbl.setAlignment(Qt.AlignCenter)
         layout.addWidget(lbl)
         
-        # History table
-        self.history_table = QTableWidget()
-        self.history_table.setColumnCount(3)
-        self.history_table.setHorizontalHeaderLabels(["Title", "Channel", "URL"])
-        hh = self.history_table.horizontalHeader()
+        # History table, rows are fetched from the store as the view scrolls
+        self.history_model = HistoryTableModel(parent=self)
+        get_history_writer().signals.entries_added.connect(self.history_model.add_entries)
+        self.history_view = QTableView()
+        self.history_view.setModel(self.history_model)
+        self.history_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.history_view.setSortingEnabled(True)
+        self.history_view.sortByColumn(3, Qt.DescendingOrder)
+        self.history_view.verticalHeader().setDefaultSectionSize(24)
+        self.history_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        hh = self.history_view.horizontalHeader()
         hh.setSectionResizeMode(0, QHeaderView.Stretch)  # Title column stretches
-        hh.setSectionResizeMode(1, QHeaderView.ResizeToContents)  # Channel column fits content
+        hh.setSectionResizeMode(1, QHeaderView.Interactive)  # Sized once, not measured per row
         hh.setSectionResizeMode(2, QHeaderView.Stretch)  # URL column stretches
-        layout.addWidget(self.history_table)
+        hh.setSectionResizeMode(3, QHeaderView.Interactive)
+        hh.resizeSection(1, 160)
+        hh.resizeSection(3, 130)
+        layout.addWidget(self.history_view)
         
         # Buttons
         hl = QHBoxLayout()
         del_sel_btn = AnimatedButton("Delete Selected")
-        del_sel_btn.clicked.connect(lambda: delete_selected_history(self.history_table, self.parent.append_log))
+        del_sel_btn.clicked.connect(self.delete_selected)
         del_all_btn = AnimatedButton("Delete All")
-        del_all_btn.clicked.connect(lambda: delete_all_history(self.history_table, self.confirm_delete_all, self.parent.append_log))
+        del_all_btn.clicked.connect(self.delete_all)
+        subs_btn = AnimatedButton("Fetch Subtitles")
+        subs_btn.setToolTip("Fetch subtitles for the selected entries without downloading the media again")
+        subs_btn.clicked.connect(self.fetch_subtitles_for_selected)
         hl.addWidget(del_sel_btn)
         hl.addWidget(del_all_btn)
+        export_btn = AnimatedButton("Export...")
+        export_btn.setToolTip("Export history to a JSON Lines or CSV file (add .gz to compress)")
+        export_btn.clicked.connect(self.export_history)
+        import_btn = AnimatedButton("Import...")
+        import_btn.clicked.connect(self.import_history)
+        stats_btn = AnimatedButton("Statistics")
+        stats_btn.setToolTip("Totals, speeds and failure rates per channel and host")
+        stats_btn.clicked.connect(self.show_statistics)
+        hl.addWidget(subs_btn)
+        hl.addWidget(export_btn)
+        hl.addWidget(import_btn)
+        hl.addWidget(stats_btn)
         layout.addLayout(hl)
         
         # Search
         s_hl = QHBoxLayout()
         self.search_hist_edit = QLineEdit()
-        self.search_hist_edit.setPlaceholderText("Search in history (title, channel, or URL)...")
+        self.search_hist_edit.setPlaceholderText("Search in history (title, channel, URL or date)...")
+        self.search_hist_edit.textChanged.connect(lambda _: self.search_timer.start())
+        self.search_hist_edit.returnPressed.connect(self.search_history_in_table)
         s_btn = AnimatedButton("Search")
         s_btn.clicked.connect(self.search_history_in_table)
         s_hl.addWidget(self.search_hist_edit)
         s_hl.addWidget(s_btn)
         layout.addLayout(s_hl)
         
-        layout.addStretch()
-        
-        # Load history
-        load_history_initial(self.history_table)
-
     def showEvent(self, event):
         
         super().showEvent(event)
-        self.history_table.setRowCount(0)  
-        load_history_initial(self.history_table)  
-        if self.parent:
-            self.parent.append_log("History refreshed")
+        if self.history_model.is_searching():
+            self.search_history_in_table()
+        else:
+            self.history_model.refresh()
+
+    def refresh(self):
+        """Pick up entries written to the store since the model last looked"""
+        if not self.history_model.is_searching():
+            self.history_model.refresh()
 
     def search_history_in_table(self):
-        txt = self.search_hist_edit.text().lower().strip()
-        search_history(self.history_table, txt)
+        self.search_timer.stop()
+        txt = self.search_hist_edit.text().strip()
+        self.search_generation += 1
+        self.search_pool.clear()
+        if not txt:
+            self.history_model.clear_search()
+            return
+        self.search_worker = HistorySearchWorker(self.search_generation, txt, config_manager.config.ui.HISTORY_SEARCH_LIMIT)
+        self.search_worker.signals.finished.connect(self.on_search_finished)
+        self.search_worker.signals.error.connect(self.on_search_error)
+        self.search_pool.start(self.search_worker)
+
+    def on_search_finished(self, generation, query, entries):
+        if generation != self.search_generation:
+            return
+        self.history_model.set_search_results(query, entries)
+
+    def on_search_error(self, generation, message):
+        if generation == self.search_generation and self.parent:
+            self.parent.append_log(f"History search failed: {message}")
+
+    def selected_entries(self):
+        rows = sorted(index.row() for index in self.history_view.selectionModel().selectedRows())
+        return [self.history_model.entry(r) for r in rows]
+
+    def delete_selected(self):
+        entries = self.selected_entries()
+        self.history_model.remove_ids(e["id"] for e in entries)
+        self.parent.append_log(f"Deleted {len(entries)} history entries.")
+
+    def delete_all(self):
+        if self.confirm_delete_all():
+            self.history_model.clear_all()
+            self.parent.append_log("All history deleted.")
+
+    def fetch_subtitles_for_selected(self):
+        urls = [e["url"].strip() for e in self.selected_entries() if e["url"].strip()]
+        if not urls:
+            self.parent.show_warning("Fetch Subtitles", "Select one or more history entries first.")
+            return
+        self.parent.fetch_subtitles_only(urls)
+
+    def export_history(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export History", "history.jsonl", HISTORY_FILE_FILTER)
+        if path:
+            self.run_history_io("export", path)
+
+    def import_history(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Import History", "", HISTORY_FILE_FILTER)
+        if path:
+            self.run_history_io("import", path)
+
+    def run_history_io(self, action, path):
+        if self.io_worker is not None:
+            self.parent.show_warning("History", "A history export or import is already running.")
+            return
+        self.io_worker = HistoryIOWorker(action, path)
+        self.io_worker.signals.finished.connect(self.on_history_io_finished)
+        self.io_worker.signals.error.connect(self.on_history_io_error)
+        self.parent.append_log(f"History {action} started: {path}")
+        QThreadPool.globalInstance().start(self.io_worker)
+
+    def on_history_io_finished(self, action, count):
+        self.io_worker = None
+        verb = "Exported" if action == "export" else "Imported"
+        self.parent.append_log(f"{verb} {count} history entries.")
+        if action == "import":
+            self.refresh()
+
+    def on_history_io_error(self, action, message):
+        self.io_worker = None
+        self.parent.show_warning("History", f"History {action} failed: {message}")
+
+    def show_statistics(self):
+        StatsDialog(self).exec()
 
     def confirm_delete_all(self):
         return self.parent.show_question("Delete All", "Are you sure?") 
\ No newline at end of file
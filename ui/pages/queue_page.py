@@ -1,17 +1,56 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                            QTableWidget, QTableWidgetItem, QHeaderView,
-                            QDialog, QFormLayout, QComboBox, QCheckBox)
-from PySide6.QtCore import Qt
+                            QTableView, QHeaderView, QAbstractItemView, QProgressBar,
+                            QDialog, QFormLayout, QComboBox, QCheckBox, QLineEdit)
+from PySide6.QtCore import Qt, QThreadPool, QTimer
 from PySide6.QtGui import QFont
 from ui.components.animated_button import AnimatedButton
 from ui.dialogs.batch_add_dialog import BatchAddDialog
+from ui.dialogs.job_log_dialog import JobLogDialog
 from ui.components.drag_drop_line_edit import DragDropLineEdit
 from core.downloader import DownloadTask
+from core.queue_model import COLUMNS, JOB_ID_ROLE, JobState, QueueTableModel
+from core.queue_dispatcher import DispatchMode, QueueDispatcher
+from core.metadata_prefetch import MetadataPrefetcher
+from core.queue_ingest import QueueIngestWorker
+from core.queue_store import QueueRecorder, get_queue_store
+from core.throttle import ThrottleController, ThrottleProfile
+from ui.components.queue_restore_worker import QueueRestoreWorker
+from ui.components.progress_delegate import ProgressDelegate
 
 class QueuePage(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
+        self.queue_model = QueueTableModel(self)
+        # Titles, sizes etc. are fetched on a separate pool, not in download slots
+        self.prefetcher = MetadataPrefetcher(self.queue_model, parent=self)
+        self.dispatcher = QueueDispatcher(
+            self.queue_model,
+            lambda job: self.parent.run_task(job.task, job.id, self.prefetcher.take_info(job.id)),
+            self.parent.max_concurrent_downloads,
+            self
+        )
+        self.dispatcher.mode_changed.connect(self.on_dispatch_mode)
+        self.dispatcher.drained.connect(lambda: self.parent.append_log("Queue drained: running downloads finished."))
+        # Time-of-day limits; outside every profile window the manual settings apply
+        self.throttle = ThrottleController(
+            self.dispatcher,
+            default=ThrottleProfile("Manual", max_concurrent=self.parent.max_concurrent_downloads),
+            parent=self
+        )
+        self.throttle.profile_changed.connect(self.on_throttle_profile)
+        self.apply_throttle_profiles(self.parent.user_profile.get_throttle_profiles())
+        # The saved queue is loaded in the background; new ids continue after the saved ones
+        self.queue_store = get_queue_store()
+        self.queue_model.reserve_ids(self.queue_store.max_id())
+        self.recorder = QueueRecorder(self.queue_model, self.queue_store, parent=self)
+        self.restore_worker = None
+        QTimer.singleShot(0, self.restore_queue)
+        self.ingest_worker = None
+        self._ingest_start = False
+        self._ingested = 0
+        # Running jobs the user paused; their workers report CANCELLED once stopped
+        self._pausing = set()
         self.init_ui()
 
     def init_ui(self):
@@ -24,16 +63,28 @@ class QueuePage(QWidget):
         layout.addWidget(lbl)
         
         
-        self.queue_table = QTableWidget()
-        self.queue_table.setColumnCount(5)
-        self.queue_table.setHorizontalHeaderLabels(["Title","Channel","URL","Type","Progress"])
-        hh = self.queue_table.horizontalHeader()
+        self.queue_view = QTableView()
+        self.queue_view.setModel(self.queue_model)
+        self.queue_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.queue_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.queue_view.verticalHeader().setVisible(False)
+        self.progress_delegate = ProgressDelegate(self.queue_view)
+        self.queue_view.setItemDelegateForColumn(COLUMNS.index(("Progress", "progress")), self.progress_delegate)
+        hh = self.queue_view.horizontalHeader()
         hh.setSectionResizeMode(0, QHeaderView.Stretch)
-        hh.setSectionResizeMode(1, QHeaderView.ResizeToContents)
+        hh.setSectionResizeMode(1, QHeaderView.Interactive)
         hh.setSectionResizeMode(2, QHeaderView.Stretch)
-        hh.setSectionResizeMode(3, QHeaderView.ResizeToContents)
-        hh.setSectionResizeMode(4, QHeaderView.Stretch)
-        layout.addWidget(self.queue_table)
+        hh.setSectionResizeMode(3, QHeaderView.Interactive)
+        hh.setSectionResizeMode(4, QHeaderView.Interactive)
+        hh.setSectionResizeMode(5, QHeaderView.Interactive)
+        hh.setSectionResizeMode(6, QHeaderView.Interactive)
+        hh.setSectionResizeMode(7, QHeaderView.Stretch)
+        layout.addWidget(self.queue_view)
+
+        self.ingest_bar = QProgressBar()
+        self.ingest_bar.setTextVisible(True)
+        self.ingest_bar.hide()
+        layout.addWidget(self.ingest_bar)
         
         
         hl = QHBoxLayout()
@@ -43,13 +94,40 @@ class QueuePage(QWidget):
         b_batch.clicked.connect(self.open_batch_add_dialog)
         b_start = AnimatedButton("Start Queue")
         b_start.clicked.connect(self.start_queue)
+        self.b_pause_queue = AnimatedButton("Pause Queue")
+        self.b_pause_queue.setToolTip("Stop starting new downloads; running ones continue")
+        self.b_pause_queue.clicked.connect(self.toggle_dispatch)
+        b_drain = AnimatedButton("Finish Running")
+        b_drain.setToolTip("Let running downloads finish, then stop the queue")
+        b_drain.clicked.connect(self.dispatcher.drain)
         b_cancel = AnimatedButton("Cancel All")
-        b_cancel.clicked.connect(self.parent.cancel_active)
+        b_cancel.clicked.connect(self.cancel_all)
         hl.addWidget(b_add)
         hl.addWidget(b_batch)
         hl.addWidget(b_start)
+        hl.addWidget(self.b_pause_queue)
+        hl.addWidget(b_drain)
         hl.addWidget(b_cancel)
         layout.addLayout(hl)
+
+        hl2 = QHBoxLayout()
+        b_pause = AnimatedButton("Pause")
+        b_pause.clicked.connect(self.pause_selected)
+        b_resume = AnimatedButton("Resume / Retry")
+        b_resume.clicked.connect(self.resume_selected)
+        b_remove = AnimatedButton("Remove")
+        b_remove.clicked.connect(self.remove_selected)
+        b_clear = AnimatedButton("Clear Finished")
+        b_clear.clicked.connect(self.queue_model.clear_finished)
+        b_job_log = AnimatedButton("Job Log")
+        b_job_log.setToolTip("Show the logs of the selected download's runs")
+        b_job_log.clicked.connect(self.show_job_log)
+        hl2.addWidget(b_pause)
+        hl2.addWidget(b_resume)
+        hl2.addWidget(b_remove)
+        hl2.addWidget(b_clear)
+        hl2.addWidget(b_job_log)
+        layout.addLayout(hl2)
         
         layout.addStretch()
 
@@ -64,6 +142,10 @@ class QueuePage(QWidget):
         c_audio = QCheckBox("Audio Only")
         c_pl = QCheckBox("Playlist")
         c_subs = QCheckBox("Download Subtitles")
+        subs_langs_edit = QLineEdit(", ".join(self.parent.user_profile.get_subtitle_languages()))
+        subs_langs_edit.setPlaceholderText("en, de, pt.*")
+        c_auto_subs = QCheckBox("Allow Automatic Captions")
+        c_auto_subs.setChecked(self.parent.user_profile.get_auto_subtitles())
         fmt_combo = QComboBox()
         fmt_combo.addItems(["mp4","mkv","webm","flv","avi"])
         
@@ -72,6 +154,8 @@ class QueuePage(QWidget):
         frm.addRow(c_pl)
         frm.addRow("Video Format:", fmt_combo)
         frm.addRow(c_subs)
+        frm.addRow("Subtitle Languages:", subs_langs_edit)
+        frm.addRow(c_auto_subs)
         ly.addLayout(frm)
         
         b_ok = AnimatedButton("Add")
@@ -104,22 +188,12 @@ class QueuePage(QWidget):
                 output_format=output_format,
                 audio_format=self.parent.user_profile.get_audio_format() if audio_only else None,
                 audio_quality=self.parent.user_profile.get_audio_quality() if audio_only else "320",
-                from_queue=True
+                from_queue=True,
+                subtitle_languages=subs_langs_edit.text(),
+                auto_subtitles=c_auto_subs.isChecked()
             )
             
-            row = self.queue_table.rowCount()
-            self.queue_table.insertRow(row)
-            self.queue_table.setItem(row, 0, QTableWidgetItem("Fetching..."))
-            self.queue_table.setItem(row, 1, QTableWidgetItem("Fetching..."))
-            self.queue_table.setItem(row, 2, QTableWidgetItem(url))
-            
-            download_type = "Audio" if audio_only else "Video"
-            if playlist:
-                download_type += " - Playlist"
-            self.queue_table.setItem(row, 3, QTableWidgetItem(download_type))
-            self.queue_table.setItem(row, 4, QTableWidgetItem("0%"))
-            
-            self.parent.run_task(task, row)
+            self.add_tasks([task], start=True)
             d.accept()
             
         def on_cancel():
@@ -133,34 +207,142 @@ class QueuePage(QWidget):
         dlg = BatchAddDialog(self.parent)
         dlg.exec()
 
+    def add_tasks(self, tasks, start=False):
+        """Append tasks to the queue; start=True runs the queue unless dispatch is paused"""
+        job_ids = self.queue_model.add_jobs(tasks)
+        if start and self.dispatcher.mode != DispatchMode.PAUSED:
+            self.dispatcher.start()
+        return job_ids
+
+    def ingest_urls(self, text, options, start=False):
+        """
+        Queue a task per URL in text, parsed and added in chunks off the GUI thread
+
+        options are the DownloadTask arguments besides the URL. Returns False if the
+        previous batch is still going in.
+        """
+        if self.ingest_worker is not None:
+            return False
+        self._ingest_start = start
+        self._ingested = 0
+        self.ingest_worker = QueueIngestWorker(text, options)
+        self.ingest_worker.signals.chunk.connect(self.on_ingest_chunk)
+        self.ingest_worker.signals.finished.connect(self.on_ingest_finished)
+        self.ingest_worker.signals.error.connect(lambda message: self.parent.append_log(f"Adding URLs failed: {message}"))
+        self.ingest_bar.setRange(0, 0)
+        self.ingest_bar.setFormat("Reading URLs...")
+        self.ingest_bar.show()
+        QThreadPool.globalInstance().start(self.ingest_worker)
+        return True
+
+    def on_ingest_chunk(self, tasks, done, total):
+        worker = self.ingest_worker
+        if worker is None or worker.cancelled:
+            return
+        self.add_tasks(tasks, start=self._ingest_start)
+        self._ingested += len(tasks)
+        self.ingest_bar.setRange(0, total)
+        self.ingest_bar.setValue(done)
+        self.ingest_bar.setFormat(f"Adding URLs: {done:,} / {total:,}")
+        worker.chunk_done()
+
+    def on_ingest_finished(self, done, cancelled):
+        self.ingest_worker = None
+        self.ingest_bar.hide()
+        if cancelled:
+            self.parent.append_log(f"Stopped adding URLs; {self._ingested} added to the queue.")
+        elif self._ingested:
+            self.parent.append_log(f"Added {self._ingested} URL(s) to the queue.")
+        else:
+            self.parent.show_warning("Error", "No valid URLs found.")
+
     def start_queue(self):
-        count_started = 0
-        for row in range(self.queue_table.rowCount()):
-            status_item = self.queue_table.item(row, 4)
-            if status_item and ("Queued" in status_item.text() or "0%" in status_item.text()):
-                if count_started < self.parent.max_concurrent_downloads:
-                    url = self.queue_table.item(row, 2).text()
-                    type_text = self.queue_table.item(row, 3).text().lower()
-                    audio_only = ("audio" in type_text)
-                    playlist = ("playlist" in type_text)
-                    
-                    output_format = self.parent.user_profile.get_audio_format() if audio_only else "mp4"
-                    
-                    task = DownloadTask(
-                        url,
-                        self.parent.user_profile.get_default_resolution(),
-                        self.parent.user_profile.get_download_path(),
-                        self.parent.user_profile.get_proxy(),
-                        audio_only=audio_only,
-                        playlist=playlist,
-                        output_format=output_format,
-                        audio_format=self.parent.user_profile.get_audio_format() if audio_only else None,
-                        audio_quality=self.parent.user_profile.get_audio_quality() if audio_only else "320",
-                        from_queue=True
-                    )
-                    
-                    self.parent.run_task(task, row)
-                    self.queue_table.setItem(row, 4, QTableWidgetItem("Started"))
-                    count_started += 1
-                    
-        self.parent.append_log("Queue started.") 
\ No newline at end of file
+        self.dispatcher.start()
+        self.parent.append_log(
+            f"Queue started: {self.queue_model.active_count()} running, {self.queue_model.pending_count()} waiting."
+        )
+
+    def toggle_dispatch(self):
+        if self.dispatcher.mode == DispatchMode.PAUSED:
+            self.dispatcher.start()
+        else:
+            self.dispatcher.pause()
+
+    def on_dispatch_mode(self, mode):
+        self.b_pause_queue.setText("Resume Queue" if mode == DispatchMode.PAUSED else "Pause Queue")
+        if mode != DispatchMode.RUNNING:
+            self.parent.append_log(f"Queue {mode.value}.")
+
+    def apply_throttle_profiles(self, profiles_data):
+        """Use the saved throttle profiles, skipping invalid ones; returns the ones used"""
+        profiles = []
+        for data in profiles_data:
+            try:
+                profiles.append(ThrottleProfile.from_dict(data))
+            except ValueError as e:
+                self.parent.append_log(f"Ignoring throttle profile '{data.get('name', '')}': {e}")
+        self.throttle.set_profiles(profiles)
+        return profiles
+
+    def on_throttle_profile(self, profile):
+        # Running downloads keep their threads; a lower limit only holds back new ones
+        self.parent.thread_pool.setMaxThreadCount(profile.max_concurrent)
+        if profile is not self.throttle.schedule.default:
+            self.parent.append_log(f"Throttle profile '{profile.name}' in force.")
+
+    def restore_queue(self):
+        self.restore_worker = QueueRestoreWorker(self.queue_store, self.parent.user_profile.get_resume_queue())
+        self.restore_worker.signals.chunk.connect(self.on_restore_chunk)
+        self.restore_worker.signals.finished.connect(self.on_restore_finished)
+        self.restore_worker.signals.error.connect(lambda message: self.parent.append_log(f"Could not restore queue: {message}"))
+        QThreadPool.globalInstance().start(self.restore_worker)
+
+    def on_restore_chunk(self, jobs, interrupted):
+        self.queue_model.restore_jobs(jobs)
+        self.recorder.mark_changed(interrupted)
+
+    def on_restore_finished(self, restored, interrupted):
+        self.restore_worker = None
+        if not restored:
+            return
+        self.parent.append_log(f"Restored {restored} queued download(s), {interrupted} interrupted.")
+        if interrupted and self.parent.user_profile.get_resume_queue():
+            self.dispatcher.start()
+
+    def on_job_state(self, job_id, state):
+        """State reported by a worker"""
+        if state == JobState.CANCELLED and job_id in self._pausing:
+            state = JobState.PAUSED
+        if state.is_finished or state == JobState.PAUSED:
+            self._pausing.discard(job_id)
+        self.queue_model.set_state(job_id, state)
+
+    def selected_job_ids(self):
+        rows = {index.row() for index in self.queue_view.selectionModel().selectedRows()}
+        return [self.queue_model.index(row, 0).data(JOB_ID_ROLE) for row in sorted(rows)]
+
+    def pause_selected(self):
+        for job_id in self.queue_model.pause(self.selected_job_ids()):
+            self._pausing.add(job_id)
+            self.parent.cancel_job(job_id)
+
+    def show_job_log(self):
+        job = next((self.queue_model.job(job_id) for job_id in self.selected_job_ids()), None)
+        if job is not None:
+            JobLogDialog(job.task.url, self).exec()
+
+    def resume_selected(self):
+        self.queue_model.resume(self.selected_job_ids())
+
+    def remove_selected(self):
+        for job in self.queue_model.remove_jobs(self.selected_job_ids()):
+            self._pausing.discard(job.id)
+            if job.state.is_active:
+                self.parent.cancel_job(job.id)
+
+    def cancel_all(self):
+        if self.ingest_worker is not None:
+            self.ingest_worker.cancel()
+        self.dispatcher.pause()
+        self.queue_model.cancel_pending()
+        self.parent.cancel_active()
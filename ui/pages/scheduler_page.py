@@ -1,19 +1,38 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                             QTableWidget, QTableWidgetItem, QHeaderView,
                             QDialog, QFormLayout, QCheckBox, QDateTimeEdit,
-                            QComboBox)
-from PySide6.QtCore import Qt, QDateTime, QTimer
+                            QComboBox, QPlainTextEdit)
+from PySide6.QtCore import Qt, QDateTime
 from PySide6.QtGui import QFont
+import time
 from ui.components.animated_button import AnimatedButton
 from ui.components.drag_drop_line_edit import DragDropLineEdit
+from core.config import config_manager
 from core.downloader import DownloadTask
+from core.queue_ingest import build_tasks, parse_urls
+from core.schedule_rules import parse_rule
+from core.schedule_store import get_schedule_store
+from core.scheduler import CatchUpPolicy, Scheduler, plan_catch_up
+from core.watch import WatchManager
+
+
+CATCH_UP_CHOICES = [("Run all missed", "all"), ("Run latest only", "latest"), ("Skip missed", "skip")]
+
+
+def format_timestamp(timestamp, seconds=False):
+    if not timestamp:
+        return ""
+    return QDateTime.fromSecsSinceEpoch(int(timestamp)).toString("yyyy-MM-dd HH:mm:ss" if seconds else "yyyy-MM-dd HH:mm")
+
 
 class SchedulerPage(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
+        self.status_items = {}
+        self.watch_items = {}
         self.init_ui()
-        self.setup_timer()
+        self.setup_scheduler()
 
     def init_ui(self):
         layout = QVBoxLayout(self)
@@ -24,8 +43,8 @@ class SchedulerPage(QWidget):
         layout.addWidget(lbl)
         
         self.scheduler_table = QTableWidget()
-        self.scheduler_table.setColumnCount(6)
-        self.scheduler_table.setHorizontalHeaderLabels(["Datetime","URL","Type","Resolution","Subtitles","Status"])
+        self.scheduler_table.setColumnCount(7)
+        self.scheduler_table.setHorizontalHeaderLabels(["Datetime","URL","Type","Resolution","Subtitles","Status","Repeat"])
         hh = self.scheduler_table.horizontalHeader()
         hh.setSectionResizeMode(0, QHeaderView.ResizeToContents)
         hh.setSectionResizeMode(1, QHeaderView.Stretch)
@@ -33,6 +52,7 @@ class SchedulerPage(QWidget):
         hh.setSectionResizeMode(3, QHeaderView.ResizeToContents)
         hh.setSectionResizeMode(4, QHeaderView.ResizeToContents)
         hh.setSectionResizeMode(5, QHeaderView.ResizeToContents)
+        hh.setSectionResizeMode(6, QHeaderView.ResizeToContents)
         layout.addWidget(self.scheduler_table)
         
         hl = QHBoxLayout()
@@ -40,16 +60,60 @@ class SchedulerPage(QWidget):
         b_add.clicked.connect(self.add_scheduled_dialog)
         b_remove = AnimatedButton("Remove Selected")
         b_remove.clicked.connect(self.remove_scheduled_item)
+        self.catch_up_combo = QComboBox()
+        for label, policy in CATCH_UP_CHOICES:
+            self.catch_up_combo.addItem(label, policy)
+        self.catch_up_combo.setCurrentIndex(max(0, self.catch_up_combo.findData(self.parent.user_profile.get_catch_up_policy())))
+        self.catch_up_combo.currentIndexChanged.connect(
+            lambda idx: self.parent.user_profile.set_catch_up_policy(self.catch_up_combo.itemData(idx)))
+        self.catch_up_combo.setToolTip(
+            "Scheduled runs that came due while the app was closed:\n"
+            "• Run all missed - every missed run of a repeating download\n"
+            "• Run latest only - one run of each missed download\n"
+            "• Skip missed - repeating downloads carry on from their next run\n\n"
+            "Missed runs start shortly after startup, one at a time, spaced apart"
+        )
         hl.addWidget(b_add)
         hl.addWidget(b_remove)
+        hl.addWidget(QLabel("Missed while closed:"))
+        hl.addWidget(self.catch_up_combo)
         layout.addLayout(hl)
         
-        layout.addStretch()
+        watch_lbl = QLabel("Watched Channels and Profiles")
+        watch_lbl.setFont(QFont("Arial", 14, QFont.Bold))
+        layout.addWidget(watch_lbl)
+        
+        self.watch_table = QTableWidget()
+        self.watch_table.setColumnCount(6)
+        self.watch_table.setHorizontalHeaderLabels(["URL","Rule","Next Poll","Last Poll","Found","Status"])
+        wh = self.watch_table.horizontalHeader()
+        wh.setSectionResizeMode(0, QHeaderView.Stretch)
+        for column in range(1, 6):
+            wh.setSectionResizeMode(column, QHeaderView.ResizeToContents)
+        layout.addWidget(self.watch_table)
+        
+        wl = QHBoxLayout()
+        b_watch = AnimatedButton("Add Watch")
+        b_watch.clicked.connect(self.add_watch_dialog)
+        b_poll = AnimatedButton("Poll Now")
+        b_poll.clicked.connect(self.poll_selected_watches)
+        b_unwatch = AnimatedButton("Remove Watch")
+        b_unwatch.clicked.connect(self.remove_selected_watches)
+        wl.addWidget(b_watch)
+        wl.addWidget(b_poll)
+        wl.addWidget(b_unwatch)
+        layout.addLayout(wl)
 
-    def setup_timer(self):
-        self.scheduler_timer = QTimer()
-        self.scheduler_timer.timeout.connect(self.check_scheduled_downloads)
-        self.scheduler_timer.start(10000) 
+    def setup_scheduler(self):
+        self.scheduler = Scheduler(parent=self)
+        self.scheduler.job_due.connect(self.start_scheduled_download)
+        self.schedule_store = get_schedule_store()
+        self.restore_schedule()
+        self.watch_manager = WatchManager(self.schedule_store, parent=self)
+        self.watch_manager.new_entries.connect(self.on_watch_entries)
+        self.watch_manager.source_changed.connect(self.update_watch_row)
+        for source in self.watch_manager.load():
+            self.add_watch_row(source)
 
     def add_scheduled_dialog(self):
         d = QDialog(self)
@@ -69,9 +133,15 @@ class SchedulerPage(QWidget):
         res_combo.addItems(["144p","240p","360p","480p","720p","1080p","1440p","2160p","4320p"])
         res_combo.setCurrentText(self.parent.user_profile.get_default_resolution())
         
+        repeat_combo = QComboBox()
+        repeat_combo.setEditable(True)
+        repeat_combo.addItems(["Once","every 1h","every 1d","every 1w"])
+        repeat_combo.setToolTip("An interval such as 'every 6h', or a cron expression such as '0 3 * * *'")
+        
         frm.addRow("Datetime:", dt_edit)
         frm.addRow("URL:", url_edit)
         frm.addRow("Resolution:", res_combo)
+        frm.addRow("Repeat:", repeat_combo)
         frm.addRow(c_audio)
         frm.addRow(c_subs)
         ly.addLayout(frm)
@@ -89,19 +159,33 @@ class SchedulerPage(QWidget):
             if not url:
                 self.parent.show_warning("Error", "No URL.")
                 return
+            repeat = repeat_combo.currentText().strip()
+            rule = None
+            if repeat and repeat != "Once":
+                try:
+                    rule = parse_rule(repeat)
+                except ValueError as e:
+                    self.parent.show_warning("Error", f"Invalid repeat rule: {e}")
+                    return
                 
-            row = self.scheduler_table.rowCount()
-            self.scheduler_table.insertRow(row)
-            self.scheduler_table.setItem(row, 0, QTableWidgetItem(dt_val.toString("yyyy-MM-dd HH:mm:ss")))
-            self.scheduler_table.setItem(row, 1, QTableWidgetItem(url))
-            
-            download_type = "Audio" if c_audio.isChecked() else "Video"
-            self.scheduler_table.setItem(row, 2, QTableWidgetItem(download_type))
-            self.scheduler_table.setItem(row, 3, QTableWidgetItem(res_combo.currentText()))
-            
-            subs_text = "Yes" if c_subs.isChecked() else "No"
-            self.scheduler_table.setItem(row, 4, QTableWidgetItem(subs_text))
-            self.scheduler_table.setItem(row, 5, QTableWidgetItem("Scheduled"))
+            audio = c_audio.isChecked()
+            # Saved in full, so a restart runs exactly what was scheduled
+            task = DownloadTask(
+                url,
+                res_combo.currentText(),
+                self.parent.user_profile.get_download_path(),
+                self.parent.user_profile.get_proxy(),
+                audio_only=audio,
+                playlist=False,
+                subtitles=c_subs.isChecked(),
+                from_queue=True,
+                output_format="mp4",
+                audio_format=self.parent.user_profile.get_audio_format() if audio else None,
+                audio_quality=self.parent.user_profile.get_audio_quality() if audio else "320"
+            )
+            job = self.scheduler.add(dt_val.toSecsSinceEpoch(), {"task": task.to_dict()}, rule)
+            self.schedule_store.save_job(job)
+            self.add_schedule_row(job, "Scheduled")
             
             d.accept()
             
@@ -118,39 +202,188 @@ class SchedulerPage(QWidget):
             selected_rows.add(item.row())
         
         for row in sorted(selected_rows, reverse=True):
+            job_id = self.scheduler_table.item(row, 0).data(Qt.UserRole)
+            # Along with any missed runs of it still waiting to catch up
+            job_ids = [job_id] + [job.id for job in self.scheduler.jobs() if job.data.get("catch_up_of") == job_id]
+            for scheduled_id in job_ids:
+                self.scheduler.remove(scheduled_id)
+            self.schedule_store.remove_jobs(job_ids)
+            self.status_items.pop(job_id, None)
             self.scheduler_table.removeRow(row)
 
-    def check_scheduled_downloads(self):
-        now = QDateTime.currentDateTime()
-        for row in range(self.scheduler_table.rowCount()):
-            dt_str = self.scheduler_table.item(row, 0).text()
-            scheduled_dt = QDateTime.fromString(dt_str, "yyyy-MM-dd HH:mm:ss")
-            status_item = self.scheduler_table.item(row, 5)
-            
-            now_secs = now.toSecsSinceEpoch()
-            scheduled_secs = scheduled_dt.toSecsSinceEpoch()
-            
-            if status_item and scheduled_secs <= now_secs and status_item.text() == "Scheduled":
-                url = self.scheduler_table.item(row, 1).text()
-                type_text = self.scheduler_table.item(row, 2).text().lower()
-                resolution = self.scheduler_table.item(row, 3).text()
-                subtitles = (self.scheduler_table.item(row, 4).text() == "Yes")
-                
-          
-                
-                task = DownloadTask(
-                    url,
-                    resolution,
-                    self.parent.user_profile.get_download_path(),
-                    self.parent.user_profile.get_proxy(),
-                    audio_only=("audio" in type_text),
-                    playlist=False,
-                    subtitles=subtitles,
-                    from_queue=True,
-                    output_format="mp4",
-                    audio_format=self.parent.user_profile.get_audio_format() if "audio" in type_text else None,
-                    audio_quality=self.parent.user_profile.get_audio_quality() if "audio" in type_text else "320"
-                )
-                
-                self.parent.run_task(task, row)
-                self.scheduler_table.setItem(row, 5, QTableWidgetItem("Started")) 
\ No newline at end of file
+    def restore_schedule(self):
+        scheduler_config = config_manager.config.scheduler
+        try:
+            policy = CatchUpPolicy(self.parent.user_profile.get_catch_up_policy())
+        except ValueError:
+            policy = CatchUpPolicy.LATEST
+        plan = plan_catch_up(self.schedule_store.jobs(), time.time(), policy, scheduler_config.CATCH_UP_MAX_RUNS,
+                             scheduler_config.CATCH_UP_DELAY, scheduler_config.CATCH_UP_STAGGER)
+        self.scheduler.restore(plan.jobs)
+        # Skipped jobs keep their rows, so their ids must not go to new jobs
+        self.scheduler.reserve_ids(max((job.id for job in plan.skipped), default=0))
+        catch_ups = [self.scheduler.add(start, {"task": job.data["task"], "catch_up_of": job.id})
+                     for job, start in plan.runs]
+        self.schedule_store.save_jobs(plan.jobs + catch_ups)
+        self.schedule_store.remove_jobs([job.id for job in plan.skipped])
+        
+        restored_ids = {job.id for job in plan.jobs}
+        for job in plan.jobs:
+            if job.data.get("catch_up_of") in restored_ids:
+                continue  # shown as its recurring job
+            missed = plan.missed.get(job.id, 0)
+            if missed and job.rule is None:
+                status = f"Missed, starts {format_timestamp(job.due, seconds=True)[11:]}"
+            elif missed:
+                status = f"Missed, catching up {missed} run(s)"
+            else:
+                status = "Scheduled"
+            self.add_schedule_row(job, status)
+        for job in plan.skipped:
+            self.add_schedule_row(job, "Missed, skipped")
+            self.status_items.pop(job.id, None)
+        total = sum(plan.missed.values())
+        if total:
+            self.parent.append_log(
+                f"Scheduler: {total} missed run(s) start in {scheduler_config.CATCH_UP_DELAY:g}s, "
+                f"{scheduler_config.CATCH_UP_STAGGER:g}s apart.")
+
+    def add_schedule_row(self, job, status):
+        task = job.data.get("task", {})
+        row = self.scheduler_table.rowCount()
+        self.scheduler_table.insertRow(row)
+        dt_item = QTableWidgetItem(format_timestamp(job.due, seconds=True))
+        dt_item.setData(Qt.UserRole, job.id)
+        self.scheduler_table.setItem(row, 0, dt_item)
+        self.scheduler_table.setItem(row, 1, QTableWidgetItem(task.get("url", "")))
+        self.scheduler_table.setItem(row, 2, QTableWidgetItem("Audio" if task.get("audio_only") else "Video"))
+        self.scheduler_table.setItem(row, 3, QTableWidgetItem(task.get("resolution", "")))
+        self.scheduler_table.setItem(row, 4, QTableWidgetItem("Yes" if task.get("subtitles") else "No"))
+        status_item = QTableWidgetItem(status)
+        self.scheduler_table.setItem(row, 5, status_item)
+        self.scheduler_table.setItem(row, 6, QTableWidgetItem(job.rule.text if job.rule else "Once"))
+        self.status_items[job.id] = status_item
+
+    def start_scheduled_download(self, job):
+        # Saved first: a one-off run is done with, a recurring job has its next due time
+        if job.rule is None:
+            self.schedule_store.remove_jobs([job.id])
+        else:
+            self.schedule_store.save_job(job)
+        row_id = job.data.get("catch_up_of", job.id)
+        if job.rule is None and row_id == job.id:
+            status_item = self.status_items.pop(job.id, None)
+        else:
+            status_item = self.status_items.get(row_id)
+        
+        self.parent.run_task(DownloadTask.from_dict(job.data["task"]))
+        if status_item is None:
+            return  # No row, as for a catch-up run whose recurring job was dropped
+        if job.rule is None and row_id == job.id:
+            status_item.setText("Started")
+        else:
+            # Recurring: the row shows the next run
+            recurring = self.scheduler.job(row_id)
+            if recurring is not None:
+                self.scheduler_table.item(status_item.row(), 0).setText(format_timestamp(recurring.due, seconds=True))
+            status_item.setText(f"Started {QDateTime.currentDateTime().toString('HH:mm')}")
+
+    def add_watch_dialog(self):
+        d = QDialog(self)
+        d.setWindowTitle("Watch Channels or Profiles")
+        d.setModal(True)
+        ly = QVBoxLayout(d)
+        
+        frm = QFormLayout()
+        urls_edit = QPlainTextEdit()
+        urls_edit.setPlaceholderText("One channel or profile URL per line")
+        rule_combo = QComboBox()
+        rule_combo.setEditable(True)
+        rule_combo.addItems(["every 1h","every 6h","every 1d","@daily"])
+        rule_combo.setToolTip("An interval such as 'every 30m', or a cron expression such as '0 */2 * * *'")
+        res_combo = QComboBox()
+        res_combo.addItems(["144p","240p","360p","480p","720p","1080p","1440p","2160p","4320p"])
+        res_combo.setCurrentText(self.parent.user_profile.get_default_resolution())
+        c_audio = QCheckBox("Audio Only")
+        
+        frm.addRow("URLs:", urls_edit)
+        frm.addRow("Check:", rule_combo)
+        frm.addRow("Resolution:", res_combo)
+        frm.addRow(c_audio)
+        ly.addLayout(frm)
+        ly.addWidget(QLabel("Only videos posted after the first check are downloaded."))
+        
+        b_ok = AnimatedButton("Watch")
+        b_cancel = AnimatedButton("Cancel")
+        btn_layout = QHBoxLayout()
+        btn_layout.addWidget(b_ok)
+        btn_layout.addWidget(b_cancel)
+        ly.addLayout(btn_layout)
+        
+        def on_ok():
+            urls = parse_urls(urls_edit.toPlainText())
+            if not urls:
+                self.parent.show_warning("Error", "No URL.")
+                return
+            rule = rule_combo.currentText().strip()
+            try:
+                parse_rule(rule)
+            except ValueError as e:
+                self.parent.show_warning("Error", f"Invalid check rule: {e}")
+                return
+            audio_only = c_audio.isChecked()
+            options = dict(
+                resolution=res_combo.currentText(),
+                folder=self.parent.user_profile.get_download_path(),
+                proxy=self.parent.user_profile.get_proxy(),
+                audio_only=audio_only,
+                output_format=self.parent.user_profile.get_audio_format() if audio_only else "mp4",
+                audio_format=self.parent.user_profile.get_audio_format() if audio_only else None,
+                audio_quality=self.parent.user_profile.get_audio_quality() if audio_only else "320",
+                from_queue=True
+            )
+            for url in urls:
+                self.add_watch_row(self.watch_manager.add_source(url, rule, options))
+            d.accept()
+        
+        b_ok.clicked.connect(on_ok)
+        b_cancel.clicked.connect(d.reject)
+        d.exec()
+
+    def add_watch_row(self, source):
+        row = self.watch_table.rowCount()
+        self.watch_table.insertRow(row)
+        url_item = QTableWidgetItem(source.url)
+        url_item.setData(Qt.UserRole, source.id)
+        self.watch_table.setItem(row, 0, url_item)
+        self.watch_items[source.id] = url_item
+        self.update_watch_row(source)
+
+    def update_watch_row(self, source):
+        url_item = self.watch_items.get(source.id)
+        if url_item is None:
+            return
+        row = url_item.row()
+        status = source.last_error or ("Watching" if source.enabled else "Disabled")
+        values = [source.rule, format_timestamp(self.watch_manager.next_poll(source.id)),
+                  format_timestamp(source.last_poll), str(source.found), status]
+        for column, value in enumerate(values, start=1):
+            self.watch_table.setItem(row, column, QTableWidgetItem(value))
+
+    def selected_watch_ids(self):
+        rows = {item.row() for item in self.watch_table.selectedItems()}
+        return [self.watch_table.item(row, 0).data(Qt.UserRole) for row in sorted(rows)]
+
+    def poll_selected_watches(self):
+        for source_id in self.selected_watch_ids():
+            self.watch_manager.poll_now(source_id)
+
+    def remove_selected_watches(self):
+        for source_id in self.selected_watch_ids():
+            self.watch_manager.remove_source(source_id)
+            self.watch_table.removeRow(self.watch_items.pop(source_id).row())
+
+    def on_watch_entries(self, source, entries):
+        tasks = [task for chunk in build_tasks([entry["url"] for entry in entries], source.options) for task in chunk]
+        self.parent.page_queue.add_tasks(tasks, start=True)
+        self.parent.append_log(f"Watch: {len(tasks)} new video(s) from {source.url} added to the queue.")
@@ -1,10 +1,16 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                             QGroupBox, QFormLayout, QLineEdit, QComboBox, 
-                            QFileDialog, QMessageBox, QScrollArea)
+                            QFileDialog, QMessageBox, QScrollArea, QTableWidget,
+                            QTableWidgetItem, QHeaderView)
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont
 from ui.components.animated_button import AnimatedButton
+from ui.dialogs.event_metrics_dialog import EventMetricsDialog
+from core.event_replay import EventRecorder, default_trace_path
+from core.events import event_bus
 from core.version import get_version
+from core.throttle import (ThrottleProfile, format_days, format_job_classes, format_rate,
+                           parse_days, parse_job_classes, parse_rate)
 
 class SettingsPage(QWidget):
     def __init__(self, parent=None):
@@ -95,8 +101,52 @@ class SettingsPage(QWidget):
         )
         g_layout.addWidget(QLabel("Concurrent:"))
         g_layout.addWidget(self.concurrent_combo)
+        self.resume_queue_combo = QComboBox()
+        self.resume_queue_combo.addItems(["Yes", "No"])
+        self.resume_queue_combo.setCurrentText("Yes" if self.parent.user_profile.get_resume_queue() else "No")
+        self.resume_queue_combo.currentTextChanged.connect(self.resume_queue_changed)
+        self.resume_queue_combo.setToolTip("Restart downloads that were running when the app was closed")
+        g_layout.addWidget(QLabel("Resume on Start:"))
+        g_layout.addWidget(self.resume_queue_combo)
         layout.addWidget(g_con)
 
+        # Throttle Profiles Group
+        g_throttle = QGroupBox("Throttle Profiles")
+        g_throttle.setMinimumWidth(300)
+        t_layout = QVBoxLayout(g_throttle)
+        t_layout.setContentsMargins(10, 10, 10, 10)
+        self.throttle_table = QTableWidget(0, 7)
+        self.throttle_table.setHorizontalHeaderLabels(["Name","Days","From","To","Max Downloads","Bandwidth","Job Types"])
+        self.throttle_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.throttle_table.setMinimumHeight(150)
+        self.throttle_table.setToolTip(
+            "Limits by time of day; outside every window the settings above apply:\n"
+            "• Days - all, mon-fri, sat,sun\n"
+            "• From/To - HH:MM; a window may run past midnight\n"
+            "• Bandwidth - shared by all downloads, e.g. 500K, 2M; empty for unlimited\n"
+            "• Job Types - all, or some of video, audio, playlist, subtitles\n\n"
+            "The first matching row wins. Running downloads are not restarted."
+        )
+        for data in self.parent.user_profile.get_throttle_profiles():
+            try:
+                self.add_throttle_row(ThrottleProfile.from_dict(data))
+            except ValueError:
+                continue
+        t_layout.addWidget(self.throttle_table)
+        t_buttons = QHBoxLayout()
+        b_add_throttle = AnimatedButton("Add Profile")
+        b_add_throttle.clicked.connect(lambda: self.add_throttle_row(
+            ThrottleProfile("Business hours", "09:00", "17:00", max_concurrent=1, bandwidth=512 * 1024, days=tuple(range(5)))))
+        b_remove_throttle = AnimatedButton("Remove Profile")
+        b_remove_throttle.clicked.connect(self.remove_throttle_rows)
+        b_apply_throttle = AnimatedButton("Apply Profiles")
+        b_apply_throttle.clicked.connect(self.apply_throttle_profiles)
+        t_buttons.addWidget(b_add_throttle)
+        t_buttons.addWidget(b_remove_throttle)
+        t_buttons.addWidget(b_apply_throttle)
+        t_layout.addLayout(t_buttons)
+        layout.addWidget(g_throttle)
+
         # Technical Group
         g_tech = QGroupBox("Technical / Appearance")
         g_tech.setMinimumWidth(300)
@@ -208,6 +258,38 @@ class SettingsPage(QWidget):
         q_layout.addRow("Preserve Original:", self.preserve_quality_combo)
         layout.addWidget(g_quality)
 
+        # Subtitles Group
+        g_subs = QGroupBox("Subtitles")
+        g_subs.setMinimumWidth(300)
+        s_layout = QFormLayout(g_subs)
+        s_layout.setContentsMargins(10, 10, 10, 10)
+
+        self.subtitle_langs_edit = QLineEdit()
+        self.subtitle_langs_edit.setText(", ".join(self.parent.user_profile.get_subtitle_languages()))
+        self.subtitle_langs_edit.setPlaceholderText("en, de, pt.*")
+        self.subtitle_langs_edit.editingFinished.connect(self.subtitle_languages_changed)
+        self.subtitle_langs_edit.setToolTip(
+            "Subtitle languages to fetch:\n"
+            "• Comma separated language codes (en, de, fr)\n"
+            "• Regular expressions are allowed (en.* matches en-US, en-GB)\n"
+            "• 'all' fetches every track (slow on YouTube)\n\n"
+            "Only the selected tracks are downloaded"
+        )
+
+        self.auto_subtitles_combo = QComboBox()
+        self.auto_subtitles_combo.addItems(["Yes", "No"])
+        self.auto_subtitles_combo.setCurrentText("Yes" if self.parent.user_profile.get_auto_subtitles() else "No")
+        self.auto_subtitles_combo.currentTextChanged.connect(self.auto_subtitles_changed)
+        self.auto_subtitles_combo.setToolTip(
+            "Automatic captions:\n"
+            "• Yes - Use auto-generated captions when no manual track exists\n"
+            "• No - Only fetch subtitles uploaded by the creator"
+        )
+
+        s_layout.addRow("Languages:", self.subtitle_langs_edit)
+        s_layout.addRow("Auto Captions:", self.auto_subtitles_combo)
+        layout.addWidget(g_subs)
+
         # Download Path Group
         g_path = QGroupBox("Download Path")
         g_path.setMinimumWidth(300)
@@ -353,10 +435,23 @@ class SettingsPage(QWidget):
         logs_info = QLabel("View application logs and debug information")
         logs_info.setStyleSheet("color: #666; font-size: 10pt;")
         
+        self.event_metrics_btn = AnimatedButton("Event Metrics")
+        self.event_metrics_btn.setFixedHeight(36)
+        self.event_metrics_btn.setToolTip("Event bus handler latencies and durations")
+        self.event_metrics_btn.clicked.connect(self.show_event_metrics)
+        
+        self.event_recorder = None
+        self.record_events_btn = AnimatedButton("Record Events")
+        self.record_events_btn.setFixedHeight(36)
+        self.record_events_btn.setToolTip("Record the events of this session to a trace for replay in benchmarks")
+        self.record_events_btn.clicked.connect(self.toggle_event_recording)
+        
         logs_layout.addWidget(logs_label)
         logs_layout.addWidget(self.show_logs_btn)
         logs_layout.addWidget(logs_info)
         logs_layout.addStretch()
+        logs_layout.addWidget(self.event_metrics_btn)
+        logs_layout.addWidget(self.record_events_btn)
         
         layout.addWidget(g_logs)
         
@@ -375,6 +470,49 @@ class SettingsPage(QWidget):
         val = self.concurrent_combo.currentText()
         self.parent.max_concurrent_downloads = int(val)
         self.parent.append_log(f"Max concurrent downloads set to {val}")
+        if hasattr(self.parent, 'page_queue'):
+            # Takes effect now unless a throttle profile window is open
+            self.parent.page_queue.throttle.set_default(
+                ThrottleProfile("Manual", max_concurrent=self.parent.max_concurrent_downloads))
+        else:
+            self.parent.thread_pool.setMaxThreadCount(self.parent.max_concurrent_downloads)
+
+    def add_throttle_row(self, profile):
+        row = self.throttle_table.rowCount()
+        self.throttle_table.insertRow(row)
+        values = [profile.name, format_days(profile.days), profile.start, profile.end,
+                  str(profile.max_concurrent), "" if profile.bandwidth is None else format_rate(profile.bandwidth),
+                  format_job_classes(profile.job_classes)]
+        for column, value in enumerate(values):
+            self.throttle_table.setItem(row, column, QTableWidgetItem(value))
+
+    def remove_throttle_rows(self):
+        rows = {item.row() for item in self.throttle_table.selectedItems()}
+        for row in sorted(rows, reverse=True):
+            self.throttle_table.removeRow(row)
+
+    def apply_throttle_profiles(self):
+        profiles = []
+        for row in range(self.throttle_table.rowCount()):
+            text = [self.throttle_table.item(row, column).text() if self.throttle_table.item(row, column) else ""
+                    for column in range(7)]
+            try:
+                profiles.append(ThrottleProfile(
+                    name=text[0].strip() or f"Profile {row + 1}",
+                    days=parse_days(text[1]),
+                    start=text[2],
+                    end=text[3],
+                    max_concurrent=int(text[4]),
+                    bandwidth=parse_rate(text[5]),
+                    job_classes=parse_job_classes(text[6])
+                ).to_dict())
+            except ValueError as e:
+                QMessageBox.warning(self, "Throttle Profiles", f"Row {row + 1}: {e}")
+                return
+        self.parent.user_profile.set_throttle_profiles(profiles)
+        if hasattr(self.parent, 'page_queue'):
+            self.parent.page_queue.apply_throttle_profiles(profiles)
+        self.parent.append_log(f"{len(profiles)} throttle profile(s) applied.")
 
     def proxy_changed(self, text):
         self.parent.user_profile.set_proxy(text)
@@ -403,6 +541,22 @@ class SettingsPage(QWidget):
         mode = "enabled" if preserve else "disabled"
         self.parent.append_log(f"Quality preservation {mode}")
 
+    def subtitle_languages_changed(self):
+        self.parent.user_profile.set_subtitle_languages(self.subtitle_langs_edit.text())
+        languages = ", ".join(self.parent.user_profile.get_subtitle_languages())
+        self.subtitle_langs_edit.setText(languages)
+        self.parent.append_log(f"Subtitle languages set to: {languages or 'default'}")
+
+    def resume_queue_changed(self, enabled_text):
+        enabled = enabled_text == "Yes"
+        self.parent.user_profile.set_resume_queue(enabled)
+        self.parent.append_log(f"Resume queue on start {'enabled' if enabled else 'disabled'}")
+
+    def auto_subtitles_changed(self, enabled_text):
+        enabled = enabled_text == "Yes"
+        self.parent.user_profile.set_auto_subtitles(enabled)
+        self.parent.append_log(f"Automatic captions {'enabled' if enabled else 'disabled'}")
+
     def select_download_path(self):
         folder = QFileDialog.getExistingDirectory(self, "Select Download Folder")
         if folder:
@@ -414,6 +568,19 @@ class SettingsPage(QWidget):
             self.download_path_edit.setText(folder)
             self.parent.append_log(f"Download path changed to {folder}")
 
+    def show_event_metrics(self):
+        EventMetricsDialog(event_bus, self).exec()
+
+    def toggle_event_recording(self):
+        if self.event_recorder is None:
+            self.event_recorder = EventRecorder(default_trace_path(), event_bus).start()
+            self.record_events_btn.setText("Stop Recording")
+            return
+        recorder, self.event_recorder = self.event_recorder, None
+        count = recorder.stop()
+        self.record_events_btn.setText("Record Events")
+        QMessageBox.information(self, "Event Recording", f"Recorded {count} events to:\n{recorder.path}")
+
     def toggle_logs(self):
         self.parent.log_manager.toggle_visibility()
         